@@ -1,6 +1,45 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
 import hashlib
 import json
-from typing import Dict
+import os
+import sys
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import zlib
+
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+@dataclass
+class CacheEntry:
+    """
+    Entry in a ``Cache``.
+    """
+
+    size: int
+    """
+    Size of the content, in bytes.
+    """
+
+    checksum: str
+    """
+    Checksum for the content (see ``fast_checksum``).
+    """
+
+    file_size: Optional[int] = None
+    file_mtime: Optional[int] = None
+    """
+    If the key for this entry is the path of a file written with this content,
+    size and modification time (in nanoseconds) for this file just after it
+    was written. None if unknown.
+    """
 
 
 class Cache:
@@ -9,9 +48,21 @@ class Cache:
 
     Generating and building libraries can be quite long. This cache class is an
     attempt to reduce the time to do this.
+
+    Several processes can use the same cache file: the cache file is written
+    atomically, and entries that a process did not update are preserved when
+    it saves the cache. Saving the cache is done under a lock (see
+    ``file_lock``), so that concurrent saves do not discard each other's
+    updates.
+    """
+
+    FORMAT_VERSION = 2
+    """
+    Version number for the on-disk format of the cache. A cache file with a
+    different version number is ignored.
     """
 
-    db: Dict[str, str]
+    db: Dict[str, CacheEntry]
 
     def __init__(self, cache_file: str) -> None:
         """Load the cache from `cache_file`, or create a new cache if new.
@@ -20,42 +71,713 @@ class Cache:
             another run.
         """
         self.cache_file = cache_file
-        self._load()
+        self.db = self._load()
+        self._updated: Set[str] = set()
 
-    def _load(self) -> None:
+    def _load(self) -> Dict[str, CacheEntry]:
         try:
-            f = open(self.cache_file, 'r')
-        except IOError:
-            self.db = {}
-        else:
-            with f:
-                self.db = json.load(f)
+            with open(self.cache_file, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get('version') != self.FORMAT_VERSION
+            or not isinstance(data.get('entries'), dict)
+        ):
+            return {}
+
+        # Ignore malformed entries: they are just cache misses
+        result = {}
+        for key, entry in data['entries'].items():
+            try:
+                size, checksum, file_size, file_mtime = entry
+            except (TypeError, ValueError):
+                continue
+            if (
+                isinstance(size, int)
+                and isinstance(checksum, str)
+                and isinstance(file_size, (int, type(None)))
+                and isinstance(file_mtime, (int, type(None)))
+            ):
+                result[key] = CacheEntry(
+                    size, checksum, file_size, file_mtime
+                )
+        return result
 
-    def is_stale(self, key: str, content: str) -> bool:
+    def is_stale(self, key: str, content: Union[str, bytes]) -> bool:
         """Return whether the `key` cache entry is staled.
 
-        The first time this is called for some `key`, always return False. The
-        next times, return whether `content` is the same as the previous time.
+        Return whether there is no entry for `key` or whether `content` is
+        different from the previous time, and update the entry.
 
         :param str key: Key for the cache entry to test.
-        :param str content: Content for the cache entry to test.
+        :param str|bytes content: Content for the cache entry to test. Strings
+            are considered encoded in UTF-8.
         :rtype: bool
         """
-        m = hashlib.md5()
-        m.update(content.encode('utf-8'))
-        new_hash = m.hexdigest()
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        new_entry = CacheEntry(len(content), fast_checksum(content))
+
+        old_entry = self.db.get(key)
+        stale = (
+            old_entry is None
+            or old_entry.size != new_entry.size
+            or old_entry.checksum != new_entry.checksum
+        )
+        if stale:
+            self.db[key] = new_entry
+            self._updated.add(key)
+        return stale
+
+    def file_changed(self, file_path: str) -> bool:
+        """Return whether the `file_path` file was changed since it was
+        written with the content of the corresponding cache entry.
+
+        This only compares file sizes and modification times, so this is
+        cheap. Missing files and files with no known state are considered
+        changed.
 
+        :param str file_path: Path of the file, which is also the key for the
+            cache entry.
+        :rtype: bool
+        """
+        entry = self.db.get(file_path)
+        if entry is None or entry.file_size is None:
+            return True
         try:
-            old_hash = self.db[key]
-        except KeyError:
-            stale = True
-        else:
-            stale = old_hash != new_hash
+            st = os.stat(file_path)
+        except OSError:
+            return True
+        return (
+            entry.file_size != st.st_size or entry.file_mtime != st.st_mtime_ns
+        )
 
-        self.db[key] = new_hash
-        return stale
+    def record_file(self, file_path: str) -> None:
+        """Record the current state of the `file_path` file, which must have
+        been just written with the content of the corresponding cache entry
+        (possibly reformatted).
+
+        :param str file_path: Path of the file, which is also the key for the
+            cache entry.
+        """
+        entry = self.db[file_path]
+        st = os.stat(file_path)
+        entry.file_size = st.st_size
+        entry.file_mtime = st.st_mtime_ns
+        self._updated.add(file_path)
 
     def save(self) -> None:
         """Save the content of the cache to a file."""
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.db, f)
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        with file_lock(self.cache_file + '.lock'):
+            # Another process may have saved the cache since we loaded it:
+            # start from its version so that we do not discard its updates.
+            db = self._load()
+            db.update((key, self.db[key]) for key in self._updated)
+            self.db = db
+            self._updated = set()
+
+            write_file_atomically(
+                self.cache_file,
+                json.dumps({
+                    'version': self.FORMAT_VERSION,
+                    'entries': {
+                        key: [e.size, e.checksum, e.file_size, e.file_mtime]
+                        for key, e in sorted(db.items())
+                    },
+                }).encode('utf-8'),
+            )
+
+
+def fast_checksum(content: bytes) -> str:
+    """
+    Return a checksum for the given content.
+
+    This is not a cryptographic hash: it combines two 32-bit checksums, which
+    is much faster to compute and good enough to detect changes in generated
+    sources.
+    """
+    return '{:08x}{:08x}'.format(zlib.crc32(content), zlib.adler32(content))
+
+
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """
+    Context manager to hold an exclusive lock on the ``lock_path`` file,
+    creating it if needed. This blocks until other processes release the
+    lock.
+    """
+    with open(lock_path, "a+b") as f:
+        if sys.platform == "win32":
+            # msvcrt.locking gives up after 10 attempts: keep trying
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_file_atomically(file_path: str, content: bytes) -> None:
+    """
+    Write ``content`` to the ``file_path`` file so that concurrent readers see
+    either the old content or the new one, never a partially written file.
+    """
+    dirname = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(
+        dir=dirname, prefix=".{}.".format(os.path.basename(file_path))
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def hash_strings(*items: str) -> str:
+    """
+    Return a hash for the given sequence of strings.
+    """
+    m = hashlib.sha256()
+    for item in items:
+        encoded = item.encode("utf-8")
+        m.update(str(len(encoded)).encode("ascii"))
+        m.update(b":")
+        m.update(encoded)
+    return m.hexdigest()
+
+
+def hash_files(file_paths: Iterable[str]) -> str:
+    """
+    Return a hash for the names and contents of the given files. Missing files
+    contribute their name only.
+    """
+    m = hashlib.sha256()
+    for file_path in sorted(set(file_paths)):
+        m.update(file_path.encode("utf-8"))
+        try:
+            with open(file_path, "rb") as f:
+                m.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            m.update(b"<missing>")
+    return m.hexdigest()
+
+
+def file_hash(file_path: str) -> Optional[str]:
+    """
+    Return a hash for the content of the given file, or None if it is missing.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+_langkit_fingerprints: Dict[bool, str] = {}
+
+
+def langkit_fingerprint(include_templates: bool = True) -> str:
+    """
+    Return a hash that identifies the version of Langkit that is running: the
+    content of all its Python modules, templates and support sources.
+
+    :param include_templates: If false, consider only the names of templates,
+        not their content. This is useful when the templates that some
+        computation uses are tracked separately.
+    """
+    result = _langkit_fingerprints.get(include_templates)
+    if result is None:
+        langkit_dir = os.path.dirname(os.path.abspath(__file__))
+        templates_dir = os.path.join(langkit_dir, "templates")
+        file_paths: List[str] = []
+        template_paths: List[str] = []
+        for dirpath, dirnames, filenames in os.walk(langkit_dir):
+            dirnames[:] = [d for d in dirnames
+                           if d != "__pycache__" and not d.startswith(".")]
+            paths = [os.path.join(dirpath, f) for f in filenames]
+            if (
+                include_templates
+                or os.path.commonpath([dirpath, templates_dir])
+                != templates_dir
+            ):
+                file_paths.extend(paths)
+            else:
+                template_paths.extend(paths)
+        result = hash_files(file_paths)
+        if not include_templates:
+            result = hash_strings(result, *sorted(template_paths))
+        _langkit_fingerprints[include_templates] = result
+    return result
+
+
+@dataclass
+class PassRecord:
+    """
+    Observable effects of one run of a compilation pass.
+    """
+
+    output: str
+    """
+    Text that the pass printed on the standard output (diagnostics, mostly).
+    """
+
+    files: List[Tuple[str, str, int]]
+    """
+    For each source file that the pass emitted: its path, the hash of its
+    content (i.e. its key in the objects store) and its permission bits.
+    """
+
+
+class PassCache:
+    """
+    Persistent, content-addressed cache for the effects of compilation passes.
+
+    The inputs of the compilation are split in named groups (for instance the
+    language spec sources or the templates), each one with its own
+    fingerprint. Each pass run is identified by a key that combines its
+    position and name in the pipeline and the fingerprints of the groups of
+    inputs that it depends on: the groups it declares, plus the groups that
+    the passes before it declare, as it works on their in-memory results. For
+    each key, the cache stores a ``PassRecord``, so that running the same
+    pipeline on the same inputs can replay the effects of passes instead of
+    running them.
+
+    Note that all passes depend on the language spec: changing it, even only
+    the body of one property, runs the whole pipeline again. Likewise, passes
+    can be replayed only at the end of the pipeline (see
+    ``langkit.passes.PassManager``), so changing templates or extensions runs
+    all compilation passes again, as code emission passes need their
+    in-memory results. This cache thus saves work only for runs whose inputs
+    match the ones of a previous run, for instance when switching back to a
+    previous configuration or to restore deleted generated sources. The unit
+    cache (``UnitCache``) is what limits the work after changes in the
+    language spec, by rendering again only the source files whose inputs
+    changed.
+
+    The cache is stored in a directory with two sub-directories: ``objects``,
+    which contains the contents of emitted source files (addressed by their
+    hash), and ``passes``, which contains one JSON file per pass record. Using
+    a record updates the modification time of its file, so that the least
+    recently used records can be removed when the cache grows too big.
+    """
+
+    FORMAT_VERSION = 3
+    """
+    Version number for the on-disk format of the cache. Records with a
+    different version number are ignored.
+    """
+
+    MAX_SIZE = 512 * 1024 * 1024
+    """
+    Size (in bytes) above which least recently used records are removed from
+    the cache.
+    """
+
+    def __init__(self, cache_dir: str, inputs: Dict[str, str]) -> None:
+        """
+        :param cache_dir: Directory that contains the cache.
+        :param inputs: Fingerprints for the inputs of the compilation, indexed
+            by group name.
+        """
+        self.cache_dir = cache_dir
+        self.inputs = inputs
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.passes_dir = os.path.join(cache_dir, "passes")
+
+        self.records: Dict[str, Optional[PassRecord]] = {}
+        """
+        Records for all the pass keys used during the current run: loaded from
+        the cache or newly recorded. None for cache misses.
+        """
+
+        self.new_records: Set[str] = set()
+        """
+        Keys for the records created during the current run, which must be
+        written to the cache.
+        """
+
+        self.recorded_files: Optional[List[str]] = None
+        """
+        While a pass is recorded, list of paths for the source files it emits.
+        None the rest of the time.
+        """
+
+        self.report: List[Tuple[str, str]] = []
+        """
+        For each pass that was considered during the current run, its name and
+        its cache status: "replayed" (cache hit: the effects of the pass were
+        replayed), "hit, re-run" (cache hit, but the pass had to run anyway
+        because a later pass needs its in-memory effects) or "miss".
+        """
+
+    def pass_key(self, index: int, name: str, inputs: Iterable[str]) -> str:
+        """
+        Return the cache key for a pass.
+
+        :param index: Position of the pass in the pipeline.
+        :param name: Name of the pass.
+        :param inputs: Names of the groups of inputs that the pass depends on.
+        """
+        return hash_strings(
+            str(self.FORMAT_VERSION),
+            str(index),
+            name,
+            *("{}={}".format(i, self.inputs[i]) for i in sorted(inputs)),
+        )
+
+    def _record_path(self, key: str) -> str:
+        return os.path.join(self.passes_dir, "{}.json".format(key))
+
+    def _object_path(self, content_hash: str) -> str:
+        return os.path.join(
+            self.objects_dir, content_hash[:2], content_hash[2:]
+        )
+
+    def lookup(self, key: str) -> Optional[PassRecord]:
+        """
+        Return the record for the given pass key, or None if there is no valid
+        record for it.
+        """
+        if key in self.records:
+            return self.records[key]
+
+        result: Optional[PassRecord] = None
+        try:
+            with open(self._record_path(key)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        else:
+            if data.get("version") == self.FORMAT_VERSION:
+                record = PassRecord(
+                    data["output"],
+                    [(path, h, mode) for path, h, mode in data["files"]],
+                )
+
+                # Records are usable only if all the objects they reference
+                # are still available.
+                if all(os.path.exists(self._object_path(h))
+                       for _, h, _ in record.files):
+                    result = record
+
+        self.records[key] = result
+        return result
+
+    def record_file(self, file_path: str) -> None:
+        """
+        If a pass is being recorded, register ``file_path`` as a source file
+        that it emits.
+        """
+        if self.recorded_files is not None:
+            self.recorded_files.append(file_path)
+
+    def start_recording(self) -> None:
+        """
+        Start recording the source files emitted by a pass.
+        """
+        assert self.recorded_files is None
+        self.recorded_files = []
+
+    def stop_recording(self, key: str, output: str) -> None:
+        """
+        Stop recording the current pass and create a record for it, using the
+        current content of the source files it emitted.
+
+        :param key: Key for the recorded pass.
+        :param output: Text that the pass printed on the standard output.
+        """
+        assert self.recorded_files is not None
+        files = []
+        for file_path in sorted(set(self.recorded_files)):
+            with open(file_path, "rb") as f:
+                content_hash = self.store_object(f.read())
+            files.append(
+                (file_path, content_hash, os.stat(file_path).st_mode & 0o777)
+            )
+        self.recorded_files = None
+
+        self.records[key] = PassRecord(output, files)
+        self.new_records.add(key)
+
+    def store_object(self, content: bytes) -> str:
+        """
+        Add ``content`` to the objects store and return its hash.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(content_hash)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            write_file_atomically(object_path, content)
+        return content_hash
+
+    def replay_files(self, record: PassRecord) -> None:
+        """
+        Restore the source files emitted by the pass for the given record.
+        Files that already have the expected content are left untouched.
+        """
+        for file_path, content_hash, mode in record.files:
+            with open(self._object_path(content_hash), "rb") as f:
+                content = f.read()
+
+            try:
+                with open(file_path, "rb") as f:
+                    up_to_date = f.read() == content
+            except OSError:
+                up_to_date = False
+
+            if not up_to_date:
+                os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+                write_file_atomically(file_path, content)
+            if os.stat(file_path).st_mode & 0o777 != mode:
+                os.chmod(file_path, mode)
+
+    def save(self) -> None:
+        """
+        Write new records to the cache, mark the records that the current run
+        used as recently used, and prune the cache (see ``prune``).
+        """
+        os.makedirs(self.passes_dir, exist_ok=True)
+        for key in sorted(self.new_records):
+            record = self.records[key]
+            assert record is not None
+            write_file_atomically(
+                self._record_path(key),
+                json.dumps({
+                    "version": self.FORMAT_VERSION,
+                    "output": record.output,
+                    "files": record.files,
+                }).encode("utf-8"),
+            )
+
+        for key, record in self.records.items():
+            if record is not None and key not in self.new_records:
+                try:
+                    os.utime(self._record_path(key))
+                except OSError:
+                    pass
+        self.new_records = set()
+
+        self.prune(self.MAX_SIZE)
+
+    def prune(self, max_size: int) -> None:
+        """
+        Remove the least recently used records until the records and the
+        objects they reference take at most ``max_size`` bytes, then remove
+        objects that no record references.
+        """
+        # Temporary files (see ``write_file_atomically``) start with a dot:
+        # leave them alone, as other processes may be writing them.
+        records = []
+        for filename in os.listdir(self.passes_dir):
+            if filename.startswith("."):
+                continue
+            record_path = os.path.join(self.passes_dir, filename)
+            try:
+                mtime = os.stat(record_path).st_mtime_ns
+                with open(record_path) as f:
+                    data = json.load(f)
+                if data["version"] != self.FORMAT_VERSION:
+                    raise ValueError
+                hashes = [h for _, h, _ in data["files"]]
+            except (OSError, ValueError, KeyError, TypeError):
+                # Invalid record: just remove it
+                mtime = -1
+                hashes = []
+            records.append((mtime, record_path, hashes))
+
+        # Keep the most recently used records first. Objects are shared
+        # between records, so count the size of each object only once.
+        kept_objects: Set[str] = set()
+        total = 0
+        for mtime, record_path, hashes in sorted(records, reverse=True):
+            size = 0
+            try:
+                size += os.stat(record_path).st_size
+                size += sum(
+                    os.stat(self._object_path(h)).st_size
+                    for h in set(hashes) - kept_objects
+                )
+            except OSError:
+                pass
+            total += size
+            if mtime < 0 or total > max_size:
+                try:
+                    os.unlink(record_path)
+                except OSError:
+                    pass
+            else:
+                kept_objects.update(hashes)
+
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for suffix in os.listdir(prefix_dir):
+                    if (
+                        not suffix.startswith(".")
+                        and prefix + suffix not in kept_objects
+                    ):
+                        os.unlink(os.path.join(prefix_dir, suffix))
+
+
+@dataclass
+class UnitRecord:
+    """
+    Inputs that the rendering of a generated source file used, in addition
+    to the inputs of the whole compilation.
+    """
+
+    templates: Dict[str, str]
+    """
+    Mapping from the path of each template used to render the source file to
+    the hash of its content.
+    """
+
+    docs: List[str]
+    """
+    Names of the documentation entries used to render the source file.
+    """
+
+
+class UnitCache:
+    """
+    Persistent cache to skip the rendering of generated source files whose
+    inputs did not change since the previous run.
+
+    The inputs of a generated source file are the inputs of the whole
+    compilation (language spec sources, Langkit's Python modules, generation
+    options: see ``CompileCtx.pass_cache_inputs_fingerprints``) and the
+    templates used to render it. Any change in the former invalidates all
+    records, whereas a change in a template invalidates only the records for
+    the source files that used it. Source files that were modified or removed
+    since they were written must be rendered again, too.
+    """
+
+    FORMAT_VERSION = 2
+    """
+    Version number for the on-disk format of the cache. A cache file with a
+    different version number is ignored.
+    """
+
+    def __init__(self, cache_file: str, inputs_fingerprint: str) -> None:
+        """
+        :param cache_file: Name of the file that contains cache data from
+            another run.
+        :param inputs_fingerprint: Hash for all the inputs of the compilation,
+            except templates.
+        """
+        self.cache_file = cache_file
+        self.inputs_fingerprint = inputs_fingerprint
+
+        self.records: Dict[str, UnitRecord] = {}
+        """
+        Records for all generated source files, indexed by path.
+        """
+
+        self._template_hashes: Dict[str, Optional[str]] = {}
+        """
+        Cache for the hashes of template files. None for missing files.
+        """
+
+        self.report: List[Tuple[str, str]] = []
+        """
+        For each generated source file that was considered during the current
+        run, its path and its cache status: "skipped" (its rendering was
+        skipped) or "rendered".
+        """
+
+        self.upstream_templates: Set[str] = set()
+        """
+        Templates used so far in the current run, except for the rendering of
+        source files that this cache tracks. Some passes render templates and
+        keep the result in memory (for instance the code of properties) for
+        the rendering of source files, so these templates are considered as
+        used by all the source files rendered after them.
+        """
+
+        try:
+            with open(cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            data.get("version") == self.FORMAT_VERSION
+            and data.get("inputs") == inputs_fingerprint
+        ):
+            self.records = {
+                file_path: UnitRecord(templates, docs)
+                for file_path, (templates, docs) in data["units"].items()
+            }
+
+    def template_hash(self, file_path: str) -> Optional[str]:
+        """
+        Return the hash of the given template file, or None if it is missing.
+        """
+        try:
+            return self._template_hashes[file_path]
+        except KeyError:
+            result = file_hash(file_path)
+            self._template_hashes[file_path] = result
+            return result
+
+    def lookup(self, file_path: str) -> Optional[UnitRecord]:
+        """
+        Return the record for the given generated source file if the templates
+        it used did not change, None otherwise.
+        """
+        record = self.records.get(file_path)
+        if record is None or any(
+            self.template_hash(t) != h for t, h in record.templates.items()
+        ):
+            return None
+        return record
+
+    def record(self,
+               file_path: str,
+               templates: Iterable[str],
+               docs: Iterable[str]) -> None:
+        """
+        Create a record for a generated source file that was just rendered.
+
+        :param file_path: Path of the generated source file.
+        :param templates: Paths for the templates used to render it.
+        :param docs: Names of the documentation entries used to render it.
+        """
+        template_hashes = {}
+        for t in sorted(templates):
+            t_hash = self.template_hash(t)
+            if t_hash is not None:
+                template_hashes[t] = t_hash
+        self.records[file_path] = UnitRecord(template_hashes, sorted(docs))
+
+    def save(self) -> None:
+        """
+        Write records to the cache file.
+        """
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        write_file_atomically(
+            self.cache_file,
+            json.dumps({
+                "version": self.FORMAT_VERSION,
+                "inputs": self.inputs_fingerprint,
+                "units": {
+                    file_path: [r.templates, r.docs]
+                    for file_path, r in sorted(self.records.items())
+                },
+            }).encode("utf-8"),
+        )
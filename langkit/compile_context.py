@@ -22,7 +22,7 @@ from os import path
 from typing import (Any, Callable, Dict, Iterator, List, Optional, Set,
                     TYPE_CHECKING, Tuple, Union)
 
-from funcy import lzip
+from funcy import keep, lzip
 
 from langkit import documentation, names, utils
 from langkit.ada_api import AdaAPISettings
@@ -42,6 +42,7 @@ if TYPE_CHECKING:
         ASTNodeType, ArrayType, CompiledType, EntityType, EnumType, Field,
         IteratorType, NodeBuilderType, StructType, UserField
     )
+    from langkit.caching import PassCache, UnitCache
     from langkit.emitter import Emitter
     from langkit.expressions import PropertyDef
     from langkit.lexer import Lexer
@@ -49,6 +50,7 @@ if TYPE_CHECKING:
     from langkit.ocaml_api import OCamlAPISettings
     from langkit.passes import AbstractPass
     from langkit.parsers import GeneratedParser, Grammar, Parser, VarDef
+    from langkit.pass_report import PassReport
     from langkit.python_api import PythonAPISettings
     from langkit.java_api import JavaAPISettings
 
@@ -332,8 +334,55 @@ class CacheCollectionConf:
     the collection threshold is reached.
     """
 
+    builtin_heuristic: Optional[str] = None
+    """
+    Name of a built-in heuristic to use instead of ``decision_heuristic``
+    (both cannot be used at the same time). With built-in heuristics, units
+    are considered in a specific order, and the lexical env caches of each
+    unit are collected until the total number of cache entries is back to at
+    most half the number that triggered the collection. Valid names are:
+
+    * ``"lru"``: consider first the units whose caches were least recently
+      looked up;
+    * ``"hit_ratio"``: consider first the units whose caches have the lowest
+      ratio of hits per lookup since their last collection.
+    """
+
+    max_unit_entries: Optional[int] = None
+    """
+    If not None, maximum number of lexical env cache entries for a single
+    analysis unit: as soon as a unit exceeds it, its caches are collected,
+    independently of ``threshold_increment``. Must be positive.
+    """
+
     def __post_init__(self):
         assert self.threshold_increment > 0
+        assert self.builtin_heuristic in (None, "lru", "hit_ratio")
+        assert (
+            self.decision_heuristic is None or self.builtin_heuristic is None
+        )
+        assert self.max_unit_entries is None or self.max_unit_entries > 0
+
+
+@dataclasses.dataclass
+class MemoizationConf:
+    """
+    Describes a memory budget for the memoization tables of properties.
+    """
+
+    max_entries: int
+    """
+    Maximum number of entries in the memoization table of each analysis unit.
+    When a call to a memoized property adds an entry to a table that is full,
+    entries are evicted using the CLOCK ("second chance") policy: entries that
+    were looked up since the last eviction round are kept for another round,
+    and the others are removed. Entries for property calls that are being
+    evaluated are never evicted, so tables may temporarily exceed this limit.
+    Must be positive.
+    """
+
+    def __post_init__(self):
+        assert self.max_entries > 0
 
 
 class CompileCtx:
@@ -379,7 +428,12 @@ class CompileCtx:
                  property_exceptions: Set[str] = set(),
                  generate_unparser: bool = False,
                  default_unparsing_config: str | None = None,
-                 cache_collection_conf: Optional[CacheCollectionConf] = None):
+                 cache_collection_conf: Optional[CacheCollectionConf] = None,
+                 table_driven_lexer: bool = False,
+                 prune_parser_memos: bool = False,
+                 parsing_statistics: bool = False,
+                 track_unit_dependencies: bool = False,
+                 memoization_conf: Optional[MemoizationConf] = None):
         """Create a new context for code emission.
 
         :param lang_name: string (mixed case and underscore: see
@@ -493,6 +547,34 @@ class CompileCtx:
 
         :param cache_collection_conf: If not None, setup the automatic cache
             collection mechanism with this configuration.
+
+        :param table_driven_lexer: If true, generate the lexer state machine as
+            compressed transition tables interpreted by a small loop, instead
+            of one block of code per state. The generated code is a bit slower
+            on some inputs, but it is much smaller and faster to compile for
+            big lexers.
+
+        :param prune_parser_memos: If true, do not generate memoization tables
+            for parsing rules that cannot be invoked twice on the same token
+            during one parsing session. This saves memory and the work to clear
+            these tables at the start of each parsing session, but note that
+            this makes parsing slower if memoization tables for the parsing
+            rules that call them are too small. See also the ``memo_size``
+            annotation for grammar rules.
+
+        :param parsing_statistics: If true, make parsing rules count hits and
+            misses for their memoization tables, and generate an API to get
+            these counters (``Get_Parsing_Statistics``).
+
+        :param track_unit_dependencies: If true, record which analysis units
+            memoized properties and lexical env lookups read from, so that
+            reparsing a unit invalidates only the caches of the units that
+            (transitively) depend on it, instead of all caches in the analysis
+            context.
+
+        :param memoization_conf: If not None, bound the size of memoization
+            tables for properties with this configuration, and generate an API
+            to get counters for these tables (``Get_Memoization_Statistics``).
         """
         from langkit.python_api import PythonAPISettings
         from langkit.ocaml_api import OCamlAPISettings
@@ -677,6 +759,14 @@ class CompileCtx:
         is no restriction.
         """
 
+        self.first_entity_lookups = False
+        """
+        Whether lexical environment lookups whose result is only used to get
+        the first entity found (or to check that no entity is found) must be
+        lowered to lookups that stop at the first entity found. This is
+        enabled by the optional "lower first entity lookups" pass.
+        """
+
         self.symbol_literals: Dict[str, names.Name] = {}
         """
         Container for all symbol literals to be used in code generation.
@@ -740,6 +830,35 @@ class CompileCtx:
         The cache collection configuration to use for this language.
         """
 
+        self.table_driven_lexer = table_driven_lexer
+        """
+        Whether to generate the lexer state machine as transition tables. See
+        the corresponding constructor argument.
+        """
+
+        self.prune_parser_memos = prune_parser_memos
+        """
+        Whether to disable memoization tables for parsing rules that do not
+        need them. See the corresponding constructor argument.
+        """
+
+        self.parsing_statistics = parsing_statistics
+        """
+        Whether to generate counters for memoization tables in parsers. See the
+        corresponding constructor argument.
+        """
+
+        self.track_unit_dependencies = track_unit_dependencies
+        """
+        Whether to invalidate caches per analysis unit after a reparse. See
+        the corresponding constructor argument.
+        """
+
+        self.memoization_conf: Optional[MemoizationConf] = memoization_conf
+        """
+        The memory budget for memoization tables to use for this language.
+        """
+
         self.template_lookup_extra_dirs: List[str] = (
             template_lookup_extra_dirs or []
         )
@@ -855,6 +974,30 @@ class CompileCtx:
         of the time.
         """
 
+        self.pass_cache: Optional[PassCache] = None
+        """
+        If enabled, persistent cache used to replay the effects of compilation
+        passes whose inputs did not change since the previous run.
+        """
+
+        self.unit_cache: Optional[UnitCache] = None
+        """
+        If enabled, persistent cache used to skip the rendering of generated
+        source files whose inputs did not change since the previous run.
+        """
+
+        self.jobs: int = 1
+        """
+        Number of worker processes to use for passes that can run in parallel
+        and for code emission.
+        """
+
+        self.pass_report: Optional[PassReport] = None
+        """
+        If enabled, record of the time and memory used by each compilation
+        pass.
+        """
+
         self.gnatcov: Optional[GNATcov] = None
         """
         During code emission, GNATcov instance if coverage is enabled. None
@@ -1094,6 +1237,13 @@ class CompileCtx:
         """
         return self.cache_collection_conf is not None
 
+    @property
+    def memoization_budget_enabled(self) -> bool:
+        """
+        Return whether the size of memoization tables is bounded.
+        """
+        return self.memoization_conf is not None and self.has_memoization
+
     @property
     def sorted_logic_functors(self) -> List[Tuple[PropertyDef, int]]:
         return sorted(
@@ -2040,6 +2190,9 @@ class CompileCtx:
         explicit_passes_triggers: Dict[str, bool] = {},
         plugin_passes: List[Union[str, AbstractPass]] = [],
         extra_code_emission_passes: List[AbstractPass] = [],
+        pass_cache_inputs: Optional[List[str]] = None,
+        unit_cache_inputs: Optional[List[str]] = None,
+        pass_report: bool = False,
         **kwargs
     ) -> None:
         """
@@ -2071,6 +2224,23 @@ class CompileCtx:
         :param extra_code_emission_passes: See
             ``CompileCtx.code_emission_passes``.
 
+        :param pass_cache_inputs: If not None, enable the persistent pass
+            cache (see ``langkit.caching.PassCache``), stored in the
+            ``obj/langkit_pass_cache`` subdirectory of ``lib_root``. In that
+            case, this must be the list of files that contain the language
+            specification, in addition to Lkt sources and extensions, which
+            are automatically considered.
+
+        :param unit_cache_inputs: If not None, enable the unit cache (see
+            ``langkit.caching.UnitCache``), stored in the
+            ``obj/langkit_unit_cache`` file in ``lib_root``. In that case, this
+            must be the list of files that contain the language specification,
+            as for ``pass_cache_inputs``.
+
+        :param pass_report: If true, measure the time and memory used by each
+            pass (see ``langkit.pass_report.PassReport``) and store the result
+            in ``self.pass_report``.
+
         See ``langkit.emitter.Emitter``'s constructor for other supported
         keyword arguments.
         """
@@ -2081,6 +2251,57 @@ class CompileCtx:
             self.warnings = warnings
 
         self.check_only = check_only
+        self.jobs = kwargs.get('jobs', 1)
+
+        cache_options = dict(
+            # The number of jobs and the location of compiled templates do not
+            # change the generated code.
+            {k: v for k, v in kwargs.items()
+             if k not in ('jobs', 'template_cache_dir')},
+            check_only=check_only,
+            explicit_passes_triggers=explicit_passes_triggers,
+        )
+
+        # The pass cache cannot record the effects of code coverage
+        # instrumentation (external tool), of the unparsing script (sources
+        # written directly to files) nor of plugin passes (their effects are
+        # unknown).
+        if (
+            pass_cache_inputs is not None
+            and not kwargs.get('coverage', False)
+            and not kwargs.get('unparse_script')
+            and not plugin_passes
+        ):
+            from langkit.caching import PassCache
+            self.pass_cache = PassCache(
+                path.join(lib_root, 'obj', 'langkit_pass_cache'),
+                self.pass_cache_inputs_fingerprints(
+                    lib_root, pass_cache_inputs, cache_options
+                ),
+            )
+
+        # Templates are tracked for each generated source file, so leave them
+        # out of the inputs fingerprint for the unit cache.
+        if unit_cache_inputs is not None and not check_only:
+            from langkit.caching import UnitCache, hash_strings
+            unit_cache_fingerprints = self.pass_cache_inputs_fingerprints(
+                lib_root,
+                unit_cache_inputs,
+                cache_options,
+                include_templates=False,
+            )
+            self.unit_cache = UnitCache(
+                path.join(lib_root, 'obj', 'langkit_unit_cache'),
+                hash_strings(*(
+                    "{}={}".format(name, fingerprint)
+                    for name, fingerprint
+                    in sorted(unit_cache_fingerprints.items())
+                )),
+            )
+
+        if pass_report:
+            from langkit.pass_report import PassReport
+            self.pass_report = PassReport()
 
         if kwargs.get('coverage', False):
             self.gnatcov = GNATcov(self)
@@ -2114,6 +2335,72 @@ class CompileCtx:
         for n in explicit_passes_triggers.keys():
             error(f"No optional pass with name {n}")
 
+    def pass_cache_inputs_fingerprints(
+        self,
+        lib_root: str,
+        spec_files: List[str],
+        options: Dict[str, Any],
+        include_templates: bool = True,
+    ) -> Dict[str, str]:
+        """
+        Return hashes for the inputs of the compilation pipeline, to be used to
+        compute keys in the pass cache. Inputs are split in groups, so that
+        each pass can declare the ones it uses (see
+        ``langkit.passes.AbstractPass.cache_inputs``):
+
+        * "langkit": Langkit's own Python modules and support sources,
+          generation options and warnings.
+        * "spec": the language specification.
+        * "templates": Langkit's templates, extensions and additional template
+          directories.
+
+        :param lib_root: Path of the directory in which the library is
+            generated.
+        :param spec_files: List of files that contain the language
+            specification.
+        :param options: Options that are passed to ``create_all_passes``.
+        :param include_templates: Whether to consider the content of Langkit's
+            templates (see ``langkit.caching.langkit_fingerprint``).
+        """
+        from langkit.caching import (
+            hash_files, hash_strings, langkit_fingerprint
+        )
+
+        spec_input_files = list(spec_files)
+        spec_input_files.extend(unit.filename for unit in self.lkt_units)
+        if self.lkt_units:
+            spec_input_files.append(L.__file__)
+
+        template_input_files: List[str] = []
+        for dirpath in keep([self.extensions_dir]
+                            + self.template_lookup_extra_dirs):
+            for root, _, filenames in os.walk(dirpath):
+                template_input_files.extend(
+                    path.join(root, f) for f in filenames
+                )
+
+        def stable_repr(value: Any) -> str:
+            return (repr(sorted(value))
+                    if isinstance(value, (set, frozenset)) else
+                    repr(value))
+
+        return {
+            "langkit": hash_strings(
+                langkit_fingerprint(include_templates=False),
+                path.abspath(lib_root),
+                str(self.version),
+                str(self.build_date),
+                stable_repr({w.name for w in self.warnings.enabled_warnings}),
+                *sorted('{}={}'.format(k, stable_repr(v))
+                        for k, v in options.items()),
+            ),
+            "spec": hash_files(path.abspath(f) for f in spec_input_files),
+            "templates": hash_strings(
+                langkit_fingerprint(include_templates),
+                hash_files(path.abspath(f) for f in template_input_files),
+            ),
+        }
+
     def emit(self):
         """
         Compile the DSL and emit sources for the generated library.
@@ -2123,6 +2410,10 @@ class CompileCtx:
                 self.run_passes(self.all_passes)
                 if not self.check_only and self.emitter is not None:
                     self.emitter.cache.save()
+                if self.pass_cache is not None:
+                    self.pass_cache.save()
+                if self.unit_cache is not None:
+                    self.unit_cache.save()
             finally:
                 self.emitter = None
 
@@ -2183,7 +2474,9 @@ class CompileCtx:
                 **kwargs
             )
 
-        return GlobalPass('prepare code emission', pass_fn)
+        return GlobalPass('prepare code emission', pass_fn).consumes(
+            "templates"
+        )
 
     def compile(self):
         """
@@ -2285,6 +2578,8 @@ class CompileCtx:
 
             GrammarRulePass('compute dont skip rules',
                             lambda p: p.traverse_dontskip(self.grammar)),
+            GrammarPass('compute parsing rules memoization tables',
+                        Grammar.compute_memo_sizes),
 
             # This cannot be done before as the "compute fields type" pass will
             # create AST list types.
@@ -2305,6 +2600,15 @@ class CompileCtx:
                          PropertyDef.freeze_abstract_expression),
             PropertyPass('compute property attributes',
                          PropertyDef.compute_property_attributes),
+            GlobalPass('lower first entity lookups',
+                       CompileCtx.enable_first_entity_lookups).optional(
+                """
+                Lower lexical environment lookups whose result is only used to
+                get the first entity found, or to check whether no entity is
+                found, to lookups that stop at the first entity found instead
+                of building the array of all entities found.
+                """
+            ),
             PropertyPass('construct and type expressions',
                          PropertyDef.construct_and_type_expression),
             PropertyPass('check overriding types',
@@ -2401,15 +2705,28 @@ class CompileCtx:
                        CompileCtx.finalize_symbol_literals),
 
             GrammarRulePass('render parsers code',
-                            lambda p: Parser.render_parser(p, self)),
-            PropertyPass('render property', PropertyDef.render_property),
+                            lambda p: Parser.render_parser(p, self))
+            .consumes("templates"),
+            PropertyPass('fuse collection expressions',
+                         PropertyDef.fuse_collection_expressions).optional(
+                """
+                Generate a single loop for collection expressions that iterate
+                on the result of map/filter/take_while expressions, instead of
+                creating intermediate arrays. Fused expressions are reported
+                in debug verbosity.
+                """
+            ),
+            PropertyPass('render property', PropertyDef.render_property)
+            .parallel(PropertyDef.render_property_in_worker,
+                      PropertyDef.set_rendered_code)
+            .consumes("templates"),
             GlobalPass('annotate fields types',
                        CompileCtx.annotate_fields_types).optional(
                 """
                 Auto annotate the type of fields in your nodes definitions,
                 based on information derived from the grammar.
                 """
-            ),
+            ).uncacheable(),
             errors_checkpoint_pass,
 
             MajorStepPass('Generate library sources'),
@@ -2436,7 +2753,7 @@ class CompileCtx:
             .optional("""
             Emit SVG railroad diagrams for grammar rules, in share/doc. Needs
             the railroad-diagrams Python library.
-            """),
+            """).uncacheable(),
 
             GlobalPass('report unused documentation entries',
                        lambda ctx: ctx.documentations.report_unused())
@@ -2460,9 +2777,16 @@ class CompileCtx:
             go through.
         """
         from langkit.passes import PassManager
+        from langkit.template_utils import record_used_templates
+
         pass_manager = PassManager()
         pass_manager.add(*passes)
-        pass_manager.run(self)
+        if self.unit_cache is None:
+            pass_manager.run(self)
+        else:
+            with record_used_templates() as upstream_templates:
+                self.unit_cache.upstream_templates = upstream_templates
+                pass_manager.run(self)
 
     @property
     def extensions_dir(self):
@@ -2520,6 +2844,14 @@ class CompileCtx:
         return sorted(self.symbol_literals.items(),
                       key=lambda kv: kv[1])
 
+    def enable_first_entity_lookups(self):
+        """
+        Enable the lowering of lookups to first entity lookups when
+        constructing property expressions (see
+        ``langkit.expressions.envs.EnvGet.construct_first``).
+        """
+        self.first_entity_lookups = True
+
     def finalize_symbol_literals(self):
         """
         Collect all symbol literals provided to "add_symbol_literal" and create
@@ -2653,6 +2985,13 @@ class CompileCtx:
             # Filter types that are relevant for dependency analysis
             return [t for t in result if t.is_struct_type or t.is_array_type]
 
+        # Templates for the generated library always use iterators on root
+        # nodes and on inner environment associations. Consider them used
+        # right now so that the generated code does not depend on the order in
+        # which templates are rendered.
+        T.root_node.create_iterator(used=True)
+        T.inner_env_assoc.create_iterator(used=True)
+
         # Collect existing types and make sure we don't create other ones later
         # by accident.
         struct_types = CompiledTypeRepo.struct_types
@@ -6,11 +6,17 @@ properties DSL level.
 from __future__ import annotations
 
 import abc
+import bisect
+import copy
 import inspect
+import json
+import os
 import shlex
+import tempfile
 from typing import (Callable, Dict, Iterable, List, Optional, TYPE_CHECKING,
-                    Type, Union, cast)
+                    Tuple, Type, Union, cast)
 
+from langkit.caching import file_hash, hash_strings
 from langkit.gdb.state import Binding, ExpressionEvaluation
 
 
@@ -24,11 +30,51 @@ class ParseError(Exception):
         super().__init__('line {}: {}'.format(line_no, message))
 
 
+RawDirective = Tuple[int, str, List[str]]
+"""
+GDB helpers directive, as found in a source file: line number, directive name
+and arguments.
+"""
+
+
+def default_cache_dir() -> Optional[str]:
+    """
+    Return the directory in which to cache parsed debug info, or None if
+    caching on disk is disabled.
+
+    This is the "LANGKIT_GDB_CACHE_DIR" environment variable if it is defined
+    (caching is disabled if it is empty), and a "langkit/gdb" subdirectory of
+    the user cache directory otherwise.
+    """
+    result = os.environ.get("LANGKIT_GDB_CACHE_DIR")
+    if result is not None:
+        return result or None
+    cache_home = (
+        os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(cache_home, "langkit", "gdb")
+
+
+_parsed_files: Dict[Tuple[str, int, int], DebugInfo] = {}
+"""
+Debug info parsed in this process, indexed by path, modification time and size
+for the source file.
+"""
+
+
 class DebugInfo:
     """
     Holder for all info that maps generated code to the properties DSL level.
     """
 
+    CACHE_FORMAT_VERSION = 2
+    """
+    Version number for the format of cached debug info. Cached debug info
+    also depends on the content of this module, so this needs to be bumped
+    only when the format of cache files itself changes.
+    """
+
     def __init__(self, context: Optional[Context]):
         self.context = context
         """
@@ -49,6 +95,13 @@ class DebugInfo:
         Name-based lookup dictionnary for properties.
         """
 
+        self._property_starts: List[int] = []
+        """
+        First line for each property in ``self.properties``. Properties cannot
+        be nested, so this list is sorted, which allows ``lookup_property`` to
+        use a binary search.
+        """
+
     @classmethod
     def parse_from_gdb(cls, context: Context) -> DebugInfo:
         """
@@ -70,12 +123,123 @@ class DebugInfo:
         if not has_unit_sym:
             return result
 
-        filename = has_unit_sym.symtab.fullname()
-        with open(filename, 'r') as f:
-            result._try_parse(filename, f)
+        return cls.parse_from_file(
+            has_unit_sym.symtab.fullname(), context, default_cache_dir()
+        )
+
+    @classmethod
+    def parse_from_file(cls,
+                        filename: str,
+                        context: Optional[Context] = None,
+                        cache_dir: Optional[str] = None) -> DebugInfo:
+        """
+        Like parse_from_gdb, but parsing the given source file.
+
+        Parsing large source files is slow, so the result is cached in memory
+        and, if ``cache_dir`` is not None, on disk in that directory. Cached
+        results are reused as long as the source file keeps the same
+        modification time and size.
 
+        Cache files only contain the list of directives found in the source
+        file, in JSON: loading them cannot run arbitrary code, even if the
+        cache directory is shared.
+        """
+        try:
+            st = os.stat(filename)
+        except OSError as exc:
+            print('Cannot read {}: {}'.format(filename, exc))
+            result = cls(context)
+            result.filename = filename
+            return result
+
+        key = (filename, st.st_mtime_ns, st.st_size)
+        info = _parsed_files.get(key)
+        if info is None:
+            # Name cache files after the source file first, so that saving a
+            # new version can remove the stale ones.
+            cache_file = (
+                None
+                if cache_dir is None else
+                os.path.join(cache_dir, "{}-{}".format(
+                    hash_strings(filename)[:16],
+                    hash_strings(
+                        str(cls.CACHE_FORMAT_VERSION),
+                        file_hash(__file__) or "",
+                        str(st.st_mtime_ns),
+                        str(st.st_size),
+                    ),
+                ))
+            )
+            info = cls._load_cached(cache_file, filename)
+            if info is None:
+                info = cls(context=None)
+                with open(filename, 'r') as f:
+                    directives = info._try_parse(filename, f)
+                if directives is not None:
+                    cls._save_cached(cache_file, directives)
+            _parsed_files[key] = info
+
+        # Parsed debug info is never modified after parsing, so it is safe to
+        # share it between all contexts.
+        result = copy.copy(info)
+        result.context = context
         return result
 
+    @classmethod
+    def _load_cached(cls,
+                     cache_file: Optional[str],
+                     filename: str) -> Optional[DebugInfo]:
+        """
+        Return the debug info for ``filename`` cached in ``cache_file``, or
+        None if it is missing or invalid.
+        """
+        if cache_file is None:
+            return None
+        try:
+            with open(cache_file) as f:
+                directives = [
+                    (line_no, name, args)
+                    for line_no, name, args in json.load(f)
+                ]
+            if not all(
+                isinstance(line_no, int)
+                and isinstance(name, str)
+                and isinstance(args, list)
+                and all(isinstance(a, str) for a in args)
+                for line_no, name, args in directives
+            ):
+                return None
+
+            result = cls(context=None)
+            result.filename = filename
+            result._process_directives(directives)
+        except Exception:
+            return None
+        return result
+
+    @staticmethod
+    def _save_cached(cache_file: Optional[str],
+                     directives: List[RawDirective]) -> None:
+        """
+        Write ``directives`` to ``cache_file``. Failures to do so are ignored,
+        as the cache is just an optimization.
+        """
+        if cache_file is None:
+            return
+        cache_dir, basename = os.path.split(cache_file)
+        prefix = basename.split('-', 1)[0] + '-'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for entry in os.listdir(cache_dir):
+                if entry.startswith(prefix):
+                    os.remove(os.path.join(cache_dir, entry))
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(directives, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
     @classmethod
     def parse_from_iterable(cls,
                             filename: str,
@@ -93,19 +257,23 @@ class DebugInfo:
         result._try_parse(filename, lines)
         return result
 
-    def _try_parse(self, filename: str, lines: Iterable[str]) -> None:
+    def _try_parse(self,
+                   filename: str,
+                   lines: Iterable[str]) -> Optional[List[RawDirective]]:
         """
         Internal method. Same semantics as parse_from_iterable, but work on an
-        existing instance.
+        existing instance. Return the list of directives found if parsing was
+        successful, None otherwise.
         """
         self.filename = filename
         try:
-            self._parse_file(lines)
+            return self._parse_file(lines)
         except ParseError as exc:
             print('Error while parsing directives in {}:'.format(filename))
             print(str(exc))
+            return None
 
-    def _parse_file(self, lines: Iterable[str]) -> None:
+    def _parse_file(self, lines: Iterable[str]) -> List[RawDirective]:
         """
         Internal method. Read GDB helpers directives from the "lines" source
         file and fill self according to it. Raise a ParseError if anything goes
@@ -114,13 +282,9 @@ class DebugInfo:
         :param iter[str] lines: Iterable that yields all the lines to parse.
             This can be any iterator: a read file, a list of strings in memory,
             a custom iterator, ...
-        :rtype: None
+        :return: The list of directives found in "lines".
         """
-        self.properties = []
-        self.properties_dict = {}
-        scope_stack: List[Scope] = []
-        expr_stack: List[ExprStart] = []
-
+        directives: List[RawDirective] = []
         for line_no, line in enumerate(lines, 1):
             line = line.strip()
             if not line.startswith('--#'):
@@ -133,7 +297,24 @@ class DebugInfo:
             except IndexError:
                 raise ParseError(line_no, 'directive name is missing')
 
-            d = Directive.parse_dispatch(line_no, name, args)
+            directives.append((line_no, name, args))
+
+        self._process_directives(directives)
+        return directives
+
+    def _process_directives(self, directives: List[RawDirective]) -> None:
+        """
+        Internal method. Fill self according to the given directives. Raise a
+        ParseError if anything goes wrong.
+        """
+        self.properties = []
+        self.properties_dict = {}
+        self._property_starts = []
+        scope_stack: List[Scope] = []
+        expr_stack: List[ExprStart] = []
+
+        for line_no, name, args in directives:
+            d = Directive.parse_dispatch(line_no, name, list(args))
 
             if isinstance(d, PropertyStart):
                 if scope_stack:
@@ -143,6 +324,7 @@ class DebugInfo:
                              d.is_dispatcher)
                 self.properties.append(p)
                 self.properties_dict[p.name] = p
+                self._property_starts.append(p.line_range.first_line)
                 scope_stack.append(p)
 
             elif isinstance(d, (ScopeStart, PropertyCallStart,
@@ -253,12 +435,13 @@ class DebugInfo:
         :param int line_no: Line number to lookup.
         :rtype: None|Property
         """
-        for p in self.properties:
-            if line_no < p.line_range.first_line:
-                break
-            elif line_no in p.line_range:
-                return p
-        return None
+        # Look for the last property that starts before or at line_no: it is
+        # the only one that can cover it.
+        i = bisect.bisect_right(self._property_starts, line_no) - 1
+        if i < 0:
+            return None
+        p = self.properties[i]
+        return p if line_no in p.line_range else None
 
     def get_property_by_name(self, name: str) -> Property:
         """
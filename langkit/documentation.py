@@ -26,9 +26,11 @@ from __future__ import annotations
 import inspect
 import textwrap
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import (
-    Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING, Union, cast
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Set,
+    TYPE_CHECKING, Tuple, Union, cast
 )
 
 import docutils.frontend
@@ -80,6 +82,35 @@ class DocDatabase:
         self._used.add(key)
         return self._dict[key]
 
+    @property
+    def used_entries(self) -> Set[str]:
+        """
+        Return the set of names for documentation entries used so far.
+        """
+        return set(self._used)
+
+    def mark_used(self, names: Iterable[str]) -> None:
+        """
+        Consider that the given documentation entries were used.
+        """
+        self._used.update(names)
+
+    @contextmanager
+    def record_used(self) -> Iterator[Set[str]]:
+        """
+        Context manager to record the names of documentation entries used
+        while it is active, in the yielded set. These entries are also
+        considered used, as usual.
+        """
+        saved = self._used
+        recorded: Set[str] = set()
+        self._used = recorded
+        try:
+            yield recorded
+        finally:
+            self._used = saved
+            saved.update(recorded)
+
     def report_unused(self) -> None:
         """
         Report all documentation entries that have not been used on the
@@ -590,6 +621,18 @@ base_langkit_docs = {
         Return the Nth child for in this node's fields and store it into
         ``*child_p``.  Return zero on failure (when ``N`` is too big).
     """,
+    'langkit.node_children_array': """
+        Return an array that contains all the children of this node (null
+        children included) and store it into ``*result_p``.
+
+        This is equivalent to calling ``${capi.get_name("node_child")}`` for
+        each child, but takes a single call.
+    """,
+    'langkit.node_subtree': """
+        Return an array that contains all the nodes in this node's subtree
+        (this node included, null children excluded) in prefix order and store
+        it into ``*result_p``.
+    """,
     'langkit.create_bare_entity': """
         Create an entity with null entity info for a given node.
     """,
@@ -972,7 +1015,10 @@ base_langkit_docs = {
         between the ``First`` and ``Last`` tokens (both included). This yields
         an empty slice if ``Last`` actually appears before ``First``.
         % if lang == 'c':
-        Put the result in ``RESULT``.
+        Put the result in ``RESULT``. The result may own the buffer it
+        references (for instance when the source is stored in compact form),
+        so the caller must call ``${capi.get_name('destroy_text')}`` on it when
+        done with it.
         % endif
 
         % if lang == 'ada':
@@ -1302,6 +1348,14 @@ base_langkit_docs = {
         This handles negative indexes the same way Python lists do. Raise an
         IndexError if "key" is out of range.
     """,
+    'langkit.python.root_node.iter_subtree': """
+        Return an iterator on all the nodes in this node's subtree, this node
+        included, in prefix order.
+
+        All nodes are fetched from the native library in a single call, which
+        makes this much faster than a recursive walk over children for big
+        trees.
+    """,
     'langkit.python.root_node.iter_fields': """
         Iterate through all the fields this node contains.
 
@@ -1586,10 +1640,60 @@ class RstCommentChecker(docutils.nodes.GenericNodeVisitor):
             rst_doc.walk(visitor)
 
 
+@dataclass(frozen=True)
+class TypeRefPart:
+    """
+    Reference to a node type in the text of a ``WrappedBlock``. It is rendered
+    differently depending on the output language.
+    """
+
+    node_type: ASTNodeType
+
+
+@dataclass(frozen=True)
+class WrappedBlock:
+    """
+    Block of text to wrap to the output width.
+    """
+
+    initial_indent: str
+    """
+    Indentation for the first line of the block (after the line prefix).
+    """
+
+    subsequent_indent: str
+    """
+    Indentation for the subsequent lines of the block (after the line prefix).
+    """
+
+    parts: Tuple[Union[str, TypeRefPart], ...]
+    """
+    Text parts to concatenate to get the text to wrap.
+    """
+
+
+@dataclass(frozen=True)
+class VerbatimBlock:
+    """
+    Block of lines to emit as-is (for instance code blocks).
+    """
+
+    indent: str
+    """
+    Indentation for all lines (after the line prefix).
+    """
+
+    lines: Tuple[str, ...]
+
+
+DocBlock = Union[WrappedBlock, VerbatimBlock]
+
+
 class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
     """
-    Docutils ``NodeVisitor``, meant to output a formatted rst docstring, with
-    text properly wrapped for the given indentation/prefix.
+    Docutils ``NodeVisitor``, meant to turn a rst docstring into a list of
+    blocks (see ``DocBlock``) that ``format_blocks`` can then format for a
+    given output language, indentation and width.
     """
 
     @dataclass
@@ -1609,47 +1713,21 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
         The prefix string for the subsequent lines of the block.
         """
 
-        parts: List[str]
+        parts: List[Union[str, TypeRefPart]]
         """
         The list of text parts that make up the block, and that will be
         populated in the visit function.
         """
 
-    def __init__(
-        self,
-        document: docutils.nodes.document,
-        prefix: str,
-        get_node_name: NodeNameGetter,
-        type_role_name: str = '',
-        width: int = 79
-    ):
+    def __init__(self, document: docutils.nodes.document):
         """
         Construct a new ``RstCommentFormatter`` visitor.
 
         :param document: The document this visitor will iterate on.
-
-        :param prefix: The string prefix with which we want to prefix every
-            line of the resulting output. Typically constituted of the
-            whitespace for the desired indentation, plus the prefix for the
-            comment style of the output language.
-
-        :param get_node_name: Callable that will return the formatted name of a
-            langkit node type, in the desired style for the output language.
-
-        :param type_role_name: String that represents the name of the role for
-            type references in the doc for the output language.
-
-        :param width: Maximum width to which to wrap the output.
         """
 
         super().__init__(document)
 
-        # Instantiation data, used to parametrize the output
-        self.width = width
-        self.prefix = prefix
-        self.get_node_name = get_node_name
-        self.type_role_name = type_role_name
-
         # Context variables
         self.surrounding = ""
         """
@@ -1661,9 +1739,9 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
         self.enumerated_list_item_no = 1
 
         # State variables for the visitor
-        self.parts: List[str] = []
+        self.blocks: List[DocBlock] = []
         """
-        List of toplevel parts to be concatenated at the end of the visit.
+        List of toplevel blocks, to be formatted at the end of the visit.
         """
 
         self.block_context_stack: List[RstCommentFormatter.BlockContext] = []
@@ -1673,19 +1751,25 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
         """
 
     @property
-    def current_parts(self) -> List[str]:
+    def current_parts(self) -> List[Union[str, TypeRefPart]]:
         """
         Shortcut property to return the list of current parts for the topmost
         entry on the block context stack.
         """
         return self.block_context_stack[-1].parts
 
-    def append_part(self, part: str) -> None:
+    def flush_current_parts(self) -> None:
         """
-        Append a part to the list of toplevel parts.
+        Turn the current parts into a block to wrap, and reset them.
         """
-        if part:
-            self.parts.append(part)
+        self.blocks.append(
+            WrappedBlock(
+                self.initial_indent,
+                self.subsequent_indent,
+                tuple(self.current_parts),
+            )
+        )
+        self.current_parts.clear()
 
     def append_context(
         self,
@@ -1697,8 +1781,7 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
         Append a new block context to the block context stack.
         """
         if self.block_context_stack:
-            self.append_part(self.wrap(''.join(self.current_parts)))
-            self.current_parts.clear()
+            self.flush_current_parts()
 
         self.block_context_stack.append(
             RstCommentFormatter.BlockContext(
@@ -1706,14 +1789,6 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
             )
         )
 
-    @property
-    def text(self) -> str:
-        """
-        Get the constructed docstring's text out of this visitor.
-        """
-        lines = f"\n{self.prefix}\n".join(self.parts).splitlines()
-        return "\n".join(l.rstrip() for l in lines)
-
     @property
     def initial_indent(self) -> str:
         """
@@ -1735,22 +1810,11 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
         """
         return ''.join(t.subsequent_prefix for t in self.block_context_stack)
 
-    def wrap(self, text: str) -> str:
-        """
-        Helper method to wrap text with the desired settings.
-        """
-        return "\n".join(textwrap.wrap(
-            text, self.width,
-            initial_indent=self.prefix + self.initial_indent,
-            subsequent_indent=self.prefix + self.subsequent_indent
-        ))
-
     def unknown_visit(self, node: docutils.nodes.node) -> None:
         """
         Visit function for langkit specific nodes.
         """
 
-        from langkit.compile_context import get_context
         from langkit.compiled_types import ASTNodeType
 
         if isinstance(node, LangkitTypeRef):
@@ -1760,13 +1824,7 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
             # TODO: For the moment ``:typeref:`` will only work for AST node
             # types.
             assert isinstance(ct, ASTNodeType)
-            type_name = self.get_node_name(get_context(), ct)
-            if self.type_role_name:
-                self.current_parts.append(
-                    f"{self.type_role_name}`{type_name}`"
-                )
-            else:
-                self.current_parts.append(f"``{type_name}``")
+            self.current_parts.append(TypeRefPart(ct))
 
             raise docutils.nodes.SkipChildren()
         elif isinstance(node, PassthroughNode):
@@ -1833,15 +1891,15 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
                 lang = classes.pop()
             except KeyError:
                 lang = ""
-            self.append_part(
-                f"{self.prefix}{self.subsequent_indent}.. code:: {lang}"
-                .rstrip()
+            self.blocks.append(
+                VerbatimBlock(self.subsequent_indent, (f".. code:: {lang}",))
+            )
+            self.blocks.append(
+                VerbatimBlock(
+                    self.subsequent_indent,
+                    tuple(f"   {line}" for line in node.astext().splitlines()),
+                )
             )
-
-            self.append_part("\n".join(
-                f"{self.prefix}{self.subsequent_indent}   {l}"
-                for l in node.astext().splitlines()
-            ))
 
         elif node.tagname == "enumerated_list":
             # TODO: Add support for nested enumerated lists
@@ -1865,7 +1923,7 @@ class RstCommentFormatter(docutils.nodes.GenericNodeVisitor):
             "field", "list_item", "paragraph", "comment"
         ] + SUPPORTED_ADMONITIONS:
             if self.block_context_stack[-1].node == node:
-                self.append_part(self.wrap(''.join(self.current_parts)))
+                self.flush_current_parts()
                 # Reset data
                 self.block_context_stack.pop()
         elif node.tagname in TAGNAMES_WITH_SURROUNDINGS:
@@ -1896,6 +1954,72 @@ def rst_document(text: str) -> docutils.nodes.document:
     return document
 
 
+@memoized
+def doc_blocks(text: str) -> Tuple[DocBlock, ...]:
+    """
+    Return the list of blocks for the given docstring. The result does not
+    depend on the output language, so the same docstring is parsed only once
+    no matter how many times and for how many languages it is formatted.
+    """
+    document = rst_document(inspect.cleandoc(text))
+    visitor = RstCommentFormatter(document)
+    document.walkabout(visitor)
+    return tuple(visitor.blocks)
+
+
+def format_blocks(
+    blocks: Iterable[DocBlock],
+    prefix: str,
+    get_node_name: NodeNameGetter,
+    type_role_name: str = '',
+    width: int = 79,
+) -> str:
+    """
+    Format the given blocks as text.
+
+    :param blocks: Blocks to format.
+
+    :param prefix: The string prefix with which we want to prefix every line
+        of the resulting output. Typically constituted of the whitespace for
+        the desired indentation, plus the prefix for the comment style of the
+        output language.
+
+    :param get_node_name: Callable that will return the formatted name of a
+        langkit node type, in the desired style for the output language.
+
+    :param type_role_name: String that represents the name of the role for
+        type references in the doc for the output language.
+
+    :param width: Maximum width to which to wrap the output.
+    """
+    from langkit.compile_context import get_context
+
+    def render_part(part: Union[str, TypeRefPart]) -> str:
+        if isinstance(part, str):
+            return part
+        type_name = get_node_name(get_context(), part.node_type)
+        if type_role_name:
+            return f"{type_role_name}`{type_name}`"
+        else:
+            return f"``{type_name}``"
+
+    parts = []
+    for b in blocks:
+        if isinstance(b, WrappedBlock):
+            part = "\n".join(textwrap.wrap(
+                "".join(render_part(p) for p in b.parts), width,
+                initial_indent=prefix + b.initial_indent,
+                subsequent_indent=prefix + b.subsequent_indent
+            ))
+        else:
+            part = "\n".join(f"{prefix}{b.indent}{line}" for line in b.lines)
+        if part:
+            parts.append(part)
+
+    lines = f"\n{prefix}\n".join(parts).splitlines()
+    return "\n".join(line.rstrip() for line in lines)
+
+
 def make_formatter(
     prefix: str = '',
     suffix: str = '',
@@ -1926,21 +2050,22 @@ def make_formatter(
 
     * ``width``, which is an optional parameter which defaults to ``79``,
       specifying the maximum width the text must be wrapped to.
+
+    Results are memoized, as the same docstrings are usually formatted several
+    times during code generation.
     """
 
+    @memoized
     def formatter(text: str, column: int, width: int = 79) -> str:
-        text = inspect.cleandoc(text)
         indent = ' ' * column
-        pfx = indent + line_prefix
-
-        document = rst_document(text)
-        visitor = RstCommentFormatter(
-            document, prefix=pfx, get_node_name=get_node_name,
-            type_role_name=type_role_name
+        text = format_blocks(
+            doc_blocks(text),
+            prefix=indent + line_prefix,
+            get_node_name=get_node_name,
+            type_role_name=type_role_name,
+            width=width,
         )
-        document.walkabout(visitor)
-
-        return "\n".join([prefix, visitor.text, indent + suffix]).strip()
+        return "\n".join([prefix, text, indent + suffix]).strip()
 
     return formatter
 
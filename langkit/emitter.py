@@ -2,13 +2,20 @@
 Code emission for Langkit-generated libraries.
 """
 
+from contextlib import redirect_stdout
 from distutils.spawn import find_executable
+import functools
 import glob
+import io
 import json
+import multiprocessing
 import os
 from os import path
 import subprocess
-from typing import Any, Callable, Dict, List, Optional, Set
+import sys
+from typing import (
+    Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, TypeVar
+)
 
 from funcy import keep
 
@@ -19,7 +26,10 @@ from langkit.diagnostics import Severity, check_source_language, error
 from langkit.generic_api import GenericAPI
 from langkit.lexer.regexp import DFACodeGenHolder
 import langkit.names as names
-from langkit.template_utils import add_template_dir
+from langkit.template_utils import (
+    add_template_dir, add_used_templates, record_used_templates,
+    set_template_module_dir
+)
 from langkit.utils import Colors, printcol
 
 
@@ -31,6 +41,60 @@ def template_extensions(ctx: CompileCtx) -> Dict[str, Any]:
 PostProcessFn = Optional[Callable[[str], str]]
 
 
+class SourceJob(NamedTuple):
+    """
+    Job to emit a source file.
+    """
+
+    file_path: str
+    """
+    Path of the source file to emit.
+    """
+
+    render: Callable[[], str]
+    """
+    Function to render the content of the source file.
+    """
+
+    write: Callable[[str], object]
+    """
+    Function to write this content to the source file.
+    """
+
+
+T = TypeVar("T")
+
+_pending_renderings: List[Callable[[], Any]] = []
+"""
+Rendering functions for the parallel rendering in progress (see
+``Emitter.render_all``). Worker processes are forked, so they inherit this
+list: this avoids pickling rendering functions, which are closures over the
+compiled language.
+"""
+
+
+def _run_rendering(index: int) -> Tuple[str, Any, Set[str], Set[str]]:
+    """
+    Run the ``index``th pending rendering function in a worker process.
+
+    Return the text printed on the standard output during the rendering, the
+    result of the rendering function (None if it raised an exception), the set
+    of documentation entries that were used and the set of templates that were
+    used.
+    """
+    ctx = get_context()
+    output = io.StringIO()
+    result: Any
+    with redirect_stdout(output), record_used_templates() as templates:
+        try:
+            result = _pending_renderings[index]()
+        except Exception:
+            result = None
+    return (
+        output.getvalue(), result, ctx.documentations.used_entries, templates
+    )
+
+
 class Emitter:
     """
     Code and data holder for code emission.
@@ -53,7 +117,10 @@ class Emitter:
                  post_process_java: PostProcessFn = None,
                  coverage: bool = False,
                  relative_project: bool = False,
-                 unparse_script: Optional[str] = None):
+                 unparse_script: Optional[str] = None,
+                 jobs: int = 1,
+                 lexer_stats: bool = False,
+                 template_cache_dir: Optional[str] = None):
         """
         Generate sources for the analysis library. Also emit a tiny program
         useful for testing purposes.
@@ -101,6 +168,17 @@ class Emitter:
             coverage. This requires GNATcoverage.
 
         :param relative_project: See libmanage's --relative-project option.
+
+        :param jobs: Number of worker processes to use in order to render
+            templates in parallel. Rendering is sequential if 1.
+
+        :param lexer_stats: If true, print statistics about the lexer state
+            machine. Note that this forces its generation even when it is up
+            to date.
+
+        :param template_cache_dir: If not None, directory in which to store
+            compiled templates, so that next runs do not need to compile them
+            again (see ``langkit.template_utils.set_template_module_dir``).
         """
         self.context = context
         self.verbosity = context.verbosity
@@ -136,6 +214,8 @@ class Emitter:
         for dirpath in keep(self.context.template_lookup_extra_dirs):
             add_template_dir(dirpath)
 
+        set_template_module_dir(template_cache_dir)
+
         self.no_property_checks = no_property_checks
         self.generate_gdb_hook = generate_gdb_hook
         self.generate_unparser = context.generate_unparser
@@ -149,6 +229,8 @@ class Emitter:
         self.coverage = coverage
         self.gnatcov = context.gnatcov
         self.relative_project = relative_project
+        self.jobs = jobs
+        self.lexer_stats = lexer_stats
 
         # Automatically add all source files in the "extensions/src" directory
         # to the generated library project.
@@ -485,16 +567,27 @@ class Emitter:
         )
 
         # Generate the lexer state machine iff the file is missing or its
-        # signature has changed since last time.
+        # signature has changed since last time. The choice of backend changes
+        # the state machine code, so include it in the signature (only when
+        # it is not the default, to keep signatures from older runs valid).
+        signature: object = ctx.lexer.signature
+        if ctx.table_driven_lexer:
+            signature = ("TableDriven", signature)
         stale_lexer_spec = self.write_source_file(
             os.path.join(
                 self.lib_root, 'obj',
                 '{}_lexer_signature.txt'
                 .format(ctx.short_name_or_long)),
-            json.dumps(ctx.lexer.signature, indent=2)
+            json.dumps(signature, indent=2)
         )
-        if not os.path.exists(lexer_sm_body) or stale_lexer_spec:
-            self.dfa_code = ctx.lexer.build_dfa_code(ctx)
+        if (
+            not os.path.exists(lexer_sm_body)
+            or stale_lexer_spec
+            or self.lexer_stats
+        ):
+            self.dfa_code = ctx.lexer.build_dfa_code(
+                ctx, report_stats=self.lexer_stats
+            )
 
     def emit_ada_lib(self, ctx: CompileCtx) -> None:
         """
@@ -539,6 +632,7 @@ class Emitter:
                 self.cached_body = cached_body
                 self.is_interface = is_interface
 
+        sources: List[SourceJob] = []
         for u in [
             # Top (pure) package
             Unit('pkg_main', '', has_body=False),
@@ -591,9 +685,11 @@ class Emitter:
         ]:
             if not self.generate_unparser and u.unparser:
                 continue
-            self.write_ada_module(self.src_dir, u.template_base_name,
-                                  u.qual_name, u.has_body, u.cached_body,
-                                  in_library=True, is_interface=u.is_interface)
+            sources.extend(self.ada_module_sources(
+                self.src_dir, u.template_base_name, u.qual_name, u.has_body,
+                u.cached_body, in_library=True, is_interface=u.is_interface
+            ))
+        self.emit_sources(sources)
 
     def emit_mains(self, ctx: CompileCtx) -> None:
         """
@@ -630,45 +726,61 @@ class Emitter:
         """
         Generate header and binding body for the external C API.
         """
-        def render(template_name: str) -> str:
-            return ctx.render_template(template_name)
+        def render_header() -> str:
+            with names.lower:
+                return ctx.render_template('c_api/header_c')
 
         with names.lower:
             header_filename = '{}.h'.format(ctx.c_api_settings.lib_name)
-            self.write_cpp_file(
-                path.join(self.src_dir, header_filename),
-                render('c_api/header_c'),
-            )
-            self.add_library_interface(
-                header_filename, generated=True, is_ada=False
-            )
+        self.add_library_interface(
+            header_filename, generated=True, is_ada=False
+        )
 
-        self.write_ada_module(
-            self.src_dir, 'c_api/pkg_main',
-            ['Implementation', 'C'],
-            in_library=True
+        header_path = path.join(self.src_dir, header_filename)
+        self.emit_sources(
+            [SourceJob(
+                header_path,
+                render_header,
+                lambda code: self.write_cpp_file(header_path, code),
+            )]
+            + self.ada_module_sources(
+                self.src_dir, 'c_api/pkg_main',
+                ['Implementation', 'C'],
+                in_library=True
+            )
         )
 
     def emit_python_api(self, ctx: CompileCtx) -> None:
         """
         Generate the Python binding module.
         """
-        def render_python_template(file_path: str,
-                                   *args: Any,
-                                   **kwargs: Any) -> None:
+        def render_module() -> str:
             with names.camel:
-                code = ctx.render_template(*args, **kwargs)
-            self.write_python_file(file_path, code)
-
-        # Emit the Python modules themselves
-        render_python_template(
-            os.path.join(self.python_pkg_dir, '__init__.py'),
-            'python_api/module_py',
-            c_api=ctx.c_api_settings,
-            pyapi=ctx.python_api_settings,
-            generate_auto_dll_dirs=self.generate_auto_dll_dirs,
-            module_name=ctx.python_api_settings.module_name
-        )
+                return ctx.render_template(
+                    'python_api/module_py',
+                    c_api=ctx.c_api_settings,
+                    pyapi=ctx.python_api_settings,
+                    generate_auto_dll_dirs=self.generate_auto_dll_dirs,
+                    module_name=ctx.python_api_settings.module_name
+                )
+
+        module_path = os.path.join(self.python_pkg_dir, '__init__.py')
+        setup_path = os.path.join(self.lib_root, 'python', 'setup.py')
+        self.emit_sources([
+            # Emit the Python modules themselves
+            SourceJob(
+                module_path,
+                render_module,
+                lambda code: self.write_python_file(module_path, code),
+            ),
+
+            # Emit the setup.py script to easily install the Python binding
+            SourceJob(
+                setup_path,
+                lambda: ctx.render_template('python_api/setup_py'),
+                lambda code: self.write_python_file(setup_path, code),
+            ),
+        ])
 
         # Emit the empty "py.type" file so that users can easily leverage type
         # annotations in the generated bindings.
@@ -676,12 +788,6 @@ class Emitter:
             os.path.join(self.python_pkg_dir, "py.typed"), ""
         )
 
-        # Emit the setup.py script to easily install the Python binding
-        setup_py_file = os.path.join(self.lib_root, 'python', 'setup.py')
-        self.write_python_file(
-            setup_py_file, ctx.render_template('python_api/setup_py')
-        )
-
     def emit_python_playground(self, ctx: CompileCtx) -> None:
         """
         Emit sources for the Python playground script.
@@ -737,6 +843,24 @@ class Emitter:
         if not os.path.isdir(self.ocaml_dir):
             os.mkdir(self.ocaml_dir)
 
+        def render(template_name: str) -> Callable[[], str]:
+            def do_render() -> str:
+                with names.camel:
+                    return ctx.render_template(
+                        template_name,
+                        c_api=ctx.c_api_settings,
+                        ocaml_api=ctx.ocaml_api_settings
+                    )
+            return do_render
+
+        def ocaml_source(template_name: str, filename: str) -> SourceJob:
+            file_path = os.path.join(self.ocaml_dir, filename)
+            return SourceJob(
+                file_path,
+                render(template_name),
+                lambda code: self.write_ocaml_file(file_path, code),
+            )
+
         with names.camel:
             # Write an empty ocamlformat file so we can call ocamlformat
             self.write_source_file(
@@ -745,36 +869,24 @@ class Emitter:
             )
 
             ctx = get_context()
-            code = ctx.render_template(
-                "ocaml_api/module_ocaml",
-                c_api=ctx.c_api_settings,
-                ocaml_api=ctx.ocaml_api_settings
-            )
-
-            ocaml_filename = '{}.ml'.format(ctx.c_api_settings.lib_name)
-            self.write_ocaml_file(
-                os.path.join(self.ocaml_dir, ocaml_filename), code,
-            )
-
-            code = ctx.render_template(
-                "ocaml_api/module_sig_ocaml",
-                c_api=ctx.c_api_settings,
-                ocaml_api=ctx.ocaml_api_settings
-            )
-
-            ocaml_filename = '{}.mli'.format(ctx.c_api_settings.lib_name)
-            self.write_ocaml_file(
-                os.path.join(self.ocaml_dir, ocaml_filename), code
-            )
+            lib_name = ctx.c_api_settings.lib_name
+            dune_path = os.path.join(self.ocaml_dir, 'dune')
+            self.emit_sources([
+                ocaml_source(
+                    "ocaml_api/module_ocaml", '{}.ml'.format(lib_name)
+                ),
+                ocaml_source(
+                    "ocaml_api/module_sig_ocaml", '{}.mli'.format(lib_name)
+                ),
 
-            # Emit dune file to easily compile and install bindings
-            code = ctx.render_template(
-                "ocaml_api/dune_ocaml",
-                c_api=ctx.c_api_settings,
-                ocaml_api=ctx.ocaml_api_settings
-            )
+                # Emit dune file to easily compile and install bindings
+                SourceJob(
+                    dune_path,
+                    render("ocaml_api/dune_ocaml"),
+                    lambda code: self.write_source_file(dune_path, code),
+                ),
+            ])
 
-            self.write_source_file(os.path.join(self.ocaml_dir, 'dune'), code)
             self.write_source_file(
                 os.path.join(self.ocaml_dir, 'dune-project'), '(lang dune 1.6)'
             )
@@ -790,6 +902,7 @@ class Emitter:
         """
         Generate the bindings to the Java environment.
         """
+        sources: List[SourceJob] = []
         for template, export_file, export_dir, post_process in [
             (
                 "java_api/main_class",
@@ -822,16 +935,22 @@ class Emitter:
                 None
             ),
         ]:
-            code = ctx.render_template(
-                template,
-                c_api=ctx.c_api_settings,
-                java_api=ctx.java_api_settings,
-            )
-            self.write_source_file(
-                os.path.join(export_dir, export_file),
-                code,
-                post_process
-            )
+            file_path = os.path.join(export_dir, export_file)
+            sources.append(SourceJob(
+                file_path,
+                functools.partial(
+                    ctx.render_template,
+                    template,
+                    c_api=ctx.c_api_settings,
+                    java_api=ctx.java_api_settings,
+                ),
+                functools.partial(
+                    self.write_source_file,
+                    file_path,
+                    post_process=post_process,
+                ),
+            ))
+        self.emit_sources(sources)
 
     def write_ada_module(self,
                          out_dir: str,
@@ -845,6 +964,25 @@ class Emitter:
         Write an Ada module (both spec and body) using a standardized scheme
         for finding the corresponding templates.
 
+        See ``ada_module_sources`` for the meaning of arguments.
+        """
+        self.emit_sources(self.ada_module_sources(
+            out_dir, template_base_name, qual_name, has_body, cached_body,
+            in_library, is_interface
+        ))
+
+    def ada_module_sources(self,
+                           out_dir: str,
+                           template_base_name: str,
+                           qual_name: List[str],
+                           has_body: bool = True,
+                           cached_body: bool = False,
+                           in_library: bool = False,
+                           is_interface: bool = True) -> List[SourceJob]:
+        """
+        Return the jobs to emit an Ada module (both spec and body) using a
+        standardized scheme for finding the corresponding templates.
+
         :param out_dir: The out directory for the generated module.
 
         :param template_base_name: The base name for the template, basically
@@ -864,34 +1002,32 @@ class Emitter:
         :param is_interface: Whether to include this module in the generated
             library interface.
         """
+        result: List[SourceJob] = []
 
-        def do_emit(kind: AdaSourceKind) -> None:
+        def add_source(kind: AdaSourceKind) -> None:
             """
-            Emit the "kind" source for this module.
+            Add a job to emit the "kind" source for this module.
             """
             qual_name_str = '.'.join(qual_name)
             with_clauses = self.context.with_clauses[(qual_name_str, kind)]
             full_qual_name = [
                 self.context.lib_name.camel_with_underscores
             ] + qual_name
+            file_path = self.ada_file_path(out_dir, kind, full_qual_name)
 
             # When requested, register library module as library interfaces
             if is_interface and in_library:
-                self.add_library_interface(
-                    self.ada_file_path(out_dir, kind, full_qual_name),
-                    generated=True,
-                )
+                self.add_library_interface(file_path, generated=True)
 
             # If asked not to generate the body, skip the rest
             if kind == AdaSourceKind.body and cached_body:
+                if self.context.pass_cache is not None:
+                    self.context.pass_cache.record_file(file_path)
                 return
 
-            with names.camel_with_underscores:
-                self.write_ada_file(
-                    out_dir=out_dir,
-                    source_kind=kind,
-                    qual_name=full_qual_name,
-                    content=self.context.render_template(
+            def render() -> str:
+                with names.camel_with_underscores:
+                    return self.context.render_template(
                         '{}{}_ada'.format(
                             template_base_name +
                             # If the base name ends with a /, we don't
@@ -900,12 +1036,123 @@ class Emitter:
                             kind.value
                         ),
                         with_clauses=with_clauses,
-                    ),
-                )
+                    )
+
+            result.append(SourceJob(
+                file_path,
+                render,
+                lambda content: self.write_ada_file(
+                    out_dir=out_dir,
+                    source_kind=kind,
+                    qual_name=full_qual_name,
+                    content=content,
+                ),
+            ))
 
-        do_emit(AdaSourceKind.spec)
+        add_source(AdaSourceKind.spec)
         if has_body:
-            do_emit(AdaSourceKind.body)
+            add_source(AdaSourceKind.body)
+        return result
+
+    def emit_sources(self, sources: List[SourceJob]) -> None:
+        """
+        Render the content of the given source files and then write them, in
+        order.
+
+        If the unit cache is enabled, skip source files whose inputs did not
+        change since the previous run and that were not modified since then.
+        """
+        unit_cache = self.context.unit_cache
+        if unit_cache is None:
+            for job, content in zip(
+                sources, self.render_all([job.render for job in sources])
+            ):
+                job.write(content)
+            return
+
+        stale_sources = []
+        for job in sources:
+            record = unit_cache.lookup(job.file_path)
+            if record is None or self.cache.file_changed(job.file_path):
+                unit_cache.report.append((job.file_path, "rendered"))
+                stale_sources.append(job)
+            else:
+                unit_cache.report.append((job.file_path, "skipped"))
+                self.context.documentations.mark_used(record.docs)
+                if self.context.pass_cache is not None:
+                    self.context.pass_cache.record_file(job.file_path)
+
+        # Templates used to render a source file are not recorded as used by
+        # the rest of the pipeline, so that they are not attributed to the
+        # source files rendered after it (see
+        # ``UnitCache.upstream_templates``).
+        def recording_render(
+            render: Callable[[], str]
+        ) -> Callable[[], Tuple[str, Set[str], Set[str]]]:
+            def wrapper() -> Tuple[str, Set[str], Set[str]]:
+                with record_used_templates(isolated=True) as templates, \
+                        self.context.documentations.record_used() as docs:
+                    content = render()
+                return content, templates, docs
+            return wrapper
+
+        for job, (content, templates, docs) in zip(
+            stale_sources,
+            self.render_all(
+                [recording_render(job.render) for job in stale_sources]
+            ),
+        ):
+            job.write(content)
+            unit_cache.record(
+                job.file_path, templates | unit_cache.upstream_templates, docs
+            )
+
+    def render_all(self, renderings: List[Callable[[], T]]) -> List[T]:
+        """
+        Run the given rendering functions and return their results, in the
+        same order.
+
+        If the emitter has more than one job, renderings are distributed on a
+        pool of forked worker processes. Their outputs are then printed in
+        order, so that this is indistinguishable from a sequential rendering.
+        If a rendering fails in a worker process, it is run again in the
+        current process to propagate the error.
+        """
+        global _pending_renderings
+
+        if (
+            self.jobs <= 1
+            or len(renderings) <= 1
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            return [render() for render in renderings]
+
+        # Make sure worker processes do not inherit pending output
+        sys.stdout.flush()
+
+        _pending_renderings = renderings
+        try:
+            with multiprocessing.get_context("fork").Pool(
+                min(self.jobs, len(renderings))
+            ) as pool:
+                results = pool.map(
+                    _run_rendering, range(len(renderings)), chunksize=1
+                )
+        finally:
+            _pending_renderings = []
+
+        contents: List[T] = []
+        for render, (output, content, used_docs, used_templates) in zip(
+            renderings, results
+        ):
+            self.context.documentations.mark_used(used_docs)
+            add_used_templates(used_templates)
+            if content is None:
+                content = render()
+            else:
+                sys.stdout.write(output)
+            contents.append(content)
+        return contents
 
     def write_source_file(self,
                           file_path: str,
@@ -923,17 +1170,25 @@ class Emitter:
         """
         context = get_context()
         assert context.emitter
+        if context.pass_cache is not None:
+            context.pass_cache.record_file(file_path)
         if post_process:
             source = post_process(source)
-        if (not os.path.exists(file_path) or
-                context.emitter.cache.is_stale(file_path, source)):
+
+        # Emit all source files as UTF-8 with "\n" line endings, no matter the
+        # current platform.
+        content = source.encode('utf-8')
+
+        # Also rewrite files that were modified or removed since the previous
+        # run, even if the content to write did not change.
+        cache = context.emitter.cache
+        if cache.is_stale(file_path, content) or cache.file_changed(file_path):
             if context.verbosity.debug:
                 printcol('Rewriting stale source: {}'.format(file_path),
                          Colors.OKBLUE)
-            # Emit all source files as UTF-8 with "\n" line endings, no matter
-            # the current platform.
-            with open(file_path, 'w', encoding='utf-8', newline='') as f:
-                f.write(source)
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            cache.record_file(file_path)
             return True
         return False
 
@@ -982,6 +1237,7 @@ class Emitter:
         if self.write_source_file(file_path, source, self.post_process_cpp):
             if find_executable('clang-format'):
                 subprocess.check_call(['clang-format', '-i', file_path])
+                self.cache.record_file(file_path)
 
     def write_ocaml_file(self, file_path: str, source: str) -> None:
         """
@@ -993,6 +1249,7 @@ class Emitter:
         if self.write_source_file(file_path, source, self.post_process_ocaml):
             if find_executable('ocamlformat'):
                 subprocess.check_call(['ocamlformat', '-i', file_path])
+                self.cache.record_file(file_path)
 
     def ada_file_path(self,
                       out_dir: str,
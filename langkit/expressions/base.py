@@ -3947,6 +3947,12 @@ class PropertyDef(AbstractNodeData):
 
         self.constructed_expr = None
 
+        self.collection_fusions: list[tuple[str, str]] = []
+        """
+        Descriptions of the (producer, consumer) collection expressions that
+        the "fuse collection expressions" pass fused in this property.
+        """
+
         self.vars = local_vars or LocalVars()
 
         self.expected_type = type
@@ -4841,6 +4847,34 @@ class PropertyDef(AbstractNodeData):
                 )
             )
 
+    def fuse_collection_expressions(self, context):
+        """
+        Fuse the collection expressions in this property that iterate on the
+        result of map expressions (see
+        ``langkit.expressions.collections.fuse_collection_expressions``), and
+        record them in ``collection_fusions``. Fusions are also reported on
+        the standard output in debug verbosity.
+
+        :type context: langkit.compile_context.CompileCtx
+        """
+        from langkit.expressions.collections import (
+            fuse_collection_expressions
+        )
+
+        if self.constructed_expr is None:
+            return
+
+        def describe(expr):
+            return repr(expr.abstract_expr or expr)
+
+        for producer, consumer in fuse_collection_expressions(
+            self.constructed_expr
+        ):
+            fusion = (describe(producer), describe(consumer))
+            self.collection_fusions.append(fusion)
+            if context.verbosity.debug:
+                print('{}: fused {} into {}'.format(self.qualname, *fusion))
+
     def render_property(self, context):
         """
         Render the given property to generated code.
@@ -4864,6 +4898,63 @@ class PropertyDef(AbstractNodeData):
                 else:
                     self.untyped_wrapper_decl = self.untyped_wrapper_def = ''
 
+    _rendered_code_attrs = ('prop_decl', 'prop_def', 'untyped_wrapper_decl',
+                            'untyped_wrapper_def')
+    """
+    Names of the attributes that ``render_property`` sets.
+    """
+
+    _expr_id_placeholder_re = re.compile('@@LKT_EXPR_ID_([0-9]+)@@')
+
+    def render_property_in_worker(self, context):
+        """
+        Variant of ``render_property`` to run in a worker process for the
+        parallel rendering of properties. Return the rendered code and the
+        number of identifiers for GDB helpers it uses.
+
+        These identifiers are unique across all properties, so they depend on
+        the order in which properties are rendered: the rendered code contains
+        placeholders for them, and ``set_rendered_code`` replaces them with
+        actual identifiers, so that the result is the same as for a
+        sequential rendering.
+
+        :type context: langkit.compile_context.CompileCtx
+        :rtype: (tuple[str], int)
+        """
+        id_count = 0
+
+        def placeholders():
+            nonlocal id_count
+            while True:
+                id_count += 1
+                yield f'@@LKT_EXPR_ID_{id_count - 1}@@'
+
+        expr_count = ResolvedExpression.expr_count
+        ResolvedExpression.expr_count = placeholders()
+        try:
+            self.render_property(context)
+        finally:
+            ResolvedExpression.expr_count = expr_count
+
+        return (tuple(getattr(self, a) for a in self._rendered_code_attrs),
+                id_count)
+
+    def set_rendered_code(self, context, result):
+        """
+        Store the result of ``render_property_in_worker`` in this property,
+        allocating identifiers for GDB helpers.
+
+        :type context: langkit.compile_context.CompileCtx
+        :type result: (tuple[str], int)
+        """
+        code, id_count = result
+        ids = [str(next(ResolvedExpression.expr_count))
+               for _ in range(id_count)]
+        for attr, text in zip(self._rendered_code_attrs, code):
+            setattr(self, attr, self._expr_id_placeholder_re.sub(
+                lambda m: ids[int(m.group(1))], text
+            ))
+
     @property
     def doc(self):
         return self._doc
@@ -201,7 +201,17 @@ class Eq(AbstractExpression):
 
         :rtype: EqExpr
         """
+        from langkit.expressions.envs import EnvGet
         from langkit.expressions.structs import Cast
+
+        # Testing whether a lookup returns no entity does not require to
+        # compute all the entities it returns.
+        result = EnvGet.construct_emptiness_test(
+            'eq', self.lhs, self.rhs, self
+        )
+        if result is not None:
+            return result
+
         lhs = construct(self.lhs)
         rhs = construct(self.rhs)
 
@@ -311,6 +321,15 @@ class OrderingTest(AbstractExpression):
 
         :rtype: OrderingTest.Expr
         """
+        from langkit.expressions.envs import EnvGet
+
+        # See the corresponding comment in Eq.construct
+        result = EnvGet.construct_emptiness_test(
+            self.operator, self.lhs, self.rhs, self
+        )
+        if result is not None:
+            return result
+
         lhs, rhs = construct(self.lhs), construct(self.rhs)
         check_source_language(
             lhs.type.is_long_type or
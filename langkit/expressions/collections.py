@@ -15,12 +15,12 @@ from langkit.diagnostics import (
 )
 from langkit.expressions.base import (
     AbstractExpression, AbstractNodeData, AbstractVariable, CallExpr,
-    ComputingExpr, FieldAccessExpr, LambdaArgInfo, LocalVars, NullCheckExpr,
-    PropertyDef, ResolvedExpression, Self, SequenceExpr, T, UncheckedCastExpr,
-    VariableExpr, attr_call, attr_expr, auto_attr, auto_attr_custom, construct,
-    construct_var, render, unsugar
+    ComputingExpr, FieldAccessExpr, IntegerLiteralExpr, LambdaArgInfo,
+    LocalVars, NullCheckExpr, PropertyDef, ResolvedExpression, Self,
+    SequenceExpr, T, UncheckedCastExpr, VariableExpr, attr_call, attr_expr,
+    auto_attr, auto_attr_custom, construct, construct_var, render, unsugar
 )
-from langkit.expressions.envs import make_as_entity
+from langkit.expressions.envs import EnvGet, make_as_entity
 
 
 # The following functions are used as "lambda" expressions in the DSL. We do
@@ -105,6 +105,16 @@ class CollectionExpression(AbstractExpression):
             self.inner_expr = common.inner_expr
             self.inner_scope = common.inner_scope
 
+            self.fused_producers: List[Map.Expr] = []
+            """
+            If this expression was fused with the map expressions that compute
+            its collection (see ``fuse_collection_expressions``), list of
+            these map expressions, starting with the one that iterates on an
+            actual collection. In this case, "self.collection" is not
+            evaluated: the code generated for this expression evaluates map
+            expressions in the same loop.
+            """
+
             super().__init__(result_var_name, abstract_expr=abstract_expr)
 
         @property
@@ -896,6 +906,17 @@ def collection_get(self: AbstractExpression,
     # indexes, so there is no need to fiddle indexes here.
     index_expr = construct(index, T.Int)
 
+    # The first element of a lookup result (or null if it is empty) can be
+    # computed without building the whole array.
+    if (
+        or_null
+        and isinstance(index_expr, IntegerLiteralExpr)
+        and index_expr.value == 0
+    ):
+        first = EnvGet.construct_first(collection)
+        if first is not None:
+            return first
+
     coll_expr = construct(collection)
     as_entity = coll_expr.type.is_entity_type
     if as_entity:
@@ -1201,3 +1222,51 @@ class Find(CollectionExpression):
         )
 
         return Find.Expr(r, abstract_expr=self)
+
+
+def fuse_collection_expressions(
+    expr: ResolvedExpression,
+) -> List[Tuple[Map.Expr, CollectionExpression.BaseExpr]]:
+    """
+    Fuse collection expressions in ``expr`` that iterate on the result of a
+    map expression with that map expression, so that the generated code does
+    not create the intermediate array. Return the list of map expressions that
+    were fused and the collection expression they were fused into.
+
+    For instance, ``c.filter(...).map(...).find(...)`` is then evaluated as a
+    single loop on ``c``. This is possible only when the map expression just
+    computes one array item per collection item: this excludes
+    :dsl:`mapcat` expressions.
+    """
+    result: List[Tuple[Map.Expr, CollectionExpression.BaseExpr]] = []
+
+    def can_fuse(consumer: CollectionExpression.BaseExpr) -> bool:
+        producer = consumer.collection
+        return (
+            isinstance(producer, Map.Expr)
+            and not producer.do_concat
+
+            # Iterating on an array does not require conversions from the
+            # array items to the user element variable: the loop only needs to
+            # bind the element variable to the item that the map expression
+            # computes.
+            and consumer.codegen_element_var.name
+            == consumer.user_element_var.name
+            and all(v.init_expr is None for v in consumer.iter_vars)
+        )
+
+    def visit(e: ResolvedExpression) -> None:
+        # Process sub-expressions first, so that the map expression that a
+        # collection expression iterates on is already fused with its own
+        # collection when we get to it.
+        for sub_expr in e.flat_subexprs():
+            visit(sub_expr)
+
+        if isinstance(e, CollectionExpression.BaseExpr) and can_fuse(e):
+            producer = e.collection
+            assert isinstance(producer, Map.Expr)
+            e.fused_producers = producer.fused_producers + [producer]
+            result.append((producer, e))
+
+    visit(expr)
+    return result
@@ -215,6 +215,15 @@ class EnvGet(AbstractExpression):
         self.categories = categories
 
     def construct(self):
+        return self._construct(self.only_first)
+
+    def _construct(self, only_first):
+        """
+        Construct a resolved expression for this lookup.
+
+        :param bool only_first: Whether the resolved expression must return
+            only the first entity found instead of all of them.
+        """
         env_expr = construct(self.env, T.LexicalEnv)
 
         sym_expr = construct(self.symbol)
@@ -239,9 +248,107 @@ class EnvGet(AbstractExpression):
             )
 
         return EnvGet.Expr(env_expr, sym_expr, lookup_kind_expr, categories,
-                           from_expr, self.only_first,
+                           from_expr, only_first,
                            abstract_expr=self)
 
+    @staticmethod
+    def construct_first(expr):
+        """
+        If ``expr`` is a lookup that returns all the entities found (i.e. a
+        ``.get`` expression), return a resolved expression for the same lookup
+        that returns only the first entity found, or a null entity if no entity
+        is found. Return None otherwise, or if this lowering is not enabled
+        (see the optional "lower first entity lookups" pass).
+
+        The generated code for the latter stops the traversal of environments
+        as soon as it finds an entity, so consumers of lookups that need only
+        the first entity should use it rather than building the whole array.
+
+        :param AbstractExpression expr: Expression to lower.
+        :rtype: ResolvedExpression|None
+        """
+        if (
+            get_context().first_entity_lookups
+            and isinstance(expr, EnvGet)
+            and not expr.only_first
+        ):
+            return expr._construct(only_first=True)
+        return None
+
+    # Comparisons of a lookup length with these integer constants are just
+    # emptiness tests. Each comparison operator is associated to a mapping
+    # from the constant to whether the comparison is true when the lookup
+    # result is empty.
+    LENGTH_TESTS = {
+        'eq': {0: True},
+        'lt': {1: True},
+        'le': {0: True},
+        'gt': {0: False},
+        'ge': {1: False},
+    }
+
+    MIRRORED_OPERATORS = {
+        'eq': 'eq',
+        'lt': 'gt',
+        'le': 'ge',
+        'gt': 'lt',
+        'ge': 'le',
+    }
+
+    @staticmethod
+    def construct_emptiness_test(operator, lhs, rhs, abstract_expr):
+        """
+        If the ``lhs <operator> rhs`` comparison only checks whether a lookup
+        returns no entity (for instance ``env.get(...).length > 0``), return a
+        resolved expression for it that uses ``EnvGet.construct_first``.
+        Return None otherwise.
+
+        :param str operator: Comparison operator: "eq" for equality, or one of
+            the OrderingTest operators.
+        :param AbstractExpression lhs: Left operand.
+        :param AbstractExpression rhs: Right operand.
+        :param AbstractExpression abstract_expr: Comparison expression.
+        :rtype: ResolvedExpression|None
+        """
+        from langkit.expressions.boolean import Not
+        from langkit.expressions.structs import IsNull
+
+        def int_constant(expr):
+            if isinstance(expr, Literal):
+                expr = expr.literal
+            # Reject booleans, which are integers for Python
+            return expr if type(expr) is int else None
+
+        # The ".length" attribute expression class is created by the auto_attr
+        # decorator: get it from the registry of attribute expressions.
+        length_cls = AbstractExpression.attrs_dict['length'].constructor
+
+        def lookup_length_prefix(expr):
+            return expr.expr_0 if isinstance(expr, length_cls) else None
+
+        prefix = lookup_length_prefix(lhs)
+        constant = int_constant(rhs)
+        if prefix is None:
+            prefix = lookup_length_prefix(rhs)
+            constant = int_constant(lhs)
+            operator = EnvGet.MIRRORED_OPERATORS[operator]
+        if prefix is None or constant is None:
+            return None
+
+        when_empty = EnvGet.LENGTH_TESTS[operator].get(constant)
+        if when_empty is None:
+            return None
+
+        first = EnvGet.construct_first(prefix)
+        if first is None:
+            return None
+
+        result = IsNull.construct_static(first)
+        if not when_empty:
+            result = Not.make_expr(result)
+        result.abstract_expr = abstract_expr
+        return result
+
 
 @auto_attr
 def env_orphan(self, env):
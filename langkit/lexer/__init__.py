@@ -655,9 +655,14 @@ class Lexer:
         """
         self.newline_after.update(tokens)
 
-    def build_dfa_code(self, context: CompileCtx) -> DFACodeGenHolder:
+    def build_dfa_code(self,
+                       context: CompileCtx,
+                       report_stats: bool = False) -> DFACodeGenHolder:
         """
         Build the DFA that implements this lexer (self.dfa_code).
+
+        :param report_stats: If true, print the number of states for the
+            various automata that are computed.
         """
         assert context.nfa_start is not None
 
@@ -670,8 +675,22 @@ class Lexer:
             sorted_actions = sorted(labels)
             return sorted_actions[0][1] if sorted_actions else None
 
-        # Compute the corresponding DFA
-        return DFACodeGenHolder(context.nfa_start.to_dfa(), get_action)
+        # Compute the corresponding DFA, and then minimize it. States that run
+        # the same action can be merged, even if their labels are different.
+        dfa = context.nfa_start.to_dfa()
+        minimized_dfa = dfa.minimize(lambda s: get_action(s.labels))
+
+        if report_stats:
+            print("Lexer statistics:")
+            for label, count in [
+                ("NFA states", len(context.nfa_start.reachable_states())),
+                ("DFA states", len(dfa.reachable_states())),
+                ("minimized DFA states",
+                 len(minimized_dfa.reachable_states())),
+            ]:
+                print(f"  {label}: {count}")
+
+        return DFACodeGenHolder(minimized_dfa, get_action)
 
     def get_token(self, literal: str) -> Action:
         """
@@ -197,16 +197,17 @@ class CharSet:
         def overlap(r1: Tuple[int, int], r2: Tuple[int, int]) -> bool:
             return r1[0] <= r2[1] and r1[1] >= r2[0]
 
-        self_r = list(self.ranges)
-        other_r = list(other.ranges)
-
-        while self_r and other_r:
-            # Remove the first item from one list if it precedes (without
-            # overlapping) the first item from the other list.
-            if self_r[0][0] > other_r[0][1]:
-                other_r.pop(0)
-            elif self_r[0][1] < other_r[0][0]:
-                self_r.pop(0)
+        self_r = self.ranges
+        other_r = other.ranges
+        self_i = other_i = 0
+
+        while self_i < len(self_r) and other_i < len(other_r):
+            # Skip the current item from one list if it precedes (without
+            # overlapping) the current item from the other list.
+            if self_r[self_i][0] > other_r[other_i][1]:
+                other_i += 1
+            elif self_r[self_i][1] < other_r[other_i][0]:
+                self_i += 1
             else:
                 return True
         return False
@@ -253,6 +254,19 @@ class CharSet:
         """
         assert low <= MAXUNICODE and high <= MAXUNICODE
 
+        # Fast path for the common case of ranges added in increasing order:
+        # the new range goes after all existing ones...
+        if not self.ranges or low > self.ranges[-1][1] + 1:
+            self.ranges.append((low, high))
+            return
+
+        # ... or extends the last one
+        last_low, last_high = self.ranges[-1]
+        if last_low <= low:
+            if last_high < high:
+                self.ranges[-1] = (last_low, high)
+            return
+
         # Look for a range that contains the low bound
         found, index = self._lookup(low)
 
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import abc
-from collections import defaultdict
+from collections import defaultdict, deque
 from contextlib import contextmanager
 import itertools
 import re
-from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
-                    Set, TYPE_CHECKING, Tuple, TypeVar)
+from typing import (Any, Callable, Deque, Dict, FrozenSet, Hashable, Iterable,
+                    Iterator, List, Optional, Set, TYPE_CHECKING, Tuple,
+                    TypeVar)
 
 
 from langkit.diagnostics import check_source_language, error
-from langkit.lexer.char_set import CharSet
+from langkit.lexer.char_set import CharSet, MAXUNICODE
 
 
 if TYPE_CHECKING:
@@ -72,6 +73,78 @@ def _to_dot(starting_state: T,
     return '\n'.join(['digraph g {'] + nodes + edges + ['}'])
 
 
+def _reachable_states(starting_state: T,
+                      get_next_states: Callable[[T], Iterable[T]]) -> List[T]:
+    """
+    Return the list of states reachable from ``starting_state`` (included), in
+    breadth-first order.
+
+    :param get_next_states: Function that returns for a given state the list
+        of states it has transitions to.
+    """
+    result = [starting_state]
+    visited = {starting_state}
+    queue: Deque[T] = deque(result)
+    while queue:
+        for next_state in get_next_states(queue.popleft()):
+            if next_state not in visited:
+                visited.add(next_state)
+                result.append(next_state)
+                queue.append(next_state)
+    return result
+
+
+def alphabet_classes(
+    char_sets: Iterable[CharSet]
+) -> Tuple[List[CharSet], Dict[CharSet, List[int]]]:
+    """
+    Partition the characters in the given character sets into equivalence
+    classes: two characters are in the same class iff they belong to exactly
+    the same character sets.
+
+    Return the list of classes, sorted by lowest character, and a mapping
+    from each given character set to the indexes of the classes it contains.
+    """
+    unique_char_sets = sorted(set(char_sets))
+
+    # Just like in NFAState.deterministic_transitions, linearize character
+    # sets as a stream of "add char set"/"remove char set" events, indexed by
+    # character.
+    adding: Dict[int, List[int]] = defaultdict(list)
+    removing: Dict[int, List[int]] = defaultdict(list)
+    for i, char_set in enumerate(unique_char_sets):
+        for low, high in char_set.ranges:
+            # Subset construction can leave empty ranges in character sets:
+            # just ignore them.
+            if low > high:
+                continue
+            adding[low].append(i)
+            removing[high + 1].append(i)
+
+    # Follow the stream of events to compute the list of ranges for each
+    # combination of character sets.
+    class_ranges: Dict[FrozenSet[int], List[Tuple[int, int]]] = {}
+    active: Set[int] = set()
+    last_char = 0
+    for char in sorted(set(adding) | set(removing)):
+        if active:
+            class_ranges.setdefault(frozenset(active), []).append(
+                (last_char, char - 1)
+            )
+        active.difference_update(removing.get(char, []))
+        active.update(adding.get(char, []))
+        last_char = char
+    assert not active
+
+    classes: List[CharSet] = []
+    members: Dict[CharSet, List[int]] = {cs: [] for cs in unique_char_sets}
+    for key, ranges in sorted(class_ranges.items(), key=lambda kv: kv[1][0]):
+        for i in sorted(key):
+            members[unique_char_sets[i]].append(len(classes))
+        classes.append(CharSet.from_int_ranges(*ranges))
+    return classes, members
+
+
 class SequenceReader:
     def __init__(self, sequence: str):
         self.sequence = sequence
@@ -678,41 +751,11 @@ class NFAState:
             process(state)
         return result
 
-    @staticmethod
-    def reachable_nonspontaneous_transitions(
-        states: Tuple[NFAState, ...]
-    ) -> List[Tuple[CharSet, NFAState]]:
-        """
-        Return the list of non-spontaneous transitions that can be reached from
-        the given set of states.
-
-        Computing this is valid if following any spontaneous transition from
-        one given state leads to a state that is also in ``states``, i.e. if
-        ``follow_spontaneous_transitions(states) == states``.
-
-        :param states: List of starting states.
-        """
-        result: List[Tuple[CharSet, NFAState]] = []
-        for state in states:
-            for chars, next_state in state.transitions:
-                if chars is None:
-                    assert next_state in states
-                else:
-                    result.append((chars, next_state))
-        return result
-
-    @staticmethod
-    def hashable_state_set(states: Set[NFAState]) -> Tuple[NFAState, ...]:
-        """
-        Return a value that can be used as a dict key/set element to represent
-        a set of states.
-        """
-        return tuple(sorted(states))
-
     @staticmethod
     def deterministic_transitions(
-        states: Tuple[NFAState, ...]
-    ) -> Dict[Tuple[NFAState, ...], CharSet]:
+        states: FrozenSet[NFAState],
+        closures: SpontaneousClosures,
+    ) -> Dict[FrozenSet[NFAState], CharSet]:
         """
         Return the set of deterministic (non-spontaneous and disjoint)
         transitions that leave the "states" sub-graph.
@@ -724,22 +767,11 @@ class NFAState:
         deterministic transitions) to disjoint character sets (label for
         transitions).
 
-        :param states: Set of states from which we compute transitions.
+        :param states: Set of states from which we compute transitions. Any
+            state reachable from them following spontaneous transitions must
+            be in this set.
+        :param closures: Cache for the closures of sets of states.
         """
-        # First, collect for each reachable state the set of characters that
-        # allow to reach that state.
-        transitions: Dict[NFAState, CharSet] = {}
-        for chars, next_state in NFAState.reachable_nonspontaneous_transitions(
-            states
-        ):
-            assert chars is not None
-            try:
-                other_chars = transitions[next_state]
-            except KeyError:
-                transitions[next_state] = chars
-            else:
-                transitions[next_state] = other_chars | chars
-
         # Linearize the transition labels: flatten all character sets to have a
         # stream of "start range"/"end range" of transitions considering all
         # input characters.
@@ -750,108 +782,106 @@ class NFAState:
         #    S3: [f:l]
         # }
         # we will get the following stream of events: {
-        #    'a': Event(adding=S1;S2),
-        #    'f': Event(adding=S3),
-        #    'h': Event(removing=S2),
-        #    'l': Event(removing=S3),
-        #    's': Event(adding=S2,removing=S2),
-        #    'z': Event(removing=S1),
+        #    'a': adding=S1;S2,
+        #    'f': adding=S3,
+        #    'i': removing=S2,
+        #    'm': removing=S3,
+        #    's': adding=S2,
+        #    't': removing=S2,
+        #    '{': removing=S1,
         # }.
-        class Event:
-            def __init__(self) -> None:
-                self.adding: Set[NFAState] = set()
-                self.removing: Set[NFAState] = set()
-
-        event_map: Dict[int, Event] = defaultdict(Event)
-        for next_state, chars in transitions.items():
-            for r in chars.ranges:
-                event_map[r[0]].adding.add(next_state)
-                event_map[r[1]].removing.add(next_state)
-        events = sorted(event_map.items())
-
-        # The final step is to compute the set of transitions for which
-        # character sets are disjoint: just follow the stream of events.
-
-        result: Dict[Tuple[NFAState, ...], CharSet] = defaultdict(CharSet)
-
-        def add_transition(low: Optional[int],
-                           high: int,
-                           states: Iterable[NFAState]) -> None:
-            if states:
-                assert isinstance(low, int)
-            else:
-                return
-            next_states = NFAState.follow_spontaneous_transitions(states)
-            result[NFAState.hashable_state_set(next_states)].add_int_range(
-                low, high
-            )
-
-        # Set of states "active" for the current position in the events stream
-        active_states: Set[NFAState] = set()
-
-        # Character for the last event we processed
-        last_char: Optional[int] = None
-
-        for char, event in events:
-            assert event.adding or event.removing
+        #
+        # Note that removing events apply to the character after the end of
+        # ranges.
+        adding: Dict[int, List[NFAState]] = defaultdict(list)
+        removing: Dict[int, List[NFAState]] = defaultdict(list)
+        for state in states:
+            for chars, next_state in state.transitions:
+                if chars is None:
+                    assert next_state in states
+                    continue
+                for low, high in chars.ranges:
+                    adding[low].append(next_state)
+                    removing[high + 1].append(next_state)
+
+        # Then follow the stream of events to compute, for each set of states
+        # active at some point, the list of character ranges for which they
+        # are active. Because several ranges can lead to the same state, keep
+        # track of the number of active ranges for each state.
+        active_states: Dict[NFAState, int] = {}
+        active_ranges: Dict[FrozenSet[NFAState], List[Tuple[int, int]]] = (
+            defaultdict(list)
+        )
+        last_char = 0
+        for char in sorted(adding.keys() | removing.keys()):
+            if active_states and last_char < char:
+                active_ranges[frozenset(active_states)].append(
+                    (last_char, char - 1)
+                )
 
-            if event.adding:
-                add_transition(last_char, char - 1, active_states)
-                active_states = active_states.union(event.adding)
-                last_char = char
+            for state in adding.get(char, []):
+                active_states[state] = active_states.get(state, 0) + 1
+            for state in removing.get(char, []):
+                count = active_states[state] - 1
+                if count:
+                    active_states[state] = count
+                else:
+                    del active_states[state]
 
-            if event.removing:
-                add_transition(last_char, char, active_states)
-                active_states = active_states.difference(event.removing)
-                last_char = char + 1
+            last_char = char
+        assert not active_states
 
-        return result
+        # The final step is to follow spontaneous transitions from all sets
+        # of active states.
+        result_ranges: Dict[FrozenSet[NFAState], List[Tuple[int, int]]] = (
+            defaultdict(list)
+        )
+        for next_states, ranges in active_ranges.items():
+            result_ranges[closures.of_states(next_states)].extend(ranges)
+        return {
+            next_states: CharSet.from_int_ranges(*sorted(ranges))
+            for next_states, ranges in result_ranges.items()
+        }
 
     def to_dfa(self) -> DFAState:
         """
         Return the conversion of this NFA into a DFA.
         """
-        result: Optional[DFAState] = None
+        closures = SpontaneousClosures()
 
-        # Mapping from sets of NFAState nodes (see NFAState.hashable_state_set)
-        # to the corresponding DFAState nodes.
-        dfa_states: Dict[Tuple[NFAState, ...], DFAState] = {}
+        # Mapping from sets of NFAState nodes to the corresponding DFAState
+        # nodes.
+        dfa_states: Dict[FrozenSet[NFAState], DFAState] = {}
 
-        # List of tuple[NFAState, CharSet and tuple[NFAState]] for the
-        # transitions that constitute the DFA.
-        transitions: List[Tuple[Tuple[NFAState, ...],
-                                CharSet,
-                                Tuple[NFAState, ...]]] = []
+        # Sets of NFAState nodes for the DFAState nodes whose transitions are
+        # yet to be computed.
+        queue: Deque[FrozenSet[NFAState]] = deque()
 
-        queue = {
-            self.hashable_state_set(
-                self.follow_spontaneous_transitions([self])
-            )
-        }
+        def get_dfa_state(states: FrozenSet[NFAState]) -> DFAState:
+            try:
+                return dfa_states[states]
+            except KeyError:
+                pass
+            result = DFAState(labels={s.label for s in states
+                                      if s.label is not None})
+            dfa_states[states] = result
+            queue.append(states)
+            return result
+
+        result = get_dfa_state(closures.of_states(frozenset([self])))
         while queue:
-            states = queue.pop()
-            if states in dfa_states:
-                # TODO: unreachable?
-                raise RuntimeError()
-
-            new_node = DFAState(labels={s.label for s in states
-                                        if s.label is not None})
-            dfa_states[states] = new_node
-            if result is None:
-                result = new_node
-
+            states = queue.popleft()
+            dfa_state = dfa_states[states]
+            # Character sets from deterministic_transitions are disjoint by
+            # construction, so there is no need to go through
+            # DFAState.add_transition (and its costly overlap checks).
             for next_states, char_set in self.deterministic_transitions(
-                states
+                states, closures
             ).items():
-                if next_states not in dfa_states:
-                    queue.add(next_states)
-                transitions.append((states, char_set, next_states))
-
-        for states, char_set, next_states in transitions:
-            dfa_states[states].add_transition(char_set,
-                                              dfa_states[next_states])
+                dfa_state.transitions.append(
+                    (char_set, get_dfa_state(next_states))
+                )
 
-        assert result
         return result
 
     def to_dot(self) -> str:
@@ -860,6 +890,67 @@ class NFAState:
         """
         return _to_dot(self, lambda s: s.transitions, lambda s: s.label)
 
+    def reachable_states(self) -> List[NFAState]:
+        """
+        Return the list of states in the NFA that starts with this state.
+        """
+        return _reachable_states(
+            self, lambda s: [next_state for _, next_state in s.transitions]
+        )
+
+
+class SpontaneousClosures:
+    """
+    Cache for the sets of states that can be reached from sets of NFA states
+    following spontaneous transitions (see
+    ``NFAState.follow_spontaneous_transitions``).
+
+    Equal sets of states returned by this cache are the same objects, so
+    that using them as dict keys is cheap.
+    """
+
+    def __init__(self) -> None:
+        self._state_closures: Dict[NFAState, FrozenSet[NFAState]] = {}
+        """
+        Closures for single states.
+        """
+
+        self._closures: Dict[FrozenSet[NFAState], FrozenSet[NFAState]] = {}
+        """
+        Closures for sets of states.
+        """
+
+        self._interned: Dict[FrozenSet[NFAState], FrozenSet[NFAState]] = {}
+        """
+        Unique object for each closure computed so far.
+        """
+
+    def of_states(self, states: FrozenSet[NFAState]) -> FrozenSet[NFAState]:
+        """
+        Return the set of states that can be reached from ``states``
+        following spontaneous transitions.
+        """
+        try:
+            return self._closures[states]
+        except KeyError:
+            pass
+
+        closure: Set[NFAState] = set()
+        for state in states:
+            try:
+                state_closure = self._state_closures[state]
+            except KeyError:
+                state_closure = frozenset(
+                    NFAState.follow_spontaneous_transitions([state])
+                )
+                self._state_closures[state] = state_closure
+            closure.update(state_closure)
+
+        frozen_closure = frozenset(closure)
+        result = self._interned.setdefault(frozen_closure, frozen_closure)
+        self._closures[states] = result
+        return result
+
 
 class DFAState:
     """
@@ -910,6 +1001,142 @@ class DFAState:
                        lambda s: s.transitions,
                        lambda s: '\n'.join(str(l) for l in sorted(s.labels)))
 
+    def reachable_states(self) -> List[DFAState]:
+        """
+        Return the list of states in the DFA that starts with this state.
+        """
+        return _reachable_states(
+            self, lambda s: [next_state for _, next_state in s.transitions]
+        )
+
+    def minimize(self, get_key: Callable[[DFAState], Hashable]) -> DFAState:
+        """
+        Return the starting state of a minimal DFA that is equivalent to the
+        one that starts with this state.
+
+        This uses Hopcroft's partition refinement algorithm. States can be
+        merged only when ``get_key`` returns the same value for them: for
+        lexers, this is the action to run when reaching the state. Merged
+        states get the union of the labels of the original states.
+
+        Note that the starting state is never merged with other states, so
+        that if the original DFA has no transition to its starting state,
+        neither does the minimized one.
+
+        :param get_key: Function that returns, for a given state, a value that
+            determines whether that state has the same observable behavior as
+            another state, ignoring transitions.
+        """
+        states = self.reachable_states()
+        state_indexes = {s: i for i, s in enumerate(states)}
+
+        # Make the automaton complete: add a "dead" state (index: ``dead``)
+        # for all transitions missing in the original DFA. Transitions are
+        # labeled with alphabet classes rather than character sets, so that
+        # the alphabet is small.
+        dead = len(states)
+        classes, class_members = alphabet_classes(
+            char_set for s in states for char_set, _ in s.transitions
+        )
+        all_classes = range(len(classes))
+
+        # For each state, index of the next state for each alphabet class
+        next_states: List[List[int]] = []
+
+        # For each alphabet class, mapping from states to the list of states
+        # that have a transition to it.
+        inverse: List[Dict[int, List[int]]] = [
+            defaultdict(list) for _ in all_classes
+        ]
+
+        for i, s in enumerate(states):
+            state_next_states = [dead] * len(classes)
+            for char_set, next_state in s.transitions:
+                for c in class_members[char_set]:
+                    state_next_states[c] = state_indexes[next_state]
+            for c, next_state_index in enumerate(state_next_states):
+                inverse[c][next_state_index].append(i)
+            next_states.append(state_next_states)
+        for c in all_classes:
+            inverse[c][dead].append(dead)
+
+        # Initial partition: the starting state alone, the dead state alone,
+        # and then one block per key for all other states.
+        blocks: List[Set[int]] = [{0}, {dead}]
+        block_indexes = [0] * (dead + 1)
+        block_indexes[dead] = 1
+        key_blocks: Dict[Hashable, int] = {}
+        for i, s in enumerate(states[1:], 1):
+            key = get_key(s)
+            try:
+                b = key_blocks[key]
+            except KeyError:
+                b = len(blocks)
+                key_blocks[key] = b
+                blocks.append(set())
+            blocks[b].add(i)
+            block_indexes[i] = b
+
+        # Refine the partition until no splitter can split a block. Splitters
+        # are (block, alphabet class) couples.
+        worklist = [(b, c) for b in range(len(blocks)) for c in all_classes]
+        while worklist:
+            splitter, c = worklist.pop()
+
+            # Group the states that transition into the splitter block on
+            # ``c`` by the block they belong to.
+            predecessors: Dict[int, Set[int]] = defaultdict(set)
+            for target in blocks[splitter]:
+                for source in inverse[c].get(target, []):
+                    predecessors[block_indexes[source]].add(source)
+
+            for b, inside in predecessors.items():
+                if len(inside) == len(blocks[b]):
+                    continue
+
+                # Split block "b": keep the biggest part in place and create
+                # a new block for the smallest one. As per Hopcroft's
+                # algorithm, only the smallest part needs to be added to the
+                # worklist, whether or not "b" is still in it.
+                outside = blocks[b] - inside
+                smallest, biggest = sorted(
+                    [inside, outside], key=lambda part: (len(part), min(part))
+                )
+                new_block = len(blocks)
+                blocks[b] = biggest
+                blocks.append(smallest)
+                for i in smallest:
+                    block_indexes[i] = new_block
+                worklist.extend((new_block, c2) for c2 in all_classes)
+
+        # Finally, create one new state per block (except the dead one)
+        new_states: Dict[int, DFAState] = {}
+        for s, b in zip(states, block_indexes):
+            try:
+                new_states[b].labels.update(s.labels)
+            except KeyError:
+                new_states[b] = DFAState(labels=set(s.labels))
+
+        for b, new_state in new_states.items():
+            # All states in a block have equivalent transitions, so just pick
+            # the first one. Compute the union of alphabet classes that lead
+            # to each block.
+            transitions: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+            for c, next_state_index in enumerate(
+                next_states[min(blocks[b])]
+            ):
+                if next_state_index != dead:
+                    transitions[block_indexes[next_state_index]].extend(
+                        classes[c].ranges
+                    )
+            for next_block, ranges in transitions.items():
+                new_state.add_transition(
+                    CharSet.from_int_ranges(*sorted(ranges)),
+                    new_states[next_block],
+                )
+
+        return new_states[0]
+
 
 class DFACodeGenHolder:
     """
@@ -1010,19 +1237,17 @@ class DFACodeGenHolder:
         # We store them in a list (self.states) to have deterministic code
         # emission, but we also maintain a set (visited_states) for fast
         # membership test.
-        visited_states = set()
+        visited_states = {dfa}
 
-        queue = [dfa]
+        queue: Deque[DFAState] = deque([dfa])
         while queue:
-            dfa_state = queue.pop(0)
-            if dfa_state in visited_states:
-                continue
-            visited_states.add(dfa_state)
+            dfa_state = queue.popleft()
 
             # Compute transition and queue unvisited nodes
             transitions = sorted(dfa_state.transitions)
             for char_set, next_state in transitions:
-                if next_state not in queue:
+                if next_state not in visited_states:
+                    visited_states.add(next_state)
                     queue.append(next_state)
 
             self.states.append(
@@ -1057,6 +1282,18 @@ class DFACodeGenHolder:
                     self.charset_to_tablename[char_set] = table_name
                 state.named_table_transitions.append((table_name, label))
 
+        self._tables: Optional[DFATables] = None
+
+    @property
+    def tables(self) -> DFATables:
+        """
+        Compressed transition tables for this DFA, to generate table-driven
+        lexers. Computed on first access.
+        """
+        if self._tables is None:
+            self._tables = DFATables(self)
+        return self._tables
+
     def ada_table_decls(self, prefix: str) -> str:
         """
         Helper to generate the Ada declarations for character lookup tables.
@@ -1079,3 +1316,309 @@ class DFACodeGenHolder:
             lines.extend(ranges)
             lines.append(');')
         return '\n'.join(prefix + line for line in lines)
+
+
+class DFATables:
+    """
+    Compressed transition tables for a DFA, used to generate table-driven
+    lexers.
+
+    Input characters are first mapped to equivalence classes: two characters
+    are in the same class iff all states have the same transitions for them.
+    Class 0 contains characters for which no state has a transition. The next
+    state is then looked up in a (state, class) transition table.
+
+    The character to class mapping is split in two: a flat table for ASCII
+    characters, which are by far the most common ones, and a two-level table
+    for the whole Unicode range. The latter maps each block of
+    ``BLOCK_SIZE`` characters to a block of classes, so that identical blocks
+    (and in practice, most of them are) are stored only once.
+
+    States are numbered from 1 (the initial state) in the order of
+    ``DFACodeGenHolder.states``: 0 stands for the absence of transition.
+    """
+
+    BLOCK_SIZE = 256
+    """
+    Number of characters per block in the two-level Unicode table.
+    """
+
+    def __init__(self, holder: DFACodeGenHolder):
+        state_numbers = {
+            state.dfa_state: i
+            for i, state in enumerate(holder.states, 1)
+        }
+
+        classes, members = alphabet_classes(
+            char_set
+            for state in holder.states
+            for char_set, _ in state.dfa_state.transitions
+        )
+
+        self.class_count = len(classes) + 1
+        """
+        Number of character classes, including the "no transition" class 0.
+        """
+
+        # Compute the class for each Unicode character
+        char_classes = [0] * (MAXUNICODE + 1)
+        for i, char_class in enumerate(classes, 1):
+            for low, high in char_class.ranges:
+                char_classes[low:high + 1] = [i] * (high - low + 1)
+
+        self.ascii_classes: List[int] = char_classes[:128]
+        """
+        Class for each ASCII character.
+        """
+
+        self.blocks: List[Tuple[int, ...]] = []
+        """
+        List of unique blocks of classes.
+        """
+
+        self.block_indexes: List[int] = []
+        """
+        For each block of Unicode characters, index in ``self.blocks`` for
+        their classes.
+        """
+
+        block_numbers: Dict[Tuple[int, ...], int] = {}
+        for first in range(0, MAXUNICODE + 1, self.BLOCK_SIZE):
+            block = tuple(char_classes[first:first + self.BLOCK_SIZE])
+            try:
+                number = block_numbers[block]
+            except KeyError:
+                number = len(self.blocks)
+                block_numbers[block] = number
+                self.blocks.append(block)
+            self.block_indexes.append(number)
+
+        self.transitions: List[List[int]] = []
+        """
+        For each state (starting with the initial one, i.e. state 1), next
+        state for each character class, or 0 if there is no transition.
+        """
+
+        for state in holder.states:
+            row = [0] * self.class_count
+            for char_set, next_state in state.dfa_state.transitions:
+                for i in members[char_set]:
+                    row[i + 1] = state_numbers[next_state]
+            self.transitions.append(row)
+
+        self.actions: List[Tuple[RuleAssoc, List[int]]] = []
+        """
+        List of actions to execute when reaching states, associated to the
+        numbers of these states.
+        """
+
+        action_indexes: Dict[int, int] = {}
+        for i, state in enumerate(holder.states, 1):
+            if state.action is None:
+                continue
+            try:
+                action_index = action_indexes[id(state.action)]
+            except KeyError:
+                action_index = len(self.actions)
+                action_indexes[id(state.action)] = action_index
+                self.actions.append((state.action, []))
+            self.actions[action_index][1].append(i)
+
+    @property
+    def state_count(self) -> int:
+        return len(self.transitions)
+
+    def next_state(self, state: int, char: int) -> int:
+        """
+        Return the state that the automaton reaches from ``state`` when it
+        reads ``char``, or 0 if there is no transition for it.
+        """
+        if char < 128:
+            char_class = self.ascii_classes[char]
+        elif char <= MAXUNICODE:
+            char_class = self.blocks[
+                self.block_indexes[char // self.BLOCK_SIZE]
+            ][char % self.BLOCK_SIZE]
+        else:
+            char_class = 0
+        return self.transitions[state - 1][char_class]
+
+    @staticmethod
+    def component_size(max_value: int) -> int:
+        """
+        Return the number of bits to use to store the given range of natural
+        numbers in array components.
+        """
+        for size in (8, 16):
+            if max_value < 2 ** size:
+                return size
+        return 32
+
+    @staticmethod
+    def ada_choices(values: List[int], first: int = 0) -> List[str]:
+        """
+        Return the list of associations for an Ada array aggregate that
+        contains the given values. The most frequent value is used for the
+        "others" choice, and consecutive indexes with the same value are
+        grouped in ranges.
+
+        :param values: Values for the array components.
+        :param first: Index of the first array component.
+        """
+        counts: Dict[int, int] = defaultdict(int)
+        for v in values:
+            counts[v] += 1
+        default = max(sorted(counts), key=lambda v: counts[v])
+
+        result: List[str] = []
+        for value, group in itertools.groupby(
+            enumerate(values, first), key=lambda item: item[1]
+        ):
+            if value == default:
+                continue
+            indexes = [i for i, _ in group]
+            result.append(
+                f"{indexes[0]} => {value}"
+                if len(indexes) == 1 else
+                f"{indexes[0]} .. {indexes[-1]} => {value}"
+            )
+        result.append(f"others => {default}")
+        return result
+
+    @staticmethod
+    def ada_index_choices(indexes: List[int]) -> str:
+        """
+        Return an Ada discrete choice list that matches the given sorted
+        indexes, grouping consecutive indexes in ranges.
+        """
+        choices: List[str] = []
+        for _, group in itertools.groupby(
+            enumerate(indexes), key=lambda item: item[1] - item[0]
+        ):
+            run = [i for _, i in group]
+            choices.append(str(run[0]) if len(run) == 1 else
+                           f"{run[0]} .. {run[-1]}")
+        return " | ".join(choices)
+
+    @staticmethod
+    def ada_aggregate(choices: List[str],
+                      prefix: str,
+                      suffix: str = "") -> List[str]:
+        """
+        Format an Ada aggregate with the given choices as lines of code that
+        fit in 79 columns (as far as possible).
+
+        :param choices: List of associations for the aggregate.
+        :param prefix: Indentation for all lines.
+        :param suffix: Text to append after the aggregate.
+        """
+        lines: List[str] = []
+        current = prefix + "("
+        for i, choice in enumerate(choices):
+            item = choice + ("," if i + 1 < len(choices) else ")" + suffix)
+            if current.endswith("("):
+                current += item
+            elif len(current) + 1 + len(item) > 79:
+                lines.append(current)
+                current = prefix + " " + item
+            else:
+                current += " " + item
+        lines.append(current)
+        return lines
+
+    @classmethod
+    def ada_nested_aggregate(cls,
+                             rows: List[List[int]],
+                             first: int,
+                             prefix: str,
+                             suffix: str = "") -> List[str]:
+        """
+        Format an Ada aggregate for a two-dimensional array (or an array of
+        arrays) as lines of code.
+
+        :param rows: Values for the array components, row by row.
+        :param first: Index of the first row.
+        :param prefix: Indentation for all lines.
+        :param suffix: Text to append after the aggregate.
+        """
+        lines: List[str] = []
+        for i, row in enumerate(rows, first):
+            lines.append("{}{}{} =>".format(prefix, "(" if i == first else " ",
+                                            i))
+            lines.extend(cls.ada_aggregate(
+                cls.ada_choices(row),
+                prefix + "    ",
+                "," if i + 1 < first + len(rows) else ")" + suffix,
+            ))
+        return lines
+
+    def ada_decls(self, prefix: str) -> str:
+        """
+        Helper to generate the Ada declarations for the transition tables.
+        """
+        # Aggregates are formatted with the final indentation, so that their
+        # lines are wrapped correctly. Add the prefix to all other lines.
+        sub_prefix = prefix + "  "
+
+        def add(*new_lines: str) -> None:
+            lines.extend(prefix + line if line else line
+                         for line in new_lines)
+
+        lines: List[str] = []
+        add(
+            f"type State_Index is range 0 .. {self.state_count};",
+            "--  State of the automaton. 1 is the initial state, 0 means that",
+            "--  there is no transition.",
+            "",
+            f"type Class_Index is range 0 .. {self.class_count - 1};",
+            "--  Equivalence class for input characters",
+            "",
+            f"type Block_Index is range 0 .. {len(self.blocks) - 1};",
+            "--  Index of a block of classes for Unicode characters",
+            "",
+            f"Block_Size : constant := {self.BLOCK_SIZE};",
+            "--  Number of characters per block in the Unicode class table",
+            "",
+            "type Class_Map is array (Natural range <>) of Class_Index",
+            "  with Component_Size => {};".format(
+                self.component_size(self.class_count - 1)
+            ),
+            "",
+            "type Block_Index_Map is array (Natural range <>) of Block_Index",
+            "  with Component_Size => {};".format(
+                self.component_size(len(self.blocks) - 1)
+            ),
+            "",
+            "type Class_Block_Array is",
+            "  array (Block_Index) of Class_Map (0 .. Block_Size - 1);",
+            "",
+            "type Transition_Table is array",
+            f"  (State_Index range 1 .. {self.state_count}, Class_Index)"
+            " of State_Index",
+            "  with Component_Size => {};".format(
+                self.component_size(self.state_count)
+            ),
+            "",
+            "Ascii_Classes : constant Class_Map (0 .. 127) :=",
+        )
+        lines.extend(self.ada_aggregate(
+            self.ada_choices(self.ascii_classes), sub_prefix, ";"
+        ))
+
+        add("", "Class_Blocks : constant Class_Block_Array :=")
+        lines.extend(self.ada_nested_aggregate(
+            [list(block) for block in self.blocks], 0, sub_prefix, ";"
+        ))
+
+        add("", "Block_Indexes : constant Block_Index_Map (0 .. {}) :="
+                .format(len(self.block_indexes) - 1))
+        lines.extend(self.ada_aggregate(
+            self.ada_choices(self.block_indexes), sub_prefix, ";"
+        ))
+
+        add("", "Transitions : constant Transition_Table :=")
+        lines.extend(self.ada_nested_aggregate(
+            self.transitions, 1, sub_prefix, ";"
+        ))
+
+        return "\n".join(lines)
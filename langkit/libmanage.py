@@ -166,6 +166,11 @@ class ManageScript(abc.ABC):
             self.do_generate, needs_context=True
         )
         self.add_generate_args(generate_parser)
+        generate_parser.add_argument(
+            '--jobs', '-j', dest='emission_jobs', type=int, default=1,
+            help='Number of processes to spawn in parallel to render templates'
+                 ' during code emission.'
+        )
 
         #########
         # Build #
@@ -449,6 +454,11 @@ class ManageScript(abc.ABC):
             '--check-only', action='store_true',
             help="Only check the input for errors, don't generate the code."
         )
+        subparser.add_argument(
+            '--lexer-stats', action='store_true',
+            help='Print the number of states in the lexer automata, before and'
+                 ' after minimization.'
+        )
         subparser.add_argument(
             '--no-property-checks', action='store_true',
             help="Don't generate runtime checks for properties."
@@ -489,6 +499,43 @@ class ManageScript(abc.ABC):
                  ' useful in order to get portable generated sources, for'
                  ' releases for instance.'
         )
+        subparser.add_argument(
+            '--pass-cache', action='store_true',
+            help='Use a persistent cache (in'
+                 ' $BUILD_DIR/obj/langkit_pass_cache) to replay the effects of'
+                 ' compilation passes instead of running them when the'
+                 ' language specification, Langkit and generation options did'
+                 ' not change since the previous run.'
+        )
+        subparser.add_argument(
+            '--unit-cache', action='store_true',
+            help='Use a persistent cache (in'
+                 ' $BUILD_DIR/obj/langkit_unit_cache) to skip the rendering of'
+                 ' generated source files when the language specification,'
+                 ' generation options and the templates they use did not'
+                 ' change since the previous run.'
+        )
+        subparser.add_argument(
+            '--pass-report', nargs='?', const='', metavar='JSON_FILE',
+            help='Measure the time and memory used by each compilation pass'
+                 ' (and by each item for passes that process grammar rules,'
+                 ' nodes or properties), print a summary and write detailed'
+                 ' results in JSON_FILE (by default:'
+                 ' $BUILD_DIR/obj/langkit_pass_report.json). Note that memory'
+                 ' measurements slow down the generation.'
+        )
+        subparser.add_argument(
+            '--template-cache-dir',
+            help='Directory in which to store compiled templates (in its'
+                 ' "langkit_templates" subdirectory), so that next runs do not'
+                 ' need to compile them again. By default, use'
+                 ' $BUILD_DIR/obj.'
+        )
+        subparser.add_argument(
+            '--no-template-cache', action='store_true',
+            help='Do not store compiled templates: compile them in memory at'
+                 ' each run.'
+        )
         subparser.add_argument(
             "--version", help="Version number for the generated library",
         )
@@ -833,10 +880,54 @@ class ManageScript(abc.ABC):
             coverage=args.coverage,
             relative_project=args.relative_project,
             unparse_script=args.unparse_script,
+            jobs=getattr(args, 'emission_jobs', 1),
+            lexer_stats=args.lexer_stats,
             explicit_passes_triggers=explicit_passes_triggers,
             extra_code_emission_passes=self.extra_code_emission_passes,
+            pass_cache_inputs=(
+                self.language_spec_files() if args.pass_cache else None
+            ),
+            unit_cache_inputs=(
+                self.language_spec_files() if args.unit_cache else None
+            ),
+            pass_report=args.pass_report is not None,
+            template_cache_dir=(
+                None
+                if args.no_template_cache else
+                args.template_cache_dir
+                or path.join(self.dirs.build_dir(), 'obj')
+            ),
         )
 
+    def language_spec_files(self) -> List[str]:
+        """
+        Return the list of files that make up the language specification: the
+        source files for the Python modules loaded from the language source
+        directory and all the other files in the directories that contain them.
+        """
+        lang_dir = path.abspath(self.dirs.lang_source_dir())
+        build_dir = path.abspath(self.dirs.build_dir())
+
+        module_dirs = set()
+        for module in list(sys.modules.values()):
+            filename = getattr(module, "__file__", None)
+            if not filename:
+                continue
+            filename = path.abspath(filename)
+            if (
+                filename.startswith(lang_dir + os.path.sep)
+                and not filename.startswith(build_dir + os.path.sep)
+            ):
+                module_dirs.add(path.dirname(filename))
+
+        result = []
+        for dirname in sorted(module_dirs):
+            for filename in sorted(os.listdir(dirname)):
+                filename = path.join(dirname, filename)
+                if path.isfile(filename):
+                    result.append(filename)
+        return result
+
     def gnatpp(self, project_file: str, glob_pattern: str) -> None:
         """
         Helper function to pretty-print files from a GPR project.
@@ -882,6 +973,48 @@ class ManageScript(abc.ABC):
 
         self.context.emit()
 
+        pass_cache = self.context.pass_cache
+        if pass_cache is not None:
+            for name, status in pass_cache.report:
+                self.log_debug(f"Pass cache {status}: {name}", Colors.OKBLUE)
+            counts = {
+                status: sum(1 for _, s in pass_cache.report if s == status)
+                for status in ("replayed", "hit, re-run", "miss")
+            }
+            self.log_info(
+                "Pass cache: {} pass(es) replayed, {} hit(s) re-run,"
+                " {} miss(es)".format(
+                    counts["replayed"], counts["hit, re-run"], counts["miss"]
+                ),
+                Colors.OKBLUE,
+            )
+
+        unit_cache = self.context.unit_cache
+        if unit_cache is not None:
+            for file_path, status in unit_cache.report:
+                self.log_debug(
+                    f"Unit cache {status}: {file_path}", Colors.OKBLUE
+                )
+            self.log_info(
+                "Unit cache: {} source file(s) skipped, {} rendered".format(
+                    sum(1 for _, s in unit_cache.report if s == "skipped"),
+                    sum(1 for _, s in unit_cache.report if s == "rendered"),
+                ),
+                Colors.OKBLUE,
+            )
+
+        pass_report = self.context.pass_report
+        if pass_report is not None:
+            report_file = args.pass_report or path.join(
+                self.dirs.build_dir(), 'obj', 'langkit_pass_report.json'
+            )
+            pass_report.print_table(sys.stdout)
+            pass_report.write_json(report_file)
+            self.log_info(
+                "Pass report written to {}".format(report_file),
+                Colors.OKBLUE,
+            )
+
         if args.check_only:
             return
 
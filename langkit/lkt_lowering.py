@@ -837,6 +837,27 @@ class StringLiteralAnnotationSpec(AnnotationSpec):
         return denoted_str(args[0])
 
 
+class IntLiteralAnnotationSpec(AnnotationSpec):
+    """
+    Convenience subclass for annotations that take a natural integer literal.
+    """
+    def __init__(self, name: str):
+        super().__init__(
+            name, unique=True, require_args=True, default_value=None
+        )
+
+    def interpret(
+        self,
+        ctx: CompileCtx,
+        args: List[L.Expr],
+        kwargs: Dict[str, L.Expr],
+        scope: Scope,
+    ) -> Any:
+        if len(args) != 1 or kwargs or not isinstance(args[0], L.NumLit):
+            error("exactly one position argument expected: an integer literal")
+        return int(args[0].text)
+
+
 class ExternalAnnotationSpec(AnnotationSpec):
     """
     Interpreter for the @external annotation on properties.
@@ -1084,8 +1105,10 @@ class GrammarAnnotations(ParsedAnnotations):
 class GrammarRuleAnnotations(ParsedAnnotations):
     main_rule: bool
     entry_point: bool
+    memo_size: Optional[int]
     annotations = [FlagAnnotationSpec('main_rule'),
-                   FlagAnnotationSpec('entry_point')]
+                   FlagAnnotationSpec('entry_point'),
+                   IntLiteralAnnotationSpec('memo_size')]
 
 
 @dataclass
@@ -2014,6 +2037,7 @@ def create_grammar(ctx: CompileCtx,
     all_rules = OrderedDict()
     main_rule_name = None
     entry_points: Set[str] = set()
+    memo_sizes: Dict[str, Tuple[int, Location]] = {}
     for full_rule in full_grammar.f_decl.f_rules:
         with ctx.lkt_context(full_rule):
             r = full_rule.f_decl
@@ -2038,6 +2062,10 @@ def create_grammar(ctx: CompileCtx,
                 main_rule_name = rule_name
             if anns.main_rule or anns.entry_point:
                 entry_points.add(rule_name)
+            if anns.memo_size is not None:
+                memo_sizes[rule_name] = (
+                    anns.memo_size, Location.from_lkt_node(r.f_syn_name)
+                )
 
             all_rules[rule_name] = (r, r.f_expr)
 
@@ -2048,6 +2076,8 @@ def create_grammar(ctx: CompileCtx,
     result = Grammar(
         main_rule_name, entry_points, Location.from_lkt_node(full_grammar)
     )
+    for rule_name, (size, loc) in memo_sizes.items():
+        result.set_memo_size(rule_name, size, loc)
 
     # Translate rules (all_rules) later, as node types are not available yet
     result._all_lkt_rules.update(all_rules)
@@ -61,6 +61,14 @@ if TYPE_CHECKING:
     from langkit.dsl import ASTNode
 
 
+DEFAULT_MEMO_SIZE = 16
+"""
+Default number of entries for the memoization tables of parsing rules. This
+must be kept in sync with the default for the ``Memo_Size`` formal in the
+``Langkit_Support.Packrat`` generic package.
+"""
+
+
 def var_context() -> _List[VarDef]:
     """
     Returns the var context for the current parser.
@@ -280,6 +288,13 @@ class Grammar:
         generated code must use visibility.
         """
 
+        self.memo_sizes: Dict[str, Tuple[int, Optional[Location]]] = {}
+        """
+        For each parsing rule whose memoization table size is set by the
+        language spec, associate its name to its size and to the location
+        where the size was set.
+        """
+
     def context(self) -> AbstractContextManager[None]:
         return diagnostic_context(self.location)
 
@@ -365,6 +380,30 @@ class Grammar:
                 rule.set_location(Location(loc.file, keywords[name].lineno))
             self._add_rule(name, rule)
 
+    def set_memo_size(self,
+                      rule_name: str,
+                      size: int,
+                      location: Optional[Location] = None) -> None:
+        """
+        Set the number of entries in the memoization table for a parsing rule.
+
+        Memoization tables are indexed by token modulo their size, so a bigger
+        table is useful for rules that are often re-invoked after backtracking
+        over more than ``DEFAULT_MEMO_SIZE`` tokens.
+
+        :param rule_name: Name of the parsing rule.
+        :param size: Number of entries for the memoization table. Zero
+            disables memoization for this rule, which is not allowed for
+            left-recursive rules.
+        :param location: Location where the size is set, for diagnostics.
+        """
+        location = location or extract_library_location()
+        with diagnostic_context(location):
+            check_source_language(
+                size >= 0, "Memoization table size cannot be negative"
+            )
+        self.memo_sizes[rule_name] = (size, location)
+
     def get_rule(self, rule_name: str) -> Parser:
         """
         Helper to return the rule corresponding to rule_name. The benefit of
@@ -484,6 +523,63 @@ class Grammar:
                 severity=Severity.warning
             )
 
+    def compute_memo_sizes(self, context: CompileCtx) -> None:
+        """
+        Compute the size of the memoization table for each parsing rule.
+
+        Use the sizes set by the language spec, if any. If the context asks to
+        prune memoization tables, disable them for rules that cannot be
+        invoked twice on the same token during one parsing session.
+        """
+        for name, (size, location) in sorted(self.memo_sizes.items()):
+            with diagnostic_context(location):
+                parser = self.get_rule(name)
+                check_source_language(
+                    size > 0 or not parser.is_left_recursive(),
+                    "Left-recursive rules need a memoization table"
+                )
+            parser.memo_size = size
+
+        if not context.prune_parser_memos:
+            return
+
+        # Memoization tables are useful only when a parsing function is called
+        # several times on the same token. Parsing sessions call the rule that
+        # the user requested only once, on the first token, so the only calls
+        # that matter come from Defer parsers (i.e. references to rules),
+        # and from the Skip parsers that call DontSkip rules.
+        #
+        # A rule that is referenced only once can be called twice on the same
+        # token only if its caller is called twice on the same token: this
+        # cannot happen if the caller is memoized (by induction, it cannot
+        # happen if any of the transitive callers is memoized). Left-recursive
+        # rules are the exception, as they run their own body several times
+        # on the same token, so we must keep the memoization tables of all
+        # rules that they reference.
+        call_sites: Dict[str, int] = {}
+        called_from_left_recursive: Set[str] = set()
+
+        def visit(parser: Parser, caller_is_left_recursive: bool) -> None:
+            if isinstance(parser, Defer):
+                call_sites[parser.name] = call_sites.get(parser.name, 0) + 1
+                if caller_is_left_recursive:
+                    called_from_left_recursive.add(parser.name)
+            for child in parser.children:
+                visit(child, caller_is_left_recursive)
+
+        for parser in self.rules.values():
+            visit(parser, parser.is_left_recursive())
+
+        for name, parser in self.rules.items():
+            if (
+                name not in self.memo_sizes
+                and not parser.is_dont_skip_parser
+                and not parser.is_left_recursive()
+                and name not in called_from_left_recursive
+                and call_sites.get(name, 0) <= 1
+            ):
+                parser.memo_size = 0
+
     def check_entry_points(self, context: CompileCtx) -> None:
         """
         Emit an error if any of the entry points are missing.
@@ -548,6 +644,13 @@ class Parser(abc.ABC):
         to scan the input to see if input should be skipped or not.
         """
 
+        self.memo_size = DEFAULT_MEMO_SIZE
+        """
+        For root parsers, number of entries in the memoization table for the
+        corresponding parsing function. If zero, this function does not use a
+        memoization table.
+        """
+
         self._type_computed = False
         self._type: Optional[CompiledType] = None
         """
@@ -810,6 +913,26 @@ class Parser(abc.ABC):
         self._name = name
         self.gen_fn_name = gen_name(name + self.base_name)
 
+    @property
+    def has_custom_memo_size(self) -> bool:
+        """
+        Whether this root parser uses a memoization table with a non-default
+        size.
+        """
+        return self.memo_size not in (0, DEFAULT_MEMO_SIZE)
+
+    @property
+    def memo_package(self) -> str:
+        """
+        For root parsers that use a memoization table, name of the
+        ``Langkit_Support.Packrat`` instantiation for this table.
+        """
+        assert self.type is not None and self.memo_size > 0
+        result = "{}_Memos".format(self.type.storage_type_name)
+        if self.has_custom_memo_size:
+            result += "_{}".format(self.memo_size)
+        return result
+
     def is_left_recursive(self) -> bool:
         """Return whether this parser is left-recursive."""
         return self._is_left_recursive(self.name)
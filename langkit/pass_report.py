@@ -0,0 +1,251 @@
+"""
+Time and memory profiling for compilation passes.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+import json
+import time
+import tracemalloc
+from typing import (
+    Any, ContextManager, Dict, Iterator, List, Optional, TextIO
+)
+
+
+@dataclass
+class Measurement:
+    """
+    Resources used by a pass or by the processing of one item in a pass.
+    """
+
+    name: str
+    """
+    Name of the pass, or name of the item (grammar rule, node type,
+    property, ...).
+    """
+
+    wall_time: float = 0.0
+    """
+    Elapsed time, in seconds.
+    """
+
+    cpu_time: float = 0.0
+    """
+    CPU time used by the current process, in seconds.
+    """
+
+    peak_memory: int = 0
+    """
+    Maximum amount of memory allocated (and not freed yet) at any point
+    during the measurement, relative to the amount allocated when it
+    started, in bytes.
+    """
+
+    memory_delta: int = 0
+    """
+    Amount of memory allocated during the measurement and not freed when it
+    ended, in bytes. This can be negative.
+    """
+
+    items: List[Measurement] = field(default_factory=list)
+    """
+    For passes that run on a collection of items, measurements for each item.
+    """
+
+    replayed: bool = False
+    """
+    Whether the effects of the pass were replayed from the pass cache
+    instead of running it.
+    """
+
+    def as_json(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_memory": self.peak_memory,
+            "memory_delta": self.memory_delta,
+        }
+        if self.replayed:
+            result["replayed"] = True
+        if self.items:
+            result["items"] = [i.as_json() for i in self.items]
+        return result
+
+
+class _Frame:
+    """
+    Measurement in progress.
+    """
+
+    def __init__(self, measurement: Measurement) -> None:
+        self.measurement = measurement
+        self.start_wall_time = time.perf_counter()
+        self.start_cpu_time = time.process_time()
+        self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.peak_memory = self.start_memory
+
+
+class PassReport:
+    """
+    Record wall time, CPU time and memory usage for each pass run by a
+    ``PassManager``, and for each item processed by passes that run on a
+    collection of items (grammar rules, node types, properties).
+
+    Memory usage is measured with ``tracemalloc``, which significantly slows
+    down execution: measured times are thus useful to compare passes with each
+    other, not as absolute values.
+    """
+
+    def __init__(self) -> None:
+        self.passes: List[Measurement] = []
+        """
+        Measurements for all passes, in execution order.
+        """
+
+        self._stack: List[_Frame] = []
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """
+        Start tracing memory allocations. This must be called before running
+        passes.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """
+        Stop tracing memory allocations, if started by ``start``.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _update_peaks(self) -> None:
+        """
+        Account for the peak of traced memory since the last call in all the
+        measurements in progress, and reset this peak.
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame.peak_memory = max(frame.peak_memory, peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def _measure(self, measurement: Measurement) -> Iterator[None]:
+        self._update_peaks()
+        frame = _Frame(measurement)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._update_peaks()
+            self._stack.pop()
+            current = tracemalloc.get_traced_memory()[0]
+            measurement.wall_time = time.perf_counter() - frame.start_wall_time
+            measurement.cpu_time = time.process_time() - frame.start_cpu_time
+            measurement.peak_memory = frame.peak_memory - frame.start_memory
+            measurement.memory_delta = current - frame.start_memory
+
+    @contextmanager
+    def measure_pass(self,
+                     name: str,
+                     replayed: bool = False) -> Iterator[None]:
+        """
+        Context manager to measure the resources used by a pass.
+
+        :param name: Name of the pass.
+        :param replayed: Whether the pass is replayed from the pass cache.
+        """
+        m = Measurement(name, replayed=replayed)
+        self.passes.append(m)
+        with self._measure(m):
+            yield
+
+    @contextmanager
+    def measure_item(self, name: str) -> Iterator[None]:
+        """
+        Context manager to measure the resources used to process one item in
+        the pass currently measured.
+
+        :param name: Name for the item.
+        """
+        assert self._stack
+        m = Measurement(name)
+        self._stack[-1].measurement.items.append(m)
+        with self._measure(m):
+            yield
+
+    def as_json(self) -> Dict[str, Any]:
+        return {"passes": [p.as_json() for p in self.passes]}
+
+    def write_json(self, filename: str) -> None:
+        """
+        Write measurements to the given file, in JSON format.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.as_json(), f, indent=2)
+            f.write("\n")
+
+    def print_table(self, out: TextIO, max_items: int = 10) -> None:
+        """
+        Print a table of measurements for passes, sorted by decreasing wall
+        time, followed by the ``max_items`` most time consuming items.
+        """
+
+        def format_memory(size: int) -> str:
+            return "{:.1f}".format(size / 1024)
+
+        def print_rows(rows: List[Measurement], total: bool) -> None:
+            header = ("Wall (s)", "CPU (s)", "Peak (KiB)", "Delta (KiB)")
+            print("{:>9} {:>9} {:>11} {:>12}  {}".format(
+                *header, "Pass" if total else "Item"
+            ), file=out)
+            for m in rows:
+                print("{:>9.3f} {:>9.3f} {:>11} {:>12}  {}{}".format(
+                    m.wall_time,
+                    m.cpu_time,
+                    format_memory(m.peak_memory),
+                    format_memory(m.memory_delta),
+                    m.name,
+                    " (replayed)" if m.replayed else "",
+                ), file=out)
+            if total:
+                print("{:>9.3f} {:>9.3f}  Total".format(
+                    sum(m.wall_time for m in rows),
+                    sum(m.cpu_time for m in rows),
+                ), file=out)
+
+        print_rows(
+            sorted(self.passes, key=lambda m: m.wall_time, reverse=True),
+            total=True,
+        )
+
+        items = sorted(
+            (
+                Measurement(
+                    f"{p.name}: {i.name}", i.wall_time, i.cpu_time,
+                    i.peak_memory, i.memory_delta,
+                )
+                for p in self.passes
+                for i in p.items
+            ),
+            key=lambda m: m.wall_time,
+            reverse=True,
+        )
+        if items:
+            print("", file=out)
+            print_rows(items[:max_items], total=False)
+
+
+def measure_item(report: Optional[PassReport],
+                 name: str) -> ContextManager[None]:
+    """
+    Shortcut to measure the processing of an item with ``report``, if not
+    None.
+    """
+    return nullcontext() if report is None else report.measure_item(name)
@@ -5,15 +5,25 @@ Helpers to manage compilation passes.
 from __future__ import annotations
 
 import abc
-from typing import Callable, List, TYPE_CHECKING
-
+from contextlib import nullcontext, redirect_stdout
+import io
+import multiprocessing
+import sys
+from typing import (
+    Any, Callable, ContextManager, FrozenSet, List, Optional, Set,
+    TYPE_CHECKING, TextIO, Tuple
+)
+
+from langkit.caching import PassCache
 from langkit.compiled_types import ASTNodeType, CompiledTypeRepo
-from langkit.diagnostics import errors_checkpoint
+from langkit.diagnostics import Diagnostics, errors_checkpoint
 from langkit.emitter import Emitter
 from langkit.envs import EnvSpec
 from langkit.expressions import PropertyDef
 from langkit.lexer import Lexer
 from langkit.parsers import Grammar, Parser
+from langkit.pass_report import measure_item
+from langkit.template_utils import add_used_templates, record_used_templates
 from langkit.utils import Colors, printcol
 
 
@@ -58,7 +68,50 @@ class PassManager:
         assert not self.frozen, 'Invalid attempt to run the pipeline twice'
         self.frozen = True
 
-        for p in self.passes:
+        report = context.pass_report
+        if report is None:
+            self._run(context)
+        else:
+            report.start()
+            try:
+                self._run(context)
+            finally:
+                report.stop()
+
+    def _run(self, context: CompileCtx) -> None:
+        cache = context.pass_cache
+        if cache is not None:
+            uncacheable = [p.name for p in self.passes
+                           if not p.disabled and not p.cacheable]
+            if uncacheable:
+                if context.verbosity.info:
+                    printcol('Pass cache disabled because of uncacheable'
+                             ' passes: {}'.format(', '.join(uncacheable)),
+                             Colors.YELLOW)
+                cache = None
+
+        # When the pass cache is enabled, compute the cache key for each pass
+        # and look for the corresponding records. Passes communicate through
+        # in-memory data structures, so the key for each pass depends on the
+        # inputs of the passes before it, and the effects of a pass can be
+        # replayed only if all the passes that come after it are replayed as
+        # well: find the first pass of the longest sequence of replayable
+        # passes at the end of the pipeline.
+        keys: List[Optional[str]] = [None] * len(self.passes)
+        replay_from = len(self.passes)
+        if cache is not None:
+            inputs: FrozenSet[str] = frozenset()
+            for i, p in enumerate(self.passes):
+                if not p.disabled and not isinstance(p, MajorStepPass):
+                    inputs = inputs | p.cache_inputs
+                    keys[i] = cache.pass_key(i, p.name, inputs)
+            for i in reversed(range(len(self.passes))):
+                key = keys[i]
+                if key is not None and cache.lookup(key) is None:
+                    break
+                replay_from = i
+
+        for i, p in enumerate(self.passes):
             if p.disabled:
                 if context.verbosity.debug:
                     printcol('Skipping pass: {}'.format(p.name), Colors.YELLOW)
@@ -68,11 +121,87 @@ class PassManager:
                     printcol('Stopping pipeline execution: {}'.format(p.name),
                              Colors.OKBLUE)
                 return
-            else:
+
+            key = keys[i]
+            if cache is None or key is None:
                 if (not isinstance(p, MajorStepPass)
                         and context.verbosity.debug):  # no-code-coverage
                     printcol('Running pass: {}'.format(p.name), Colors.YELLOW)
+                with self.measure_pass(context, p):
+                    p.run(context)
+
+            elif i >= replay_from:
+                record = cache.lookup(key)
+                assert record is not None
+                if context.verbosity.debug:
+                    printcol('Replaying pass: {}'.format(p.name),
+                             Colors.YELLOW)
+                with self.measure_pass(context, p, replayed=True):
+                    sys.stdout.write(record.output)
+                    cache.replay_files(record)
+                cache.report.append((p.name, 'replayed'))
+
+            else:
+                if context.verbosity.debug:  # no-code-coverage
+                    printcol('Running pass: {}'.format(p.name), Colors.YELLOW)
+                cache.report.append((
+                    p.name,
+                    'miss' if cache.lookup(key) is None else 'hit, re-run'
+                ))
+                with self.measure_pass(context, p):
+                    self.run_and_record(p, context, cache, key)
+
+    @staticmethod
+    def measure_pass(context: CompileCtx,
+                     p: AbstractPass,
+                     replayed: bool = False) -> ContextManager[None]:
+        """
+        Return a context manager to measure the resources used by the given
+        pass if a pass report is enabled (see ``CompileCtx.pass_report``).
+        """
+        report = context.pass_report
+        return (nullcontext()
+                if report is None or isinstance(p, MajorStepPass) else
+                report.measure_pass(p.name, replayed))
+
+    @staticmethod
+    def run_and_record(p: AbstractPass,
+                       context: CompileCtx,
+                       cache: PassCache,
+                       key: str) -> None:
+        """
+        Run the given pass and record its effects in the pass cache.
+        """
+        recorder = _OutputRecorder(sys.stdout)
+        cache.start_recording()
+        try:
+            with redirect_stdout(recorder):
                 p.run(context)
+        except BaseException:
+            cache.recorded_files = None
+            raise
+        cache.stop_recording(key, recorder.getvalue())
+
+
+class _OutputRecorder(io.StringIO):
+    """
+    Text stream that forwards what is written to it to another stream, and
+    that keeps a copy of it.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__()
+        self.stream = stream
+
+    def write(self, s: str) -> int:
+        self.stream.write(s)
+        return super().write(s)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
 
 
 class AbstractPass(abc.ABC):
@@ -101,10 +230,27 @@ class AbstractPass(abc.ABC):
 
     doc: str
 
+    cacheable: bool
+    """
+    Whether the effects of this pass on the outside world can be recorded in
+    the pass cache: text printed on the standard output and source files
+    written through ``Emitter.write_source_file``. The pass cache is disabled
+    for pipelines that contain enabled uncacheable passes.
+    """
+
+    cache_inputs: FrozenSet[str]
+    """
+    Names of the groups of compilation inputs that this pass uses directly
+    (see ``langkit.caching.PassCache``). The key of this pass in the pass cache
+    depends on these inputs and on the inputs of the passes before it.
+    """
+
     def __init__(self, name: str, disabled: bool = False) -> None:
         self.name = name
         self.disabled = disabled
         self.is_optional = False
+        self.cacheable = True
+        self.cache_inputs = frozenset({"langkit", "spec"})
 
     def optional(self, doc: str, disabled: bool = True) -> AbstractPass:
         """
@@ -119,6 +265,22 @@ class AbstractPass(abc.ABC):
         self.doc = format_text(doc, 4)
         return self
 
+    def uncacheable(self) -> AbstractPass:
+        """
+        Expression chain method to flag a pass as uncacheable (see the
+        ``cacheable`` attribute) and return it.
+        """
+        self.cacheable = False
+        return self
+
+    def consumes(self, *cache_inputs: str) -> AbstractPass:
+        """
+        Expression chain method to add groups of compilation inputs to the
+        ``cache_inputs`` attribute of this pass and return it.
+        """
+        self.cache_inputs = self.cache_inputs | frozenset(cache_inputs)
+        return self
+
     @abc.abstractmethod
     def run(self, context: CompileCtx) -> None:
         ...
@@ -172,6 +334,7 @@ class EmitterPass(AbstractPass):
                  disabled: bool = False) -> None:
         super().__init__(name, disabled)
         self.pass_fn = pass_fn
+        self.consumes("templates")
 
     def run(self, context: CompileCtx) -> None:
         assert context.emitter is not None
@@ -187,6 +350,7 @@ class EmbedIpythonPass(AbstractPass):  # no-code-coverage
 
     def __init__(self) -> None:
         super().__init__("Embed IPython")
+        self.cacheable = False
 
     def run(self, context: CompileCtx) -> None:
         from IPython import embed
@@ -235,7 +399,158 @@ class GrammarPass(AbstractPass):
         self.pass_fn(context.grammar, context)
 
 
-class GrammarRulePass(AbstractPass):
+_pending_item_jobs: List[Tuple[ItemPass, CompileCtx, Any]] = []
+"""
+Items to process for the parallel execution of an item pass in progress (see
+``ItemPass.run``). As for ``langkit.emitter._pending_renderings``, worker
+processes are forked, so they inherit this list.
+"""
+
+
+def _run_item_job(index: int) -> Tuple[str, bool, Any, Set[str], Set[str]]:
+    """
+    Run the parallel compute function of the pending item pass on the
+    ``index``th pending item, in a worker process.
+
+    Return the text printed on the standard output, whether the computation
+    succeeded (it did not raise an exception nor emitted an error), its
+    result, the set of documentation entries that were used and the set of
+    templates that were used.
+    """
+    p, context, item = _pending_item_jobs[index]
+    assert p.parallel_fns is not None
+    compute_fn, _ = p.parallel_fns
+
+    used_docs = context.documentations.used_entries
+    Diagnostics.has_pending_error = False
+    output = io.StringIO()
+    result: Any = None
+    with redirect_stdout(output), record_used_templates() as templates:
+        try:
+            with p.item_context(item):
+                result = compute_fn(item, context)
+            success = not Diagnostics.has_pending_error
+        except Exception:
+            success = False
+    return (
+        output.getvalue(),
+        success,
+        result if success else None,
+        context.documentations.used_entries - used_docs,
+        templates,
+    )
+
+
+class ItemPass(AbstractPass):
+    """
+    Base class for passes that process a collection of items (grammar rules,
+    AST nodes, properties, ...) one after the other.
+
+    Subclasses are required to override the "items", "item_context" and
+    "run_item" methods.
+    """
+
+    parallel_fns: Optional[Tuple[Callable[[Any, CompileCtx], Any],
+                                 Callable[[Any, CompileCtx, Any], None]]]
+    """
+    If not None, this pass can process items in parallel (see the
+    ``parallel`` method).
+    """
+
+    def __init__(self, name: str, disabled: bool = False) -> None:
+        super().__init__(name, disabled)
+        self.parallel_fns = None
+
+    def parallel(self,
+                 compute_fn: Callable[[Any, CompileCtx], Any],
+                 apply_fn: Callable[[Any, CompileCtx, Any], None]) -> ItemPass:
+        """
+        Expression chain method to declare that items can be processed in
+        parallel and return this pass.
+
+        When the compilation context has more than one job (see
+        ``CompileCtx.jobs``), ``compute_fn`` is called on each item in forked
+        worker processes instead of the function of the pass. It must return a
+        picklable result, and must not have other effects than printing
+        diagnostics. Then, ``apply_fn`` is called in the current process on
+        each item and its result, in the same order as for a sequential
+        execution. Items for which ``compute_fn`` failed are processed again
+        in the current process.
+
+        The effects of the pass must be the same in both modes.
+        """
+        self.parallel_fns = (compute_fn, apply_fn)
+        return self
+
+    @abc.abstractmethod
+    def items(self, context: CompileCtx) -> List[Tuple[str, Any]]:
+        """
+        Return the list of items to process, in order, with their names.
+        """
+        ...
+
+    def item_context(self, item: Any) -> ContextManager[Any]:
+        """
+        Return a context manager to use while processing the given item.
+        """
+        return nullcontext()
+
+    @abc.abstractmethod
+    def run_item(self, context: CompileCtx, item: Any) -> None:
+        """
+        Process the given item.
+        """
+        ...
+
+    def run(self, context: CompileCtx) -> None:
+        global _pending_item_jobs
+
+        items = self.items(context)
+
+        if (
+            self.parallel_fns is None
+            or context.jobs <= 1
+            or len(items) <= 1
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            for name, item in items:
+                with self.item_context(item), measure_item(
+                    context.pass_report, name
+                ):
+                    self.run_item(context, item)
+            return
+
+        _, apply_fn = self.parallel_fns
+
+        # Make sure worker processes do not inherit pending output
+        sys.stdout.flush()
+
+        jobs = min(context.jobs, len(items))
+        _pending_item_jobs = [(self, context, item) for _, item in items]
+        try:
+            with multiprocessing.get_context("fork").Pool(jobs) as pool:
+                results = pool.map(
+                    _run_item_job,
+                    range(len(items)),
+                    chunksize=max(1, len(items) // (4 * jobs)),
+                )
+        finally:
+            _pending_item_jobs = []
+
+        for (_, item), (output, success, result, used_docs, templates) in zip(
+            items, results
+        ):
+            context.documentations.mark_used(used_docs)
+            add_used_templates(templates)
+            with self.item_context(item):
+                if success:
+                    sys.stdout.write(output)
+                    apply_fn(item, context, result)
+                else:
+                    self.run_item(context, item)
+
+
+class GrammarRulePass(ItemPass):
     """
     Concrete pass to run on each grammar rule.
     """
@@ -247,15 +562,19 @@ class GrammarRulePass(AbstractPass):
         super().__init__(name, disabled)
         self.pass_fn = pass_fn
 
-    def run(self, context: CompileCtx) -> None:
+    def items(self, context: CompileCtx) -> List[Tuple[str, Any]]:
         # Sort grammar rules by name, so that the pass order is deterministic
         assert context.grammar is not None
-        for name, rule in sorted(context.grammar.rules.items()):
-            with rule.diagnostic_context:
-                self.pass_fn(rule)
+        return sorted(context.grammar.rules.items())
+
+    def item_context(self, item: Any) -> ContextManager[Any]:
+        return item.diagnostic_context
+
+    def run_item(self, context: CompileCtx, item: Any) -> None:
+        self.pass_fn(item)
 
 
-class ASTNodePass(AbstractPass):
+class ASTNodePass(ItemPass):
     """
     Concrete pass to run on each ASTNodeType subclass.
     """
@@ -274,13 +593,17 @@ class ASTNodePass(AbstractPass):
         self.pass_fn = pass_fn
         self.auto_context = auto_context
 
-    def run(self, context: CompileCtx) -> None:
-        for astnode in context.astnode_types:
-            if self.auto_context:
-                with astnode.diagnostic_context:
-                    self.pass_fn(context, astnode)
-            else:
-                self.pass_fn(context, astnode)
+    def items(self, context: CompileCtx) -> List[Tuple[str, Any]]:
+        return [(astnode.dsl_name, astnode)
+                for astnode in context.astnode_types]
+
+    def item_context(self, item: Any) -> ContextManager[Any]:
+        return (item.diagnostic_context
+                if self.auto_context else
+                nullcontext())
+
+    def run_item(self, context: CompileCtx, item: Any) -> None:
+        self.pass_fn(context, item)
 
 
 class EnvSpecPass(AbstractPass):
@@ -314,7 +637,7 @@ class EnvSpecPass(AbstractPass):
             self.pass_fn(env_spec, context)
 
 
-class PropertyPass(AbstractPass):
+class PropertyPass(ItemPass):
     """
     Concrete pass to run on each PropertyDef instance.
     """
@@ -326,10 +649,15 @@ class PropertyPass(AbstractPass):
         super().__init__(name, disabled)
         self.pass_fn = pass_fn
 
-    def run(self, context: CompileCtx) -> None:
-        for prop in context.all_properties(include_inherited=False):
-            with prop.diagnostic_context:
-                self.pass_fn(prop, context)
+    def items(self, context: CompileCtx) -> List[Tuple[str, Any]]:
+        return [(prop.qualname, prop)
+                for prop in context.all_properties(include_inherited=False)]
+
+    def item_context(self, item: Any) -> ContextManager[Any]:
+        return item.diagnostic_context
+
+    def run_item(self, context: CompileCtx, item: Any) -> None:
+        self.pass_fn(item, context)
 
 
 class StopPipeline(AbstractPass):
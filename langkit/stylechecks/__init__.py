@@ -14,12 +14,19 @@ from __future__ import annotations
 import abc
 import argparse
 import ast
+from contextlib import redirect_stdout
 import dataclasses
+import functools
+import hashlib
+import io
+import json
+import multiprocessing
 import os
 import os.path
 import re
 import sys
-from typing import Any, IO, Iterator, Pattern
+import tempfile
+from typing import Any, IO, Iterable, Iterator, Pattern
 
 
 TERM_CODE_RE = re.compile('(\x1b\\[[^m]*m)')
@@ -30,7 +37,8 @@ YELLOW = '\x1b[33m'
 
 punctuation_re = re.compile(' [!?:;]')
 
-accepted_chars = [chr(c) for c in range(0x20, 0x80)]
+# Characters that are not accepted in sources, unless explicitly allowed
+forbidden_char_re = re.compile('[^\x20-\x7f]')
 
 
 def colored(msg: str, color: str) -> str:
@@ -204,12 +212,33 @@ def check_text(
     :param text: Text on which the checks must be performed.
     :param is_comment: True if "text" is a comment, False if it's a docstring.
     """
+    # The same texts (license headers, common comments, ...) appear in many
+    # places, so check each text once and relocate the diagnostics.
+    for line_offset, message in _check_text(
+        lang.comment_start, text, is_comment
+    ):
+        report.add(message, filename, first_line + line_offset)
+
+
+@functools.lru_cache(maxsize=None)
+def _check_text(
+    comment_start: str | None,
+    text: str,
+    is_comment: bool,
+) -> tuple[tuple[int, str], ...]:
+    """
+    Run the checks for ``check_text`` and return the diagnostics as (line
+    offset from the first line, message) couples.
+    """
+    report = Report()
+    filename = ''
+    first_line = 1
     lines = text.split('\n')
     chars = set(lines[0])
     if (
-        lang.comment_start is not None
+        comment_start is not None
         and len(chars) == 1
-        and chars == set(lang.comment_start)
+        and chars == set(comment_start)
     ):
         # This is a comment box
 
@@ -221,10 +250,10 @@ def check_text(
         # Each line must start and end with language comment start
         for i, line in enumerate(lines[1:-1], 1):
             report.set_context(filename, first_line + i)
-            if (not line.endswith(' ' + lang.comment_start) or
+            if (not line.endswith(' ' + comment_start) or
                     len(lines[0]) != len(line)):
                 report.add('Badly formatted comment box')
-        return
+        return tuple((r.line - first_line, r.message) for r in report.records)
 
     # Otherwise, assume this is regular text
     class State:
@@ -345,6 +374,7 @@ def check_text(
         s.last_line = line
 
     s.end_block(True)
+    return tuple((r.line - first_line, r.message) for r in report.records)
 
 
 def check_generic(
@@ -437,11 +467,8 @@ def check_generic(
     for i, line in iter_lines(content):
         report.set_context(filename, i)
 
-        if not non_ascii_allowed:
-            for c in line:
-                if c not in accepted_chars:
-                    report.add('Non-ASCII characters')
-                    break
+        if not non_ascii_allowed and forbidden_char_re.search(line):
+            report.add('Non-ASCII characters')
 
         if (len(line) > 80 and
                 'http://' not in line and
@@ -852,6 +879,24 @@ def excludes_match(path: str, excludes: list[str]) -> bool:
                for e in excludes)
 
 
+def iter_files(root: str, excludes: list[str]) -> Iterator[str]:
+    """
+    Yield the files to stylecheck in ``root``, in a deterministic order.
+
+    :param root: Root directory in which the files to stylecheck are looked
+        for. Filenames are accepted as well.
+    :param excludes: List of path to exclude from the search of files to check.
+    """
+    if excludes_match(root, excludes):
+        return
+
+    if os.path.isdir(root):
+        for item in sorted(os.listdir(root)):
+            yield from iter_files(os.path.join(root, item), excludes)
+    else:
+        yield os.path.relpath(root)
+
+
 def traverse(report: Report, root: str, excludes: list[str]) -> None:
     """
     Perform generic and language-specific style checks.
@@ -861,24 +906,207 @@ def traverse(report: Report, root: str, excludes: list[str]) -> None:
         for. Filenames are accepted as well.
     :param excludes: List of path to exclude from the search of files to check.
     """
-    def process(path: str) -> None:
+    for filename in iter_files(root, excludes):
+        check_file(report, filename)
+
+
+def _check_file_job(
+    args: tuple[str, bool],
+) -> tuple[str, list[Report.Record]]:
+    """
+    Run ``check_file`` on a file in a dedicated report.
+
+    :param args: Name of the file to check, and whether diagnostics should
+        have colors.
+    :return: The text that the checks printed on the standard output, and the
+        diagnostics for the file.
+    """
+    filename, enable_colors = args
+    report = Report(enable_colors=enable_colors)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        check_file(report, filename)
+    return output.getvalue(), report.records
+
+
+class ResultsCache:
+    """
+    Persistent cache for the results of style checks on files.
+
+    Results for a file are reused as long as the content of the file does not
+    change. Any change in the checker itself (or in the versions of the
+    pycodestyle and pyflakes packages that it uses) invalidates the whole
+    cache.
+    """
+
+    def __init__(self, cache_file: str, enable_colors: bool):
+        """
+        :param cache_file: Name of the file that contains cache data from
+            another run.
+        :param enable_colors: Whether diagnostics have colors.
         """
-        Do nothing if ``path`` must be excluded. Otherwise, traverse it if it
-        is a directory, or run style checks on it if it is a file.
+        self.cache_file = cache_file
+        self.fingerprint = self.checker_fingerprint(enable_colors)
+
+        self.entries: dict[str, list[Any]] = {}
         """
-        if excludes_match(path, excludes):
+        For each checked file, hash of its content, output of the checks and
+        diagnostics (as lists of line/column/message).
+        """
+
+        try:
+            with open(cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
             return
+        if data.get("fingerprint") == self.fingerprint:
+            self.entries = data["entries"]
 
-        if os.path.isdir(path):
-            traverse(report, path, excludes)
-        else:
-            check_file(report, os.path.relpath(path))
+    @staticmethod
+    def checker_fingerprint(enable_colors: bool) -> str:
+        """
+        Return a hash that identifies the checker that is running.
+        """
+        m = hashlib.sha256()
+        with open(__file__, "rb") as f:
+            m.update(f.read())
+        for module_name in ("pycodestyle", "pep8", "pyflakes"):
+            try:
+                module = __import__(module_name)
+            except ImportError:
+                version = None
+            else:
+                version = getattr(module, "__version__", None)
+            m.update("{}={}\n".format(module_name, version).encode("utf-8"))
+        m.update(str(enable_colors).encode("utf-8"))
+        return m.hexdigest()
 
-    if os.path.isdir(root):
-        for item in sorted(os.listdir(root)):
-            process(os.path.join(root, item))
+    @staticmethod
+    def content_hash(filename: str) -> str | None:
+        """
+        Return the hash for the content of the given file, or None if it
+        cannot be read.
+        """
+        try:
+            with open(filename, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def lookup(
+        self,
+        filename: str,
+        content_hash: str,
+    ) -> tuple[str, list[Report.Record]] | None:
+        """
+        Return the results of the checks for the given file, if its content
+        did not change.
+        """
+        entry = self.entries.get(filename)
+        if entry is None or entry[0] != content_hash:
+            return None
+        return entry[1], [
+            Report.Record(filename, line, col, message)
+            for line, col, message in entry[2]
+        ]
+
+    def store(
+        self,
+        filename: str,
+        content_hash: str,
+        output: str,
+        records: list[Report.Record],
+    ) -> None:
+        """
+        Store the results of the checks for the given file.
+        """
+        self.entries[filename] = [
+            content_hash,
+            output,
+            [[r.line, r.col, r.message] for r in records],
+        ]
+
+    def save(self) -> None:
+        """
+        Write the content of the cache to the cache file.
+        """
+        dirname = os.path.dirname(os.path.abspath(self.cache_file))
+        fd, tmp_path = tempfile.mkstemp(dir=dirname)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"fingerprint": self.fingerprint, "entries": self.entries},
+                    f,
+                )
+            os.replace(tmp_path, self.cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def check_files(
+    report: Report,
+    filenames: Iterable[str],
+    jobs: int = 1,
+    cache_file: str | None = None,
+) -> None:
+    """
+    Perform generic and language-specific style checks on the given files.
+
+    :param report: The report in which diagnostics must be emitted.
+    :param filenames: Files to check.
+    :param jobs: Number of processes to use in order to check files in
+        parallel. Checks are sequential if 1.
+    :param cache_file: If not None, file in which to store the results of
+        checks, so that next runs do not need to check again files that did
+        not change (see ``ResultsCache``).
+    """
+    cache = (
+        None
+        if cache_file is None else
+        ResultsCache(cache_file, report.enable_colors)
+    )
+
+    # Results for each file, in order. None for files to check.
+    results: list[tuple[str, list[Report.Record]] | None] = []
+    content_hashes: list[str | None] = []
+    pending: list[int] = []
+    filenames = [f for f in filenames if f.split('.')[-1] in langs]
+    for i, filename in enumerate(filenames):
+        content_hash = (
+            None if cache is None else cache.content_hash(filename)
+        )
+        result = (
+            None
+            if cache is None or content_hash is None else
+            cache.lookup(filename, content_hash)
+        )
+        results.append(result)
+        content_hashes.append(content_hash)
+        if result is None:
+            pending.append(i)
+
+    job_args = [(filenames[i], report.enable_colors) for i in pending]
+    if jobs > 1 and len(job_args) > 1:
+        with multiprocessing.Pool(min(jobs, len(job_args))) as pool:
+            job_results = pool.map(_check_file_job, job_args, chunksize=1)
     else:
-        process(root)
+        job_results = [_check_file_job(a) for a in job_args]
+
+    for i, result in zip(pending, job_results):
+        results[i] = result
+        content_hash = content_hashes[i]
+        if cache is not None and content_hash is not None:
+            cache.store(filenames[i], content_hash, *result)
+
+    for result in results:
+        assert result is not None
+        output, records = result
+        sys.stdout.write(output)
+        report.records.extend(records)
+
+    if cache is not None:
+        cache.save()
 
 
 def main(
@@ -886,6 +1114,8 @@ def main(
     files: list[str],
     dirs: list[str],
     excludes: list[str],
+    jobs: int = 1,
+    cache_file: str | None = None,
 ) -> None:
     """
     Global purpose main procedure.
@@ -895,21 +1125,28 @@ def main(
         the Langkit repository.
     :param dirs: List of directories in which to find sources to check.
     :param excludes: List of directories to exclude from the search.
+    :param jobs: See ``check_files``.
+    :param cache_file: See ``check_files``.
     """
     report = Report(enable_colors=os.isatty(sys.stdout.fileno()))
 
-    if files:
-        for f in args.files:
-            check_file(report, f)
-    else:
+    if cache_file is not None:
+        cache_file = os.path.abspath(cache_file)
+
+    if not files:
         os.chdir(src_root)
-        for root in dirs:
-            traverse(report, root, excludes)
+        files = [f for root in dirs for f in iter_files(root, excludes)]
+    check_files(report, files, jobs, cache_file)
 
     report.output()
 
 
-def langkit_main(langkit_root: str, files: list[str] = []) -> None:
+def langkit_main(
+    langkit_root: str,
+    files: list[str] = [],
+    jobs: int = 1,
+    cache_file: str | None = None,
+) -> None:
     """
     Run main() on Langkit sources.
     """
@@ -932,7 +1169,7 @@ def langkit_main(langkit_root: str, files: list[str] = []) -> None:
                 os.path.join('testsuite', 'python_support', 'expect.py'),
                 os.path.join('testsuite', 'python_support', 'quotemeta.py'),
                 os.path.join('testsuite', 'out')]
-    main(langkit_root, files, dirs, excludes)
+    main(langkit_root, files, dirs, excludes, jobs, cache_file)
 
 
 args_parser = argparse.ArgumentParser(description="""
@@ -946,6 +1183,14 @@ args_parser.add_argument(
     help='Root directory for the Langkit source repository. Used to'
          ' automatically look for source files to analyze. If not provided,'
          ' default to a path relative to the `langkit.stylechecks` package.')
+args_parser.add_argument(
+    '--jobs', '-j', type=int, default=1,
+    help='Number of processes to use in order to check files in parallel.'
+         ' Checks are sequential by default.')
+args_parser.add_argument(
+    '--cache-file',
+    help='File in which to store the results of checks, so that next runs'
+         ' do not need to check again files that did not change.')
 args_parser.add_argument(
     'files', nargs='*',
     help='Source files to analyze. If none is provided, look for all sources'
@@ -954,4 +1199,4 @@ args_parser.add_argument(
 
 if __name__ == '__main__':
     args = args_parser.parse_args()
-    langkit_main(args.langkit_root, args.files)
+    langkit_main(args.langkit_root, args.files, args.jobs, args.cache_file)
@@ -5,11 +5,14 @@ also a way to make it explicit how it is intended to work...
 
 import dataclasses
 import os
-from typing import List, Tuple
+import pathlib
+from typing import List, Optional, Tuple
 
 import pytest
 
-from langkit.stylechecks import Report, check_file_content
+from langkit.stylechecks import (
+    Report, ResultsCache, check_file_content, check_files
+)
 
 
 @dataclasses.dataclass
@@ -637,3 +640,47 @@ def test_report_output() -> None:
             r.set_context("foo.txt", 1)
             r.add('Foobar')
             r.output()
+
+
+def test_check_files(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Check that parallel and cached checks give the same results as regular
+    ones, and that cached results are reused only for unchanged files.
+    """
+    monkeypatch.chdir(tmp_path)
+    with open("foo.py", "w") as f:
+        f.write("import sys\nimport os\n")
+    with open("bar.adb", "w") as f:
+        f.write("--  Some comment.\n")
+    filenames = ["foo.py", "bar.adb", "README"]
+    cache_file = str(tmp_path / "cache.json")
+
+    def check(jobs: int, cache_file: Optional[str]) -> List[Report.Record]:
+        report = Report()
+        check_files(report, filenames, jobs, cache_file)
+        return sorted(report.records)
+
+    expected = check(1, None)
+    assert {r.filename for r in expected} == {"bar.adb", "foo.py"}
+    assert check(2, None) == expected
+    assert check(2, cache_file) == expected
+
+    cache = ResultsCache(cache_file, enable_colors=False)
+    assert sorted(cache.entries) == ["bar.adb", "foo.py"]
+    foo_hash = ResultsCache.content_hash("foo.py")
+    assert foo_hash is not None
+    assert cache.lookup("foo.py", foo_hash) is not None
+
+    # Results for unchanged files come from the cache
+    cache.store("bar.adb", cache.entries["bar.adb"][0], "", [])
+    cache.save()
+    assert check(1, cache_file) == [r for r in expected
+                                    if r.filename == "foo.py"]
+
+    # Changed files are checked again
+    with open("bar.adb", "a") as f:
+        f.write("\n")
+    assert check(1, cache_file) == expected
@@ -1346,7 +1346,7 @@ package body Langkit_Support.Generic_API.Analysis is
       Reject_Null_Token (Self);
 
       D := Data (Self.Index, Self.TDH.all);
-      return Self.TDH.Source_Buffer (D.Source_First .. D.Source_Last);
+      return Source_Text (Self.TDH.all, D.Source_First, D.Source_Last);
    end Text;
 
    ----------
@@ -1362,7 +1362,7 @@ package body Langkit_Support.Generic_API.Analysis is
 
       FD := Data (First.Index, First.TDH.all);
       LD := Data (Last.Index, First.TDH.all);
-      return First.TDH.Source_Buffer (FD.Source_First .. LD.Source_Last);
+      return Source_Text (First.TDH.all, FD.Source_First, LD.Source_Last);
    end Text;
 
    ----------------
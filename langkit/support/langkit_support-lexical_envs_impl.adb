@@ -101,6 +101,18 @@ package body Langkit_Support.Lexical_Envs_Impl is
    --  identical New_Env in the set of rebindings. If there are, raise a
    --  property error.
 
+   type First_Lookup_State is record
+      From : Node_Type;
+      --  Node from which the lookup is done, for sequential lookups (see the
+      --  ``From`` argument of ``Get``).
+
+      Found : Boolean;
+      --  Whether the lookup has found at least one entity that is visible
+      --  from ``From``.
+   end record;
+   --  State for lookups that stop as soon as they find one entity (see
+   --  ``Get_First``).
+
    procedure Get_Internal_Impl
      (Self                    : Lexical_Env;
       Key                     : Thin_Symbol;
@@ -110,12 +122,31 @@ package body Langkit_Support.Lexical_Envs_Impl is
       Categories              : Ref_Categories;
       Local_Results           : in out Lookup_Result_Vector;
       Toplevel                : Boolean := True;
-      Recursive_Check_Reached : in out Boolean);
+      Recursive_Check_Reached : in out Boolean;
+      From_Owner              : Generic_Unit_Ptr := No_Generic_Unit;
+      First_Only              : access First_Lookup_State := null;
+      In_Dynamic_Ref          : Boolean := False);
    --  This is the real Env.Get implementation.
    --
    --  ``Toplevel`` is used to discriminate between the toplevel call and
    --  further calls, for the ``Toplevel_Only`` cache mode.
    --
+   --  ``From_Owner`` is the owner of the closest primary environment from
+   --  which the lookup recursed to ``Self`` (see ``Notify_Env_Visited``).
+   --
+   --  If ``First_Only`` is not null, the caller needs only the first entity
+   --  that is visible from ``First_Only.From``: stop the traversal of
+   --  environments as soon as ``Local_Results`` contains one such entity (and
+   --  set ``First_Only.Found`` to True). Lookup caches store complete
+   --  results only, so on a cache miss in an environment that has a lookup
+   --  cache, the traversal from this environment is complete and its result
+   --  is cached: the traversal stops early only in the other environments.
+   --
+   --  ``In_Dynamic_Ref`` is whether ``Self`` is reached through a referenced
+   --  environment with a dynamic getter. The visibility of results is then
+   --  checked with the getter node (see ``Get_Refd_Nodes``), so these results
+   --  can stop the traversal only if they do not need a visibility check.
+   --
    --  ``Recursive_Check_Reached`` is an helper variable passed down to
    --  recursive calls, to down propagate to parent calls when the recursion
    --  protection is activated, i.e. when an lexical environment is visited a
@@ -145,7 +176,8 @@ package body Langkit_Support.Lexical_Envs_Impl is
       Rebindings    : Env_Rebindings := null;
       Metadata      : Node_Metadata := Empty_Metadata;
       Categories    : Ref_Categories;
-      Local_Results : in out Lookup_Result_Vector);
+      Local_Results : in out Lookup_Result_Vector;
+      First_Only    : access First_Lookup_State := null);
    --  This is the ``Get_Internal_Impl`` wrapper. It is used to forward default
    --  values to some internal parameters used by ``Get_Internal_Impl``. We're
    --  not using a nested function for ``Get_Internal_Impl`` because the level
@@ -855,7 +887,8 @@ package body Langkit_Support.Lexical_Envs_Impl is
       Rebindings    : Env_Rebindings := null;
       Metadata      : Node_Metadata := Empty_Metadata;
       Categories    : Ref_Categories;
-      Local_Results : in out Lookup_Result_Vector)
+      Local_Results : in out Lookup_Result_Vector;
+      First_Only    : access First_Lookup_State := null)
    is
       Dummy : Boolean := False;
    begin
@@ -863,7 +896,8 @@ package body Langkit_Support.Lexical_Envs_Impl is
         (Self, Key, Lookup_Kind, Rebindings,
          Metadata, Categories, Local_Results,
          Toplevel                => True,
-         Recursive_Check_Reached => Dummy);
+         Recursive_Check_Reached => Dummy,
+         First_Only              => First_Only);
    end Get_Internal;
 
    -----------------------
@@ -879,7 +913,10 @@ package body Langkit_Support.Lexical_Envs_Impl is
       Categories              : Ref_Categories;
       Local_Results           : in out Lookup_Result_Vector;
       Toplevel                : Boolean := True;
-      Recursive_Check_Reached : in out Boolean)
+      Recursive_Check_Reached : in out Boolean;
+      From_Owner              : Generic_Unit_Ptr := No_Generic_Unit;
+      First_Only              : access First_Lookup_State := null;
+      In_Dynamic_Ref          : Boolean := False)
    is
       function Do_Cache return Boolean
       is
@@ -892,14 +929,33 @@ package body Langkit_Support.Lexical_Envs_Impl is
       function Log_Id return String is
         ("env=" & Env_Image (Self) & ", key=" & Key_Image (Self, Key));
 
+      procedure Check_Found (Item : Lookup_Result_Item);
+      --  If the caller needs only the first visible entity, record whether
+      --  ``Item`` is such an entity. The visibility test must be the same as
+      --  the one that ``Get``/``Get_First`` do on the final results.
+
       Env : constant Lexical_Env_Access := Unwrap (Self);
 
+      Recursion_Owner : constant Generic_Unit_Ptr :=
+        (if Self.Kind in Primary_Kind and then Self.Owner /= No_Generic_Unit
+         then Self.Owner
+         else From_Owner);
+      --  Owner to pass as ``From_Owner`` to recursive calls
+
       Outer_Results :  Lookup_Result_Vector :=
         Lookup_Result_Item_Vectors.Empty_Vector;
       Need_Cache    : Boolean := False;
 
       Current_Rebindings : Env_Rebindings;
 
+      function Done return Boolean
+      is (not Need_Cache
+          and then First_Only /= null
+          and then First_Only.Found);
+      --  Return whether the traversal of environments can stop. If the result
+      --  of this lookup must be stored in the lookup cache, it must be
+      --  complete, so the traversal cannot stop early.
+
       procedure Get_Refd_Nodes (Self : in out Referenced_Env);
       --  Perform a recursive lookup inside the given referenced environment
 
@@ -930,15 +986,40 @@ package body Langkit_Support.Lexical_Envs_Impl is
          Rebindings              : Env_Rebindings := null;
          Metadata                : Node_Metadata := Empty_Metadata;
          Categories              : Ref_Categories;
-         Local_Results           : in out Lookup_Result_Vector);
+         Local_Results           : in out Lookup_Result_Vector;
+         Dynamic_Ref             : Boolean := False);
       --  Helper procedure for all env lookup recursions, so that the Toplevel
       --  argument is automatically passed to False for recursive calls, and
-      --  ``Recursive_Check_Reached`` is automatically passed down the call
-      --  chain.
+      --  ``Recursive_Check_Reached``, ``First_Only`` and ``In_Dynamic_Ref``
+      --  are automatically passed down the call chain. ``Dynamic_Ref`` must
+      --  be True when recursing through a referenced environment with a
+      --  dynamic getter.
       --
       --  NOTE: Every recursive call to ``Get_Internal_Impl`` should go through
       --  this helper.
 
+      -----------------
+      -- Check_Found --
+      -----------------
+
+      procedure Check_Found (Item : Lookup_Result_Item) is
+      begin
+         if First_Only = null or else First_Only.Found then
+            return;
+         end if;
+
+         First_Only.Found :=
+           First_Only.From = No_Node
+           or else not Item.Filter_From
+           or else
+             (not In_Dynamic_Ref
+              and then Can_Reach
+                (Node => (if Item.Override_Filter_Node /= No_Node
+                          then Item.Override_Filter_Node
+                          else Item.E.Node),
+                 From => First_Only.From));
+      end Check_Found;
+
       -------------
       -- Recurse --
       -------------
@@ -950,14 +1031,19 @@ package body Langkit_Support.Lexical_Envs_Impl is
          Rebindings              : Env_Rebindings := null;
          Metadata                : Node_Metadata := Empty_Metadata;
          Categories              : Ref_Categories;
-         Local_Results           : in out Lookup_Result_Vector)
+         Local_Results           : in out Lookup_Result_Vector;
+         Dynamic_Ref             : Boolean := False)
       is
       begin
          Get_Internal_Impl
            (Self, Key, Lookup_Kind, Rebindings, Metadata,
             Categories, Local_Results,
             Toplevel                => False,
-            Recursive_Check_Reached => Recursive_Check_Reached);
+            Recursive_Check_Reached => Recursive_Check_Reached,
+            From_Owner              => Recursion_Owner,
+            First_Only              =>
+              (if Need_Cache then null else First_Only),
+            In_Dynamic_Ref          => In_Dynamic_Ref or else Dynamic_Ref);
       end Recurse;
 
       ----------------------
@@ -1134,6 +1220,7 @@ package body Langkit_Support.Lexical_Envs_Impl is
               (if Node.Resolver = null
                then E
                else Node.Resolver.all (E));
+            Item            : Lookup_Result_Item;
          begin
             --  Silently discard null resolved nodes: we tolerate them as they
             --  likely come from semantic analysis routines running on invalid
@@ -1144,11 +1231,12 @@ package body Langkit_Support.Lexical_Envs_Impl is
             end if;
 
             Resolved_Entity.Info.From_Rebound := From_Rebound;
-            Local_Results.Append
-              (Lookup_Result_Item'
-                 (E                    => Resolved_Entity,
-                  Filter_From          => Node.Resolver = null,
-                  Override_Filter_Node => No_Node));
+            Item :=
+              (E                    => Resolved_Entity,
+               Filter_From          => Node.Resolver = null,
+               Override_Filter_Node => No_Node);
+            Local_Results.Append (Item);
+            Check_Found (Item);
          end;
       end Append_Result;
 
@@ -1218,7 +1306,8 @@ package body Langkit_Support.Lexical_Envs_Impl is
 
                Metadata      => Metadata,
                Categories    => Categories,
-               Local_Results => Refd_Results);
+               Local_Results => Refd_Results,
+               Dynamic_Ref   => Self.Getter.Dynamic);
 
             if Self.Getter.Dynamic then
                for Res of Refd_Results loop
@@ -1289,6 +1378,7 @@ package body Langkit_Support.Lexical_Envs_Impl is
                   Combine (Env.Default_Md, Metadata);
             begin
                for E of Env.Grouped_Envs.all loop
+                  exit when Done;
                   Recurse (E, Key, Lookup_Kind, Rebindings, Md,
                            Categories, Local_Results);
                end loop;
@@ -1314,6 +1404,10 @@ package body Langkit_Support.Lexical_Envs_Impl is
 
       --  At this point, we know that Self is a primary lexical environment
 
+      if Self.Owner /= No_Generic_Unit then
+         Notify_Env_Visited (From_Owner, Self.Owner);
+      end if;
+
       if Do_Cache
         and then Lookup_Kind = Recursive
       then
@@ -1360,13 +1454,17 @@ package body Langkit_Support.Lexical_Envs_Impl is
                   null;
                when Computed =>
                   for El of Res_Val.Elements loop
-                     Local_Results.Append
-                       (Lookup_Result_Item'
-                         (E => Entity'
-                           (Node                 => El.Node,
-                            Info                 => Info (El)),
-                            Override_Filter_Node => El.Override_Filter_Node,
-                            Filter_From          => El.Filter_From));
+                     declare
+                        Item : constant Lookup_Result_Item :=
+                          (E => Entity'
+                             (Node                 => El.Node,
+                              Info                 => Info (El)),
+                           Override_Filter_Node => El.Override_Filter_Node,
+                           Filter_From          => El.Filter_From);
+                     begin
+                        Local_Results.Append (Item);
+                        Check_Found (Item);
+                     end;
                   end loop;
 
                   if Env.Node /= No_Node then
@@ -1410,7 +1508,10 @@ package body Langkit_Support.Lexical_Envs_Impl is
          end;
       end if;
 
-      if Lookup_Kind /= Minimal then
+      --  Stop there if the caller needs only one result and we already have
+      --  it.
+
+      if Lookup_Kind /= Minimal and then not Done then
 
          --  Phase 2: Get nodes in transitive and prioritary referenced envs
 
@@ -1418,6 +1519,7 @@ package body Langkit_Support.Lexical_Envs_Impl is
             for I in Env.Referenced_Envs.First_Index
                   .. Env.Referenced_Envs.Last_Index
             loop
+               exit when Done;
                if Env.Referenced_Envs.Get_Access (I).Kind
                in Transitive | Prioritary
                then
@@ -1441,7 +1543,9 @@ package body Langkit_Support.Lexical_Envs_Impl is
 
          --  Phase 3: Get nodes in parent envs
 
-         if Lookup_Kind = Recursive or else Env.Transitive_Parent then
+         if (Lookup_Kind = Recursive or else Env.Transitive_Parent)
+            and then not Done
+         then
             declare
                Parent_Env        : Lexical_Env := Parent (Self);
                Parent_Rebindings : constant Env_Rebindings :=
@@ -1476,6 +1580,7 @@ package body Langkit_Support.Lexical_Envs_Impl is
             for I in Env.Referenced_Envs.First_Index
                   .. Env.Referenced_Envs.Last_Index
             loop
+               exit when Done;
                if Env.Referenced_Envs.Get_Access (I).Kind
                not in Transitive | Prioritary
                then
@@ -1502,6 +1607,14 @@ package body Langkit_Support.Lexical_Envs_Impl is
         and then Need_Cache
       then
 
+         --  The traversal was complete, and recursive calls did not check
+         --  their results for the caller of ``Get_First``: do it now, so that
+         --  enclosing lookups can stop early.
+
+         for El of Local_Results loop
+            Check_Found (El);
+         end loop;
+
          --  Only cache if there was no loop in the env graph (see comment on
          --  ``Get_Internal_Impl``).
 
@@ -1654,7 +1767,8 @@ package body Langkit_Support.Lexical_Envs_Impl is
       Lookup_Kind : Lookup_Kind_Type := Recursive;
       Categories  : Ref_Categories := All_Cats) return Entity
    is
-      FV : Entity_Vectors.Vector;
+      FV    : Entity_Vectors.Vector;
+      State : aliased First_Lookup_State := (From => From, Found => False);
    begin
       if Has_Trace then
          Me.Trace ("==== In Env Get_First, key="
@@ -1665,8 +1779,12 @@ package body Langkit_Support.Lexical_Envs_Impl is
       declare
          V : Lookup_Result_Vector;
       begin
+         --  We only need the first entity: let the lookup stop as soon as it
+         --  finds it.
+
          Get_Internal
-           (Self, Key, Lookup_Kind, null, Empty_Metadata, Categories, V);
+           (Self, Key, Lookup_Kind, null, Empty_Metadata, Categories, V,
+            First_Only => State'Access);
 
          for El of V loop
             if From = No_Node
@@ -3,8 +3,19 @@
 --  SPDX-License-Identifier: Apache-2.0
 --
 
+with Ada.Unchecked_Deallocation;
+
 package body Langkit_Support.Token_Data_Handlers is
 
+   procedure Free is new Ada.Unchecked_Deallocation
+     (String, Compact_Text_Access);
+
+   function Column_Count
+     (Line     : String;
+      Tab_Stop : Positive) return Column_Number;
+   --  Counterpart of ``Langkit_Support.Slocs.Column_Count`` for compact source
+   --  buffers.
+
    function Internal_Get_Trivias
      (TDH   : Token_Data_Handler;
       Index : Token_Index) return Token_Index_Vectors.Elements_Array;
@@ -92,7 +103,7 @@ package body Langkit_Support.Token_Data_Handlers is
 
    function Has_Source_Buffer (TDH : Token_Data_Handler) return Boolean is
    begin
-      return TDH.Source_Buffer /= null;
+      return TDH.Source_Buffer /= null or else TDH.Compact_Buffer /= null;
    end Has_Source_Buffer;
 
    ----------------
@@ -107,6 +118,7 @@ package body Langkit_Support.Token_Data_Handlers is
    begin
       TDH := (Version            => 0,
               Source_Buffer      => null,
+              Compact_Buffer     => null,
               Source_First       => <>,
               Source_Last        => <>,
               Filename           => <>,
@@ -131,6 +143,7 @@ package body Langkit_Support.Token_Data_Handlers is
       Source_Last   : Natural) is
    begin
       Free (TDH.Source_Buffer);
+      Free (TDH.Compact_Buffer);
       TDH.Source_Buffer := Source_Buffer;
       TDH.Source_First := Source_First;
       TDH.Source_Last := Source_Last;
@@ -202,6 +215,89 @@ package body Langkit_Support.Token_Data_Handlers is
 
    end Compute_Lines_Starts;
 
+   -------------
+   -- Compact --
+   -------------
+
+   procedure Compact (TDH : in out Token_Data_Handler) is
+   begin
+      if TDH.Compact_Buffer /= null then
+         return;
+      end if;
+
+      declare
+         --  Keep the indexes of the source buffer, so that token bounds and
+         --  line starts remain valid for the compact buffer.
+
+         T : Text_Type renames
+           TDH.Source_Buffer (TDH.Source_Buffer'First .. TDH.Source_Last);
+      begin
+         for C of T loop
+            if Character_Type'Pos (C) > Character'Pos (Character'Last) then
+               return;
+            end if;
+         end loop;
+
+         TDH.Compact_Buffer := new String (T'Range);
+         for I in T'Range loop
+            TDH.Compact_Buffer (I) :=
+              Character'Val (Character_Type'Pos (T (I)));
+         end loop;
+      end;
+
+      Free (TDH.Source_Buffer);
+   end Compact;
+
+   -----------------
+   -- Source_Text --
+   -----------------
+
+   function Source_Text
+     (TDH   : Token_Data_Handler;
+      First : Positive;
+      Last  : Natural) return Text_Type is
+   begin
+      if TDH.Compact_Buffer = null then
+         return TDH.Source_Buffer (First .. Last);
+      end if;
+
+      declare
+         Slice : String renames TDH.Compact_Buffer (First .. Last);
+      begin
+         return Result : Text_Type (First .. Last) do
+            for I in Result'Range loop
+               Result (I) := Character_Type'Val (Character'Pos (Slice (I)));
+            end loop;
+         end return;
+      end;
+   end Source_Text;
+
+   ------------------
+   -- Column_Count --
+   ------------------
+
+   function Column_Count
+     (Line     : String;
+      Tab_Stop : Positive) return Column_Number
+   is
+      HT     : constant Character :=
+        Character'Val (Character_Type'Pos (Chars.HT));
+      TS     : constant Column_Number := Column_Number (Tab_Stop);
+      Result : Column_Number := 0;
+   begin
+      --  Keep in sync with Langkit_Support.Slocs.Column_Count
+
+      for C of Line loop
+         if C = HT then
+            Result := (Result + TS) / TS * TS;
+         else
+            Result := Result + 1;
+         end if;
+      end loop;
+
+      return Result;
+   end Column_Count;
+
    ----------
    -- Free --
    ----------
@@ -209,6 +305,7 @@ package body Langkit_Support.Token_Data_Handlers is
    procedure Free (TDH : in out Token_Data_Handler) is
    begin
       Free (TDH.Source_Buffer);
+      Free (TDH.Compact_Buffer);
       TDH.Tokens.Destroy;
       TDH.Trivias.Destroy;
       TDH.Tokens_To_Trivias.Destroy;
@@ -225,6 +322,7 @@ package body Langkit_Support.Token_Data_Handlers is
       Destination := Source;
       Source := (Version           => 0,
                  Source_Buffer     => null,
+                 Compact_Buffer    => null,
                  Source_First      => <>,
                  Source_Last       => <>,
                  Filename          => <>,
@@ -700,17 +798,15 @@ package body Langkit_Support.Token_Data_Handlers is
    begin
       --  Return slice from...
       return
-        TDH.Source_Buffer
-          (
-           --  The first character in the requested line
-           TDH.Lines_Starts.Get (Line_Number)
+        Source_Text
+          (TDH,
 
-           ..
+           --  The first character in the requested line
+           TDH.Lines_Starts.Get (Line_Number),
 
            --  The character before the LF that precedes the first character of
            --  the next line.
-             TDH.Lines_Starts.Get (Line_Number + 1) - 2
-          );
+           TDH.Lines_Starts.Get (Line_Number + 1) - 2);
 
    end Get_Line;
 
@@ -751,7 +847,10 @@ package body Langkit_Support.Token_Data_Handlers is
          --  Allow an offset that reference the character that would follow the
          --  end of the source buffer (i.e. ``'Last + 1``), but no further.
 
-         if Index > TDH.Source_Buffer'Last + 1 then
+         if Index > (if TDH.Compact_Buffer = null
+                     then TDH.Source_Buffer'Last
+                     else TDH.Compact_Buffer'Last) + 1
+         then
             raise Constraint_Error with "out of bound access";
          end if;
 
@@ -759,8 +858,13 @@ package body Langkit_Support.Token_Data_Handlers is
          --  add the columns for anything between the start of the line and the
          --  requested offset.
 
-         Column := 1 + Column_Count
-           (TDH.Source_Buffer (Line_Offset .. Line_End), TDH.Tab_Stop);
+         Column := 1 +
+           (if TDH.Compact_Buffer = null
+            then Column_Count
+                   (TDH.Source_Buffer (Line_Offset .. Line_End), TDH.Tab_Stop)
+            else Column_Count
+                   (TDH.Compact_Buffer (Line_Offset .. Line_End),
+                    TDH.Tab_Stop));
 
          return Source_Location'(Line_Number (Line_Index), Column);
       end;
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+from collections import ChainMap
+from contextlib import contextmanager
+import hashlib
+import io
 import os.path
 import sys
-from typing import Any
+import time
+from typing import Any, Iterator, Mapping
 
+import mako
 import mako.exceptions
 from mako.lookup import TemplateLookup
+import mako.runtime
 
+from langkit.caching import hash_strings, langkit_fingerprint
 from langkit.common import (
     ada_block_with_parens,
     ada_enum_type_decl,
@@ -19,27 +27,68 @@ from langkit.diagnostics import DiagnosticError
 from langkit.names import Name
 
 
+_builtin_template_env: dict[str, Any] = {
+    'ada_block_with_parens': ada_block_with_parens,
+    'ada_enum_type_decl': ada_enum_type_decl,
+    'ada_pipe_list': ada_pipe_list,
+    'ascii_repr': ascii_repr,
+    'bytes_repr': bytes_repr,
+    'text_repr': text_repr,
+    'Name': Name,
+}
+"""
+Helpers that are available in all template environments. They take precedence
+over user-provided entries.
+"""
+
+
 class Renderer:
+    """
+    Helper to render templates with a given environment.
+
+    The environment is layered: deriving a renderer (``update``) or rendering
+    a template with additional entries (``render``) does not copy it. Only the
+    mappings passed to the constructor are copied, so that modifying them
+    afterwards does not affect renderings.
+    """
 
     def __init__(
         self,
-        template_env: dict[str, Any] | None = None,
+        template_env: Mapping[str, Any] | None = None,
         **kwargs: Any,
     ):
-        self.env = dict(template_env or {})
-        self.env.update(kwargs)
-        self.env.update({
-            'ada_block_with_parens': ada_block_with_parens,
-            'ada_enum_type_decl': ada_enum_type_decl,
-            'ada_pipe_list': ada_pipe_list,
-            'ascii_repr': ascii_repr,
-            'bytes_repr': bytes_repr,
-            'text_repr': text_repr,
-            'Name': Name,
-        })
+        # Builtin helpers take precedence over all other entries, then
+        # keyword arguments take precedence over the base environment.
+        maps: list[Mapping[str, Any]] = [_builtin_template_env, kwargs]
+        if isinstance(template_env, ChainMap):
+            maps.extend(
+                dict(m) for m in template_env.maps
+                if m is not _builtin_template_env
+            )
+        elif template_env:
+            maps.append(dict(template_env))
+        self._init_env(maps)
+
+    def _init_env(self, maps: list[Mapping[str, Any]]) -> None:
+        """
+        Initialize this renderer's environment from the given layers, which
+        must not be modified afterwards.
+        """
+        self.env: ChainMap[str, Any] = ChainMap(*maps)  # type: ignore
+
+        self._flat_env: dict[str, Any] | None = None
+        """
+        Flattened version of ``self.env``, computed on the first rendering.
+        """
 
     def update(self, env: dict[str, Any]) -> Renderer:
-        return Renderer(self.env, **env)
+        # Layers of our own environment are private: share them instead of
+        # copying them.
+        maps: list[Mapping[str, Any]] = [_builtin_template_env, dict(env)]
+        maps.extend(self.env.maps[1:])
+        result = Renderer.__new__(Renderer)
+        result._init_env(maps)
+        return result
 
     def render(
         self,
@@ -47,13 +96,47 @@ class Renderer:
         env: dict[str, Any] | None = None,
         **kwargs: Any,
     ) -> str:
-        env = dict(env or {})
-        env.update(kwargs)
-        return self.update(env)._render(template_name)
+        if env:
+            extra_env = dict(env)
+            extra_env.update(kwargs)
+        else:
+            extra_env = kwargs
+        return self._render(template_name, extra_env)
+
+    def _render(
+        self,
+        template_name: str,
+        extra_env: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Render the given template with this renderer's environment plus
+        ``extra_env``, whose entries take precedence over the environment
+        (except builtin helpers).
+        """
+        if self._flat_env is None:
+            self._flat_env = {}
+            for layer in reversed(self.env.maps):
+                self._flat_env.update(layer)
+        env = self._flat_env
+
+        # In the common case, additional entries do not override existing
+        # ones, so we can let Python merge both environments when passing
+        # keyword arguments to the context constructor: this is the only copy
+        # of the environment that we need.
+        if extra_env and not env.keys().isdisjoint(extra_env):
+            env = dict(env)
+            env.update(extra_env)
+            env.update(_builtin_template_env)
+            extra_env = None
 
-    def _render(self, template_name: str) -> str:
+        # Create the rendering context ourselves rather than using
+        # Template.render: the latter passes the environment as keyword
+        # arguments to several functions, and thus copies it several times.
+        buf = io.StringIO()
+        context = mako.runtime.Context(buf, **env, **(extra_env or {}))
         try:
-            return mako_template(template_name).render(**self.env)
+            mako_template(template_name).render_context(context)
+            return buf.getvalue()
         except DiagnosticError:  # no-code-coverage
             # In the case of DiagnosticErrors, we don't want to show the
             # traceback.
@@ -65,15 +148,180 @@ class Renderer:
             raise
 
 
+_used_templates: set[str] | None = None
+"""
+While templates used are recorded (see ``record_used_templates``), set of
+paths for these templates.
+"""
+
+
+class _TemplateLookup(TemplateLookup):
+    """
+    Template lookup that records the templates it returns. Mako uses the
+    lookup to resolve includes, inheritance and namespaces, so this covers
+    all the templates involved in a rendering.
+    """
+
+    def get_template(self, uri: str) -> mako.template.Template:
+        result = super().get_template(uri)
+        if _used_templates is not None:
+            _used_templates.add(result.filename)
+        return result
+
+
+@contextmanager
+def record_used_templates(isolated: bool = False) -> Iterator[set[str]]:
+    """
+    Context manager to record the paths of all the templates used while it is
+    active, in the yielded set.
+
+    :param isolated: If false, also add the recorded templates to the set of
+        the enclosing recording, if any.
+    """
+    global _used_templates
+    saved = _used_templates
+    recorded: set[str] = set()
+    _used_templates = recorded
+    try:
+        yield recorded
+    finally:
+        _used_templates = saved
+        if saved is not None and not isolated:
+            saved.update(recorded)
+
+
+def add_used_templates(templates: set[str]) -> None:
+    """
+    If templates used are recorded, add ``templates`` to them. This is useful
+    to forward the templates that worker processes used.
+    """
+    if _used_templates is not None:
+        _used_templates.update(templates)
+
+
 _template_dirs: list[str] = []
 _template_lookup: mako.utils.TemplateLookup | None = None
+_template_module_dir: str | None = None
 
 
-def add_template_dir(path: str) -> None:
+def _reset_template_lookup() -> None:
     global _template_lookup
+    _template_lookup = _TemplateLookup(
+        directories=_template_dirs,
+        strict_undefined=True,
+        modulename_callable=(
+            None if _template_module_dir is None else _template_module_filename
+        ),
+    )
+
+
+def _template_module_filename(filename: str, uri: str) -> str:
+    """
+    Return the name of the file in which to store the compiled module for the
+    given template.
+
+    The module name is derived from the template file name, its URI and its
+    content: editing a template or adding a template directory that shadows it
+    makes Mako compile it again instead of loading a stale module.
+    """
+    assert _template_module_dir is not None
+    with open(filename, "rb") as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    key = hash_strings(os.path.abspath(filename), uri, content_hash)
+    result = os.path.join(_template_module_dir, "{}.py".format(key))
+
+    # Mark the module as recently used, so that it is not pruned (see
+    # set_template_module_dir).
+    try:
+        os.utime(result)
+    except OSError:
+        pass
+
+    return result
+
+
+def add_template_dir(path: str) -> None:
     _template_dirs.append(path)
-    _template_lookup = TemplateLookup(directories=_template_dirs,
-                                      strict_undefined=True)
+    _reset_template_lookup()
+
+
+TEMPLATE_MODULE_SUBDIR = "langkit_templates"
+"""
+Name of the subdirectory that ``set_template_module_dir`` creates to store
+compiled templates.
+"""
+
+TEMPLATE_MODULE_MAX_AGE = 30 * 24 * 3600
+"""
+Number of seconds after which compiled templates that were not used are
+removed from the cache.
+"""
+
+
+def _prune_template_modules(path: str) -> None:
+    """
+    Remove compiled templates that were not used for more than
+    ``TEMPLATE_MODULE_MAX_AGE`` seconds from the given cache directory, as
+    well as the subdirectories that contain no compiled template anymore.
+    """
+    min_mtime = time.time() - TEMPLATE_MODULE_MAX_AGE
+    for subdir in os.listdir(path):
+        subdir_path = os.path.join(path, subdir)
+        if not os.path.isdir(subdir_path):
+            continue
+        for entry in os.listdir(subdir_path):
+            entry_path = os.path.join(subdir_path, entry)
+            try:
+                if (
+                    os.path.isfile(entry_path)
+                    and os.stat(entry_path).st_mtime < min_mtime
+                ):
+                    os.unlink(entry_path)
+            except OSError:
+                pass
+
+        # Other processes may be adding modules to this directory, so do not
+        # try to remove it unless it is empty.
+        try:
+            os.rmdir(subdir_path)
+        except OSError:
+            pass
+
+
+def set_template_module_dir(path: str | None) -> None:
+    """
+    Set the directory in which to store compiled templates.
+
+    Compiling templates takes a significant part of the code generation time.
+    If ``path`` is not None, store compiled templates as Python modules in
+    this directory, so that next runs can load them instead of compiling
+    templates again. If it is None, just compile templates in memory.
+
+    Modules are stored in a subdirectory of ``path/langkit_templates`` that is
+    specific to the versions of Mako and of Langkit's code. The name of each
+    module depends on the content of its template, so editing a template
+    invalidates only its own module. Compiled templates that were not used
+    for ``TEMPLATE_MODULE_MAX_AGE`` seconds are removed, whatever Langkit
+    version created them, so that the cache does not grow without bound while
+    several Langkit checkouts can share it. Nothing else is removed from
+    ``path``, so it can be a directory shared with other tools.
+    """
+    global _template_module_dir
+
+    if path is not None:
+        path = os.path.join(path, TEMPLATE_MODULE_SUBDIR)
+        if os.path.isdir(path):
+            _prune_template_modules(path)
+        path = os.path.join(
+            path,
+            hash_strings(
+                mako.__version__, langkit_fingerprint(include_templates=False)
+            ),
+        )
+
+    if path != _template_module_dir:
+        _template_module_dir = path
+        _reset_template_lookup()
 
 
 add_template_dir(os.path.join(os.path.dirname(os.path.realpath(__file__)),
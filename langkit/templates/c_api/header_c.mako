@@ -8,6 +8,7 @@
 
 <%
     entity_type = root_entity.c_type(capi).name
+    entity_array_type = root_entity.array.c_type(capi).name
 
     def define_opaque_ptr(name):
         """
@@ -529,6 +530,16 @@ ${capi.get_name("node_child")}(${entity_type} *node,
                                unsigned n,
                                ${entity_type}* child_p);
 
+${c_doc('langkit.node_children_array')}
+extern void
+${capi.get_name("node_children_array")}(${entity_type} *node,
+                                        ${entity_array_type} *result_p);
+
+${c_doc('langkit.node_subtree')}
+extern void
+${capi.get_name("node_subtree")}(${entity_type} *node,
+                                 ${entity_array_type} *result_p);
+
 ${c_doc('langkit.text_to_locale_string')}
 extern char *
 ${capi.get_name("text_to_locale_string")}(${text_type} *text);
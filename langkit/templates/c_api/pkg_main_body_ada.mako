@@ -739,6 +739,73 @@ package body ${ada_lib_name}.Implementation.C is
          return 0;
    end;
 
+   procedure ${capi.get_name('node_children_array')}
+     (Node     : ${entity_type}_Ptr;
+      Result_P : access ${root_entity.array.name}) is
+   begin
+      Clear_Last_Exception;
+      Result_P.all := Children (Node.Node, Node.Info);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name('node_subtree')}
+     (Node     : ${entity_type}_Ptr;
+      Result_P : access ${root_entity.array.name}) is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         Count : Natural := 0;
+         Last  : Natural := 0;
+
+         Result : ${root_entity.array.name};
+
+         function Count_Node (N : ${T.root_node.name}) return Visit_Status;
+         --  Traversal callback to compute the number of nodes in the subtree
+
+         function Append_Node (N : ${T.root_node.name}) return Visit_Status;
+         --  Traversal callback to append N to Result
+
+         ----------------
+         -- Count_Node --
+         ----------------
+
+         function Count_Node (N : ${T.root_node.name}) return Visit_Status
+         is
+            pragma Unreferenced (N);
+         begin
+            Count := Count + 1;
+            return Into;
+         end Count_Node;
+
+         -----------------
+         -- Append_Node --
+         -----------------
+
+         function Append_Node (N : ${T.root_node.name}) return Visit_Status
+         is
+         begin
+            Last := Last + 1;
+            Result.Items (Last) := (N, Node.Info);
+            return Into;
+         end Append_Node;
+
+      begin
+         --  First compute the size of the subtree so that we can allocate the
+         --  result array once, then fill it in a second traversal.
+
+         Traverse (Node.Node, Count_Node'Access);
+         Result := ${root_entity.array.constructor_name} (Count);
+         Traverse (Node.Node, Append_Node'Access);
+         Result_P.all := Result;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
    function ${capi.get_name("text_to_locale_string")}
      (Text : ${text_type}) return System.Address is
    begin
@@ -1233,21 +1300,31 @@ package body ${ada_lib_name}.Implementation.C is
    begin
       Clear_Last_Exception;
       declare
-         FD : constant Token_Data_Type := Data (Unwrap (First));
-         LD : constant Token_Data_Type := Data (Unwrap (Last));
+         FT : constant Token_Reference := Unwrap (First);
+         LT : constant Token_Reference := Unwrap (Last);
+         FD : constant Token_Data_Type := Data (FT);
+         LD : constant Token_Data_Type := Data (LT);
 
          First_Source_Buffer, Last_Source_Buffer : Text_Cst_Access;
          First_Index, Ignored_First              : Positive;
          Last_Index, Ignored_Last                : Natural;
       begin
+         if Get_Token_TDH (FT) /= Get_Token_TDH (LT) then
+            return 0;
+         end if;
          Extract_Token_Text
            (FD, First_Source_Buffer, First_Index, Ignored_Last);
          Extract_Token_Text
            (LD, Last_Source_Buffer, Ignored_First, Last_Index);
-         if First_Source_Buffer /= Last_Source_Buffer then
-            return 0;
+
+         --  If the source text is stored in compact form, there is no 32-bit
+         --  buffer to point to: return a widened copy instead.
+
+         if First_Source_Buffer = null then
+            Text.all := Wrap_Alloc (Common.Text (FT, LT));
+         else
+            Text.all := Wrap (First_Source_Buffer, First_Index, Last_Index);
          end if;
-         Text.all := Wrap (First_Source_Buffer, First_Index, Last_Index);
          return 1;
       end;
    exception
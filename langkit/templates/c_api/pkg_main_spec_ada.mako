@@ -553,6 +553,22 @@ package ${ada_lib_name}.Implementation.C is
            External_name => "${capi.get_name('node_child')}";
    ${ada_c_doc('langkit.node_child', 3)}
 
+   procedure ${capi.get_name('node_children_array')}
+     (Node     : ${entity_type}_Ptr;
+      Result_P : access ${root_entity.array.name})
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('node_children_array')}";
+   ${ada_c_doc('langkit.node_children_array', 3)}
+
+   procedure ${capi.get_name('node_subtree')}
+     (Node     : ${entity_type}_Ptr;
+      Result_P : access ${root_entity.array.name})
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('node_subtree')}";
+   ${ada_c_doc('langkit.node_subtree', 3)}
+
    function ${capi.get_name('text_to_locale_string')}
      (Text : ${text_type}) return System.Address
       with Export        => True,
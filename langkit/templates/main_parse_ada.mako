@@ -2,7 +2,11 @@
 
 with Ada.Calendar;              use Ada.Calendar;
 with Ada.Containers.Hashed_Sets;
+with Ada.Containers.Vectors;
+with Ada.Directories;
+with Ada.Exceptions;
 with Ada.Strings;               use Ada.Strings;
+with Ada.Strings.Fixed;
 with Ada.Strings.Unbounded;     use Ada.Strings.Unbounded;
 pragma Warnings (Off, "internal");
 with Ada.Text_IO;               use Ada.Text_IO;
@@ -42,6 +46,17 @@ procedure Parse is
       package Measure_Time is new Parse_Flag
         (Parser, "-t", "--time", "Time the execution of parsing");
 
+      package Jobs is new Parse_Option
+        (Parser, "-j", "--jobs",
+         Arg_Type    => Natural,
+         Default_Val => 0,
+         Help        =>
+           "Parse files (from --file-name/--file-list) in batch mode: shard"
+           & " them over the given number of tasks, each with its own"
+           & " analysis context, populate their lexical environments and"
+           & " print throughput statistics instead of trees. Disabled if"
+           & " 0 (the default).");
+
       package Check is new Parse_Flag
         (Parser, "-C", "--check",
          Help => "Perform consistency checks on the tree");
@@ -109,6 +124,7 @@ procedure Parse is
    procedure Process_File (Filename : String; Ctx : Analysis_Context);
    procedure Print_Token_Stream (Unit : Analysis_Unit);
    procedure Parse_Input (Content : String);
+   procedure Process_Batch;
 
    function Create_Parse_Context return Analysis_Context is
      (Create_Context (Charset     => To_String (Args.Charset.Get),
@@ -345,12 +361,347 @@ procedure Parse is
 
    end Process_File;
 
+   -------------------
+   -- Process_Batch --
+   -------------------
+
+   procedure Process_Batch is
+      package String_Vectors is new Ada.Containers.Vectors
+        (Positive, Unbounded_String);
+
+      type Batch_Stats is record
+         Files, Files_With_Diagnostics : Natural := 0;
+         Bytes, Tokens, Nodes           : Long_Long_Integer := 0;
+         Lexing, Parsing, Env_Population : Duration := 0.0;
+      end record;
+      --  Statistics for a set of processed files. Times are cumulated over
+      --  all the files, so they do not depend on how many tasks run.
+
+      Files : String_Vectors.Vector;
+      --  List of files to process. It is not modified once workers start.
+
+      protected Queue is
+         procedure Next (Index : out Natural);
+         --  Return the index in Files of the next file to process, or 0 if
+         --  all files have been dispatched.
+
+         procedure Add (Stats : Batch_Stats);
+         --  Add ``Stats`` to the statistics for all files
+
+         function Total return Batch_Stats;
+         --  Return the statistics for all files
+      private
+         Next_Index : Positive := 1;
+         Totals     : Batch_Stats;
+      end Queue;
+
+      task type Worker;
+      --  Process files from Queue in a new analysis context until there are
+      --  none left.
+
+      Rule : constant Grammar_Rule := Args.Rule.Get;
+
+      function Count_Nodes
+        (Node : ${root_entity.api_name}'Class) return Long_Long_Integer;
+      --  Return the number of nodes in the tree rooted at ``Node``
+
+      function Peak_Memory return String;
+      --  Return a human-readable representation of the peak memory usage for
+      --  this process, or "unknown" if it is not available.
+
+      function Image (N : Long_Long_Integer) return String
+      is (Ada.Strings.Fixed.Trim (Long_Long_Integer'Image (N), Left));
+
+      function Rate (Count : Long_Long_Integer; Span : Duration) return String
+      is (if Span = 0.0
+          then "n/a"
+          else Image (Long_Long_Integer
+                        (Long_Float (Count) / Long_Float (Span))));
+      --  Return the image for the number of ``Count`` items per second, if
+      --  processing them takes ``Span``.
+
+      -----------
+      -- Queue --
+      -----------
+
+      protected body Queue is
+
+         ----------
+         -- Next --
+         ----------
+
+         procedure Next (Index : out Natural) is
+         begin
+            if Next_Index > Natural (Files.Length) then
+               Index := 0;
+            else
+               Index := Next_Index;
+               Next_Index := Next_Index + 1;
+            end if;
+         end Next;
+
+         ---------
+         -- Add --
+         ---------
+
+         procedure Add (Stats : Batch_Stats) is
+         begin
+            Totals.Files := Totals.Files + Stats.Files;
+            Totals.Files_With_Diagnostics :=
+              Totals.Files_With_Diagnostics + Stats.Files_With_Diagnostics;
+            Totals.Bytes := Totals.Bytes + Stats.Bytes;
+            Totals.Tokens := Totals.Tokens + Stats.Tokens;
+            Totals.Nodes := Totals.Nodes + Stats.Nodes;
+            Totals.Lexing := Totals.Lexing + Stats.Lexing;
+            Totals.Parsing := Totals.Parsing + Stats.Parsing;
+            Totals.Env_Population :=
+              Totals.Env_Population + Stats.Env_Population;
+         end Add;
+
+         -----------
+         -- Total --
+         -----------
+
+         function Total return Batch_Stats is
+         begin
+            return Totals;
+         end Total;
+
+      end Queue;
+
+      ------------
+      -- Worker --
+      ------------
+
+      task body Worker is
+         Ctx   : constant Analysis_Context := Create_Parse_Context;
+         Stats : Batch_Stats;
+         Index : Natural;
+
+         procedure Add_Stats;
+         --  Add the parsing times for ``Ctx`` to ``Stats`` and add ``Stats``
+         --  to the statistics for all files.
+
+         ---------------
+         -- Add_Stats --
+         ---------------
+
+         procedure Add_Stats is
+         begin
+            Ctx.Get_Parsing_Times (Stats.Lexing, Stats.Parsing);
+            Queue.Add (Stats);
+         end Add_Stats;
+
+      begin
+         --  Do not let errors during env population stop the whole batch: we
+         --  are only interested in the time it takes.
+
+         Ctx.Discard_Errors_In_Populate_Lexical_Env (True);
+
+         loop
+            Queue.Next (Index);
+            exit when Index = 0;
+
+            declare
+               Filename : constant String := To_String (Files (Index));
+               Unit     : constant Analysis_Unit :=
+                 Get_From_File (Ctx, Filename, "", True, Rule => Rule);
+
+               Time_Parsed, Time_Populated : Time;
+            begin
+               --  The analysis context measures the time spent lexing and
+               --  parsing units: only measure env population here.
+
+               Time_Parsed := Clock;
+
+               if not Unit.Root.Is_Null then
+                  % if ctx.ple_unit_root:
+                  declare
+                     Last : constant Natural :=
+                       (if Unit.Root.Kind
+                           /= ${ctx.ple_unit_root.list.ada_kind_name}
+                        then 1
+                        else Unit.Root.Children_Count);
+                  begin
+                     for I in 1 .. Last loop
+                        Unit.Populate_Lexical_Env (I);
+                     end loop;
+                  end;
+                  % else:
+                  Unit.Populate_Lexical_Env;
+                  % endif
+               end if;
+               Time_Populated := Clock;
+
+               Stats.Files := Stats.Files + 1;
+               if Has_Diagnostics (Unit) then
+                  Stats.Files_With_Diagnostics :=
+                    Stats.Files_With_Diagnostics + 1;
+               end if;
+               if Ada.Directories.Exists (Filename) then
+                  Stats.Bytes := Stats.Bytes
+                    + Long_Long_Integer (Ada.Directories.Size (Filename));
+               end if;
+               Stats.Tokens :=
+                 Stats.Tokens + Long_Long_Integer (Unit.Token_Count);
+               if not Unit.Root.Is_Null then
+                  Stats.Nodes := Stats.Nodes + Count_Nodes (Unit.Root);
+               end if;
+
+               Stats.Env_Population :=
+                 Stats.Env_Population + (Time_Populated - Time_Parsed);
+            end;
+         end loop;
+
+         Add_Stats;
+      exception
+         when Exc : others =>
+            --  Unhandled exceptions silently terminate tasks: report them
+
+            Put_Line
+              ("Worker aborted: "
+               & Ada.Exceptions.Exception_Information (Exc));
+            Add_Stats;
+      end Worker;
+
+      -----------------
+      -- Count_Nodes --
+      -----------------
+
+      function Count_Nodes
+        (Node : ${root_entity.api_name}'Class) return Long_Long_Integer
+      is
+         Result : Long_Long_Integer := 1;
+      begin
+         for C of Node.Children loop
+            if not C.Is_Null then
+               Result := Result + Count_Nodes (C);
+            end if;
+         end loop;
+         return Result;
+      end Count_Nodes;
+
+      -----------------
+      -- Peak_Memory --
+      -----------------
+
+      function Peak_Memory return String is
+         F : File_Type;
+      begin
+         --  Only Linux provides this information, as the "high water mark"
+         --  for the resident set size of the process.
+
+         Open (F, In_File, "/proc/self/status");
+         while not End_Of_File (F) loop
+            declare
+               Prefix : constant String := "VmHWM:";
+               Line   : constant String := Get_Line (F);
+            begin
+               if Line'Length > Prefix'Length
+                  and then Line (Line'First .. Line'First + Prefix'Length - 1)
+                           = Prefix
+               then
+                  Close (F);
+                  return Ada.Strings.Fixed.Trim
+                    (Line (Line'First + Prefix'Length .. Line'Last), Both);
+               end if;
+            end;
+         end loop;
+         Close (F);
+         return "unknown";
+      exception
+         when Name_Error | Use_Error =>
+            return "unknown";
+      end Peak_Memory;
+
+      Time_Start : Time;
+      Elapsed    : Duration;
+      Total      : Batch_Stats;
+   begin
+      --  Gather the list of files to process
+
+      if Args.File_List.Get /= Null_Unbounded_String then
+         declare
+            F : File_Type;
+         begin
+            Open (F, In_File, To_String (Args.File_List.Get));
+            while not End_Of_File (F) loop
+               Files.Append (To_Unbounded_String (Get_Line (F)));
+            end loop;
+            Close (F);
+         end;
+      end if;
+      for File_Name of Args.File_Names.Get loop
+         Files.Append (File_Name);
+      end loop;
+
+      --  Process them with one analysis context per task
+
+      Time_Start := Clock;
+      declare
+         Workers : array (1 .. Args.Jobs.Get) of Worker;
+         pragma Unreferenced (Workers);
+      begin
+         --  Wait for all workers to complete
+         null;
+      end;
+      Elapsed := Clock - Time_Start;
+      Total := Queue.Total;
+
+      --  Print statistics. Throughputs are measured against the elapsed
+      --  (wall clock) time, while the breakdown of the time spent in each
+      --  phase is cumulated over all tasks.
+
+      declare
+         Phases_Time : constant Duration :=
+           Total.Lexing + Total.Parsing + Total.Env_Population;
+
+         procedure Put_Phase (Name : String; Phase_Time : Duration);
+         --  Print the time spent in the given phase
+
+         ---------------
+         -- Put_Phase --
+         ---------------
+
+         procedure Put_Phase (Name : String; Phase_Time : Duration) is
+         begin
+            Put_Line
+              ("  " & Name & ":" & Duration'Image (Phase_Time) & "s ("
+               & (if Phases_Time = 0.0
+                  then "n/a"
+                  else Image (Long_Long_Integer
+                                (100.0 * Long_Float (Phase_Time)
+                                 / Long_Float (Phases_Time))))
+               & "%)");
+         end Put_Phase;
+      begin
+         Put_Line
+           ("Files: " & Image (Long_Long_Integer (Total.Files)) & " ("
+            & Image (Long_Long_Integer (Total.Files_With_Diagnostics))
+            & " with diagnostics)");
+         Put_Line ("Tasks: " & Image (Long_Long_Integer (Args.Jobs.Get)));
+         Put_Line ("Elapsed time:" & Duration'Image (Elapsed) & "s");
+         Put_Line ("Throughput:");
+         Put_Line ("  " & Rate (Total.Bytes, Elapsed) & " bytes/s");
+         Put_Line ("  " & Rate (Total.Tokens, Elapsed) & " tokens/s");
+         Put_Line ("  " & Rate (Total.Nodes, Elapsed) & " nodes/s");
+         Put_Line ("Peak memory: " & Peak_Memory);
+         Put_Line ("Time per phase:");
+         Put_Phase ("lexing", Total.Lexing);
+         Put_Phase ("parsing", Total.Parsing);
+         Put_Phase ("env population", Total.Env_Population);
+      end;
+   end Process_Batch;
+
 begin
    if not Args.Parser.Parse then
       return;
    end if;
 
-   if Args.File_List.Get /= Null_Unbounded_String then
+   if Args.Jobs.Get > 0 then
+      Process_Batch;
+
+   elsif Args.File_List.Get /= Null_Unbounded_String then
       declare
          F   : File_Type;
          Ctx : constant Analysis_Context := Create_Parse_Context;
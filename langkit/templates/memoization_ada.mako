@@ -65,13 +65,53 @@ end record;
 
 function Hash (Key : Mmz_Key) return Hash_Type;
 function Equivalent (L, R : Mmz_Key) return Boolean;
+% if ctx.memoization_budget_enabled:
+
+type Mmz_Entry is record
+   Value : Mmz_Value;
+   --  Memoized value for the key of this entry
+
+   Referenced : Boolean;
+   --  Whether this entry was looked up since the last time the eviction clock
+   --  hand went over it (see Memoization_Table.Clock_Hand).
+end record;
+
+package Memoization_Maps is new Ada.Containers.Hashed_Maps
+  (Mmz_Key, Mmz_Entry, Hash, Equivalent_Keys => Equivalent);
+% else:
 
 package Memoization_Maps is new Ada.Containers.Hashed_Maps
   (Mmz_Key, Mmz_Value, Hash, Equivalent_Keys => Equivalent);
+% endif
 
 procedure Destroy (Map : in out Memoization_Maps.Map);
 --  Free all resources stored in a memoization map. This includes destroying
 --  ref-count shares the map owns.
+% if ctx.memoization_budget_enabled:
+
+Max_Memoization_Entries : constant := ${ctx.memoization_conf.max_entries};
+--  Maximum number of entries in the memoization table of an analysis unit
+
+type Memoization_Table is record
+   Map : Memoization_Maps.Map;
+   --  Mapping of arguments tuple to property result for memoization
+
+   Clock_Hand : Memoization_Maps.Cursor;
+   --  Next entry in Map to consider for eviction, or No_Element to start
+   --  over from the first entry in Map.
+
+   Eviction_Count : Long_Long_Integer := 0;
+   --  Number of entries evicted from Map since the creation of this table
+
+   Byte_Count : Long_Long_Integer := 0;
+   --  Approximate memory size for the entries in Map, in bytes
+end record;
+--  Memoization table whose size is bounded by Max_Memoization_Entries
+
+procedure Destroy (Table : in out Memoization_Table);
+--  Free all resources stored in Table's memoization map and reset its
+--  counters, except Eviction_Count, which accumulates across resets.
+% endif
 
 type Memoization_Handle is record
    Key : Mmz_Key;
@@ -85,6 +125,12 @@ type Memoization_Handle is record
    --  Version of the unit memoization table at the time Key/Cur were created.
    --  When using this record, if the version has changed, both Key and Cur are
    --  invalid and must be recomputed.
+   % if ctx.track_unit_dependencies:
+
+   Evaluation_Depth : Natural := 0;
+   --  Length of the context's stack of evaluated units before Key's property
+   --  was pushed on it (see Analysis_Context_Type.Evaluated_Units).
+   % endif
 end record;
 --  Wrapper for memoization state, to be used in memoized properties.
 --  Please use high-level functions below instead of accessing fields
@@ -142,11 +188,35 @@ with No_Return;
 <%
    key_types = ctx.sorted_types(ctx.memoization_keys)
    value_types = ctx.sorted_types(ctx.memoization_values)
+
+   bounded = ctx.memoization_budget_enabled
+   map_expr = ('Unit.Memoization_Map.Map'
+               if bounded else 'Unit.Memoization_Map')
+   value_field = '.Value' if bounded else ''
 %>
 
 function Hash (Key : Mmz_Key_Item) return Hash_Type;
 function Equivalent (L, R : Mmz_Key_Item) return Boolean;
 procedure Destroy (Key : in out Mmz_Key_Array_Access);
+% if bounded:
+procedure Free_Memoized_Value (Value : in out Mmz_Value);
+--  Free all resources that Value owns
+
+function Memoized_Key_Size (Key : Mmz_Key) return Long_Long_Integer;
+--  Approximate memory size for a memoization table entry with the given key,
+--  excluding resources that its value owns.
+
+function Memoized_Value_Size (Value : Mmz_Value) return Long_Long_Integer;
+--  Approximate memory size for resources that Value owns
+
+procedure Evict_Memoized_Values (Unit : Internal_Unit);
+--  While Unit's memoization table has more than Max_Memoization_Entries
+--  entries, evict entries following the CLOCK policy.
+% endif
+% if ctx.track_unit_dependencies:
+procedure Record_Key_Dependencies (Unit : Internal_Unit; Key : Mmz_Key);
+--  Record that Unit depends on the units of all nodes in Key
+% endif
 
 ----------------
 -- Equivalent --
@@ -253,7 +323,7 @@ procedure Destroy (Map : in out Memoization_Maps.Map) is
 begin
    for Cur in Map.Iterate loop
       Keys (I) := Key (Cur).Items;
-      Values (I) := Element (Cur);
+      Values (I) := Element (Cur)${value_field};
       I := I + 1;
    end loop;
 
@@ -308,6 +378,152 @@ begin
    Free (Key);
 end Destroy;
 
+% if bounded:
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Table : in out Memoization_Table) is
+begin
+   Destroy (Table.Map);
+   Table.Clock_Hand := Memoization_Maps.No_Element;
+   Table.Byte_Count := 0;
+end Destroy;
+
+-------------------------
+-- Free_Memoized_Value --
+-------------------------
+
+procedure Free_Memoized_Value (Value : in out Mmz_Value) is
+begin
+   case Value.Kind is
+      when Mmz_Error =>
+         Free_Memoized_Error (Value.Exc_Id, Value.Exc_Msg);
+
+      % for t in refcounted_value_types:
+         when ${t.memoization_kind} =>
+            Dec_Ref (Value.As_${t.name});
+      % endfor
+
+      when others => null;
+   end case;
+end Free_Memoized_Value;
+
+-----------------------
+-- Memoized_Key_Size --
+-----------------------
+
+function Memoized_Key_Size (Key : Mmz_Key) return Long_Long_Integer is
+begin
+   return Long_Long_Integer (Mmz_Key'Max_Size_In_Storage_Elements)
+          + Long_Long_Integer (Mmz_Entry'Max_Size_In_Storage_Elements)
+          + Long_Long_Integer (Key.Items'Length)
+            * Long_Long_Integer (Mmz_Key_Item'Max_Size_In_Storage_Elements);
+end Memoized_Key_Size;
+
+-------------------------
+-- Memoized_Value_Size --
+-------------------------
+
+function Memoized_Value_Size (Value : Mmz_Value) return Long_Long_Integer is
+begin
+   if Value.Kind = Mmz_Error then
+      return Long_Long_Integer (Value.Exc_Msg'Length);
+   else
+      return 0;
+   end if;
+end Memoized_Value_Size;
+
+---------------------------
+-- Evict_Memoized_Values --
+---------------------------
+
+procedure Evict_Memoized_Values (Unit : Internal_Unit) is
+   use Memoization_Maps;
+
+   Table : Memoization_Table renames Unit.Memoization_Map;
+
+   Steps : Natural := 2 * Natural (Table.Map.Length);
+   --  After two complete rounds of the clock hand, all entries that could be
+   --  evicted are gone: stop there in case only entries for properties that
+   --  are being evaluated remain.
+begin
+   while Natural (Table.Map.Length) > Max_Memoization_Entries
+         and then Steps > 0
+   loop
+      Steps := Steps - 1;
+      if not Has_Element (Table.Clock_Hand) then
+         Table.Clock_Hand := Table.Map.First;
+      end if;
+
+      declare
+         Cur : Cursor := Table.Clock_Hand;
+      begin
+         Next (Table.Clock_Hand);
+
+         if Table.Map.Constant_Reference (Cur).Referenced then
+
+            --  This entry was used recently: give it a second chance
+
+            Table.Map.Reference (Cur).Referenced := False;
+
+         elsif Table.Map.Constant_Reference (Cur).Value.Kind
+               /= Mmz_Evaluating
+         then
+            --  Memoized property calls that are being evaluated hold cursors
+            --  to their entries: we can evict only the other entries.
+
+            declare
+               Items : Mmz_Key_Array_Access := Key (Cur).Items;
+               Value : Mmz_Value := Element (Cur).Value;
+            begin
+               Table.Byte_Count :=
+                 Table.Byte_Count
+                 - Memoized_Key_Size (Key (Cur))
+                 - Memoized_Value_Size (Value);
+               Table.Map.Delete (Cur);
+               Destroy (Items);
+               Free_Memoized_Value (Value);
+               Table.Eviction_Count := Table.Eviction_Count + 1;
+            end;
+         end if;
+      end;
+   end loop;
+end Evict_Memoized_Values;
+
+% endif
+% if ctx.track_unit_dependencies:
+<%
+   node_key_types = [t for t in key_types if t.is_ast_node]
+   entity_key_types = [t for t in key_types if t.is_entity_type]
+%>
+-----------------------------
+-- Record_Key_Dependencies --
+-----------------------------
+
+procedure Record_Key_Dependencies (Unit : Internal_Unit; Key : Mmz_Key) is
+begin
+   for K of Key.Items.all loop
+      case K.Kind is
+         % for t in node_key_types:
+            when ${t.memoization_kind} =>
+               if K.As_${t.name} /= null then
+                  Record_Unit_Dependency (Unit, K.As_${t.name}.Unit);
+               end if;
+         % endfor
+         % for t in entity_key_types:
+            when ${t.memoization_kind} =>
+               if K.As_${t.name}.Node /= null then
+                  Record_Unit_Dependency (Unit, K.As_${t.name}.Node.Unit);
+               end if;
+         % endfor
+
+         when others => null;
+      end case;
+   end loop;
+end Record_Key_Dependencies;
+
+% endif
 -------------------------
 -- Find_Memoized_Value --
 -------------------------
@@ -328,15 +544,41 @@ begin
    Handle.Key := Create_Key.all;
    Handle.Cache_Version := Unit.Cache_Version;
    Value := (Kind => Mmz_Evaluating);
-   Unit.Memoization_Map.Insert (Handle.Key, Value, Handle.Cur, Inserted);
+   % if bounded:
+   ${map_expr}.Insert
+     (Handle.Key, (Value, Referenced => False), Handle.Cur, Inserted);
+   % else:
+   ${map_expr}.Insert (Handle.Key, Value, Handle.Cur, Inserted);
+   % endif
 
    --  No existing entry yet? The above just created one. Otherwise, destroy
    --  our key and reuse the existing entry's.
    if not Inserted then
       Destroy (Handle.Key.Items);
       Handle.Key := Memoization_Maps.Key (Handle.Cur);
-      Value := Memoization_Maps.Element (Handle.Cur);
+      Value := Memoization_Maps.Element (Handle.Cur)${value_field};
+      % if bounded:
+      ${map_expr}.Reference (Handle.Cur).Referenced := True;
+
+   --  Otherwise, make room for the new entry if the table is full
+   else
+      Unit.Memoization_Map.Byte_Count :=
+        Unit.Memoization_Map.Byte_Count + Memoized_Key_Size (Handle.Key);
+      Evict_Memoized_Values (Unit);
+      % endif
+   end if;
+   % if ctx.track_unit_dependencies:
+
+   --  Whatever is being evaluated now reads data from Unit. Then, if we are
+   --  about to evaluate this property, track the units it reads data from,
+   --  starting with the units of the nodes in its key.
+   Record_Unit_Read (Unit);
+   if Inserted then
+      Handle.Evaluation_Depth := Unit.Context.Evaluated_Units.Length;
+      Unit.Context.Evaluated_Units.Append (Unit);
+      Record_Key_Dependencies (Unit, Handle.Key);
    end if;
+   % endif
 
    return not Inserted;
 end Find_Memoized_Value;
@@ -357,8 +599,24 @@ begin
 
    Stored := Unit.Cache_Version <= Handle.Cache_Version;
    if Stored then
-      Unit.Memoization_Map.Replace_Element (Handle.Cur, Value);
+      % if bounded:
+      ${map_expr}.Replace_Element
+        (Handle.Cur, (Value, Referenced => False));
+      Unit.Memoization_Map.Byte_Count :=
+        Unit.Memoization_Map.Byte_Count + Memoized_Value_Size (Value);
+      % else:
+      ${map_expr}.Replace_Element (Handle.Cur, Value);
+      % endif
+   end if;
+   % if ctx.track_unit_dependencies:
+
+   --  The evaluation of this property is over: pop its unit from the stack
+   --  of evaluated units, as well as the units of evaluations that
+   --  non-property exceptions may have aborted.
+   if Unit.Context.Evaluated_Units.Length > Handle.Evaluation_Depth then
+      Unit.Context.Evaluated_Units.Cut (Handle.Evaluation_Depth);
    end if;
+   % endif
 end Add_Memoized_Value;
 
 ------------------------
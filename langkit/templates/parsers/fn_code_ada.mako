@@ -3,13 +3,20 @@
 <%
 ret_type = parser.type.storage_type_name
 memo = 'PP.{}_Memo'.format(parser.gen_fn_name)
+with_stats = (
+   ctx.parsing_statistics
+   and parser.memo_size
+   and parser.name in ctx.grammar.user_defined_rules_indexes
+)
 %>
 
 function ${parser.gen_fn_name}
   (Parser : in out Parser_Type;
    Pos    : Token_Index) return ${ret_type}
 is
-   use ${ret_type}_Memos;
+   % if parser.memo_size:
+   use ${parser.memo_package};
+   % endif
 
    % for name, typ in var_context:
       ${name} :
@@ -29,9 +36,27 @@ is
    % endif
 
    PP : constant Parser_Private_Part := +Parser.Private_Part;
+   % if parser.memo_size:
    M  : Memo_Entry := Get (${memo}, Pos);
+   % if with_stats:
+   Stats : Parsing_Rule_Statistics renames
+     PP.Statistics (${ctx.grammar_rule_api_name(parser.name)});
+   % endif
+   % else:
+   pragma Warnings (Off, PP);
+   --  Without memoization table, only some parsers use PP
+   % endif
 
 begin
+   % if parser.memo_size:
+   % if with_stats:
+   if M.State = No_Result then
+      Stats.Memo_Misses := Stats.Memo_Misses + 1;
+   else
+      Stats.Memo_Hits := Stats.Memo_Hits + 1;
+   end if;
+
+   % endif
    if M.State = Success then
       Parser.Current_Pos := M.Final_Pos;
       ${parser.res_var} := M.Instance;
@@ -40,6 +65,7 @@ begin
       Parser.Current_Pos := No_Token_Index;
       return ${parser.res_var};
    end if;
+   % endif
 
    % if parser.is_left_recursive():
        Set (${memo}, False, ${parser.res_var}, Pos, Mem_Pos);
@@ -84,12 +110,14 @@ begin
       end if;
    % endif
 
+   % if parser.memo_size:
    Set
      (${memo},
       ${parser.pos_var} /= No_Token_Index,
       ${parser.res_var},
       Pos,
       ${parser.pos_var});
+   % endif
 
    % if parser.is_left_recursive():
        <<No_Memo>>
@@ -30,7 +30,15 @@ pragma Warnings (On, "referenced");
 with ${ada_lib_name}.Implementation.Extensions;
 % endif
 
-<% sorted_fns = sorted(ctx.fns, key=lambda f: f.gen_fn_name) %>
+<%
+   sorted_fns = sorted(ctx.fns, key=lambda f: f.gen_fn_name)
+   memoized_fns = [f for f in sorted_fns if f.memo_size]
+
+   # Packrat instantiations for memoization tables with a non-default size
+   custom_memos = {
+      f.memo_package: f for f in memoized_fns if f.has_custom_memo_size
+   }
+%>
 
 package body ${ada_lib_name}.Parsers_Impl is
    pragma Warnings (Off, "use clause");
@@ -78,6 +86,10 @@ package body ${ada_lib_name}.Parsers_Impl is
 
       % endif
    % endfor
+   % for pkg, fn in sorted(custom_memos.items()):
+      package ${pkg} is new Langkit_Support.Packrat
+        (${fn.type.storage_type_name}, Token_Index, ${fn.memo_size});
+   % endfor
    pragma Warnings (On, "is not referenced");
 
    type Dontskip_Parser_Function is access function
@@ -99,12 +111,17 @@ package body ${ada_lib_name}.Parsers_Impl is
    type Parser_Private_Part_Type is record
       Parse_Lists : Free_Parse_List;
 
-      % for parser in sorted_fns:
-      <% ret_type = parser.type.storage_type_name %>
-      ${parser.gen_fn_name}_Memo : ${ret_type}_Memos.Memo_Type;
+      % for parser in memoized_fns:
+      ${parser.gen_fn_name}_Memo : ${parser.memo_package}.Memo_Type;
       % endfor
 
       Dont_Skip : Dont_Skip_Fn_Vectors.Vector;
+      % if ctx.parsing_statistics:
+
+      Statistics : Parsing_Statistics;
+      --  Hit/miss counters for the memoization tables of parsing rules. Unlike
+      --  memoization tables, they are preserved across parsing sessions.
+      % endif
    end record;
    type Parser_Private_Part is access all Parser_Private_Part_Type;
    pragma No_Strict_Aliasing (Parser_Private_Part);
@@ -305,10 +322,33 @@ package body ${ada_lib_name}.Parsers_Impl is
 
       --  Reset the memo tables in the private part
       PP := +Parser.Private_Part;
-      % for fn in sorted_fns:
-         ${fn.type.storage_type_name}_Memos.Clear (PP.${fn.gen_fn_name}_Memo);
+      % for fn in memoized_fns:
+         ${fn.memo_package}.Clear (PP.${fn.gen_fn_name}_Memo);
       % endfor
    end Reset;
+   % if ctx.parsing_statistics:
+
+   --------------------
+   -- Get_Statistics --
+   --------------------
+
+   function Get_Statistics (Parser : Parser_Type) return Parsing_Statistics
+   is
+      PP : constant Parser_Private_Part := +Parser.Private_Part;
+   begin
+      return PP.Statistics;
+   end Get_Statistics;
+
+   ----------------------
+   -- Reset_Statistics --
+   ----------------------
+
+   procedure Reset_Statistics (Parser : in out Parser_Type) is
+      PP : constant Parser_Private_Part := +Parser.Private_Part;
+   begin
+      PP.Statistics := (others => <>);
+   end Reset_Statistics;
+   % endif
 
    -------------
    -- Destroy --
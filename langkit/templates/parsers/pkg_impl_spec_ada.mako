@@ -36,5 +36,14 @@ private package ${ada_lib_name}.Parsers_Impl is
 
    procedure Destroy (Parser : in out Parser_Type)
    with Export, External_Name => "${ada_lib_name}__destroy_parser";
+   % if ctx.parsing_statistics:
+
+   function Get_Statistics (Parser : Parser_Type) return Parsing_Statistics
+   with Export, External_Name => "${ada_lib_name}__get_parsing_statistics";
+
+   procedure Reset_Statistics (Parser : in out Parser_Type)
+   with Export,
+        External_Name => "${ada_lib_name}__reset_parsing_statistics";
+   % endif
 
 end ${ada_lib_name}.Parsers_Impl;
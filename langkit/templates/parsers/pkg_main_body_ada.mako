@@ -61,5 +61,26 @@ package body ${ada_lib_name}.Parsers is
    begin
       Parsers_Impl.Destroy (Parser);
    end Destroy;
+   % if ctx.parsing_statistics:
+
+   --------------------
+   -- Get_Statistics --
+   --------------------
+
+   function Get_Statistics (Parser : Parser_Type) return Parsing_Statistics
+   is
+   begin
+      return Parsers_Impl.Get_Statistics (Parser);
+   end Get_Statistics;
+
+   ----------------------
+   -- Reset_Statistics --
+   ----------------------
+
+   procedure Reset_Statistics (Parser : in out Parser_Type) is
+   begin
+      Parsers_Impl.Reset_Statistics (Parser);
+   end Reset_Statistics;
+   % endif
 
 end ${ada_lib_name}.Parsers;
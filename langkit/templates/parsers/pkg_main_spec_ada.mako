@@ -89,5 +89,14 @@ private package ${ada_lib_name}.Parsers is
 
    procedure Destroy (Parser : in out Parser_Type);
    --  Destroy resources associated with the parser
+   % if ctx.parsing_statistics:
+
+   function Get_Statistics (Parser : Parser_Type) return Parsing_Statistics;
+   --  Return memoization counters for all parsing sessions since the parser
+   --  was initialized, or since the last call to Reset_Statistics.
+
+   procedure Reset_Statistics (Parser : in out Parser_Type);
+   --  Reset memoization counters for all parsing rules
+   % endif
 
 end ${ada_lib_name}.Parsers;
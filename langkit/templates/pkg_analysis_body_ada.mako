@@ -319,6 +319,20 @@ package body ${ada_lib_name}.Analysis is
         (Unwrap_Context (Context), Discard);
    end Discard_Errors_In_Populate_Lexical_Env;
 
+   -----------------------
+   -- Get_Parsing_Times --
+   -----------------------
+
+   procedure Get_Parsing_Times
+     (Context : Analysis_Context'Class; Lexing, Parsing : out Duration) is
+   begin
+      if Context.Internal = null then
+         raise Precondition_Failure with "null context argument";
+      end if;
+
+      Get_Parsing_Times (Unwrap_Context (Context), Lexing, Parsing);
+   end Get_Parsing_Times;
+
    ----------------------------------
    -- Set_Logic_Resolution_Timeout --
    ----------------------------------
@@ -355,6 +369,67 @@ package body ${ada_lib_name}.Analysis is
 
       return Has_Rewriting_Handle (Unwrap_Context (Context));
    end Has_Rewriting_Handle;
+   % if ctx.parsing_statistics:
+
+   ----------------------------
+   -- Get_Parsing_Statistics --
+   ----------------------------
+
+   function Get_Parsing_Statistics
+     (Context : Analysis_Context'Class) return Parsing_Statistics is
+   begin
+      if Context.Internal = null then
+         raise Precondition_Failure with "null context argument";
+      end if;
+
+      return Get_Parsing_Statistics (Unwrap_Context (Context));
+   end Get_Parsing_Statistics;
+
+   ------------------------------
+   -- Reset_Parsing_Statistics --
+   ------------------------------
+
+   procedure Reset_Parsing_Statistics (Context : Analysis_Context'Class) is
+   begin
+      if Context.Internal = null then
+         raise Precondition_Failure with "null context argument";
+      end if;
+
+      Reset_Parsing_Statistics (Unwrap_Context (Context));
+   end Reset_Parsing_Statistics;
+   % endif
+   % if ctx.memoization_budget_enabled:
+
+   --------------------------------
+   -- Get_Memoization_Statistics --
+   --------------------------------
+
+   function Get_Memoization_Statistics
+     (Context : Analysis_Context'Class) return Memoization_Statistics is
+   begin
+      if Context.Internal = null then
+         raise Precondition_Failure with "null context argument";
+      end if;
+
+      return Get_Memoization_Statistics (Unwrap_Context (Context));
+   end Get_Memoization_Statistics;
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   -------------------------------
+   -- Get_Env_Caches_Statistics --
+   -------------------------------
+
+   function Get_Env_Caches_Statistics
+     (Context : Analysis_Context'Class) return Env_Caches_Statistics is
+   begin
+      if Context.Internal = null then
+         raise Precondition_Failure with "null context argument";
+      end if;
+
+      return Get_Env_Caches_Statistics (Unwrap_Context (Context));
+   end Get_Env_Caches_Statistics;
+   % endif
 
    ----------------------
    -- Get_Symbol_Table --
@@ -567,6 +642,38 @@ package body ${ada_lib_name}.Analysis is
 
       return Trivia_Count (Unwrap_Unit (Unit));
    end Trivia_Count;
+   % if ctx.memoization_budget_enabled:
+
+   --------------------------------
+   -- Get_Memoization_Statistics --
+   --------------------------------
+
+   function Get_Memoization_Statistics
+     (Unit : Analysis_Unit'Class) return Memoization_Statistics is
+   begin
+      if Unit.Internal = null then
+         raise Precondition_Failure with "null unit argument";
+      end if;
+
+      return Get_Memoization_Statistics (Unwrap_Unit (Unit));
+   end Get_Memoization_Statistics;
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   -------------------------------
+   -- Get_Env_Caches_Statistics --
+   -------------------------------
+
+   function Get_Env_Caches_Statistics
+     (Unit : Analysis_Unit'Class) return Env_Caches_Statistics is
+   begin
+      if Unit.Internal = null then
+         raise Precondition_Failure with "null unit argument";
+      end if;
+
+      return Get_Env_Caches_Statistics (Unwrap_Unit (Unit));
+   end Get_Env_Caches_Statistics;
+   % endif
 
    ----------
    -- Unit --
@@ -344,6 +344,12 @@ package ${ada_lib_name}.Analysis is
      (Context : Analysis_Context'Class; Discard : Boolean);
    ${ada_doc('langkit.context_discard_errors_in_populate_lexical_env', 3)}
 
+   procedure Get_Parsing_Times
+     (Context : Analysis_Context'Class; Lexing, Parsing : out Duration);
+   --  Return the cumulated time spent lexing (including reading and decoding
+   --  source buffers) and parsing analysis units in ``Context`` since its
+   --  creation. This is mainly useful to profile parsers.
+
    procedure Set_Logic_Resolution_Timeout
      (Context : Analysis_Context'Class; Timeout : Natural);
    ${ada_doc('langkit.context_set_logic_resolution_timeout', 3)}
@@ -358,6 +364,34 @@ package ${ada_lib_name}.Analysis is
    --  ``${ada_lib_name}.Rewriting``), i.e. whether it is in the process of
    --  rewriting. If true, this means that the set of currently loaded analysis
    --  units is frozen until the rewriting process is done.
+   % if ctx.parsing_statistics:
+
+   function Get_Parsing_Statistics
+     (Context : Analysis_Context'Class) return Parsing_Statistics;
+   --  Return, for each grammar rule, how many times its parsing function
+   --  found (hits) or did not find (misses) its result in its memoization
+   --  table. These counters accumulate across all the parsing sessions for
+   --  ``Context`` since its creation or since the last call to
+   --  ``Reset_Parsing_Statistics``.
+
+   procedure Reset_Parsing_Statistics (Context : Analysis_Context'Class);
+   --  Reset all the parsing statistics counters for ``Context``
+   % endif
+   % if ctx.memoization_budget_enabled:
+
+   function Get_Memoization_Statistics
+     (Context : Analysis_Context'Class) return Memoization_Statistics;
+   --  Return counters for the memoization tables of all the analysis units in
+   --  ``Context``. Note that eviction counts for units that were removed from
+   --  ``Context`` are not included.
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   function Get_Env_Caches_Statistics
+     (Context : Analysis_Context'Class) return Env_Caches_Statistics;
+   --  Return counters for the lexical env caches of all analysis units in
+   --  ``Context``, and for their automatic collection.
+   % endif
 
    function Get_Symbol_Table
      (Context : Analysis_Context'Class) return Symbol_Table;
@@ -427,6 +461,19 @@ package ${ada_lib_name}.Analysis is
 
    function Trivia_Count (Unit : Analysis_Unit'Class) return Natural;
    ${ada_doc('langkit.unit_trivia_count', 3)}
+   % if ctx.memoization_budget_enabled:
+
+   function Get_Memoization_Statistics
+     (Unit : Analysis_Unit'Class) return Memoization_Statistics;
+   --  Return counters for the memoization table of ``Unit``. Eviction counts
+   --  accumulate since the creation of ``Unit``.
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   function Get_Env_Caches_Statistics
+     (Unit : Analysis_Unit'Class) return Env_Caches_Statistics;
+   --  Return counters for the lexical env caches of ``Unit``
+   % endif
 
    function Unit (Token : Token_Reference) return Analysis_Unit;
    --  Return the analysis unit that owns ``Token``
@@ -296,7 +296,7 @@ package body ${ada_lib_name}.Common is
       if Token.TDH = null then
          raise Precondition_Failure with "null token argument";
       end if;
-      return Token.TDH.Source_Buffer (RD.Source_First .. RD.Source_Last);
+      return Source_Text (Token.TDH.all, RD.Source_First, RD.Source_Last);
    end Text;
 
    ----------
@@ -304,7 +304,7 @@ package body ${ada_lib_name}.Common is
    ----------
 
    function Text (First, Last : Token_Reference) return Text_Type is
-      FD, LD : Token_Data_Type;
+      FD, LD : Stored_Token_Data;
    begin
       Check_Safety_Net (First);
       Check_Safety_Net (Last);
@@ -315,9 +315,9 @@ package body ${ada_lib_name}.Common is
          raise Precondition_Failure with
             "token arguments must belong to the same source";
       end if;
-      FD := Data (First);
-      LD := Data (Last);
-      return FD.Source_Buffer.all (FD.Source_First .. LD.Source_Last);
+      FD := Raw_Data (First);
+      LD := Raw_Data (Last);
+      return Source_Text (First.TDH.all, FD.Source_First, LD.Source_Last);
    end Text;
 
    ----------
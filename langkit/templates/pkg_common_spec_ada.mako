@@ -121,6 +121,65 @@ package ${ada_lib_name}.Common is
 
    Default_Grammar_Rule : constant Grammar_Rule := ${ctx.main_rule_api_name};
    --  Default grammar rule to use when parsing analysis units
+   % if ctx.parsing_statistics:
+
+   type Parsing_Rule_Statistics is record
+      Memo_Hits : Long_Long_Integer := 0;
+      --  Number of times the parsing function for this rule found its result
+      --  in its memoization table.
+
+      Memo_Misses : Long_Long_Integer := 0;
+      --  Number of times the parsing function for this rule had to actually
+      --  parse, as its memoization table had no result.
+   end record;
+   --  Counters for the memoization table of a grammar rule. Note that parsing
+   --  rules with no memoization table (see the ``memo_size`` annotation) have
+   --  no hits nor misses.
+
+   type Parsing_Statistics is array (Grammar_Rule) of Parsing_Rule_Statistics;
+   % endif
+   % if ctx.memoization_budget_enabled:
+
+   type Memoization_Statistics is record
+      Entry_Count : Long_Long_Integer := 0;
+      --  Number of entries in memoization tables for properties
+
+      Eviction_Count : Long_Long_Integer := 0;
+      --  Number of entries that were evicted from memoization tables to keep
+      --  them under their size limit.
+
+      Byte_Count : Long_Long_Integer := 0;
+      --  Approximate memory size for the entries in memoization tables, in
+      --  bytes. This does not include memory for the data that memoized
+      --  values reference, such as array contents.
+   end record;
+   --  Counters for the memoization tables of properties
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   type Env_Caches_Statistics is record
+      Entry_Count : Long_Long_Integer := 0;
+      --  Number of entries in lexical env caches
+
+      Lookup_Count : Long_Long_Integer := 0;
+      --  Number of lookups in lexical env caches
+
+      Hit_Count : Long_Long_Integer := 0;
+      --  Number of lookups in lexical env caches that found an entry
+
+      Collection_Count : Long_Long_Integer := 0;
+      --  For analysis contexts, number of attempted cache collections. For
+      --  analysis units, number of times their caches were collected.
+
+      Collection_Threshold : Long_Long_Integer := 0;
+      --  For analysis contexts, number of cache entries that will trigger the
+      --  next collection attempt. Always 0 for analysis units.
+   end record;
+   --  Counters for lexical env caches and their automatic collection. For
+   --  analysis contexts, lookup and hit counts accumulate since the creation
+   --  of the context. For analysis units, they accumulate since the last
+   --  collection of their caches.
+   % endif
 
    ------------------
    -- Lexer inputs --
@@ -357,7 +416,9 @@ private
       --  See documentation for the Index accessor
 
       Source_Buffer : Text_Cst_Access;
-      --  Text for the original source file
+      --  Text for the original source file. Null if the token data handler
+      --  stores it in compact form (see
+      --  ``Langkit_Support.Token_Data_Handlers.Compact``).
 
       Source_First : Positive;
       Source_Last  : Natural;
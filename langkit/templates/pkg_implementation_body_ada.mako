@@ -15,6 +15,7 @@ with Ada.Containers.Vectors;
 with Ada.Directories;
 with Ada.Exceptions;
 with Ada.Finalization;
+with Ada.Real_Time;                   use type Ada.Real_Time.Time;
 with Ada.Strings.Unbounded;           use Ada.Strings.Unbounded;
 with Ada.Strings.Wide_Wide_Unbounded; use Ada.Strings.Wide_Wide_Unbounded;
 
@@ -58,6 +59,10 @@ ${exts.with_clauses(with_clauses + [
    ((ctx.cache_collection_conf.decision_heuristic.unit_fqn, False, False)
     if ctx.cache_collection_enabled
        and ctx.cache_collection_conf.decision_heuristic
+    else None),
+   (("Ada.Containers.Generic_Array_Sort", False, False)
+    if ctx.cache_collection_enabled
+       and ctx.cache_collection_conf.builtin_heuristic
     else None)
 ])}
 pragma Warnings (On, "referenced");
@@ -145,6 +150,12 @@ package body ${ada_lib_name}.Implementation is
 
    procedure Reset_Envs_Caches (Unit : Internal_Unit);
    --  Reset the env caches of all lexical environments created for ``Unit``
+   % if ctx.cache_collection_enabled:
+
+   procedure Collect_Env_Caches (Unit : Internal_Unit);
+   --  Reset the env caches of ``Unit`` and its counters that track events
+   --  since its last collection.
+   % endif
 
    procedure Destroy (Env : in out Lexical_Env_Access);
 
@@ -479,6 +490,8 @@ package body ${ada_lib_name}.Implementation is
       % endif
 
       Initialize (Context.Parser);
+      Context.Lexing_Time := 0.0;
+      Context.Parsing_Time := 0.0;
 
       Context.Discard_Errors_In_Populate_Lexical_Env := True;
       Context.Logic_Resolution_Timeout :=
@@ -870,6 +883,17 @@ package body ${ada_lib_name}.Implementation is
       Context.Discard_Errors_In_Populate_Lexical_Env := Discard;
    end Discard_Errors_In_Populate_Lexical_Env;
 
+   -----------------------
+   -- Get_Parsing_Times --
+   -----------------------
+
+   procedure Get_Parsing_Times
+     (Context : Internal_Context; Lexing, Parsing : out Duration) is
+   begin
+      Lexing := Context.Lexing_Time;
+      Parsing := Context.Parsing_Time;
+   end Get_Parsing_Times;
+
    ----------------------------------
    -- Set_Logic_Resolution_Timeout --
    ----------------------------------
@@ -888,6 +912,104 @@ package body ${ada_lib_name}.Implementation is
    begin
       return Context.Rewriting_Handle /= No_Rewriting_Handle_Pointer;
    end Has_Rewriting_Handle;
+   % if ctx.parsing_statistics:
+
+   ----------------------------
+   -- Get_Parsing_Statistics --
+   ----------------------------
+
+   function Get_Parsing_Statistics
+     (Context : Internal_Context) return Parsing_Statistics is
+   begin
+      return Get_Statistics (Context.Parser);
+   end Get_Parsing_Statistics;
+
+   ------------------------------
+   -- Reset_Parsing_Statistics --
+   ------------------------------
+
+   procedure Reset_Parsing_Statistics (Context : Internal_Context) is
+   begin
+      Reset_Statistics (Context.Parser);
+   end Reset_Parsing_Statistics;
+   % endif
+   % if ctx.memoization_budget_enabled:
+
+   --------------------------------
+   -- Get_Memoization_Statistics --
+   --------------------------------
+
+   function Get_Memoization_Statistics
+     (Context : Internal_Context) return Memoization_Statistics
+   is
+      Result : Memoization_Statistics;
+   begin
+      for Unit of Context.Units loop
+         declare
+            S : constant Memoization_Statistics :=
+              Get_Memoization_Statistics (Unit);
+         begin
+            Result.Entry_Count := Result.Entry_Count + S.Entry_Count;
+            Result.Eviction_Count := Result.Eviction_Count + S.Eviction_Count;
+            Result.Byte_Count := Result.Byte_Count + S.Byte_Count;
+         end;
+      end loop;
+      return Result;
+   end Get_Memoization_Statistics;
+
+   --------------------------------
+   -- Get_Memoization_Statistics --
+   --------------------------------
+
+   function Get_Memoization_Statistics
+     (Unit : Internal_Unit) return Memoization_Statistics
+   is
+      Table : Memoization_Table renames Unit.Memoization_Map;
+   begin
+      --  Make sure that we do not count entries from stale caches
+
+      Reset_Caches (Unit);
+
+      return (Entry_Count    => Long_Long_Integer (Table.Map.Length),
+              Eviction_Count => Table.Eviction_Count,
+              Byte_Count     => Table.Byte_Count);
+   end Get_Memoization_Statistics;
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   -------------------------------
+   -- Get_Env_Caches_Statistics --
+   -------------------------------
+
+   function Get_Env_Caches_Statistics
+     (Context : Internal_Context) return Env_Caches_Statistics
+   is
+      Stats : Context_Env_Caches_Stats renames Context.Env_Caches_Stats;
+   begin
+      return (Entry_Count          => Stats.Entry_Count,
+              Lookup_Count         => Stats.Lookup_Count,
+              Hit_Count            => Stats.Hit_Count,
+              Collection_Count     => Stats.Collection_Count,
+              Collection_Threshold =>
+                Context.Env_Caches_Collection_Threshold);
+   end Get_Env_Caches_Statistics;
+
+   -------------------------------
+   -- Get_Env_Caches_Statistics --
+   -------------------------------
+
+   function Get_Env_Caches_Statistics
+     (Unit : Internal_Unit) return Env_Caches_Statistics
+   is
+      Stats : Unit_Env_Caches_Stats renames Unit.Env_Caches_Stats;
+   begin
+      return (Entry_Count          => Stats.Entry_Count,
+              Lookup_Count         => Stats.Lookup_Count,
+              Hit_Count            => Stats.Hit_Count,
+              Collection_Count     => Stats.Collection_Count,
+              Collection_Threshold => 0);
+   end Get_Env_Caches_Statistics;
+   % endif
 
    -------------
    -- Inc_Ref --
@@ -957,6 +1079,9 @@ package body ${ada_lib_name}.Implementation is
          end loop;
          AR.Destroy;
       end;
+      % if ctx.track_unit_dependencies:
+         Context.Evaluated_Units.Destroy;
+      % endif
 
       for Pos in Context.Unit_Provider_Cache.Iterate loop
          declare
@@ -1053,6 +1178,23 @@ package body ${ada_lib_name}.Implementation is
    begin
       Internal (Unit.Ast_Root);
    end Reset_Envs_Caches;
+   % if ctx.cache_collection_enabled:
+
+   ------------------------
+   -- Collect_Env_Caches --
+   ------------------------
+
+   procedure Collect_Env_Caches (Unit : Internal_Unit) is
+      Stats : Unit_Env_Caches_Stats renames Unit.Env_Caches_Stats;
+   begin
+      Reset_Envs_Caches (Unit);
+      Stats.Lookup_Count := 0;
+      Stats.Hit_Count := 0;
+      Stats.Last_Overall_Lookup_Count :=
+        Unit.Context.Env_Caches_Stats.Lookup_Count;
+      Stats.Collection_Count := Stats.Collection_Count + 1;
+   end Collect_Env_Caches;
+   % endif
 
    --------------------------
    -- Populate_Lexical_Env --
@@ -1970,6 +2112,12 @@ package body ${ada_lib_name}.Implementation is
             end;
          end;
          Value.Unit.Exiled_Entries_In_NED.Append ((Dest_NED, Key, Value));
+         % if ctx.track_unit_dependencies:
+            if Actual_Dest_Env.Owner /= No_Generic_Unit then
+               Record_Unit_Dependency
+                 (Convert_Unit (Actual_Dest_Env.Owner), Value.Unit);
+            end if;
+         % endif
 
       --  Otherwise, if we're adding the element to an environment that belongs
       --  to a different unit, or to the root scope, then...
@@ -1984,6 +2132,12 @@ package body ${ada_lib_name}.Implementation is
             --  Add_To_Env again on those nodes.
             Convert_Unit (Actual_Dest_Env.Owner).Foreign_Nodes.Append
               ((Value, Self.Unit));
+            % if ctx.track_unit_dependencies:
+
+               --  Lookups in Actual_Dest_Env now read data from Value's unit
+               Record_Unit_Dependency
+                 (Convert_Unit (Actual_Dest_Env.Owner), Value.Unit);
+            % endif
          end if;
       end if;
    end Add_To_Env;
@@ -2860,6 +3014,42 @@ package body ${ada_lib_name}.Implementation is
    end Register_Rebinding;
 
    % if ctx.cache_collection_enabled:
+      % if ctx.cache_collection_conf.builtin_heuristic:
+
+      type Unit_Array is array (Positive range <>) of Internal_Unit;
+      type Unit_Array_Access is access Unit_Array;
+      procedure Free is new Ada.Unchecked_Deallocation
+        (Unit_Array, Unit_Array_Access);
+
+      % if ctx.cache_collection_conf.builtin_heuristic == "lru":
+      function Collect_First (Left, Right : Internal_Unit) return Boolean
+      is (Left.Env_Caches_Stats.Last_Lookup
+          < Right.Env_Caches_Stats.Last_Lookup);
+      --  Return whether the caches of ``Left`` were looked up less recently
+      --  than the caches of ``Right``.
+      % else:
+      function Hit_Ratio (Unit : Internal_Unit) return Long_Float
+      is (if Unit.Env_Caches_Stats.Lookup_Count = 0
+          then 0.0
+          else Long_Float (Unit.Env_Caches_Stats.Hit_Count)
+               / Long_Float (Unit.Env_Caches_Stats.Lookup_Count));
+      --  Return the ratio of hits per lookup in the caches of ``Unit`` since
+      --  their last collection.
+
+      function Collect_First (Left, Right : Internal_Unit) return Boolean
+      is (Hit_Ratio (Left) < Hit_Ratio (Right));
+      --  Return whether the caches of ``Left`` have a lower hit ratio than
+      --  the caches of ``Right``.
+      % endif
+
+      procedure Sort_For_Collection is new Ada.Containers.Generic_Array_Sort
+        (Index_Type   => Positive,
+         Element_Type => Internal_Unit,
+         Array_Type   => Unit_Array,
+         "<"          => Collect_First);
+      --  Sort units so that the ones whose caches must be collected first
+      --  come first.
+      % endif
 
       -------------------------------
       -- Lexical_Env_Cache_Updated --
@@ -2883,6 +3073,23 @@ package body ${ada_lib_name}.Implementation is
            All_Env_Caches_Entry_Count + Delta_Amount;
          Node.Unit.Env_Caches_Stats.Entry_Count :=
            Node.Unit.Env_Caches_Stats.Entry_Count + Delta_Amount;
+         % if ctx.cache_collection_conf.max_unit_entries:
+
+         --  If the caches of this unit have grown too big, collect them right
+         --  away.
+         if Delta_Amount > 0
+            and then Node.Unit.Env_Caches_Stats.Entry_Count
+                     > ${ctx.cache_collection_conf.max_unit_entries}
+         then
+            if Cache_Invalidation_Trace.Is_Active then
+               Cache_Invalidation_Trace.Trace
+                 ("Collecting caches of unit " & Trace_Image (Node.Unit)
+                  & " because its number of entries reached"
+                  & Node.Unit.Env_Caches_Stats.Entry_Count'Image);
+            end if;
+            Collect_Env_Caches (Node.Unit);
+         end if;
+         % endif
 
          --  If the number of entries exceeds the threshold we had set, attempt
          --  to invalidate caches. Don't do anything if this notification was
@@ -2897,7 +3104,46 @@ package body ${ada_lib_name}.Implementation is
                   & " reached" & All_Env_Caches_Entry_Count'Image);
                Cache_Invalidation_Trace.Increase_Indent;
             end if;
+            Ctx_Stats.Collection_Count := Ctx_Stats.Collection_Count + 1;
+
+            % if ctx.cache_collection_conf.builtin_heuristic:
+            declare
+               Units : Unit_Array_Access :=
+                 new Unit_Array (1 .. Natural (Ctx.Units.Length));
+               Last  : Natural := 0;
+
+               Target : constant Long_Long_Integer :=
+                 All_Env_Caches_Entry_Count / 2;
+               --  Stop collecting caches as soon as the number of entries is
+               --  back to this.
+            begin
+               --  Consider only units that have cache entries, in the order
+               --  that the heuristic determines.
+
+               for Unit of Ctx.Units loop
+                  if Unit.Env_Caches_Stats.Entry_Count > 0 then
+                     Last := Last + 1;
+                     Units (Last) := Unit;
+                  end if;
+               end loop;
+               Sort_For_Collection (Units (1 .. Last));
+
+               for Unit of Units (1 .. Last) loop
+                  exit when Ctx_Stats.Entry_Count <= Target;
+                  if Cache_Invalidation_Trace.Is_Active then
+                     Cache_Invalidation_Trace.Trace
+                       ("Collecting caches of unit " & Trace_Image (Unit));
+                  end if;
+                  Collect_Env_Caches (Unit);
+               end loop;
+               Free (Units);
 
+               for Unit of Ctx.Units loop
+                  Unit.Env_Caches_Stats.Previous_Lookup_Count :=
+                    Unit.Env_Caches_Stats.Lookup_Count;
+               end loop;
+            end;
+            % else:
             for Unit of Ctx.Units loop
                % if ctx.cache_collection_conf.decision_heuristic:
                if ${ctx.cache_collection_conf.decision_heuristic.fqn}
@@ -2906,17 +3152,14 @@ package body ${ada_lib_name}.Implementation is
                % endif
                   --  Clear all caches and set counters that are meant to
                   --  track events since the unit's last collection.
-                  Reset_Envs_Caches (Unit);
-                  Unit.Env_Caches_Stats.Lookup_Count := 0;
-                  Unit.Env_Caches_Stats.Hit_Count := 0;
-                  Unit.Env_Caches_Stats.Last_Overall_Lookup_Count :=
-                    Ctx_Stats.Lookup_Count;
+                  Collect_Env_Caches (Unit);
                % if ctx.cache_collection_conf.decision_heuristic:
                end if;
                % endif
                Unit.Env_Caches_Stats.Previous_Lookup_Count :=
                  Unit.Env_Caches_Stats.Lookup_Count;
             end loop;
+            % endif
 
             Ctx_Stats.Previous_Lookup_Count := Ctx_Stats.Lookup_Count;
 
@@ -2950,6 +3193,8 @@ package body ${ada_lib_name}.Implementation is
 
          Ctx.Env_Caches_Stats.Lookup_Count :=
             Ctx.Env_Caches_Stats.Lookup_Count + 1;
+         Unit.Env_Caches_Stats.Last_Lookup :=
+            Ctx.Env_Caches_Stats.Lookup_Count;
       end Lexical_Env_Cache_Looked_Up;
 
       ---------------------------
@@ -2958,12 +3203,35 @@ package body ${ada_lib_name}.Implementation is
 
       procedure Lexical_Env_Cache_Hit (Node : ${T.root_node.name}) is
          Unit : constant Internal_Unit := Node.Unit;
+         Ctx  : constant Internal_Context := Unit.Context;
       begin
          Unit.Env_Caches_Stats.Hit_Count :=
             Unit.Env_Caches_Stats.Hit_Count + 1;
+
+         Ctx.Env_Caches_Stats.Hit_Count :=
+            Ctx.Env_Caches_Stats.Hit_Count + 1;
       end Lexical_Env_Cache_Hit;
 
    % endif
+   % if ctx.track_unit_dependencies:
+
+      -------------------------
+      -- Lexical_Env_Visited --
+      -------------------------
+
+      procedure Lexical_Env_Visited (From, To : Generic_Unit_Ptr) is
+         To_Unit : constant Internal_Unit := Convert_Unit (To);
+      begin
+         --  The lookup cache of the environment from which the lookup
+         --  recursed, as well as the property that triggered the lookup, read
+         --  data from the visited environment.
+
+         if From /= No_Generic_Unit then
+            Record_Unit_Dependency (Convert_Unit (From), To_Unit);
+         end if;
+         Record_Unit_Read (To_Unit);
+      end Lexical_Env_Visited;
+   % endif
 
    --------------------
    -- Element_Parent --
@@ -2993,6 +3261,18 @@ package body ${ada_lib_name}.Implementation is
    begin
       return H (Node);
    end Hash;
+   % if ctx.track_unit_dependencies:
+
+      ----------
+      -- Hash --
+      ----------
+
+      function Hash (Unit : Internal_Unit) return Hash_Type is
+         function H is new Hash_Access (Analysis_Unit_Type, Internal_Unit);
+      begin
+         return H (Unit);
+      end Hash;
+   % endif
 
    % if T.Bool.requires_hash_function:
       function Hash (B : Boolean) return Hash_Type is (Boolean'Pos (B));
@@ -5241,9 +5521,11 @@ package body ${ada_lib_name}.Implementation is
       --  all version numbers from analysis units.
       if Context.Cache_Version = Version_Number'Last then
          Context.Cache_Version := 1;
+         % if not ctx.track_unit_dependencies:
          for Unit of Context.Units loop
             Unit.Cache_Version := 0;
          end loop;
+         % endif
       else
          Context.Cache_Version := Context.Cache_Version + 1;
       end if;
@@ -5251,7 +5533,137 @@ package body ${ada_lib_name}.Implementation is
       if Invalidate_Envs then
          Context.Reparse_Cache_Version := Context.Cache_Version;
       end if;
+      % if ctx.track_unit_dependencies:
+
+      --  Unit version numbers are not compared to Context's: invalidate the
+      --  caches of each unit explicitly.
+      for Unit of Context.Units loop
+         Unit.Memoization_Invalidated := True;
+         Unit.Envs_Invalidated := Unit.Envs_Invalidated or else Invalidate_Envs;
+      end loop;
+      if Context.Templates_Unit /= No_Analysis_Unit then
+         Context.Templates_Unit.Memoization_Invalidated := True;
+         Context.Templates_Unit.Envs_Invalidated :=
+           Context.Templates_Unit.Envs_Invalidated or else Invalidate_Envs;
+      end if;
+      % endif
    end Invalidate_Caches;
+   % if ctx.track_unit_dependencies:
+
+      ----------------------------
+      -- Invalidate_Unit_Caches --
+      ----------------------------
+
+      procedure Invalidate_Unit_Caches
+        (Unit : Internal_Unit; Invalidate_Envs : Boolean)
+      is
+         Context     : constant Internal_Context := Unit.Context;
+         Invalidated : Unit_Sets.Set;
+         Queue       : Internal_Unit_Vectors.Vector;
+         Current     : Internal_Unit;
+         Kept_Count  : Natural := 0;
+
+         procedure Invalidate (U : Internal_Unit);
+         --  Invalidate the caches of U
+
+         ----------------
+         -- Invalidate --
+         ----------------
+
+         procedure Invalidate (U : Internal_Unit) is
+         begin
+            U.Memoization_Invalidated := True;
+            U.Envs_Invalidated := U.Envs_Invalidated or else Invalidate_Envs;
+         end Invalidate;
+
+      begin
+         --  Env getters that resolved to Empty_Env compare the context
+         --  version to decide whether to resolve again, so increase it anyway
+         --  (see Get_Context_Version).
+         if Context.Cache_Version = Version_Number'Last then
+            Context.Cache_Version := 1;
+         else
+            Context.Cache_Version := Context.Cache_Version + 1;
+         end if;
+
+         if Cache_Invalidation_Trace.Is_Active then
+            Cache_Invalidation_Trace.Trace
+              ("Invalidating caches after the reparsing of "
+               & Basename (Unit));
+            Cache_Invalidation_Trace.Increase_Indent;
+         end if;
+
+         --  Invalidate the caches of Unit and of all the units whose caches
+         --  read data from Unit, directly or not.
+         Invalidated.Insert (Unit);
+         Queue.Append (Unit);
+         while not Queue.Is_Empty loop
+            Current := Queue.Pop;
+            Invalidate (Current);
+            if Cache_Invalidation_Trace.Is_Active then
+               Cache_Invalidation_Trace.Trace
+                 ("Invalidated: " & Basename (Current));
+            end if;
+
+            for D of Current.Dependent_Units loop
+               if not Invalidated.Contains (D) then
+                  Invalidated.Insert (D);
+                  Queue.Append (D);
+               end if;
+            end loop;
+         end loop;
+         Queue.Destroy;
+
+         --  The caches of all other units are kept
+         for U of Context.Units loop
+            if not Invalidated.Contains (U) then
+               Kept_Count := Kept_Count + 1;
+               if Cache_Invalidation_Trace.Is_Active then
+                  Cache_Invalidation_Trace.Trace ("Kept: " & Basename (U));
+               end if;
+            end if;
+         end loop;
+
+         --  Nothing records which units the templates unit depends on:
+         --  always invalidate its caches.
+         if Context.Templates_Unit /= No_Analysis_Unit then
+            Invalidate (Context.Templates_Unit);
+         end if;
+
+         if Cache_Invalidation_Trace.Is_Active then
+            Cache_Invalidation_Trace.Decrease_Indent;
+            Cache_Invalidation_Trace.Trace
+              ("Kept the caches of" & Natural'Image (Kept_Count)
+               & " unit(s) out of"
+               & Count_Type'Image (Context.Units.Length));
+         end if;
+      end Invalidate_Unit_Caches;
+
+      ----------------------------
+      -- Record_Unit_Dependency --
+      ----------------------------
+
+      procedure Record_Unit_Dependency (From, To : Internal_Unit) is
+      begin
+         if From /= To and then not From.Dependencies.Contains (To) then
+            From.Dependencies.Insert (To);
+            To.Dependent_Units.Include (From);
+         end if;
+      end Record_Unit_Dependency;
+
+      ----------------------
+      -- Record_Unit_Read --
+      ----------------------
+
+      procedure Record_Unit_Read (Unit : Internal_Unit) is
+         Stack : Internal_Unit_Vectors.Vector renames
+           Unit.Context.Evaluated_Units;
+      begin
+         if not Stack.Is_Empty then
+            Record_Unit_Dependency (Stack.Get (Stack.Last_Index), Unit);
+         end if;
+      end Record_Unit_Read;
+   % endif
 
    ------------------
    --  Reset_Envs  --
@@ -5336,6 +5748,21 @@ package body ${ada_lib_name}.Implementation is
    ------------------
 
    procedure Reset_Caches (Unit : Internal_Unit) is
+   % if ctx.track_unit_dependencies:
+   begin
+      if Unit.Envs_Invalidated then
+         Unit.Envs_Invalidated := False;
+         Reset_Envs (Unit);
+      end if;
+
+      if Unit.Memoization_Invalidated then
+         Unit.Memoization_Invalidated := False;
+         Unit.Cache_Version := Unit.Cache_Version + 1;
+         % if ctx.has_memoization:
+            Destroy (Unit.Memoization_Map);
+         % endif
+      end if;
+   % else:
       Cache_Version : constant Version_Number := Unit.Cache_Version;
    begin
       if Cache_Version < Unit.Context.Reparse_Cache_Version then
@@ -5349,6 +5776,7 @@ package body ${ada_lib_name}.Implementation is
             Destroy (Unit.Memoization_Map);
          % endif
       end if;
+   % endif
    end Reset_Caches;
 
    --------------------
@@ -5359,6 +5787,9 @@ package body ${ada_lib_name}.Implementation is
       Dummy : Boolean;
    begin
       Dummy := Analysis_Unit_Sets.Add (From.Referenced_Units, Referenced);
+      % if ctx.track_unit_dependencies:
+         Record_Unit_Dependency (From, Referenced);
+      % endif
    end Reference_Unit;
 
    ------------------------
@@ -5389,6 +5820,9 @@ package body ${ada_lib_name}.Implementation is
       Context  : constant Internal_Context := Unit.Context;
       Unit_TDH : constant Token_Data_Handler_Access := Token_Data (Unit);
 
+      Time_Start, Time_Lexed : Ada.Real_Time.Time;
+      --  Timestamps to update Context.Lexing_Time and Context.Parsing_Time
+
       Saved_TDH : Token_Data_Handler;
       --  Holder to save tokens data in Unit.
       --
@@ -5458,16 +5892,24 @@ package body ${ada_lib_name}.Implementation is
       --  Initialize the parser, which fetches the source buffer and extract
       --  all tokens.
 
+      Time_Start := Ada.Real_Time.Clock;
       Init_Parser
         (Input, Context.With_Trivia, Unit, Unit_TDH, Unit.Context.Parser);
+      Time_Lexed := Ada.Real_Time.Clock;
+      Context.Lexing_Time :=
+        Context.Lexing_Time
+        + Ada.Real_Time.To_Duration (Time_Lexed - Time_Start);
 
       --  If we could run the lexer, run the parser and get the root node
 
-      if Unit_TDH.Source_Buffer /= null then
+      if Has_Source_Buffer (Unit_TDH.all) then
          Result.Ast_Mem_Pool := Create;
          Unit.Context.Parser.Mem_Pool := Result.Ast_Mem_Pool;
          Result.Ast_Root := ${T.root_node.name}
            (Parse (Unit.Context.Parser, Rule => Unit.Rule));
+         Context.Parsing_Time :=
+           Context.Parsing_Time
+           + Ada.Real_Time.To_Duration (Ada.Real_Time.Clock - Time_Lexed);
       end if;
 
       --  Forward token data and diagnostics to the returned unit
@@ -5482,7 +5924,22 @@ package body ${ada_lib_name}.Implementation is
 
    procedure Update_After_Reparse
      (Unit : Internal_Unit; Reparsed : in out Reparsed_Unit) is
+   % if ctx.track_unit_dependencies:
+      Invalidate_All : Boolean := Unit.Ast_Root = null;
+      --  Whether to invalidate the caches of all units instead of only the
+      --  ones that depend on Unit.
+   % endif
    begin
+      % if ctx.track_unit_dependencies:
+      --  Nothing records which units read the root scope, so if Unit added
+      --  entries to it, all units may depend on Unit.
+      for EE of Unit.Exiled_Entries loop
+         if EE.Env.Owner = No_Generic_Unit then
+            Invalidate_All := True;
+         end if;
+      end loop;
+
+      % endif
       --  Remove the `symbol -> AST node` associations for Unit's nodes in
       --  foreign lexical environments.
       Remove_Exiled_Entries (Unit);
@@ -5516,8 +5973,21 @@ package body ${ada_lib_name}.Implementation is
       --
       --  As an optimization, invalidate referenced envs cache only if this is
       --  not the first time we parse Unit.
+      % if ctx.track_unit_dependencies:
+      --
+      --  Loading a new unit can change the result of any computation that
+      --  looked for it, but otherwise, only the caches that read data from
+      --  Unit can be stale.
+      if Invalidate_All then
+         Invalidate_Caches
+           (Unit.Context, Invalidate_Envs => Unit.Ast_Root /= null);
+      else
+         Invalidate_Unit_Caches (Unit, Invalidate_Envs => True);
+      end if;
+      % else:
       Invalidate_Caches
         (Unit.Context, Invalidate_Envs => Unit.Ast_Root /= null);
+      % endif
 
       --  Likewise for token data
       Free (Unit.TDH);
@@ -5532,6 +6002,15 @@ package body ${ada_lib_name}.Implementation is
       --  Clear the set of units referenced from that one, as it may no longer
       --  hold in the reparsed unit.
       Analysis_Unit_Sets.Destroy (Unit.Referenced_Units);
+      % if ctx.track_unit_dependencies:
+
+      --  Likewise for the units that this unit's caches read data from: these
+      --  caches were all invalidated above.
+      for D of Unit.Dependencies loop
+         D.Dependent_Units.Exclude (Unit);
+      end loop;
+      Unit.Dependencies.Clear;
+      % endif
 
       --  Destroy the old AST node and replace it by the new one
       if Unit.Ast_Root /= null then
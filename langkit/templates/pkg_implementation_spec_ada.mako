@@ -333,6 +333,11 @@ private package ${ada_lib_name}.Implementation is
       procedure Lexical_Env_Cache_Hit (Node : ${T.root_node.name});
       --  Callback for Langkit_Support.Lexical_Envs_Impl.Notify_Cache_Hit
    % endif
+   % if ctx.track_unit_dependencies:
+
+      procedure Lexical_Env_Visited (From, To : Generic_Unit_Ptr);
+      --  Callback for Langkit_Support.Lexical_Envs_Impl.Notify_Env_Visited
+   % endif
 
    function Element_Parent
      (Node : ${T.root_node.name}) return ${T.root_node.name};
@@ -388,6 +393,9 @@ private package ${ada_lib_name}.Implementation is
       Notify_Cache_Updated     => Lexical_Env_Cache_Updated,
       Notify_Cache_Looked_Up   => Lexical_Env_Cache_Looked_Up,
       Notify_Cache_Hit         => Lexical_Env_Cache_Hit,
+   % endif
+   % if ctx.track_unit_dependencies:
+      Notify_Env_Visited       => Lexical_Env_Visited,
    % endif
       Ref_Category             => Ref_Category,
       Ref_Categories           => Ref_Categories,
@@ -1530,6 +1538,18 @@ private package ${ada_lib_name}.Implementation is
 
    package Analysis_Unit_Sets is new Langkit_Support.Cheap_Sets
      (Internal_Unit, null);
+   % if ctx.track_unit_dependencies:
+
+      function Hash (Unit : Internal_Unit) return Hash_Type;
+
+      package Unit_Sets is new Ada.Containers.Hashed_Sets
+        (Element_Type        => Internal_Unit,
+         Hash                => Hash,
+         Equivalent_Elements => "=");
+
+      package Internal_Unit_Vectors is new Langkit_Support.Vectors
+        (Internal_Unit);
+   % endif
 
    package Units_Maps is new Ada.Containers.Hashed_Maps
      (Key_Type        => GNATCOLL.VFS.Virtual_File,
@@ -1708,6 +1728,14 @@ private package ${ada_lib_name}.Implementation is
       --  Snapshot of the total number of cache lookups that were done in the
       --  lexical envs of any analysis unit of this context at the time the
       --  last collection was attempted.
+
+      Hit_Count : Long_Long_Natural := 0;
+      --  Current number of cache hits that have occurred in any lexical env
+      --  of any analysis unit owned by this context since its creation.
+
+      Collection_Count : Long_Long_Natural := 0;
+      --  Number of collections that were attempted since the creation of
+      --  this context.
    end record;
 
    type Unit_Env_Caches_Stats is record
@@ -1732,6 +1760,16 @@ private package ${ada_lib_name}.Implementation is
       --  Snapshot of the total number of cache lookups that were done in any
       --  lexical env of any analysis unit belonging to the same context as
       --  this one when this unit was last collected.
+
+      Last_Lookup : Long_Long_Natural := 0;
+      --  Snapshot of the total number of cache lookups that were done in any
+      --  lexical env of any analysis unit belonging to the same context as
+      --  this one right after the last cache lookup in this unit: the higher,
+      --  the more recently the caches of this unit were used.
+
+      Collection_Count : Long_Long_Natural := 0;
+      --  Number of times the caches of this unit were collected since its
+      --  creation.
    end record;
 
    % endif
@@ -1811,6 +1849,10 @@ private package ${ada_lib_name}.Implementation is
       --  Main parser type. TODO: If we want to parse in several tasks, we'll
       --  replace that by an array of parsers.
 
+      Lexing_Time, Parsing_Time : Duration;
+      --  Cumulated time spent lexing and parsing analysis units in this
+      --  context (see Do_Parsing).
+
       Discard_Errors_In_Populate_Lexical_Env : Boolean;
       --  See the eponym procedure
 
@@ -1833,6 +1875,14 @@ private package ${ada_lib_name}.Implementation is
       Reparse_Cache_Version : Version_Number;
       --  Version number used to invalidate referenced envs caches. It is
       --  incremented only when a unit is reparsed in the context.
+      % if ctx.track_unit_dependencies:
+
+         Evaluated_Units : Internal_Unit_Vectors.Vector;
+         --  Stack of the units that own the memoized properties currently
+         --  being evaluated. While this stack is not empty, the units that
+         --  property evaluation reads data from are recorded as dependencies
+         --  of the unit on top of the stack (see Record_Unit_Read).
+      % endif
 
       Rewriting_Handle : Rewriting_Handle_Pointer :=
          No_Rewriting_Handle_Pointer;
@@ -2006,13 +2056,38 @@ private package ${ada_lib_name}.Implementation is
       --  unit. When this unit gets destroyed or reparsed, these rebindings
       --  need to be destroyed too (see Destroy_Rebindings).
 
-      % if ctx.has_memoization:
+      % if ctx.memoization_budget_enabled:
+         Memoization_Map : Memoization_Table;
+         --  Mapping of arguments tuple to property result for memoization
+      % elif ctx.has_memoization:
          Memoization_Map : Memoization_Maps.Map;
          --  Mapping of arguments tuple to property result for memoization
       % endif
 
       Cache_Version : Version_Number := 0;
       --  See the eponym field in Analysis_Context_Type
+      % if ctx.track_unit_dependencies:
+         --
+         --  Note that when unit dependencies are tracked, caches are
+         --  invalidated per unit instead: this is incremented each time this
+         --  unit's memoization map is reset, and the fields below determine
+         --  when to reset caches.
+
+         Dependencies : Unit_Sets.Set;
+         --  Units that caches in this unit (memoized property results and
+         --  lexical env lookup caches) read data from.
+
+         Dependent_Units : Unit_Sets.Set;
+         --  Units whose caches read data from this unit, i.e. units that have
+         --  this unit in their Dependencies set.
+
+         Memoization_Invalidated : Boolean := False;
+         --  Whether this unit's memoization map must be reset before its next
+         --  use. See Invalidate_Unit_Caches.
+
+         Envs_Invalidated : Boolean := False;
+         --  Likewise for this unit's referenced envs caches
+      % endif
 
       % if ctx.cache_collection_enabled:
 
@@ -2171,12 +2246,45 @@ private package ${ada_lib_name}.Implementation is
      (Context : Internal_Context; Discard : Boolean);
    --  Implementation for Analysis.Discard_Errors_In_Populate_Lexical_Env
 
+   procedure Get_Parsing_Times
+     (Context : Internal_Context; Lexing, Parsing : out Duration);
+   --  Implementation for Analysis.Get_Parsing_Times
+
    procedure Set_Logic_Resolution_Timeout
      (Context : Internal_Context; Timeout : Natural);
    --  Implementation for Analysis.Set_Logic_Resolution_Timeout
 
    function Has_Rewriting_Handle (Context : Internal_Context) return Boolean;
    --  Implementation for Analysis.Has_Rewriting_Handle
+   % if ctx.parsing_statistics:
+
+   function Get_Parsing_Statistics
+     (Context : Internal_Context) return Parsing_Statistics;
+   --  Implementation for Analysis.Get_Parsing_Statistics
+
+   procedure Reset_Parsing_Statistics (Context : Internal_Context);
+   --  Implementation for Analysis.Reset_Parsing_Statistics
+   % endif
+   % if ctx.cache_collection_enabled:
+
+   function Get_Env_Caches_Statistics
+     (Context : Internal_Context) return Env_Caches_Statistics;
+   --  Implementation for Analysis.Get_Env_Caches_Statistics
+
+   function Get_Env_Caches_Statistics
+     (Unit : Internal_Unit) return Env_Caches_Statistics;
+   --  Implementation for Analysis.Get_Env_Caches_Statistics
+   % endif
+   % if ctx.memoization_budget_enabled:
+
+   function Get_Memoization_Statistics
+     (Context : Internal_Context) return Memoization_Statistics;
+   --  Implementation for Analysis.Get_Memoization_Statistics
+
+   function Get_Memoization_Statistics
+     (Unit : Internal_Unit) return Memoization_Statistics;
+   --  Implementation for Analysis.Get_Memoization_Statistics
+   % endif
 
    procedure Inc_Ref (Context : Internal_Context);
    --  Increment the ref-count of Context. This does nothing if Context is
@@ -2293,6 +2401,22 @@ private package ${ada_lib_name}.Implementation is
    procedure Reset_Caches (Unit : Internal_Unit);
    --  Destroy Unit's memoization cache. This resets Unit's version number to
    --  Unit.Context.Cache_Version.
+   % if ctx.track_unit_dependencies:
+
+      procedure Invalidate_Unit_Caches
+        (Unit : Internal_Unit; Invalidate_Envs : Boolean);
+      --  Like Invalidate_Caches, but invalidate only the caches of Unit and of
+      --  the units that transitively depend on it (see the Dependencies
+      --  component in Analysis_Unit_Type).
+
+      procedure Record_Unit_Dependency (From, To : Internal_Unit);
+      --  Record that caches in the From unit read data from the To unit, so
+      --  that they are invalidated when To is reparsed.
+
+      procedure Record_Unit_Read (Unit : Internal_Unit);
+      --  If a memoized property is being evaluated, record that its unit
+      --  depends on Unit. Do nothing otherwise.
+   % endif
 
    procedure Reference_Unit (From, Referenced : Internal_Unit);
    --  Set the Referenced unit as being referenced from the From unit. This is
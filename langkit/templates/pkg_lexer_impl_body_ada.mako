@@ -369,6 +369,12 @@ package body ${ada_lib_name}.Lexer_Implementation is
       else
          Process_All_Tokens_No_Trivia (Contents, TDH, Diagnostics);
       end if;
+
+      --  Now that the lexer is done with the source buffer, switch to a
+      --  compact representation if possible: most sources contain only 8-bit
+      --  characters, for which 32-bit storage wastes a lot of memory.
+
+      Compact (TDH);
    end Extract_Tokens_From_Text_Buffer;
 
    --------------------
@@ -475,8 +481,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
    begin
       if T.Symbol = No_Thin_Symbol then
          declare
-            Text   : Text_Type renames
-               TDH.Source_Buffer (T.Source_First ..  T.Source_Last);
+            Text   : constant Text_Type :=
+               Source_Text (TDH, T.Source_First, T.Source_Last);
             Symbol : constant Symbolization_Result :=
                % if ctx.symbol_canonicalizer:
                   ${ctx.symbol_canonicalizer.fqn} (Text)
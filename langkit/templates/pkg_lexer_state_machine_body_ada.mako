@@ -5,6 +5,31 @@
    termination = lexer.Termination.ada_name
    lexing_failure = lexer.LexingFailure.ada_name
 %>
+## Generate code to execute the given action when the automaton reaches a
+## state.
+<%def name="execute_action(action)">\
+            % if action.is_case_action:
+               case Self.Last_Token_Kind is
+                  % for alt in action.all_alts:
+                     when ${('others' if alt.prev_token_cond is None else
+                             ' | '.join(t.ada_name
+                                        for t in alt.prev_token_cond))} =>
+                        Match_Kind := ${alt.send.ada_name};
+                        Match_Index := Index - 1 - ${(
+                           action.match_length - alt.match_size
+                        )};
+                  % endfor
+               end case;
+
+            % elif action.is_ignore:
+               Match_Index := Index - 1;
+               Match_Ignore := True;
+
+            % else:
+               Match_Index := Index - 1;
+               Match_Kind := ${action.ada_name};
+            % endif
+</%def>\
 
 package body ${ada_lib_name}.Lexer_State_Machine is
 
@@ -13,6 +38,7 @@ package body ${ada_lib_name}.Lexer_State_Machine is
        [f"{t.ada_name} => {t.is_trivia}" for t in lexer.sorted_tokens], 3
    )};
 
+% if not ctx.table_driven_lexer:
    type Character_Range is record
       First, Last : Character_Type;
    end record;
@@ -25,6 +51,7 @@ package body ${ada_lib_name}.Lexer_State_Machine is
      (Char : Character_Type; Ranges : Character_Range_Array) return Boolean;
    --  Return whether Char is included in the given ranges
    pragma Warnings (On, "referenced");
+% endif
 
    ----------------
    -- Initialize --
@@ -64,6 +91,7 @@ package body ${ada_lib_name}.Lexer_State_Machine is
       return Self.Has_Next;
    end Has_Next;
 
+% if not ctx.table_driven_lexer:
    --------------
    -- Contains --
    --------------
@@ -92,6 +120,9 @@ package body ${ada_lib_name}.Lexer_State_Machine is
    end Contains;
 
 ${emitter.dfa_code.ada_table_decls('   ')}
+% else:
+${emitter.dfa_code.tables.ada_decls('   ')}
+% endif
 
    ----------------
    -- Next_Token --
@@ -118,6 +149,11 @@ ${emitter.dfa_code.ada_table_decls('   ')}
       Match_Kind : Token_Kind;
       --  If we found a match and it is not ignored, kind for the token to
       --  emit. Meaningless otherwise.
+      % if ctx.table_driven_lexer:
+
+      State : State_Index;
+      --  Current state of the automaton
+      % endif
    begin
       First_Index := Self.Last_Token.Text_Last + 1;
 
@@ -126,6 +162,45 @@ ${emitter.dfa_code.ada_table_decls('   ')}
       Match_Index := 0;
       Match_Ignore := False;
 
+      % if ctx.table_driven_lexer:
+      State := 1;
+      loop
+         ## If actions are associated to this state, execute them now. See
+         ## the comment for the equivalent code below.
+         case State is
+            % for action, states in emitter.dfa_code.tables.actions:
+            when ${emitter.dfa_code.tables.ada_index_choices(states)} =>
+${execute_action(action)}\
+            % endfor
+            when others =>
+               null;
+         end case;
+
+         ## If we are about to read past the input buffer, just stop there
+         exit when Index > Self.Input_Last;
+
+         ## Read the current character, look for its class and transition to
+         ## the next state, or stop if there is no transition for it.
+         declare
+            Char_Pos : constant Natural :=
+              Character_Type'Pos (Input (Index));
+            Class    : Class_Index;
+         begin
+            Index := Index + 1;
+            if Char_Pos <= 127 then
+               Class := Ascii_Classes (Char_Pos);
+            elsif Char_Pos <= 16#10FFFF# then
+               Class := Class_Blocks
+                 (Block_Indexes (Char_Pos / Block_Size))
+                 (Char_Pos mod Block_Size);
+            else
+               Class := 0;
+            end if;
+            State := Transitions (State, Class);
+         end;
+         exit when State = 0;
+      end loop;
+      % else:
       % for i, state in enumerate(emitter.dfa_code.states):
          ## No transition can go to the first state, so don't emit a label
          ## for it. This avoids an "unreferenced" warning.
@@ -138,27 +213,7 @@ ${emitter.dfa_code.ada_table_decls('   ')}
          ## return a token as soon as we find one, but rather return the
          ## longest one.
          % if state.action is not None:
-            % if state.action.is_case_action:
-               case Self.Last_Token_Kind is
-                  % for alt in state.action.all_alts:
-                     when ${('others' if alt.prev_token_cond is None else
-                             ' | '.join(t.ada_name
-                                        for t in alt.prev_token_cond))} =>
-                        Match_Kind := ${alt.send.ada_name};
-                        Match_Index := Index - 1 - ${(
-                           state.action.match_length - alt.match_size
-                        )};
-                  % endfor
-               end case;
-
-            % elif state.action.is_ignore:
-               Match_Index := Index - 1;
-               Match_Ignore := True;
-
-            % else:
-               Match_Index := Index - 1;
-               Match_Kind := ${state.action.ada_name};
-            % endif
+${execute_action(state.action)}\
          % endif
 
          ## If we are about to read past the input buffer, just stop there
@@ -206,8 +261,13 @@ ${emitter.dfa_code.ada_table_decls('   ')}
          % endif
 
       % endfor
+      % endif
 
+      ## Loops in the table-driven lexer exit here, so there is no need for a
+      ## label (which would be unreferenced).
+      % if not ctx.table_driven_lexer:
       <<Stop>>
+      % endif
       --  We end up here as soon as the currently analyzed character was not
       --  accepted by any transitions from the current state. Two cases from
       --  there:
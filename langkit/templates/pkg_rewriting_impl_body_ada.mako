@@ -2519,8 +2519,8 @@ package body ${ada_lib_name}.Rewriting_Implementation is
                   Index : constant Natural := Natural (Node.Token_Start_Index);
                   Data  : constant Stored_Token_Data :=
                      Reparsed.TDH.Tokens.Get (Index);
-                  Text  : constant Text_Type := Reparsed.TDH.Source_Buffer
-                    (Data.Source_First .. Data.Source_Last);
+                  Text  : constant Text_Type := Source_Text
+                    (Reparsed.TDH, Data.Source_First, Data.Source_Last);
                begin
                   Result.Children :=
                     (Kind => Expanded_Token_Node,
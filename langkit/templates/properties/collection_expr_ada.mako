@@ -28,7 +28,15 @@
 ##
 ## * "after_loop", to generate code after the loop that implements the
 ##   iteration.
+##
+## If "expr" was fused with the collection expressions that compute its
+## collection (see "expr.fused_producers"), delegate to "render_fused".
 <%def name="render(expr, exit_cond=None)">
+% if expr.fused_producers:
+   ${render_fused(
+      expr, exit_cond, caller.before_loop, caller.loop_body, caller.after_loop
+   )}
+% else:
 
    <% loop_body = caller.loop_body %>
 
@@ -106,4 +114,149 @@
 
    ${caller.after_loop()}
 
+% endif
+</%def>
+
+## Variant of "render" for a collection expression that was fused with the
+## map expressions that compute its collection ("expr.fused_producers", see
+## langkit.expressions.collections.fuse_collection_expressions).
+##
+## This generates a single loop on the collection of the first map expression.
+## For each item, each map expression evaluates its filter, its take_while
+## predicate and its element expression in turn, the last one passing its
+## element to the loop body of "expr" instead of appending it to an array. No
+## intermediate array is created.
+##
+## "before_loop", "loop_body" and "after_loop" are the homonym sub-templates
+## that the caller of "render" provides ("empty_list" is not needed).
+<%def name="render_fused(expr, exit_cond, before_loop, loop_body, after_loop)">
+
+   <%
+      producers = expr.fused_producers
+      root = producers[0]
+      stages = producers + [expr]
+      needs_exit = exit_cond or any(p.take_while for p in producers)
+   %>
+
+   ${root.collection.render_pre()}
+
+   ${before_loop()}
+
+   <%def name="render_loop()">
+      % for s in stages:
+         % if s.index_var:
+            ${s.index_var.name} := 0;
+         % endif
+      % endfor
+
+      declare
+         <%
+            coll_expr = root.collection.render_expr()
+            coll_type = root.collection.type
+         %>
+         Collection : constant ${coll_type.name} := ${coll_expr};
+         % if needs_exit:
+            Exit_Fused_Loop : Boolean := False;
+         % endif
+      begin
+         for ${root.codegen_element_var.name} of
+            % if coll_type.is_list_type:
+               Collection.Nodes (1 .. Children_Count (Collection))
+            % else:
+               Collection.Items
+            % endif
+         loop
+            ## Initialize all element variables for the first map expression
+            % for v in reversed(root.iter_vars):
+               % if v.init_expr:
+                  ${v.init_expr.render_pre()}
+                  ${assign_var(v.var, v.init_expr.render_expr())}
+               % endif
+            % endfor
+
+            ## Open all stages: each stage (but the first one) gets its
+            ## element from the element expression of the previous one.
+            % for i, s in enumerate(stages):
+               % if i > 0:
+                  <% elt_var = s.codegen_element_var %>
+                  declare
+                     ${elt_var.name} : constant ${elt_var.type.name} :=
+                        ${stages[i - 1].inner_expr.render_expr()};
+                  begin
+               % endif
+
+               ${scopes.start_scope(s.inner_scope)}
+
+               % if s.user_element_var.source_name:
+                  ${gdb_bind_var(s.user_element_var)}
+               % endif
+               % if s.index_var:
+                  ${gdb_bind_var(s.index_var)}
+               % endif
+
+               % if s is expr:
+                  ${loop_body()}
+               % else:
+                  % if s.filter:
+                     ${s.filter.render_pre()}
+                     if ${s.filter.render_expr()} then
+                  % endif
+                  % if s.take_while:
+                     ${s.take_while.render_pre()}
+                     if ${s.take_while.render_expr()} then
+                  % endif
+                  ${s.inner_expr.render_pre()}
+               % endif
+            % endfor
+
+            ## Then close them in reverse order. Exit the loop only once all
+            ## scopes are finalized.
+            % for i, s in reversed(list(enumerate(stages))):
+               % if s is expr:
+                  ${scopes.finalize_scope(s.inner_scope)}
+                  % if exit_cond:
+                     if ${exit_cond} then
+                        Exit_Fused_Loop := True;
+                     end if;
+                  % endif
+               % else:
+                  % if s.take_while:
+                     else
+                        Exit_Fused_Loop := True;
+                     end if;
+                  % endif
+                  % if s.filter:
+                     end if;
+                  % endif
+                  ${scopes.finalize_scope(s.inner_scope)}
+               % endif
+
+               % if s.index_var:
+                  ${s.index_var.name} := ${s.index_var.name} + 1;
+               % endif
+
+               % if i > 0:
+                  end;
+               % endif
+            % endfor
+
+            % if needs_exit:
+               exit when Exit_Fused_Loop;
+            % endif
+         end loop;
+      end;
+   </%def>
+
+   ## Null list nodes are processed as empty lists: the first map expression
+   ## then yields no item, so there is nothing to do.
+   % if root.collection.type.is_list_type:
+      if ${root.collection.render_expr()} /= null then
+         ${render_loop()}
+      end if;
+   % else:
+      ${render_loop()}
+   % endif
+
+   ${after_loop()}
+
 </%def>
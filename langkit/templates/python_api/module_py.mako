@@ -31,6 +31,7 @@ import collections
 import ctypes
 import io
 import json
+import multiprocessing
 import os
 import re
 import sys
@@ -1453,7 +1454,8 @@ class ${root_astnode_name}:
 
     ${astnode_types.subclass_decls(T.root_node)}
 
-    def __init__(self, c_value: Any, node_c_value: Any, rebindings: Any):
+    def __init__(self, c_value: Any, node_c_value: Any, rebindings: Any,
+                 unit: Opt[AnalysisUnit] = None):
         """
         This constructor is an implementation detail, and is not meant to be
         used directly. For now, the creation of AST nodes can happen only as
@@ -1476,7 +1478,9 @@ class ${root_astnode_name}:
 
         # Information to check before accessing node data that it is still
         # valid.
-        self._unit = self._fetch_unit(c_value)
+        self._unit = (
+            self._fetch_unit(c_value) if unit is None else unit
+        )
         self._unit_version = self._unit._unit_version
         self._rebindings_version = (
             rebindings.contents.version if rebindings else None
@@ -1579,8 +1583,7 @@ class ${root_astnode_name}:
 
     def __iter__(self) -> Iterator[Opt[${root_astnode_name}]]:
         ${py_doc('langkit.python.root_node.__iter__', 8)}
-        for i in range(len(self)):
-            yield self[i]
+        return iter(self._children_list())
 
     def __len__(self) -> int:
         ${py_doc('langkit.python.root_node.__len__', 8)}
@@ -1618,8 +1621,31 @@ class ${root_astnode_name}:
             for i, value in enumerate(self):
                 yield ('item_{}'.format(i), value)
         else:
-            for field_name in self._field_names:
-                yield (field_name, getattr(self, '{}'.format(field_name)))
+            # Fields are exactly the children of this node, in the same
+            # order: fetch them all at once.
+            yield from zip(self._field_names, self._children_list())
+
+    def iter_subtree(self) -> Iterator[${root_astnode_name}]:
+        ${py_doc('langkit.python.root_node.iter_subtree', 8)}
+        c_array = ${pyapi.array_wrapper(T.entity.array)}.c_type()
+        _node_subtree(ctypes.byref(self._unwrap(self)), ctypes.byref(c_array))
+        for node in ${root_astnode_name}._wrap_array(c_array):
+            assert node is not None
+            yield node
+
+    def _children_list(self) -> List[Opt[${root_astnode_name}]]:
+        """
+        Return the list of children for this node, fetching them from the
+        native library in a single call and populating the cache for
+        __getitem__.
+        """
+        c_array = ${pyapi.array_wrapper(T.entity.array)}.c_type()
+        _node_children_array(
+            ctypes.byref(self._unwrap(self)), ctypes.byref(c_array)
+        )
+        result = ${root_astnode_name}._wrap_array(c_array)
+        self._getitem_cache.update(enumerate(result))
+        return result
 
     def dump_str(self) -> str:
         ${py_doc('langkit.python.root_node.dump_str', 8)}
@@ -1811,10 +1837,62 @@ class ${root_astnode_name}:
 
         # Pick the right subclass to materialize this node in Python
         kind = _node_kind(ctypes.byref(c_value))
-        result = _kind_to_astnode_cls[kind](c_value, node_c_value, rebindings)
+        result = _kind_to_astnode_cls[kind](
+            c_value, node_c_value, rebindings, unit
+        )
         unit._node_cache[cache_key] = result
         return result
 
+    @classmethod
+    def _wrap_array(cls, c_array: Any) -> List[Opt[${root_astnode_name}]]:
+        """
+        Internal helper to wrap a low-level array of entities that all belong
+        to the same analysis unit and share the same entity info (for instance
+        the children of a node). This takes ownership of ``c_array``.
+
+        This is equivalent to calling ``_wrap`` on each item, except that the
+        owning unit is fetched and its node cache is checked only once.
+        """
+        array = ${pyapi.array_wrapper(T.entity.array)}(c_array)
+        result: List[Opt[${root_astnode_name}]] = []
+        if array.length == 0:
+            return result
+
+        # Build the part of the cache key that is common to all items. In
+        # ctypes, accessing an array element does not copy it, and the array
+        # is freed when "array" is garbage collected: copy items so that
+        # cache keys and wrappers do not refer to the array.
+        first_item = ${c_entity}.from_buffer_copy(array.items[0])
+        metadata = first_item.info.md
+        rebindings = first_item.info.rebindings
+        unit: Opt[AnalysisUnit] = None
+        node_cache: Dict[Tuple[Any, Any, Any], ${root_astnode_name}] = {}
+
+        for i in range(array.length):
+            item = ${c_entity}.from_buffer_copy(array.items[i])
+            node_c_value = item.node
+            if not node_c_value:
+                result.append(None)
+                continue
+
+            if unit is None:
+                unit = cls._fetch_unit(item)
+                unit._check_node_cache()
+                node_cache = unit._node_cache
+
+            cache_key = (node_c_value, metadata, rebindings)
+            try:
+                node = node_cache[cache_key]
+            except KeyError:
+                kind = _node_kind(ctypes.byref(item))
+                node = _kind_to_astnode_cls[kind](
+                    item, node_c_value, rebindings, unit
+                )
+                node_cache[cache_key] = node
+            result.append(node)
+
+        return result
+
     @classmethod
     def _wrap_bare_node(cls, c_value: Any) -> Opt[${root_astnode_name}]:
         return cls._wrap(${c_entity}.from_bare_node(c_value))
@@ -2186,6 +2264,18 @@ _node_child = _import_func(
     [ctypes.POINTER(${c_entity}), ctypes.c_uint, ctypes.POINTER(${c_entity})],
     ctypes.c_int
 )
+_node_children_array = _import_func(
+    '${capi.get_name("node_children_array")}',
+    [ctypes.POINTER(${c_entity}),
+     ctypes.POINTER(${pyapi.array_wrapper(T.entity.array)}.c_type)],
+    None
+)
+_node_subtree = _import_func(
+    '${capi.get_name("node_subtree")}',
+    [ctypes.POINTER(${c_entity}),
+     ctypes.POINTER(${pyapi.array_wrapper(T.entity.array)}.c_type)],
+    None
+)
 
 % for astnode in ctx.astnode_types:
     % for field in astnode.fields_with_accessors():
@@ -2388,6 +2478,24 @@ class App:
 
     The user can then run the app by calling `App.run()`.
 
+    By default, all units are parsed before `main` runs, and kept alive until
+    the app is destroyed. For big batches of files, apps can instead run in:
+
+    - Streaming mode (`--stream`): `main` parses each file and processes it
+      right away, without keeping the unit in `self.units`. The analysis
+      context is replaced every `units_per_context` units, so that memory for
+      processed units is released.
+
+    - Parallel mode (`--jobs=N` with N > 1): files are sharded across N worker
+      processes. Each creates its own app instance (with the same command line
+      arguments, but with its shard as the list of files to process) and
+      processes its shard in streaming mode. As usual with `multiprocessing`,
+      the app class must be importable from worker processes.
+
+    In both modes, the values that `process_unit` returns are merged with the
+    `reduce` method, first for each worker, then for all workers. The final
+    result is stored in `self.result`.
+
     Here is a small example of an app subclassing `App`, that will simply print
     the tree of every unit passed as argument:
 
@@ -2407,9 +2515,18 @@ class App:
 
     parser: argparse.ArgumentParser
     args: argparse.Namespace
+    argv: List[str]
+    files: List[str]
     u: AnalysisUnit
     units: Dict[str, AnalysisUnit]
     ctx: AnalysisContext
+    result: Any
+
+    units_per_context: ClassVar[int] = 1000
+    """
+    In streaming and parallel modes, number of units to process in an analysis
+    context before replacing it with a new one.
+    """
 
     @property
     def description(self) -> str:
@@ -2418,37 +2535,73 @@ class App:
         """
         return ""
 
-    def __init__(self, args: Opt[List[str]] = None):
+    def __init__(self,
+                 args: Opt[List[str]] = None,
+                 files: Opt[List[str]] = None):
+        """
+        :param args: Command line arguments for this app. If None, use
+            ``sys.argv``.
+        :param files: If not None, list of files to process, overriding both
+            the files passed on the command line and ``default_get_files``.
+        """
         self.parser = argparse.ArgumentParser(description=self.description)
         self.parser.add_argument('files', nargs='*', help='Files')
+        self.parser.add_argument(
+            '--stream', action='store_true',
+            help='Process each unit right after parsing it, and release it'
+                 ' afterwards.'
+        )
+        self.parser.add_argument(
+            '--jobs', type=int, default=1,
+            help='Number of worker processes to use. If greater than 1,'
+                 ' process files in parallel, in streaming mode.'
+        )
         self.add_arguments()
 
-        # Parse command line arguments
-        self.args = self.parser.parse_args(args)
+        # Parse command line arguments. Keep them so that worker processes
+        # can create app instances with the same arguments.
+        self.argv = sys.argv[1:] if args is None else list(args)
+        self.args = self.parser.parse_args(self.argv)
 
-        self.ctx = AnalysisContext(
-            charset='utf-8',
-            unit_provider=self.create_unit_provider(),
-            event_handler=self.create_event_handler(),
-            with_trivia=True,
-        )
+        self.ctx = self._create_context()
 
-        files = self.args.files
-        if not files:
-            files = self.default_get_files()
+        if files is not None:
+            self.files = list(files)
+        else:
+            self.files = self.args.files
+            if not self.files:
+                self.files = self.default_get_files()
 
-        # Parse files
         self.units = {}
-        for file_name in files:
+        self.result = None
+
+        # In streaming and parallel modes, files are parsed only in "main"
+        if self.args.stream or self.args.jobs > 1:
+            return
+
+        # Parse files
+        for file_name in self.files:
             self.u = self.ctx.get_from_file(file_name)
             if self.u.diagnostics:
                 self.on_parsing_errors(self.u)
             self.units[file_name] = self.u
 
+    def _create_context(self) -> AnalysisContext:
+        """
+        Create an analysis context for this app.
+        """
+        return AnalysisContext(
+            charset='utf-8',
+            unit_provider=self.create_unit_provider(),
+            event_handler=self.create_event_handler(),
+            with_trivia=True,
+        )
+
     def on_parsing_errors(self, unit: AnalysisUnit) -> None:
         """
-        Callback invoked during App initialization, when a requested unit has a
-        parsing error. By default, print the error on the standard output, but
+        Callback invoked during App initialization (or during ``main`` in
+        streaming and parallel modes), when a requested unit has a parsing
+        error. By default, print the error on the standard output, but
         subclasses can override this behavior.
         """
         for d in unit.diagnostics:
@@ -2488,17 +2641,65 @@ class App:
         """
         Default implementation for App.main: just iterates on every units and
         call ``process_unit`` on it.
+
+        In streaming and parallel modes, parse and process all files instead,
+        and store the reduced results in ``self.result``.
         """
-        for u in sorted(self.units.values(), key=lambda u: u.filename):
-            self.process_unit(u)
+        if self.args.jobs > 1:
+            jobs = self.args.jobs
+            shards = [self.files[i::jobs] for i in range(jobs)]
+            with multiprocessing.Pool(jobs) as pool:
+                results = pool.starmap(
+                    _run_app_worker,
+                    [(type(self), self.argv, shard)
+                     for shard in shards if shard],
+                )
+            self.result = self.reduce(results)
+
+        elif self.args.stream:
+            self.result = self.reduce([self._process_files(self.files)])
 
-    def process_unit(self, unit: AnalysisUnit) -> None:
+        else:
+            for u in sorted(self.units.values(), key=lambda u: u.filename):
+                self.process_unit(u)
+
+    def _process_files(self, files: List[str]) -> Any:
+        """
+        Parse and process the given files in streaming mode, and return the
+        reduced results for them.
+        """
+        results = []
+        for i, file_name in enumerate(files):
+            # Release processed units (and the units they depend on) from time
+            # to time.
+            if i > 0 and i % self.units_per_context == 0:
+                self.ctx = self._create_context()
+
+            self.u = self.ctx.get_from_file(file_name)
+            if self.u.diagnostics:
+                self.on_parsing_errors(self.u)
+            results.append(self.process_unit(self.u))
+        return self.reduce(results)
+
+    def process_unit(self, unit: AnalysisUnit) -> Any:
         """
         Abstract method that processes one unit. Needs to be subclassed by
         implementors.
+
+        In streaming and parallel modes, the returned value is passed to
+        ``reduce``: in parallel mode, it must be picklable.
         """
         raise NotImplementedError()
 
+    def reduce(self, results: List[Any]) -> Any:
+        """
+        Hook to merge results in streaming and parallel modes. It is called
+        first on the values that ``process_unit`` returned for the units of
+        each worker, then on the list of results for all workers. Default
+        implementation discards results and returns None.
+        """
+        return None
+
     @classmethod
     def run(cls, args: Opt[List[str]]=None) -> None:
         """
@@ -2507,3 +2708,14 @@ class App:
         cls(args).main()
 
     ${exts.include_extension(ctx.ext('python_api/app_exts'))}
+
+
+def _run_app_worker(app_cls: Type[App],
+                    args: List[str],
+                    files: List[str]) -> Any:
+    """
+    Entry point for worker processes in the parallel mode of ``App``: process
+    ``files`` with a new instance of ``app_cls`` and return the reduced result.
+    """
+    app = app_cls(args, files=files)
+    return app._process_files(app.files)
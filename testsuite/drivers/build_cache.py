@@ -0,0 +1,264 @@
+"""
+Cache for libraries built by testcases.
+
+Most testcases generate a library for a small language and then build it with
+GPRbuild, which is by far the most expensive step of these testcases. The
+build cache stores the object and library directories resulting from each
+build in a shared directory, keyed by a hash of the generated sources and of
+build parameters, so that testcases that emit the same sources (in the same
+testsuite run or in later ones) can just restore them.
+
+Each lookup in the cache is recorded in a statistics file, so that the
+testsuite can report how much build time the cache saved.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import os.path
+import shutil
+import tempfile
+import time
+from typing import Iterable, Iterator
+
+
+@dataclasses.dataclass
+class BuildCacheStats:
+    """
+    Summary of the lookups recorded in a statistics file.
+    """
+
+    hits: int = 0
+    misses: int = 0
+
+    build_time: float = 0.0
+    """
+    Time spent building libraries that were not in the cache, in seconds.
+    """
+
+    saved_time: float = 0.0
+    """
+    Time that building libraries restored from the cache would have taken,
+    minus the time spent restoring them, in seconds.
+    """
+
+    def summary(self) -> str:
+        total = self.build_time + self.saved_time
+        return (
+            "Build cache: {} hit(s), {} miss(es), {:.1f}s of build time saved"
+            " ({:.0f}% of {:.1f}s)".format(
+                self.hits,
+                self.misses,
+                self.saved_time,
+                100 * self.saved_time / total if total else 0,
+                total,
+            )
+        )
+
+
+class BuildCache:
+    """
+    Content-addressed cache of built libraries.
+
+    The cache directory contains one subdirectory per entry, named after its
+    key. Each entry contains a copy of the directories built by GPRbuild and
+    a "entry.json" file that records how long the build took. Entries are
+    created atomically, so several testcases can use the cache concurrently.
+    """
+
+    ENTRY_METADATA = "entry.json"
+
+    def __init__(self, cache_dir: str, stats_file: str | None = None):
+        """
+        :param cache_dir: Directory in which to store entries.
+        :param stats_file: If provided, file to which lookups are appended.
+        """
+        self.cache_dir = cache_dir
+        self.stats_file = stats_file
+
+    @classmethod
+    def from_env(cls) -> BuildCache | None:
+        """
+        Return the build cache that the testsuite enabled for the current
+        testcase, if any.
+        """
+        cache_dir = os.environ.get("LANGKIT_BUILD_CACHE")
+        if not cache_dir:
+            return None
+        return cls(cache_dir, os.environ.get("LANGKIT_BUILD_CACHE_STATS"))
+
+    @staticmethod
+    def key(source_dir: str,
+            excluded_dirs: Iterable[str],
+            parameters: Iterable[str]) -> str:
+        """
+        Compute the key of the entry for a library.
+
+        :param source_dir: Directory that contains the generated sources. All
+            the files it contains are hashed, with their path relative to it,
+            so that the key does not depend on where sources were generated.
+        :param excluded_dirs: Subdirectories of ``source_dir`` to ignore: the
+            ones that contain build artifacts, for instance.
+        :param parameters: Additional strings that affect the result of the
+            build (build modes, compiler version, ...).
+        """
+        excluded = set(excluded_dirs)
+        m = hashlib.sha256()
+        for p in parameters:
+            m.update(p.encode("utf-8"))
+            m.update(b"\0")
+        for dirpath, dirnames, filenames in os.walk(source_dir):
+            rel_dir = os.path.relpath(dirpath, source_dir)
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if os.path.normpath(os.path.join(rel_dir, d)) not in excluded
+            )
+            for f in sorted(filenames):
+                rel_path = os.path.normpath(os.path.join(rel_dir, f))
+                m.update(rel_path.encode("utf-8"))
+                m.update(b"\0")
+                with open(os.path.join(dirpath, f), "rb") as fp:
+                    m.update(hashlib.sha256(fp.read()).digest())
+        return m.hexdigest()
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def restore(self, key: str, build_dir: str, subdirs: list[str]) -> bool:
+        """
+        If there is an entry for ``key``, copy its directories to
+        ``build_dir`` and return True. Return False otherwise.
+
+        :param subdirs: Directories (relative to ``build_dir``) to restore, in
+            this order. Restored files are given the current time as their
+            modification time, so listing object directories before library
+            directories preserves the order of timestamps that GPRbuild
+            expects.
+        """
+        start = time.perf_counter()
+        entry = self.entry_dir(key)
+        try:
+            with open(os.path.join(entry, self.ENTRY_METADATA)) as f:
+                build_time = json.load(f)["build_time"]
+        except (OSError, ValueError, KeyError):
+            self._record(key, "miss", 0.0)
+            return False
+
+        for d in subdirs:
+            src = os.path.join(entry, d)
+            if os.path.isdir(src):
+                shutil.copytree(
+                    src,
+                    os.path.join(build_dir, d),
+                    symlinks=True,
+                    copy_function=shutil.copy,
+                    dirs_exist_ok=True,
+                )
+
+        # Let pruning know that this entry is still in use
+        os.utime(entry)
+
+        self._record(
+            key, "hit", build_time - (time.perf_counter() - start)
+        )
+        return True
+
+    def store(self,
+              key: str,
+              build_dir: str,
+              subdirs: list[str],
+              build_time: float) -> None:
+        """
+        Create the entry for ``key`` from the given directories in
+        ``build_dir``. If another process created it in the meantime, keep the
+        existing one.
+
+        :param build_time: Time the build took, in seconds.
+        """
+        self._record(key, "build", build_time)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix="tmp-", dir=self.cache_dir)
+        try:
+            for d in subdirs:
+                src = os.path.join(build_dir, d)
+                if os.path.isdir(src):
+                    shutil.copytree(
+                        src, os.path.join(tmp_dir, d), symlinks=True
+                    )
+            with open(os.path.join(tmp_dir, self.ENTRY_METADATA), "w") as f:
+                json.dump({"build_time": build_time}, f)
+            os.rename(tmp_dir, self.entry_dir(key))
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _record(self, key: str, kind: str, seconds: float) -> None:
+        """
+        Append an event to the statistics file, if any.
+
+        :param kind: "hit" or "miss" for a lookup, "build" for a library built
+            after a failed lookup.
+        :param seconds: For a hit, build time saved. For a build, the build
+            time.
+        """
+        if self.stats_file is None:
+            return
+
+        # Each record fits in a single small write, and the file is opened in
+        # append mode: concurrent testcases cannot interleave their records.
+        line = json.dumps({"key": key, "kind": kind, "time": seconds}) + "\n"
+        with open(self.stats_file, "a") as f:
+            f.write(line)
+
+    @staticmethod
+    def read_stats(stats_file: str) -> BuildCacheStats:
+        """
+        Summarize the lookups recorded in the given statistics file.
+        """
+        result = BuildCacheStats()
+        try:
+            with open(stats_file) as f:
+                lines = f.readlines()
+        except OSError:
+            return result
+
+        for line in lines:
+            record = json.loads(line)
+            if record["kind"] == "hit":
+                result.hits += 1
+                result.saved_time += record["time"]
+            elif record["kind"] == "miss":
+                result.misses += 1
+            else:
+                result.build_time += record["time"]
+        return result
+
+    def _entries(self) -> Iterator[tuple[str, float, int]]:
+        """
+        Yield the path, last use time and size of all entries.
+        """
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith("tmp-") or not os.path.isdir(path):
+                continue
+            size = 0
+            for dirpath, _, filenames in os.walk(path):
+                for f in filenames:
+                    size += os.lstat(os.path.join(dirpath, f)).st_size
+            yield path, os.stat(path).st_mtime, size
+
+    def prune(self, max_size: int) -> None:
+        """
+        Remove the least recently used entries until the cache takes at most
+        ``max_size`` bytes.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = sorted(self._entries(), key=lambda e: e[1], reverse=True)
+        total = 0
+        for path, _, size in entries:
+            total += size
+            if total > max_size:
+                shutil.rmtree(path, ignore_errors=True)
@@ -43,6 +43,11 @@ class PythonDriver(BaseDriver):
         derived_env['LANGKIT_PRETTY_PRINT'] = str(
             int(self.env.options.pretty_print))
         derived_env['LANGKIT_JOBS'] = str(self.env.inner_jobs)
+        if self.env.build_cache is not None:
+            derived_env['LANGKIT_BUILD_CACHE'] = self.env.build_cache.cache_dir
+            derived_env['LANGKIT_BUILD_CACHE_STATS'] = (
+                self.env.build_cache.stats_file
+            )
 
         # Unless this mechanism is specifically disabled, make the Langkit
         # library relative to this testsuite available to tests.
@@ -1,22 +1,26 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
 import os
 import os.path as P
 import shutil
 import subprocess
 import sys
+import time
 import traceback
 from typing import List, Optional, Set
 
 import langkit
+from langkit.caching import langkit_fingerprint
 import langkit.compile_context
 from langkit.compile_context import (
-    CacheCollectionConf, CompileCtx, UnparseScript
+    CacheCollectionConf, CompileCtx, MemoizationConf, UnparseScript
 )
 from langkit.diagnostics import DiagnosticError, Diagnostics, WarningSet
 from langkit.libmanage import ManageScript
 
+from drivers.build_cache import BuildCache
 from drivers.valgrind import valgrind_cmd
 
 
@@ -82,6 +86,18 @@ class GPRMain:
 
 valgrind_enabled = bool(os.environ.get('VALGRIND_ENABLED'))
 jobs = int(os.environ.get('LANGKIT_JOBS', '1'))
+build_cache = BuildCache.from_env()
+
+
+@functools.lru_cache(maxsize=None)
+def gprbuild_version() -> str:
+    """
+    Return the first line of "gprbuild --version", which identifies the
+    toolchain used to build generated libraries.
+    """
+    return subprocess.check_output(
+        ['gprbuild', '--version'], encoding='utf-8'
+    ).split('\n', 1)[0]
 
 
 # Determine where to find the root directory for Langkit sources
@@ -111,7 +127,12 @@ def prepare_context(grammar=None, lexer=None, lkt_file=None,
                     property_exceptions: Set[str] = set(),
                     generate_unparser: bool = False,
                     default_unparsing_config: str | None = None,
-                    cache_coll_conf: Optional[CacheCollectionConf] = None):
+                    cache_coll_conf: Optional[CacheCollectionConf] = None,
+                    table_driven_lexer: bool = False,
+                    prune_parser_memos: bool = False,
+                    parsing_statistics: bool = False,
+                    track_unit_dependencies: bool = False,
+                    memoization_conf: Optional[MemoizationConf] = None):
     """
     Create a compile context and prepare the build directory for code
     generation.
@@ -152,6 +173,16 @@ def prepare_context(grammar=None, lexer=None, lkt_file=None,
 
     :param cache_coll_conf: See CompileCtx's ``cache_collection_conf``
         constructor argument.
+
+    :param table_driven_lexer: See CompileCtx's constructor.
+
+    :param prune_parser_memos: See CompileCtx's constructor.
+
+    :param parsing_statistics: See CompileCtx's constructor.
+
+    :param track_unit_dependencies: See CompileCtx's constructor.
+
+    :param memoization_conf: See CompileCtx's constructor.
     """
 
     # Have a clean build directory
@@ -176,6 +207,11 @@ def prepare_context(grammar=None, lexer=None, lkt_file=None,
         generate_unparser=generate_unparser,
         default_unparsing_config=default_unparsing_config,
         cache_collection_conf=cache_coll_conf,
+        table_driven_lexer=table_driven_lexer,
+        prune_parser_memos=prune_parser_memos,
+        parsing_statistics=parsing_statistics,
+        track_unit_dependencies=track_unit_dependencies,
+        memoization_conf=memoization_conf,
     )
     ctx.warnings = warning_set
     ctx.pretty_print = pretty_print
@@ -283,7 +319,12 @@ def build_and_run(grammar=None, py_script=None, gpr_mains=None,
                   additional_make_args: List[str] = [],
                   python_args: Optional[List[str]] = None,
                   property_exceptions: Set[str] = set(),
-                  cache_collection_conf: Optional[CacheCollectionConf] = None):
+                  cache_collection_conf: Optional[CacheCollectionConf] = None,
+                  table_driven_lexer: bool = False,
+                  prune_parser_memos: bool = False,
+                  parsing_statistics: bool = False,
+                  track_unit_dependencies: bool = False,
+                  memoization_conf: Optional[MemoizationConf] = None):
     """
     Compile and emit code for `ctx` and build the generated library. Then,
     execute the provided scripts/programs, if any.
@@ -354,6 +395,16 @@ def build_and_run(grammar=None, py_script=None, gpr_mains=None,
     :param property_exceptions: See CompileCtx's constructor.
 
     :param cache_collection_conf: See CompileCtx's constructor.
+
+    :param table_driven_lexer: See CompileCtx's constructor.
+
+    :param prune_parser_memos: See CompileCtx's constructor.
+
+    :param parsing_statistics: See CompileCtx's constructor.
+
+    :param track_unit_dependencies: See CompileCtx's constructor.
+
+    :param memoization_conf: See CompileCtx's constructor.
     """
     assert not types_from_lkt or lkt_file is not None
 
@@ -365,6 +416,40 @@ def build_and_run(grammar=None, py_script=None, gpr_mains=None,
         def create_context(self, args):
             return self._cached_context
 
+        def gprbuild(self, args, project_file, is_library, mains=set()):
+            # Build the generated library through the build cache, if enabled
+            if build_cache is None or not is_library:
+                return super().gprbuild(args, project_file, is_library, mains)
+
+            build_dir = self.dirs.build_dir()
+            subdirs = [
+                P.join('obj', build_mode.value)
+                for build_mode in args.build_modes
+            ] + ['lib']
+            parameters = [
+                sys.platform,
+                gprbuild_version(),
+                langkit_fingerprint(),
+                str(args.with_rpath),
+                *(args.gargs or []),
+            ]
+            for configs in self.what_to_build(args, is_library):
+                for build_mode, library_type in configs:
+                    parameters.extend(self.gpr_scenario_vars(
+                        library_type=library_type.value,
+                        build_mode=build_mode.value,
+                    ))
+            key = BuildCache.key(build_dir, ['obj', 'lib'], parameters)
+
+            if build_cache.restore(key, build_dir, subdirs):
+                return
+
+            start = time.perf_counter()
+            super().gprbuild(args, project_file, is_library, mains)
+            build_cache.store(
+                key, build_dir, subdirs, time.perf_counter() - start
+            )
+
     # The call to build_and_run in test.py scripts should never be considered
     # as being part of the DSL to create diagnostics.
     for frame in traceback.extract_stack():
@@ -391,6 +476,11 @@ def build_and_run(grammar=None, py_script=None, gpr_mains=None,
             generate_unparser=generate_unparser,
             default_unparsing_config=default_unparsing_config,
             cache_coll_conf=cache_collection_conf,
+            table_driven_lexer=table_driven_lexer,
+            prune_parser_memos=prune_parser_memos,
+            parsing_statistics=parsing_statistics,
+            track_unit_dependencies=track_unit_dependencies,
+            memoization_conf=memoization_conf,
         )
 
         m = Manage(ctx)
@@ -0,0 +1,68 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+with Libfoolang.Common;   use Libfoolang.Common;
+
+procedure Main is
+
+   procedure Put_Statistics (Label : String);
+   --  Print the parsing statistics for Ctx
+
+   procedure Parse;
+   --  Parse the test buffer in U and print its number of declarations
+
+   Ctx : constant Analysis_Context := Create_Context;
+   U   : Analysis_Unit;
+
+   --------------------
+   -- Put_Statistics --
+   --------------------
+
+   procedure Put_Statistics (Label : String) is
+      Stats : constant Parsing_Statistics := Ctx.Get_Parsing_Statistics;
+   begin
+      Put_Line ("== " & Label & " ==");
+      for Rule in Grammar_Rule loop
+         Put_Line
+           (Rule'Image & ": hits:" & Stats (Rule).Memo_Hits'Image
+            & ", misses:" & Stats (Rule).Memo_Misses'Image);
+      end loop;
+      New_Line;
+   end Put_Statistics;
+
+   -----------
+   -- Parse --
+   -----------
+
+   procedure Parse is
+   begin
+      U := Ctx.Get_From_Buffer
+        (Filename => "main.txt",
+         Buffer   => "a = 1 + b;" & ASCII.LF & "f ();" & ASCII.LF);
+      if U.Has_Diagnostics then
+         for D of U.Diagnostics loop
+            Put_Line (U.Format_GNU_Diagnostic (D));
+         end loop;
+         raise Program_Error;
+      end if;
+      Put_Line ("Declarations:" & U.Root.Children_Count'Image);
+      New_Line;
+   end Parse;
+
+begin
+   Put_Statistics ("Before parsing");
+
+   Parse;
+   Put_Statistics ("After parsing");
+
+   --  Memoization tables are cleared at the start of each parsing session,
+   --  but statistics must accumulate.
+
+   Parse;
+   Put_Statistics ("After reparsing");
+
+   Ctx.Reset_Parsing_Statistics;
+   Put_Statistics ("After reset");
+
+   Put_Line ("main.adb: Done.");
+end Main;
@@ -0,0 +1,16 @@
+"""
+Check that parsing rules without a memoization table work as expected, and
+that the parsing statistics API counts memoization table hits and misses.
+"""
+
+from utils import build_and_run
+
+
+build_and_run(
+    lkt_file="expected_concrete_syntax.lkt",
+    gpr_mains=["main.adb"],
+    types_from_lkt=True,
+    prune_parser_memos=True,
+    parsing_statistics=True,
+)
+print("Done")
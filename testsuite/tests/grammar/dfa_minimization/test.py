@@ -0,0 +1,82 @@
+"""
+Check that DFA minimization merges equivalent states and preserves the
+language recognized by lexers.
+"""
+
+from langkit.diagnostics import Location, diagnostic_context
+from langkit.lexer.regexp import NFAState, RegexpCollection
+
+
+def get_action(labels):
+    sorted_labels = sorted(labels)
+    return sorted_labels[0][1] if sorted_labels else None
+
+
+def run(label, rules, inputs):
+    print("== {} ==".format(label))
+
+    # Build a NFA for all rules, just like Lexer.compile_rules does
+    regexps = RegexpCollection()
+    nfa = NFAState()
+    with diagnostic_context(Location.nowhere):
+        for i, (regexp, action) in enumerate(rules):
+            start, end = regexps.nfa_for(regexp)
+            end.label = (i, action)
+            nfa.add_transition(None, start)
+
+    dfa = nfa.to_dfa()
+    minimized = dfa.minimize(lambda s: get_action(s.labels))
+    print("DFA states:", len(dfa.reachable_states()))
+    print("Minimized DFA states:", len(minimized.reachable_states()))
+
+    # Nothing can transition to the starting state
+    assert all(
+        next_state is not minimized
+        for s in minimized.reachable_states()
+        for _, next_state in s.transitions
+    )
+
+    def longest_match(dfa, text):
+        """
+        Return the action and length for the longest match for ``text``.
+        """
+        state = dfa
+        result = (get_action(state.labels), 0)
+        for i, c in enumerate(text):
+            state = next(
+                (next_state
+                 for char_set, next_state in state.transitions
+                 if c in char_set),
+                None
+            )
+            if state is None:
+                break
+            action = get_action(state.labels)
+            if action is not None:
+                result = (action, i + 1)
+        return result
+
+    for text in inputs:
+        match = longest_match(dfa, text)
+        assert match == longest_match(minimized, text)
+        print("  {}: {} ({} chars)".format(repr(text), *match))
+    print("")
+
+
+run(
+    "Keywords with the same action",
+    [("def", "Kw"), ("del", "Kw"), ("if", "Kw"), ("in", "Kw"), ("is", "Kw")],
+    ["def", "del", "de", "in", "isx"],
+)
+run(
+    "Identifiers and keywords",
+    [("if", "If"), ("in", "In"), ("[a-z][a-z0-9]*", "Id"), ("[0-9]+", "Num")],
+    ["if", "ifx", "in", "i", "x1", "12a", "a"],
+)
+run(
+    "Ignored blanks",
+    [(r"[ \t]+", "Ignore"), (r"\n", "Ignore"), ("#[^\n]*", "Comment")],
+    [" \t ", "\n\n", "# foo\nbar"],
+)
+
+print("Done")
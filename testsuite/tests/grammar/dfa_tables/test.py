@@ -0,0 +1,102 @@
+"""
+Check that the compressed transition tables used to generate table-driven
+lexers encode the same automaton as the DFA they come from.
+"""
+
+from langkit.diagnostics import Location, diagnostic_context
+from langkit.lexer.regexp import DFACodeGenHolder, NFAState, RegexpCollection
+
+
+def get_action(labels):
+    sorted_labels = sorted(labels)
+    return sorted_labels[0][1] if sorted_labels else None
+
+
+def run(label, rules, inputs):
+    print("== {} ==".format(label))
+
+    # Build a NFA for all rules, just like Lexer.compile_rules does
+    regexps = RegexpCollection()
+    nfa = NFAState()
+    with diagnostic_context(Location.nowhere):
+        for i, (regexp, action) in enumerate(rules):
+            start, end = regexps.nfa_for(regexp)
+            end.label = (i, action)
+            nfa.add_transition(None, start)
+
+    dfa = nfa.to_dfa().minimize(lambda s: get_action(s.labels))
+    holder = DFACodeGenHolder(dfa, get_action)
+    tables = holder.tables
+    print("States:", tables.state_count)
+    print("Character classes:", tables.class_count)
+    print("Unique Unicode blocks:", len(tables.blocks))
+
+    def dfa_longest_match(text):
+        state = dfa
+        result = (get_action(state.labels), 0)
+        for i, c in enumerate(text):
+            state = next(
+                (next_state
+                 for char_set, next_state in state.transitions
+                 if c in char_set),
+                None
+            )
+            if state is None:
+                break
+            action = get_action(state.labels)
+            if action is not None:
+                result = (action, i + 1)
+        return result
+
+    def tables_longest_match(text):
+        state = 1
+        result = (holder.states[0].action, 0)
+        for i, c in enumerate(text):
+            state = tables.next_state(state, ord(c))
+            if state == 0:
+                break
+            action = holder.states[state - 1].action
+            if action is not None:
+                result = (action, i + 1)
+        return result
+
+    for text in inputs:
+        match = dfa_longest_match(text)
+        assert match == tables_longest_match(text)
+        print("  {}: {} ({} chars)".format(ascii(text), *match))
+    print("")
+
+
+run(
+    "Keywords and identifiers",
+    [("if", "If"), ("in", "In"), ("[a-z][a-z0-9]*", "Id"), ("[0-9]+", "Num")],
+    ["if", "ifx", "in", "i", "x1", "12a", "a", "+"],
+)
+run(
+    "Unicode identifiers",
+    [(r"(\p{L}|_)(\p{L}|\p{Nd}|_)*", "Id"), (r"\p{Nd}+", "Num"),
+     (r"[ \t]+", "Blank")],
+    ["foo", "\xe9t\xe9 2", "\u0663\u0664", "_\u4e2d\u6587", "\U0001d400x",
+     "\U0001f600", "a\U0001f600"],
+)
+run(
+    "Any character",
+    [(r"#[^\n]*", "Comment"), (r'"[^"]*"', "String"), ("[a-z]+", "Id")],
+    ["# h\xe9llo\nworld", '"\U0010ffff"', "abc#", "\n"],
+)
+
+# Rules from the lexer used in python_api/table_driven_lexer, with inputs
+# from that test.
+run(
+    "Lexer example",
+    [(r"[ \n\r\t]+", "Whitespace"), ("def", "Def"), ("var", "Var"),
+     (":", "Colon"), (":=", "Equal"), (r"\+", "Plus"), ("<", "LessThan"),
+     ("<=", "LessThanOrEqual"), (">", "GreaterThan"),
+     (">=", "GreaterThanOrEqual"), ("[0-9]+|0x[0-9a-f]+", "Number"),
+     ("[a-zA-Z_][a-zA-Z0-9_]*", "Identifier"), (r'"[^"]*"', "String"),
+     ("#(.?)+", "Comment")],
+    ["def foo", ":= 0x1f", "0x1g", "<=b", ">c", '"h\xe9llo" #',
+     "# \xe9t\xe9 \U0001f600", "\xe9 12", "\U0001f600x", "x\u0100y"],
+)
+
+print("Done")
@@ -0,0 +1,109 @@
+with Ada.Strings.Wide_Wide_Fixed; use Ada.Strings.Wide_Wide_Fixed;
+with Ada.Text_IO;                 use Ada.Text_IO;
+
+with GNATCOLL.Traces;
+
+with Langkit_Support.Text; use Langkit_Support.Text;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+with Libfoolang.Common;   use Libfoolang.Common;
+
+procedure Main is
+   Ctx : constant Analysis_Context := Create_Context;
+
+   type Unit_Array is array (Positive range <>) of Analysis_Unit;
+
+   Units : Unit_Array (1 .. 3);
+   A     : Analysis_Unit renames Units (1);
+   B     : Analysis_Unit renames Units (2);
+   C     : Analysis_Unit renames Units (3);
+
+   procedure Lookup (Unit : Analysis_Unit; First, Last : Natural);
+   --  Call the ``P_Lookup`` property on the root node of ``Unit`` for the
+   --  symbols of the environment entries ``First`` to ``Last``.
+
+   procedure Put_Stats (Label : String; Stats : Env_Caches_Statistics);
+   --  Print the content of ``Stats``
+
+   procedure Put_All_Stats;
+   --  Print statistics for all units and for the context
+
+   ------------
+   -- Lookup --
+   ------------
+
+   procedure Lookup (Unit : Analysis_Unit; First, Last : Natural) is
+      Node : constant Example := Unit.Root.As_Example;
+   begin
+      for I in First .. Last loop
+         if Node.P_Lookup (To_Unbounded_Text ("foo" & (I * 'o'))) /= Node
+         then
+            raise Program_Error with "Unexpected lookup result";
+         end if;
+      end loop;
+   end Lookup;
+
+   ---------------
+   -- Put_Stats --
+   ---------------
+
+   procedure Put_Stats (Label : String; Stats : Env_Caches_Statistics) is
+   begin
+      Put_Line
+        (Label & ":"
+         & " entries:" & Stats.Entry_Count'Image
+         & ", lookups:" & Stats.Lookup_Count'Image
+         & ", hits:" & Stats.Hit_Count'Image
+         & ", collections:" & Stats.Collection_Count'Image
+         & ", threshold:" & Stats.Collection_Threshold'Image);
+   end Put_Stats;
+
+   -------------------
+   -- Put_All_Stats --
+   -------------------
+
+   procedure Put_All_Stats is
+   begin
+      Put_Stats ("a.txt", A.Get_Env_Caches_Statistics);
+      Put_Stats ("b.txt", B.Get_Env_Caches_Statistics);
+      Put_Stats ("c.txt", C.Get_Env_Caches_Statistics);
+      Put_Stats ("context", Ctx.Get_Env_Caches_Statistics);
+   end Put_All_Stats;
+
+begin
+   GNATCOLL.Traces.Parse_Config_File;
+
+   Put_Line ("main.adb: Starting...");
+   A := Ctx.Get_From_Buffer (Filename => "a.txt", Buffer => "example");
+   B := Ctx.Get_From_Buffer (Filename => "b.txt", Buffer => "example");
+   C := Ctx.Get_From_Buffer (Filename => "c.txt", Buffer => "example");
+   for U of Units loop
+      if U.Has_Diagnostics then
+         raise Program_Error;
+      end if;
+   end loop;
+
+   --  Make the caches of A the least recently used ones, but the ones with
+   --  the best hit ratio, and make the caches of C the ones with the most
+   --  entries. The last lookup exceeds the collection threshold.
+
+   Lookup (A, 0, 9);
+   Lookup (A, 0, 9);
+   Lookup (B, 0, 9);
+   Lookup (C, 0, 9);
+   Lookup (C, 0, 1);
+   Lookup (C, 10, 10);
+   Put_All_Stats;
+
+   --  Heuristics must now rely on the statistics gathered since the first
+   --  collection: fill the caches of A up to the new collection threshold,
+   --  with hits for the entries it may have kept, then exceed it with a
+   --  lookup in C.
+
+   Put_Line ("main.adb: Looking up again...");
+   Lookup (A, 0, 39);
+   Lookup (C, 0, 0);
+   Put_All_Stats;
+
+   Put_Line ("main.adb: Done.");
+end Main;
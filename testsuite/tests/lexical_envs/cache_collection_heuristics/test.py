@@ -0,0 +1,50 @@
+"""
+Check that the built-in cache collection heuristics and the limit of cache
+entries per unit work as expected, and that the statistics API reflects their
+actions. As each configuration requires its own compilation context, we call
+`build_and_run` once per configuration.
+"""
+
+import os
+import os.path
+import shutil
+
+import langkit
+from langkit.compile_context import CacheCollectionConf
+
+from utils import build_and_run
+
+
+configs = [
+    ("lru", CacheCollectionConf(30, builtin_heuristic="lru")),
+    ("hit_ratio", CacheCollectionConf(30, builtin_heuristic="hit_ratio")),
+    ("unit_cap", CacheCollectionConf(30, max_unit_entries=8)),
+]
+
+test_dir = os.getcwd()
+
+for dirname, config in configs:
+    print("== " + dirname + " ==")
+
+    # Build each configuration in its own directory, so that generated
+    # libraries do not override each other.
+    os.mkdir(dirname)
+    for filename in ("expected_concrete_syntax.lkt", "main.adb", ".gnatdebug"):
+        shutil.copy(filename, dirname)
+
+    os.chdir(dirname)
+    build_and_run(
+        lkt_file="expected_concrete_syntax.lkt",
+        gpr_mains=["main.adb"],
+        types_from_lkt=True,
+        cache_collection_conf=config,
+    )
+
+    # We need to clean up some internal data structures for two consecutive
+    # language creation to work as expected.
+    langkit.reset()
+
+    os.chdir(test_dir)
+    print()
+
+print("Done")
@@ -0,0 +1,66 @@
+import sys
+
+import libfoolang
+
+
+print("main.py: Running...")
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer("main.txt", b"""
+def a {
+    def x {}
+    def b {
+        def x {}
+        +c
+    }
+}
+def c {
+    def x {}
+    def y {}
+}
+""")
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+
+def img(n):
+    if n is None:
+        return "None"
+    return f"{n.f_name.text}@{n.sloc_range.start.line}"
+
+
+def img_list(nodes):
+    return "[{}]".format(", ".join(img(n) for n in nodes))
+
+
+a = u.root[0]
+b = a.f_content[1]
+c = u.root[1]
+
+for sym in ["x", "y", "z"]:
+    print("")
+    print(f"== Lookups for {sym} from {img(b)} ==")
+    print(f"get_all: {img_list(b.p_get_all(sym))}")
+    for prop in ("first", "second"):
+        print(f"{prop}: {img(getattr(b, 'p_' + prop)(sym))}")
+    for prop in (
+        "has_any",
+        "has_none",
+        "has_many",
+        "length_eq_0",
+        "length_ne_0",
+        "length_ge_1",
+    ):
+        print(f"{prop}: {getattr(b, 'p_' + prop)(sym)}")
+
+for sym, from_node in [("x", b), ("y", b), ("y", c)]:
+    print("")
+    print(f"== Sequential lookups for {sym} from {img(b)},"
+          f" visible from {img(from_node)} ==")
+    print(f"get_visible: {img_list(b.p_get_visible(sym, from_node))}")
+    print(f"first_visible: {img(b.p_first_visible(sym, from_node))}")
+
+print("")
+print("main.py: Done.")
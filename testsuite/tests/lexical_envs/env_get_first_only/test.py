@@ -0,0 +1,98 @@
+"""
+Check that env lookups whose consumer only needs the first entity found
+(".at(0)" or emptiness tests) compute the same results as the corresponding
+complete lookups.
+"""
+
+from langkit.dsl import ASTNode, Field, T
+from langkit.envs import EnvSpec, add_env, add_to_env_kv, reference
+from langkit.expressions import Entity, Self, langkit_property
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    @langkit_property(public=True, return_type=T.FooNode.entity.array)
+    def get_all(sym=T.Symbol):
+        return Entity.children_env.get(sym)
+
+    @langkit_property(public=True, return_type=T.FooNode.entity)
+    def first(sym=T.Symbol):
+        return Entity.children_env.get(sym).at(0)
+
+    @langkit_property(public=True, return_type=T.FooNode.entity)
+    def second(sym=T.Symbol):
+        return Entity.children_env.get(sym).at(1)
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def has_any(sym=T.Symbol):
+        return Entity.children_env.get(sym).length > 0
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def has_none(sym=T.Symbol):
+        return Entity.children_env.get(sym).empty
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def has_many(sym=T.Symbol):
+        return Entity.children_env.get(sym).length > 1
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def length_eq_0(sym=T.Symbol):
+        return Entity.children_env.get(sym).length == 0
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def length_ne_0(sym=T.Symbol):
+        return Entity.children_env.get(sym).length != 0
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def length_ge_1(sym=T.Symbol):
+        return Entity.children_env.get(sym).length >= 1
+
+    @langkit_property(public=True, return_type=T.FooNode.entity.array)
+    def get_visible(sym=T.Symbol, from_node=T.FooNode):
+        return Entity.children_env.get(sym, from_node=from_node)
+
+    @langkit_property(public=True, return_type=T.FooNode.entity)
+    def first_visible(sym=T.Symbol, from_node=T.FooNode):
+        return Entity.children_env.get(sym, from_node=from_node).at(0)
+
+
+class Id(FooNode):
+    token_node = True
+
+
+class RefClause(FooNode):
+    ref_id = Field(type=T.Id)
+
+    @langkit_property(return_type=T.LexicalEnv)
+    def resolve():
+        return Entity.first(Self.ref_id.symbol)._.children_env
+
+    env_spec = EnvSpec(
+        reference(nodes=[Self.cast(FooNode)], through=T.RefClause.resolve)
+    )
+
+
+class Scope(FooNode):
+    name = Field(type=T.Id)
+    content = Field(type=T.FooNode.list)
+
+    env_spec = EnvSpec(
+        add_to_env_kv(key=Self.name.symbol, value=Self),
+        add_env(),
+    )
+
+
+build_and_run(
+    lkt_file='expected_concrete_syntax.lkt',
+    py_script='main.py',
+    types_from_lkt=True,
+    additional_make_args=['--pass-on=lower first entity lookups'],
+)
+
+# Check that lookups were lowered to Get_First when possible: for all
+# properties above but "get_all", "second", "has_many" and "get_visible".
+with open('build/src/libfoolang-implementation.adb') as f:
+    print('Get_First calls:', f.read().count('AST_Envs.Get_First'))
+
+print('Done')
@@ -0,0 +1,89 @@
+"""
+Check the cache that testcases use to avoid building the same generated
+library several times.
+"""
+
+import os
+import os.path
+
+from drivers.build_cache import BuildCache
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def make_build_dir(name, spec):
+    """
+    Create a build directory with generated sources, and return the key for
+    it.
+    """
+    write(os.path.join(name, "src", "foo.ads"), spec)
+    write(os.path.join(name, "foo.gpr"), "project Foo is end Foo;")
+    write(os.path.join(name, "obj", "langkit_cache"), name)
+    return BuildCache.key(name, ["obj", "lib"], ["dev"])
+
+
+def build(name):
+    """
+    Simulate the build of the library in the given build directory.
+    """
+    write(os.path.join(name, "obj", "dev", "foo.o"), read(
+        os.path.join(name, "src", "foo.ads")
+    ))
+    write(os.path.join(name, "lib", "relocatable", "dev", "libfoo.so"), "lib")
+
+
+cache = BuildCache("cache", "stats.jsonl")
+subdirs = ["obj/dev", "lib"]
+
+# Keys depend on generated sources only, not on build artifacts nor on the
+# location of the build directory.
+key1 = make_build_dir("build1", "package Foo is end Foo;")
+key2 = make_build_dir("build2", "package Foo is end Foo;")
+key3 = make_build_dir("build3", "package Foo is X : Integer; end Foo;")
+print("Same sources, same key:", key1 == key2)
+print("Different sources, different keys:", key1 != key3)
+print("Different parameters, different keys:",
+      key1 != BuildCache.key("build1", ["obj", "lib"], ["prod"]))
+print("")
+
+# The first lookup fails, so the library is built and stored
+print("Restored build1:", cache.restore(key1, "build1", subdirs))
+build("build1")
+cache.store(key1, "build1", subdirs, build_time=10.0)
+
+# The second build directory has the same sources: restore the library
+print("Restored build2:", cache.restore(key2, "build2", subdirs))
+print("  object:", read("build2/obj/dev/foo.o"))
+print("  library:", read("build2/lib/relocatable/dev/libfoo.so"))
+print("  kept its own cache:", read("build2/obj/langkit_cache"))
+
+# The third one has different sources
+print("Restored build3:", cache.restore(key3, "build3", subdirs))
+build("build3")
+cache.store(key3, "build3", subdirs, build_time=5.0)
+print("")
+
+stats = BuildCache.read_stats("stats.jsonl")
+print(f"hits={stats.hits} misses={stats.misses}"
+      f" build_time={stats.build_time}")
+print("saved time below 10s:", 9 < stats.saved_time <= 10)
+print("")
+
+# Pruning removes the least recently used entries first
+os.utime(cache.entry_dir(key1), (0, 0))
+cache.prune(max_size=100)
+print("Entry for build1 after pruning:",
+      os.path.isdir(cache.entry_dir(key1)))
+print("Entry for build3 after pruning:",
+      os.path.isdir(cache.entry_dir(key3)))
+
+print("Done")
@@ -0,0 +1,62 @@
+"""
+Check that formatting the same docstring for several languages, columns and
+widths reuses the same parsed docstring, and that the result does not depend
+on what was formatted before.
+"""
+
+from langkit import documentation as doc
+from langkit.utils import reset_memoized
+
+
+docstring = """
+    This is a docstring with a ``literal`` and a long paragraph that will need
+    to be wrapped at various widths.
+
+    * This is a bullet point with several lines, which is long enough to be
+      wrapped as well.
+
+    .. code-block:: ada
+
+        procedure Foo is null;
+"""
+
+formatters = (
+    ("C", doc.format_c),
+    ("Ada", doc.format_ada),
+    ("Python", doc.format_python),
+)
+settings = [(3, 79), (6, 50)]
+
+
+def format_all():
+    return {
+        (lang_name, column, width): format_fn(docstring, column, width)
+        for lang_name, format_fn in formatters
+        for column, width in settings
+    }
+
+
+blocks = doc.doc_blocks(docstring)
+first = format_all()
+second = format_all()
+print("Docstring parsed once:", doc.doc_blocks(docstring) is blocks)
+print("Same results:", first == second)
+
+# Formatting only one configuration must give the same result as when all
+# others have been formatted first.
+reset_memoized()
+print(
+    "Same result without cache:",
+    doc.format_ada(docstring, 6, 50) == first[("Ada", 6, 50)],
+)
+print()
+
+for (lang_name, column, width), text in first.items():
+    header = f"{lang_name}, column {column}, width {width}"
+    print(header)
+    print("=" * len(header))
+    print()
+    print(f"{' ' * column}{text}")
+    print()
+
+print("Done")
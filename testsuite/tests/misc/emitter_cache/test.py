@@ -0,0 +1,86 @@
+"""
+Check that "manage.py generate" rewrites only the generated source files that
+need it, and that it recovers from a corrupted emitter cache.
+"""
+
+import json
+import os
+import os.path
+import subprocess
+import sys
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+build_dir = os.path.join("mylang", "build")
+cache_file = os.path.join(build_dir, "obj", "langkit_cache")
+analysis_adb = os.path.join(build_dir, "src", "libmylanglang-analysis.adb")
+
+python(create_project_py, "Mylang")
+
+
+def generate(label):
+    """
+    Run generation and return the set of source files it rewrote.
+    """
+    print(f"== {label} ==")
+
+    def source_files():
+        result = {}
+        for dirpath, dirnames, filenames in os.walk(build_dir):
+            dirnames[:] = [d for d in dirnames if d != "obj"]
+            for f in filenames:
+                p = os.path.join(dirpath, f)
+                st = os.stat(p)
+                result[p] = (st.st_mtime_ns, st.st_ino)
+        return result
+
+    before = source_files()
+    python(manage_py, "generate")
+    after = source_files()
+    return {p for p, state in after.items() if before.get(p) != state}
+
+
+def read(filename):
+    with open(filename) as f:
+        return f.read()
+
+
+generate("First run")
+analysis = read(analysis_adb)
+
+print("rewritten:", sorted(generate("No change")))
+
+# Generated files that were modified since the previous run are restored
+with open(analysis_adb, "a") as f:
+    f.write("-- Some change\n")
+print("rewritten:", generate("Modified source file") == {analysis_adb})
+assert read(analysis_adb) == analysis
+
+# A corrupted cache is ignored
+with open(cache_file, "w") as f:
+    f.write('{"version": ')
+generate("Corrupted cache")
+assert read(analysis_adb) == analysis
+print("rewritten:", sorted(generate("No change after corrupted cache")))
+
+# Malformed entries are cache misses: only the corresponding file is rewritten
+with open(cache_file) as f:
+    cache = json.load(f)
+for key in cache["entries"]:
+    if os.path.basename(key) == os.path.basename(analysis_adb):
+        cache["entries"][key] = [0, "not", "an", "entry", None]
+with open(cache_file, "w") as f:
+    json.dump(cache, f)
+print("rewritten:", generate("Malformed cache entry") == {analysis_adb})
+assert read(analysis_adb) == analysis
+
+print("Done")
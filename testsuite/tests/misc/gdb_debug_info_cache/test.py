@@ -0,0 +1,96 @@
+"""
+Check that debug info for GDB helpers is looked up by line correctly, and
+that parsed debug info is cached on disk.
+"""
+
+import os
+
+import langkit.debug_info
+from langkit.debug_info import DebugInfo
+
+
+source = """\
+package body Libfoolang.Implementation is
+   --# property-start Foo_Node.p_a foo.py:10
+   function Foo_Node_P_A return Boolean is
+   begin
+      --# property-body-start
+      --# scope-start
+      --# bind x X_Var
+      return True;
+      --# end
+   end Foo_Node_P_A;
+   --# end
+
+   procedure Helper is null;
+
+   --# property-start Foo_Node.p_b foo.py:20
+   function Foo_Node_P_B return Boolean is
+   begin
+      --# property-body-start
+      return False;
+   end Foo_Node_P_B;
+   --# end
+end Libfoolang.Implementation;
+"""
+
+filename = os.path.abspath("libfoolang-implementation.adb")
+cache_dir = os.path.abspath("cache")
+with open(filename, "w") as f:
+    f.write(source)
+
+# Count how many times the source file is actually parsed
+parse_count = 0
+orig_parse_file = DebugInfo._parse_file
+
+
+def counting_parse_file(self, lines):
+    global parse_count
+    parse_count += 1
+    return orig_parse_file(self, lines)
+
+
+DebugInfo._parse_file = counting_parse_file
+
+
+def parse(label):
+    info = DebugInfo.parse_from_file(filename, cache_dir=cache_dir)
+    print(f"{label}: {len(info.properties)} properties, parsed"
+          f" {parse_count} time(s)")
+    return info
+
+
+info = parse("First parsing")
+for line_no in (1, 2, 6, 11, 13, 15, 19, 22):
+    prop = info.lookup_property(line_no)
+    print(f"  line {line_no}: {prop.name if prop else None}")
+print("")
+
+# Parsing the same file again in the same process reuses the result
+parse("Same process")
+
+# Parsing it in another process reuses the cache on disk
+langkit.debug_info._parsed_files.clear()
+info = parse("Other process")
+print("  Bindings:", [
+    e.dsl_name for e in info.get_property_by_name("Foo_Node.p_a").iter_events()
+    if isinstance(e, langkit.debug_info.Bind)
+])
+
+# Modifying the source file invalidates the cache
+with open(filename, "a") as f:
+    f.write("--  Comment\n")
+langkit.debug_info._parsed_files.clear()
+parse("Modified source")
+print("  Cache files:", len(os.listdir(cache_dir)))
+
+# Invalid cache files are ignored
+(cache_file, ) = os.listdir(cache_dir)
+with open(os.path.join(cache_dir, cache_file), "wb") as f:
+    f.write(b"\x80\x04invalid")
+langkit.debug_info._parsed_files.clear()
+parse("Invalid cache")
+langkit.debug_info._parsed_files.clear()
+parse("Cache rewritten")
+
+print("Done")
@@ -0,0 +1,53 @@
+"""
+Check that "manage.py generate --jobs" (parallel rendering of templates)
+generates the same sources as the default sequential rendering.
+"""
+
+import os
+import os.path
+import shutil
+import subprocess
+import sys
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+build_dir = os.path.join("mylang", "build")
+
+python(create_project_py, "Mylang")
+
+
+def generate(*args):
+    """
+    Generate the library from scratch and return a mapping from generated
+    source file names to their contents.
+    """
+    shutil.rmtree(build_dir, ignore_errors=True)
+    python(manage_py, "generate", "-P", *args)
+
+    result = {}
+    for dirpath, dirnames, filenames in os.walk(build_dir):
+        dirnames[:] = [d for d in dirnames if d not in ("obj", "__pycache__")]
+        for f in filenames:
+            filename = os.path.join(dirpath, f)
+            with open(filename, "rb") as fp:
+                result[os.path.relpath(filename, build_dir)] = fp.read()
+    return result
+
+
+sequential = generate()
+parallel = generate("--jobs", "4")
+print("Same set of files:", sorted(sequential) == sorted(parallel))
+for f in sorted(sequential):
+    if f in parallel and sequential[f] != parallel[f]:
+        print("Different content:", f)
+
+print("Done")
@@ -0,0 +1,115 @@
+"""
+Check that running parallel passes (for instance the rendering of properties)
+with "manage.py generate --jobs" generates the same sources as the default
+sequential execution.
+"""
+
+import os
+import os.path
+import shutil
+import subprocess
+import sys
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+parser_py = os.path.join("mylang", "language", "parser.py")
+build_dir = os.path.join("mylang", "build")
+
+python(create_project_py, "Mylang")
+
+# Add properties that have debug information, whose GDB helpers use
+# identifiers that are unique across all properties.
+with open(parser_py, "w") as f:
+    f.write('''
+from langkit.dsl import ASTNode, Field, T, abstract
+from langkit.expressions import Entity, Let, Not, Self, langkit_property
+from langkit.parsers import Grammar, List
+
+
+@abstract
+class MylangNode(ASTNode):
+    """
+    Root node class for Mylang AST nodes.
+    """
+
+    @langkit_property(public=True)
+    def parent_count():
+        """
+        Return the number of parents for this node.
+        """
+        return Let(lambda p=Self.parents: p.length)
+
+    @langkit_property(public=True)
+    def has_siblings():
+        """
+        Return whether this node has siblings.
+        """
+        return Let(
+            lambda n=Entity.next_sibling, p=Entity.previous_sibling:
+            Let(lambda nn=n.is_null, pn=p.is_null: Not(nn & pn))
+        )
+
+
+class ExampleNode(MylangNode):
+    """
+    Example node.
+    """
+
+    @langkit_property(public=True)
+    def next_example():
+        """
+        Return the next example node, if any.
+        """
+        return Let(lambda n=Entity.next_sibling: n.cast(T.ExampleNode))
+
+
+mylang_grammar = Grammar("main_rule")
+mylang_grammar.add_rules(
+    main_rule=List(ExampleNode("example"))
+)
+''')
+
+
+def generate(*args):
+    """
+    Generate the library from scratch and return a mapping from generated
+    source file names to their contents.
+    """
+    shutil.rmtree(build_dir, ignore_errors=True)
+    python(manage_py, "generate", "-P", *args)
+
+    result = {}
+    for dirpath, dirnames, filenames in os.walk(build_dir):
+        dirnames[:] = [d for d in dirnames if d not in ("obj", "__pycache__")]
+        for f in filenames:
+            filename = os.path.join(dirpath, f)
+            with open(filename, "rb") as fp:
+                result[os.path.relpath(filename, build_dir)] = fp.read()
+    return result
+
+
+sequential = generate()
+parallel = generate("--jobs", "4")
+print("Same set of files:", sorted(sequential) == sorted(parallel))
+for f in sorted(sequential):
+    if f in parallel and sequential[f] != parallel[f]:
+        print("Different content:", f)
+
+# Make sure that the generated code actually contains GDB helpers for
+# expressions.
+impl_body = "src/libmylanglang-implementation.adb"
+print(
+    "Has expression GDB helpers:",
+    b"--# expr-start" in sequential[impl_body],
+)
+
+print("Done")
@@ -0,0 +1,96 @@
+"""
+Check that "manage.py generate --pass-cache" replays the effects of compilation
+passes when the inputs of the compilation did not change.
+"""
+
+import os.path
+import re
+import subprocess
+import sys
+
+from langkit.caching import PassCache
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+parser_py = os.path.join("mylang", "language", "parser.py")
+analysis_adb = os.path.join(
+    "mylang", "build", "src", "libmylanglang-analysis.adb"
+)
+extension_file = os.path.join("mylang", "extensions", "notes.txt")
+
+python(create_project_py, "Mylang")
+
+# Extensions are inputs for code emission passes only
+os.mkdir(os.path.dirname(extension_file))
+with open(extension_file, "w") as f:
+    f.write("Notes\n")
+
+
+def generate(label, *args):
+    print(f"== {label} ==")
+    output = python(manage_py, "generate", "-P", "--pass-cache", *args)
+    m = re.search(
+        r"Pass cache: (\d+) pass\(es\) replayed, (\d+) hit\(s\) re-run,"
+        r" (\d+) miss\(es\)",
+        output,
+    )
+    assert m, output
+    replayed, rerun, missed = (int(n) for n in m.groups())
+    print("replayed:", "yes" if replayed else "no")
+    print("re-run:", "yes" if rerun else "no")
+    print("missed:", "yes" if missed else "no")
+    with open(analysis_adb) as f:
+        return f.read()
+
+
+# First run: the cache is empty, so all passes run
+analysis_1 = generate("First run")
+
+# Second run: the spec did not change, so all passes are replayed
+analysis_2 = generate("No change")
+assert analysis_1 == analysis_2
+
+# Generated files that were deleted are restored when replaying passes
+os.remove(analysis_adb)
+analysis_3 = generate("Deleted source file")
+assert analysis_1 == analysis_3
+
+# Changing the language spec invalidates the cache
+with open(parser_py, "a") as f:
+    f.write("\n# Some change\n")
+generate("Spec change")
+generate("No change after spec change")
+
+# Changing inputs that only code emission passes use invalidates only the
+# records for these passes: the records for the other passes are still valid,
+# but they need to run anyway.
+with open(extension_file, "a") as f:
+    f.write("More notes\n")
+generate("Extension change")
+
+# Records for a configuration are kept when using another one
+generate("Other configuration", "--version=2")
+generate("Back to the first configuration")
+
+# Pruning the cache removes corrupted records, but keeps the valid ones
+passes_dir = os.path.join("mylang", "build", "obj", "langkit_pass_cache",
+                          "passes")
+valid_records = sorted(os.listdir(passes_dir))
+with open(os.path.join(passes_dir, "corrupted.json"), "w") as f:
+    f.write("garbage")
+PassCache(os.path.dirname(passes_dir), {}).prune(PassCache.MAX_SIZE)
+print("== Pruning with a corrupted record ==")
+print("corrupted record removed:",
+      "corrupted.json" not in os.listdir(passes_dir))
+print("valid records kept:", sorted(os.listdir(passes_dir)) == valid_records)
+
+print("Done")
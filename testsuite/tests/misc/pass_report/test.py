@@ -0,0 +1,52 @@
+"""
+Check that "manage.py generate --pass-report" prints a summary of the
+resources used by compilation passes and writes detailed results as JSON.
+"""
+
+import json
+import os.path
+import subprocess
+import sys
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+report_json = os.path.abspath("report.json")
+
+python(create_project_py, "Mylang")
+output = python(manage_py, "generate", "-P", f"--pass-report={report_json}")
+
+# The summary is a table for passes, with a total line, followed by a table for
+# the most time consuming items.
+lines = output.splitlines()
+print("Pass table:", any(line.endswith("  Pass") for line in lines))
+print("Total line:", any(line.endswith("  Total") for line in lines))
+print("Item table:", any(line.endswith("  Item") for line in lines))
+
+with open(report_json) as f:
+    report = json.load(f)
+
+passes = {p["name"]: p for p in report["passes"]}
+for name in ("compute parser types", "render property", "emit C API"):
+    p = passes[name]
+    print(f"{name}:")
+    print("  wall time:", p["wall_time"] >= 0)
+    print("  CPU time:", p["cpu_time"] >= 0)
+    print("  peak memory:", p["peak_memory"] >= max(0, p["memory_delta"]))
+    print("  has items:", bool(p.get("items")))
+
+# Items for grammar rule passes are grammar rules
+print(
+    "Grammar rules:",
+    [i["name"] for i in passes["compute parser types"]["items"]],
+)
+
+print("Done")
@@ -0,0 +1,119 @@
+"""
+Check that "manage.py generate" stores compiled templates in a persistent
+cache and re-uses them in later runs.
+"""
+
+import glob
+import os.path
+import subprocess
+import sys
+import time
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+analysis_adb = os.path.join(
+    "mylang", "build", "src", "libmylanglang-analysis.adb"
+)
+default_cache_dir = os.path.join("mylang", "build", "obj")
+custom_cache_dir = os.path.abspath("custom_cache")
+
+python(create_project_py, "Mylang")
+
+
+def generate(label, *args):
+    print(f"== {label} ==")
+    python(manage_py, "generate", "-P", *args)
+    with open(analysis_adb) as f:
+        return f.read()
+
+
+def cached_modules(cache_dir):
+    """
+    Return a mapping from module file names to inode numbers for all compiled
+    templates in the given cache directory. Using a compiled template updates
+    its modification time, but compiling it again creates a new file.
+    """
+    return {
+        f: os.stat(f).st_ino
+        for f in glob.glob(
+            os.path.join(cache_dir, "langkit_templates", "*", "*.py")
+        )
+    }
+
+
+# First run: all templates are compiled and stored in the cache
+analysis_1 = generate("First run")
+modules_1 = cached_modules(default_cache_dir)
+print("modules stored:", "yes" if modules_1 else "no")
+
+
+def plant_modules_dir(name, age):
+    """
+    Create a directory for compiled templates from another version of
+    Langkit, with a module that was last used ``age`` seconds ago.
+    """
+    result = os.path.join(default_cache_dir, "langkit_templates", name)
+    os.mkdir(result)
+    module = os.path.join(result, "foo.py")
+    with open(module, "w") as f:
+        f.write("# Module from another version\n")
+    mtime = time.time() - age
+    os.utime(module, (mtime, mtime))
+    return result
+
+
+# The next run is expected to remove the directories for compiled templates
+# that were not used recently.
+stale_dir = plant_modules_dir("stale", 60 * 24 * 3600)
+recent_dir = plant_modules_dir("recent", 3600)
+
+# Compiled templates for older versions of templates are removed as well when
+# they were not used recently.
+stale_module = os.path.join(
+    os.path.dirname(next(iter(modules_1))), "stale_template.py"
+)
+with open(stale_module, "w") as f:
+    f.write("# Module for an old template\n")
+mtime = time.time() - 60 * 24 * 3600
+os.utime(stale_module, (mtime, mtime))
+
+# Second run: compiled templates are re-used
+analysis_2 = generate("Second run")
+assert analysis_1 == analysis_2
+modules_2 = cached_modules(default_cache_dir)
+print("modules re-used:",
+      "yes" if all(modules_2.get(f) == ino for f, ino in modules_1.items())
+      else "no")
+print("stale directory removed:", "no" if os.path.exists(stale_dir) else "yes")
+print("stale module removed:", "no" if os.path.exists(stale_module) else "yes")
+print("recent directory kept:", "yes" if os.path.exists(recent_dir) else "no")
+
+# Custom cache directory: directories that do not belong to Langkit are
+# expected to be preserved.
+unrelated_dir = os.path.join(custom_cache_dir, "unrelated")
+os.makedirs(unrelated_dir)
+analysis_3 = generate(
+    "Custom cache directory", "--template-cache-dir", custom_cache_dir
+)
+assert analysis_1 == analysis_3
+modules_3 = cached_modules(custom_cache_dir)
+print("modules stored:", "yes" if modules_3 else "no")
+print("unrelated directory preserved:", os.path.isdir(unrelated_dir))
+
+# Cache disabled
+os.remove(modules_2.popitem()[0])
+analysis_4 = generate("Cache disabled", "--no-template-cache")
+assert analysis_1 == analysis_4
+modules_4 = cached_modules(default_cache_dir)
+print("no module stored:", "yes" if modules_4 == modules_2 else "no")
+
+print("Done")
@@ -0,0 +1,68 @@
+"""
+Check that "manage.py generate --unit-cache" skips the rendering of generated
+source files when their inputs did not change.
+"""
+
+import os.path
+import re
+import subprocess
+import sys
+
+from utils import langkit_root
+
+
+def python(script, *args):
+    return subprocess.check_output(
+        [sys.executable, script] + list(args), encoding="utf-8"
+    )
+
+
+create_project_py = os.path.join(langkit_root, "scripts", "create-project.py")
+manage_py = os.path.join("mylang", "manage.py")
+parser_py = os.path.join("mylang", "language", "parser.py")
+analysis_adb = os.path.join(
+    "mylang", "build", "src", "libmylanglang-analysis.adb"
+)
+
+python(create_project_py, "Mylang")
+
+
+def generate(label):
+    print(f"== {label} ==")
+    output = python(manage_py, "generate", "-P", "--unit-cache")
+    m = re.search(
+        r"Unit cache: (\d+) source file\(s\) skipped, (\d+) rendered", output
+    )
+    assert m, output
+    skipped, rendered = (int(n) for n in m.groups())
+    print("skipped:", "yes" if skipped else "no")
+    print("rendered:", rendered if rendered <= 1 else "many")
+    with open(analysis_adb) as f:
+        return f.read()
+
+
+# First run: the cache is empty, so all source files are rendered
+analysis_1 = generate("First run")
+
+# Second run: nothing changed, so all renderings are skipped
+analysis_2 = generate("No change")
+assert analysis_1 == analysis_2
+
+# Generated files that were modified since the previous run are rendered again
+with open(analysis_adb, "a") as f:
+    f.write("-- Some change\n")
+analysis_3 = generate("Modified source file")
+assert analysis_1 == analysis_3
+
+# Likewise for deleted files
+os.remove(analysis_adb)
+analysis_4 = generate("Deleted source file")
+assert analysis_1 == analysis_4
+
+# Changing the language spec invalidates the cache
+with open(parser_py, "a") as f:
+    f.write("\n# Some change\n")
+generate("Spec change")
+generate("No change after spec change")
+
+print("Done")
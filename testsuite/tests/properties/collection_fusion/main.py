@@ -0,0 +1,35 @@
+import sys
+
+import libfoolang
+
+
+print("main.py: Running...")
+print("")
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer("main.txt", b"example")
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+n = u.root
+for values in [[], [0], [3, -1, 7, 2, 12, 0, 4]]:
+    print(f"== {values} ==")
+    for prop in (
+        "p_filter_map",
+        "p_map_find",
+        "p_take_while_any",
+        "p_chain",
+        "p_indexes",
+        "p_filter_mapcat",
+        "p_mapcat_map",
+    ):
+        print(f"{prop}: {getattr(n, prop)(values)}")
+    print("")
+
+for label, arg in [("root", n), ("null", None)]:
+    print(f"p_entity_list({label}): {n.p_entity_list(arg)}")
+    print(f"p_entity_list_texts({label}): {n.p_entity_list_texts(arg)}")
+
+print("main.py: Done.")
@@ -0,0 +1,88 @@
+"""
+Check that fused collection expressions (see the "fuse collection expressions"
+optional pass) compute the same results as unfused ones.
+"""
+
+from langkit.compiled_types import T
+from langkit.dsl import ASTNode
+from langkit.expressions import String, langkit_property
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+
+    @langkit_property(public=True, return_type=T.Int.array)
+    def filter_map(values=T.Int.array):
+        return values.filter(lambda v: v > 0).map(lambda v: v + 100)
+
+    @langkit_property(public=True, return_type=T.Int)
+    def map_find(values=T.Int.array):
+        return values.map(lambda v: v + v).find(lambda v: v > 5)
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def take_while_any(values=T.Int.array):
+        return values.take_while(lambda v: v < 10).any(lambda v: v == 3)
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def chain(values=T.Int.array):
+        return (
+            values.map(lambda v: v + 1)
+            .take_while(lambda v: v < 10)
+            .all(lambda v: v > 0)
+        )
+
+    @langkit_property(public=True, return_type=T.Int.array)
+    def indexes(values=T.Int.array):
+        return (
+            values.map(lambda i, v: v + i)
+            .filter(lambda i, v: (i < 2) | (v > 10))
+        )
+
+    @langkit_property(public=True, return_type=T.Int.array)
+    def filter_mapcat(values=T.Int.array):
+        return values.filter(lambda v: v > 0).mapcat(lambda v: [v, v])
+
+    # Expressions that iterate on the result of a mapcat are not fused
+
+    @langkit_property(public=True, return_type=T.Int.array)
+    def mapcat_map(values=T.Int.array):
+        return values.mapcat(lambda v: [v]).map(lambda v: v + 1)
+
+    # Exercize the special case of iterating on a list entity (which can be
+    # null), with ref-counted elements.
+
+    @langkit_property(public=True, return_type=T.Bool)
+    def entity_list(lst=T.Example.list.entity):
+        return lst.map(lambda n: n.text).any(lambda t: t == String("example"))
+
+    @langkit_property(public=True, return_type=T.String.array)
+    def entity_list_texts(lst=T.Example.list.entity):
+        return lst.map(lambda n: n.text).filter(lambda t: t != String(""))
+
+
+class Example(FooNode):
+    token_node = True
+
+
+build_and_run(
+    lkt_file='expected_concrete_syntax.lkt',
+    py_script='main.py',
+    additional_make_args=['--pass-on=fuse collection expressions'],
+)
+
+print('')
+for prop in (
+    FooNode.filter_map,
+    FooNode.map_find,
+    FooNode.take_while_any,
+    FooNode.chain,
+    FooNode.indexes,
+    FooNode.filter_mapcat,
+    FooNode.mapcat_map,
+    FooNode.entity_list,
+    FooNode.entity_list_texts,
+):
+    for producer, consumer in prop.collection_fusions:
+        print('{}: fused {} into {}'.format(prop.qualname, producer, consumer))
+print('Done')
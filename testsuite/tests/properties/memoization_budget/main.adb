@@ -0,0 +1,81 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+with Libfoolang.Common;   use Libfoolang.Common;
+
+procedure Main is
+   Ctx  : constant Analysis_Context := Create_Context;
+   Unit : Analysis_Unit :=
+      Get_From_Buffer (Ctx, "foo.txt", Buffer => "example");
+   Node : Example := Root (Unit).As_Example;
+
+   procedure Compute (I : Integer);
+   --  Call the memoized property with the given argument
+
+   procedure Put_Stats (Label : String);
+   --  Print memoization statistics for Unit and Ctx
+
+   -------------
+   -- Compute --
+   -------------
+
+   procedure Compute (I : Integer) is
+   begin
+      Put_Line
+        ("Compute" & Integer'Image (I) & " ="
+         & Integer'Image (Node.P_Compute (I)));
+   end Compute;
+
+   ---------------
+   -- Put_Stats --
+   ---------------
+
+   procedure Put_Stats (Label : String) is
+      S : constant Memoization_Statistics :=
+        Get_Memoization_Statistics (Unit);
+      C : constant Memoization_Statistics := Get_Memoization_Statistics (Ctx);
+   begin
+      Put_Line ("== " & Label & " ==");
+      Put_Line ("Entries:" & Long_Long_Integer'Image (S.Entry_Count));
+      Put_Line ("Evictions:" & Long_Long_Integer'Image (S.Eviction_Count));
+      Put_Line ("Has bytes: " & Boolean'Image (S.Byte_Count > 0));
+      Put_Line ("Same for context: " & Boolean'Image (S = C));
+      New_Line;
+   end Put_Stats;
+
+begin
+   Put_Stats ("Initial");
+
+   for I in 1 .. 10 loop
+      Compute (I);
+   end loop;
+   Put_Stats ("After 10 calls");
+
+   --  This is a cache hit: counters must not change
+
+   Compute (10);
+   Put_Stats ("After a cache hit");
+
+   --  Adding a new entry must evict one of the old ones, but the entry for
+   --  Compute (10) was just used: it must get a second chance.
+
+   Compute (11);
+   Compute (10);
+   Put_Stats ("After a new entry");
+
+   --  Reparsing the unit clears memoization tables, but not eviction counts
+
+   Unit := Get_From_Buffer (Ctx, "foo.txt", Buffer => "example ");
+   Node := Root (Unit).As_Example;
+   Put_Stats ("After reparse");
+
+   --  Entries for property calls that are being evaluated cannot be evicted,
+   --  so recursive calls can make the table exceed its limit. The next new
+   --  entry must bring it back to the limit.
+
+   Put_Line ("Sum 5 =" & Integer'Image (Node.P_Sum (5)));
+   Put_Stats ("After recursive calls");
+
+   Compute (1);
+   Put_Stats ("After another new entry");
+end Main;
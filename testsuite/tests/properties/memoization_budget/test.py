@@ -0,0 +1,17 @@
+"""
+Check that memoization tables do not grow beyond the configured number of
+entries, and that their counters are correctly updated.
+"""
+
+from langkit.compile_context import MemoizationConf
+
+from utils import build_and_run
+
+
+build_and_run(
+    lkt_file="expected_concrete_syntax.lkt",
+    gpr_mains=["main.adb"],
+    types_from_lkt=True,
+    memoization_conf=MemoizationConf(max_entries=3),
+)
+print("Done")
@@ -0,0 +1,50 @@
+package body Libfoolang.Implementation.Extensions is
+
+   Evaluation_Count : Integer := 0;
+   --  Number of evaluations of the "depth" property
+
+   ----------------------
+   -- Example_P_Target --
+   ----------------------
+
+   function Example_P_Target (Node : Bare_Example) return Bare_Example is
+      Name : constant String := Image (Text (Node));
+      Unit : Internal_Unit;
+   begin
+      if Name = "none" then
+         return null;
+      end if;
+
+      Unit := Get_From_File
+        (Context  => Node.Unit.Context,
+         Filename => Name & ".txt",
+         Charset  => Default_Charset,
+         Reparse  => False,
+         Rule     => Default_Grammar_Rule);
+      return Unit.Ast_Root;
+   end Example_P_Target;
+
+   --------------------------------
+   -- Example_P_Count_Evaluation --
+   --------------------------------
+
+   function Example_P_Count_Evaluation (Node : Bare_Example) return Boolean
+   is
+      pragma Unreferenced (Node);
+   begin
+      Evaluation_Count := Evaluation_Count + 1;
+      return True;
+   end Example_P_Count_Evaluation;
+
+   --------------------------------
+   -- Example_P_Evaluation_Count --
+   --------------------------------
+
+   function Example_P_Evaluation_Count (Node : Bare_Example) return Integer
+   is
+      pragma Unreferenced (Node);
+   begin
+      return Evaluation_Count;
+   end Example_P_Evaluation_Count;
+
+end Libfoolang.Implementation.Extensions;
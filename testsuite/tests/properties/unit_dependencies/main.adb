@@ -0,0 +1,74 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with GNATCOLL.Traces;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+
+procedure Main is
+   Ctx     : constant Analysis_Context := Create_Context;
+   A, B, C : Analysis_Unit;
+
+   procedure Parse (Unit : out Analysis_Unit; Filename, Buffer : String);
+   --  Parse Buffer as the content of Filename and put the result in Unit
+
+   procedure Query;
+   --  Evaluate the "depth" property on the root nodes of A, B and C and
+   --  print the results, as well as the number of evaluations so far.
+
+   -----------
+   -- Parse --
+   -----------
+
+   procedure Parse (Unit : out Analysis_Unit; Filename, Buffer : String) is
+   begin
+      Put_Line ("Parsing " & Filename & ": " & Buffer);
+      Unit := Ctx.Get_From_Buffer (Filename => Filename, Buffer => Buffer);
+      if Unit.Has_Diagnostics then
+         for D of Unit.Diagnostics loop
+            Put_Line (Unit.Format_GNU_Diagnostic (D));
+         end loop;
+         raise Program_Error;
+      end if;
+   end Parse;
+
+   -----------
+   -- Query --
+   -----------
+
+   procedure Query is
+      A_Depth : constant Integer := A.Root.As_Example.P_Depth;
+      B_Depth : constant Integer := B.Root.As_Example.P_Depth;
+      C_Depth : constant Integer := C.Root.As_Example.P_Depth;
+   begin
+      Put_Line ("a.txt depth:" & A_Depth'Image);
+      Put_Line ("b.txt depth:" & B_Depth'Image);
+      Put_Line ("c.txt depth:" & C_Depth'Image);
+      Put_Line
+        ("Evaluations:" & A.Root.As_Example.P_Evaluation_Count'Image);
+      New_Line;
+   end Query;
+
+begin
+   GNATCOLL.Traces.Parse_Config_File;
+
+   --  Caches in c.txt depend on a.txt, and caches in a.txt depend on b.txt,
+   --  but not the other way round.
+
+   Parse (A, "a.txt", "b");
+   Parse (B, "b.txt", "none");
+   Parse (C, "c.txt", "a");
+   Query;
+
+   --  Reparsing a.txt must keep the memoized results of b.txt only
+
+   Parse (A, "a.txt", "b");
+   Query;
+
+   --  Reparsing b.txt must invalidate the memoized results of all units,
+   --  including c.txt, which depends on it only through a.txt.
+
+   Parse (B, "b.txt", "none");
+   Query;
+
+   Put_Line ("main.adb: Done.");
+end Main;
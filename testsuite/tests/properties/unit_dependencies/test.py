@@ -0,0 +1,15 @@
+"""
+Check that when unit dependencies are tracked, reparsing a unit invalidates
+only the memoized properties of the units that depend on it.
+"""
+
+from utils import build_and_run
+
+
+build_and_run(
+    lkt_file="expected_concrete_syntax.lkt",
+    gpr_mains=["main.adb"],
+    types_from_lkt=True,
+    track_unit_dependencies=True,
+)
+print("Done")
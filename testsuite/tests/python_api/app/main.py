@@ -48,6 +48,28 @@ class CustomParsingErrorHandling(BasicApp):
             print(">>> ", unit.format_gnu_diagnostic(d))
 
 
+class CollectingApp(libfoolang.App):
+    # Collect the names of processed units, whatever the order in which they
+    # are processed.
+    def process_unit(self, unit):
+        return [os.path.basename(unit.filename)]
+
+    def reduce(self, results):
+        return sorted(name for names in results for name in names)
+
+    def main(self):
+        super().main()
+        print(f"Result: {self.result}")
+        print("")
+
+
+class CollectingWithDefaultFiles(CollectingApp):
+    # Worker processes must not compute the list of files again
+    def default_get_files(self):
+        print("default_get_files called")
+        return ["input1", "input2", "input3"]
+
+
 tests = [
     # Check the interaction between the "default_get_files" method and source
     # files passed on the command line.
@@ -66,28 +88,52 @@ tests = [
 
     # Check that the "create_event_handler" method is used as expected
     Testcase("event_handler", WithEventHandler, ["input1", "input2"]),
+
+    # Check the streaming and parallel modes
+    Testcase("stream", BasicApp, ["--stream", "input2", "input1"]),
+    Testcase(
+        "stream_parsing_errors",
+        BasicApp,
+        ["--stream", "no_such_file", "input4"],
+    ),
+    Testcase(
+        "stream_reduce",
+        CollectingApp,
+        ["--stream", "input3", "input1", "input2"],
+    ),
+    Testcase(
+        "jobs_reduce",
+        CollectingApp,
+        ["--jobs=2", "input3", "input1", "input2"],
+    ),
+    Testcase(
+        "jobs_more_than_files", CollectingApp, ["--jobs=4", "input2", "input1"]
+    ),
+    Testcase("jobs_defaults", CollectingWithDefaultFiles, ["--jobs=2"]),
 ]
 
 
-if len(sys.argv) == 1:
-    # If we ran this script through our path wrapper helper for Windows, run
-    # the subprocess under this wrapper, too.
-    path_wrapper = os.environ.get("PATH_WRAPPER")
+# Worker processes may import this module: only run tests in the main one
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        # If we ran this script through our path wrapper helper for Windows,
+        # run the subprocess under this wrapper, too.
+        path_wrapper = os.environ.get("PATH_WRAPPER")
 
-    print("main.py: Starting...")
-    print("")
-    for t in tests:
-        print(f"== {t.label} ==")
+        print("main.py: Starting...")
         print("")
-        sys.stdout.flush()
-        argv = [sys.executable, __file__, t.cls.__name__] + t.args
-        if path_wrapper:
-            argv.insert(1, path_wrapper)
-        subprocess.check_call(argv)
-    print("main.py: Done.")
-
-else:
-    clsname, args = sys.argv[1], sys.argv[2:]
-
-    cls = globals()[clsname]
-    cls.run(args)
+        for t in tests:
+            print(f"== {t.label} ==")
+            print("")
+            sys.stdout.flush()
+            argv = [sys.executable, __file__, t.cls.__name__] + t.args
+            if path_wrapper:
+                argv.insert(1, path_wrapper)
+            subprocess.check_call(argv)
+        print("main.py: Done.")
+
+    else:
+        clsname, args = sys.argv[1], sys.argv[2:]
+
+        cls = globals()[clsname]
+        cls.run(args)
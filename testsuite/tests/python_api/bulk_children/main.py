@@ -0,0 +1,87 @@
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer("foo.txt", b"def a = b\ndef c(d) = e(f, g)")
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+
+def walk(node):
+    """
+    Recursive preorder walk through the tree, using only __len__ and
+    __getitem__.
+    """
+    yield node
+    for i in range(len(node)):
+        child = node[i]
+        if child is not None:
+            yield from walk(child)
+
+
+# Wrap all nodes through the one-child-at-a-time API first, so that we can
+# check that bulk wrapping re-uses the existing wrappers.
+walked = list(walk(unit.root))
+
+print("== iter_subtree ==")
+subtree = list(unit.root.iter_subtree())
+for node in subtree:
+    print(node)
+assert len(subtree) == len(walked)
+assert all(n1 is n2 for n1, n2 in zip(subtree, walked))
+print("")
+
+print("== iter_fields ==")
+for d in unit.root:
+    print(d)
+    for name, value in d.iter_fields():
+        print("  {}: {}".format(name, value))
+    assert list(d) == [d[i] for i in range(len(d))]
+print("")
+
+# Bulk wrapping on a fresh unit must create wrappers that the
+# one-child-at-a-time API re-uses.
+print("== fresh unit ==")
+unit2 = ctx.get_from_buffer("bar.txt", b"def h(i) = j")
+subtree = list(unit2.root.iter_subtree())
+assert all(n1 is n2 for n1, n2 in zip(subtree, walk(unit2.root)))
+for node in subtree:
+    print(node)
+print("")
+
+# Nodes without children go through the same fast paths: check them on a
+# token node and on an empty list.
+print("== leaves and empty lists ==")
+unit3 = ctx.get_from_buffer("baz.txt", b"def m = n()")
+call = unit3.root[0].f_expr
+for node in (call.f_name, call.f_args):
+    subtree = list(node.iter_subtree())
+    assert subtree[0] is node
+    print("{}: children={}, subtree={}, fields={}".format(
+        type(node).__name__, list(node), len(subtree),
+        list(node.iter_fields())
+    ))
+print("")
+
+# Both fast paths must detect stale references
+print("== reparse ==")
+root = unit.root
+unit.reparse(b"def k = l")
+for label, computation in [
+    ("iter_subtree", lambda n: list(n.iter_subtree())),
+    ("__iter__", lambda n: list(n)),
+]:
+    print("Trying to compute: {}...".format(label))
+    try:
+        computation(root)
+    except libfoolang.StaleReferenceError:
+        print("   StaleReferenceError raised!")
+    else:
+        print("   No error raised...")
+print([str(n) for n in unit.root.iter_subtree()])
+
+print("main.py: Done.")
@@ -0,0 +1,15 @@
+"""
+Check that the bulk node-wrapping fast paths of the Python binding (children
+iteration, fields iteration and subtree iteration) return the same wrappers as
+the one-child-at-a-time API.
+"""
+
+from utils import build_and_run
+
+
+build_and_run(
+    lkt_file="expected_concrete_syntax.lkt",
+    py_script="main.py",
+    types_from_lkt=True,
+)
+print("Done")
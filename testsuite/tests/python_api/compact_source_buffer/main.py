@@ -0,0 +1,39 @@
+import libfoolang
+
+
+print('main.py: Running...')
+
+ctx = libfoolang.AnalysisContext()
+
+
+def check(label, buffer, charset=None):
+    print('== {} =='.format(label))
+
+    # Always use the same filename, so that each check reparses the same unit
+    # and thus resets its token data handler.
+    u = ctx.get_from_buffer('foo.txt', buffer, charset)
+    for d in u.diagnostics:
+        print('error: {}'.format(d))
+
+    print('text: {}'.format(ascii(u.text)))
+    print('text_range: {}'.format(
+        ascii(libfoolang.Token.text_range(u.first_token, u.last_token))
+    ))
+    t = u.first_token
+    while t is not None:
+        print('  {} {} {}'.format(t.kind, ascii(t.text), t.sloc_range))
+        t = t.next
+    print('')
+
+
+check('ASCII', b'(a\t(b c)) # comment\n')
+check('Wide characters', '(a # \u03bb\n\tb)')
+check('Latin-1', b'(a # H\xe9llo\n\tb)', 'iso-8859-1')
+check('ASCII after Latin-1', '(a)')
+
+# Check both sides of the limit for compaction on the last character of the
+# buffer, which the check must not skip.
+check('Last 8-bit character', b'(a) # \xff', 'iso-8859-1')
+check('First wide character', '(a) # \u0100')
+
+print('main.py: Done.')
@@ -0,0 +1,23 @@
+import libfoolang
+
+
+print('main.py: Running...')
+
+ctx = libfoolang.AnalysisContext()
+
+for i, buffer in enumerate([
+    'def foo := 0x1f + 42; # comment',
+    '"h\xe9llo" # \xe9t\xe9 \U0001f600',
+    'abc \xe9 12',
+    'a<=b>=c<d',
+    '\U0001f600x\u0100y',
+]):
+    print('== {} =='.format(ascii(buffer)))
+    u = ctx.get_from_buffer('buffer{}.txt'.format(i), buffer)
+    t = u.first_token
+    while t is not None:
+        print('  {} {}'.format(t.kind, ascii(t.text)))
+        t = t.next
+    print('')
+
+print('main.py: Done.')
@@ -17,6 +17,7 @@ import sys
 from e3.testsuite import Testsuite
 
 import drivers.adalog_driver
+from drivers.build_cache import BuildCache
 import drivers.langkit_support_driver
 import drivers.lkt_compile_driver
 import drivers.lkt_parse_driver
@@ -126,6 +127,20 @@ class LangkitTestsuite(Testsuite):
             '--pretty-print', action='store_true',
             help='Pretty-print generated source code.'
         )
+        parser.add_argument(
+            '--build-cache',
+            help='Directory in which to cache the libraries that testcases'
+                 ' build. Testcases that generate the same sources as a'
+                 ' previous testcase (in this testsuite run or in a previous'
+                 ' one) restore the library from this cache instead of'
+                 ' building it again.'
+        )
+        parser.add_argument(
+            '--build-cache-max-size', type=int, default=4096,
+            help='Maximum size of the build cache, in megabytes. Least'
+                 ' recently used entries are removed at the end of the'
+                 ' testsuite run to stay below this limit. Default: 4096.'
+        )
 
         # Tests update
         parser.add_argument(
@@ -139,6 +154,17 @@ class LangkitTestsuite(Testsuite):
         args = self.main.args
 
         self.env.rewrite_baselines = args.rewrite
+
+        if args.build_cache:
+            self.env.build_cache = BuildCache(
+                os.path.abspath(args.build_cache),
+                os.path.join(self.output_dir, 'build_cache_stats.jsonl'),
+            )
+            os.makedirs(self.env.build_cache.cache_dir, exist_ok=True)
+            if os.path.exists(self.env.build_cache.stats_file):
+                os.remove(self.env.build_cache.stats_file)
+        else:
+            self.env.build_cache = None
         self.env.control_condition_env = {
             'restricted_env': args.restricted_env,
             'has_ocaml': not args.disable_ocaml,
@@ -267,6 +293,11 @@ class LangkitTestsuite(Testsuite):
         )
 
     def tear_down(self):
+        build_cache = self.env.build_cache
+        if build_cache is not None:
+            print(BuildCache.read_stats(build_cache.stats_file).summary())
+            build_cache.prune(self.main.args.build_cache_max_size * 2 ** 20)
+
         if self.main.args.coverage:
             # Consolidate coverage data for each testcase and generate both a
             # sumary textual report on the standard output and a detailed HTML
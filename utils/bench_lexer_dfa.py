@@ -0,0 +1,193 @@
+#! /usr/bin/env python
+
+r"""
+Benchmark the compilation of a lexer into a state machine.
+
+LANG_DIR must be a directory that contains the "manage.py" script for a
+language (for instance "contrib/python"). For the lexer of this language, this
+script prints how long it takes to convert its NFA into a DFA, to minimize this
+DFA and to compute data structures for code generation (for both the default
+and the table-driven lexer backends).
+
+Lexers that use big Unicode character classes are much more expensive to
+compile: use --extra-rule to add rules to the lexer, for instance::
+
+    bench_lexer_dfa.py contrib/python \
+        --extra-rule '(\p{L}|_)(\p{L}|\p{Nd}|\p{Mn}|\p{Mc}|\p{Pc})*'
+
+With --compare-backends, this script also generates the library sources with
+each lexer backend (in a separate process, as compilation contexts can be used
+only once) and prints the size of the generated state machine body.
+"""
+
+import argparse
+import glob
+import importlib.util
+import os.path
+import subprocess
+import sys
+import tempfile
+import time
+
+from langkit.compile_context import global_context
+from langkit.diagnostics import Location, diagnostic_context
+from langkit.lexer.regexp import (
+    DFACodeGenHolder, DFATables, RegexpCollection
+)
+
+
+BACKENDS = ("case", "table-driven")
+"""
+Lexer backends: the default one generates case statements and gotos, the other
+one generates transition tables (see the ``table_driven_lexer`` CompileCtx
+option).
+"""
+
+
+parser = argparse.ArgumentParser(
+    description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+)
+parser.add_argument(
+    "--repeat", "-n", type=int, default=5,
+    help="Number of times to run each step. The best time is reported."
+)
+parser.add_argument(
+    "--extra-rule", action="append", default=[],
+    help="Regular expression for an additional lexing rule. Its action is"
+         " unique and has the lowest priority."
+)
+parser.add_argument(
+    "--compare-backends", action="store_true",
+    help="Compare the size of the state machine that the default and the"
+         " table-driven lexer backends generate."
+)
+parser.add_argument(
+    "--generate-backend", choices=BACKENDS, help=argparse.SUPPRESS
+)
+parser.add_argument("--build-dir", help=argparse.SUPPRESS)
+parser.add_argument("lang_dir", help="Directory for the language to use.")
+
+
+def get_action(labels):
+    sorted_labels = sorted(labels)
+    return sorted_labels[0][1] if sorted_labels else None
+
+
+def bench(label, repeat, fn):
+    """
+    Run ``fn`` ``repeat`` times, print the best time and return the result of
+    the last run.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    print(f"{label}: {min(times):.3f}s")
+    return result
+
+
+def load_manage(lang_dir):
+    """
+    Import the "manage.py" script in ``lang_dir`` and return it.
+    """
+    sys.path.insert(0, lang_dir)
+    spec = importlib.util.spec_from_file_location(
+        "manage", os.path.join(lang_dir, "manage.py")
+    )
+    manage = importlib.util.module_from_spec(spec)
+    sys.modules["manage"] = manage
+    spec.loader.exec_module(manage)
+    return manage
+
+
+def generate(lang_dir, backend, build_dir):
+    """
+    Generate library sources in ``build_dir`` with the given lexer backend.
+    """
+    manage = load_manage(lang_dir)
+
+    class Manage(manage.Manage):
+        def create_context(self, args):
+            ctx = super().create_context(args)
+            ctx.table_driven_lexer = backend == "table-driven"
+            return ctx
+
+    Manage().run(
+        ["generate", "-wundocumented-nodes", "--build-dir", build_dir]
+    )
+
+
+def compare_backends(lang_dir):
+    """
+    Print the size of the lexer state machine body for each backend.
+    """
+    for backend in BACKENDS:
+        with tempfile.TemporaryDirectory() as build_dir:
+            subprocess.check_call(
+                [sys.executable, __file__, lang_dir,
+                 "--generate-backend", backend, "--build-dir", build_dir],
+                stdout=subprocess.DEVNULL,
+            )
+            body, = glob.glob(
+                os.path.join(build_dir, "src", "*-lexer_state_machine.adb")
+            )
+            with open(body) as f:
+                content = f.read()
+        lines = content.count("\n")
+        print(
+            f"State machine body ({backend}): {lines} lines,"
+            f" {len(content)} bytes"
+        )
+
+
+def main(args):
+    lang_dir = os.path.abspath(args.lang_dir)
+    if args.generate_backend:
+        generate(lang_dir, args.generate_backend, args.build_dir)
+        return
+
+    manage = load_manage(lang_dir)
+    ctx = manage.Manage().create_context(None)
+
+    with global_context(ctx):
+        ctx.lexer.compile_rules(ctx)
+        nfa = ctx.nfa_start
+
+        regexps = RegexpCollection()
+        for i, regexp in enumerate(args.extra_rule):
+            with diagnostic_context(Location.nowhere):
+                start, end = regexps.nfa_for(regexp)
+            end.label = (len(ctx.lexer.rules) + i, f"Extra_Rule_{i}")
+            nfa.add_transition(None, start)
+
+        print(f"NFA states: {len(nfa.reachable_states())}")
+
+        dfa = bench("NFA to DFA", args.repeat, nfa.to_dfa)
+        print(f"DFA states: {len(dfa.reachable_states())}")
+
+        minimized_dfa = bench(
+            "DFA minimization",
+            args.repeat,
+            lambda: dfa.minimize(lambda s: get_action(s.labels)),
+        )
+        print(f"Minimized DFA states: {len(minimized_dfa.reachable_states())}")
+
+        holder = bench(
+            "Code generation data",
+            args.repeat,
+            lambda: DFACodeGenHolder(minimized_dfa, get_action),
+        )
+
+        tables = bench(
+            "Transition tables", args.repeat, lambda: DFATables(holder)
+        )
+        print(f"Character classes: {tables.class_count}")
+        print(f"Unique Unicode blocks: {len(tables.blocks)}")
+
+    if args.compare_backends:
+        compare_backends(lang_dir)
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,213 @@
+#! /usr/bin/env python
+
+"""
+Benchmark the rendering of templates for properties and parsers.
+
+LANG_DIR must be a directory that contains the "manage.py" script for a
+language (for instance "contrib/python"). This script runs the compilation
+pipeline for this language up to code emission and prints how long the
+"render parsers code" and "render property" passes take, the peak memory they
+allocate and the number of memory allocations they perform.
+
+Rendering passes can run only once per compilation context, so each
+measurement is done in a separate process.
+
+Python does not count memory allocations, so this script compiles a small
+shared library (this requires a C compiler and the GNU C library) that counts
+calls to malloc, calloc and realloc, and preloads it in the process that
+counts allocations. That process also uses the PYTHONMALLOC environment
+variable so that all Python allocations go through malloc.
+"""
+
+import argparse
+import ctypes
+import importlib.util
+import json
+import os.path
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import langkit
+from langkit.compile_context import global_context
+import langkit.names as names
+from langkit.passes import MajorStepPass
+from langkit.template_utils import mako_template
+
+
+BENCHED_PASSES = ("render parsers code", "render property")
+
+
+ALLOC_COUNTER_SOURCE = """
+#include <stddef.h>
+
+extern void *__libc_malloc (size_t);
+extern void *__libc_calloc (size_t, size_t);
+extern void *__libc_realloc (void *, size_t);
+
+static unsigned long long count = 0;
+
+unsigned long long
+langkit_alloc_count (void)
+{
+  return count;
+}
+
+void *
+malloc (size_t size)
+{
+  __atomic_add_fetch (&count, 1, __ATOMIC_RELAXED);
+  return __libc_malloc (size);
+}
+
+void *
+calloc (size_t n, size_t size)
+{
+  __atomic_add_fetch (&count, 1, __ATOMIC_RELAXED);
+  return __libc_calloc (n, size);
+}
+
+void *
+realloc (void *ptr, size_t size)
+{
+  __atomic_add_fetch (&count, 1, __ATOMIC_RELAXED);
+  return __libc_realloc (ptr, size);
+}
+"""
+"""
+Source for the shared library that counts memory allocations.
+"""
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    "--repeat", "-n", type=int, default=5,
+    help="Number of times to run each pass. The best time is reported."
+)
+parser.add_argument(
+    "--single-run", choices=["time", "memory", "allocations"],
+    help="Internal option: run the pipeline once in this process and print"
+         " measurements for benched passes as JSON."
+)
+parser.add_argument("lang_dir", help="Directory for the language to use.")
+
+
+def single_run(lang_dir, measure):
+    """
+    Run the compilation pipeline up to code emission and return measurements
+    (time in seconds, peak memory in bytes or number of allocations) for
+    benched passes.
+    """
+    sys.path.insert(0, lang_dir)
+    spec = importlib.util.spec_from_file_location(
+        "manage", os.path.join(lang_dir, "manage.py")
+    )
+    manage = importlib.util.module_from_spec(spec)
+    sys.modules["manage"] = manage
+    spec.loader.exec_module(manage)
+    ctx = manage.Manage().create_context(None)
+
+    result = {}
+
+    if measure == "allocations":
+        alloc_count = ctypes.CDLL(None).langkit_alloc_count
+        alloc_count.restype = ctypes.c_ulonglong
+
+    def measured_run(p, run):
+        def wrapper(context):
+            if measure == "time":
+                start = time.perf_counter()
+                run(context)
+                result[p.name] = time.perf_counter() - start
+            elif measure == "memory":
+                tracemalloc.start()
+                run(context)
+                result[p.name] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                start_count = alloc_count()
+                run(context)
+                result[p.name] = alloc_count() - start_count
+
+        return wrapper
+
+    with tempfile.TemporaryDirectory() as lib_root:
+        ctx.create_all_passes(lib_root)
+
+        # Compile all templates beforehand, so that only their rendering is
+        # measured.
+        templates_dir = os.path.join(
+            os.path.dirname(langkit.__file__), "templates"
+        )
+        for dirpath, _, filenames in os.walk(templates_dir):
+            for f in filenames:
+                if f.endswith(".mako"):
+                    mako_template(os.path.relpath(
+                        os.path.join(dirpath, f[:-len(".mako")]),
+                        templates_dir,
+                    ))
+
+        passes = []
+        for p in ctx.all_passes:
+            if (
+                isinstance(p, MajorStepPass)
+                and p.name == "Generate library sources"
+            ):
+                break
+            if p.name in BENCHED_PASSES:
+                p.run = measured_run(p, p.run)
+            passes.append(p)
+
+        with names.camel_with_underscores, global_context(ctx):
+            ctx.run_passes(passes)
+
+    return result
+
+
+def main(args):
+    lang_dir = os.path.abspath(args.lang_dir)
+
+    if args.single_run:
+        print(json.dumps(single_run(lang_dir, args.single_run)))
+        return
+
+    def run(measure, env=None):
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--single-run", measure, lang_dir],
+            encoding="utf-8",
+            env=env,
+        )
+
+        # The compilation pipeline may print messages: measurements are on
+        # the last line.
+        return json.loads(output.splitlines()[-1])
+
+    times = [run("time") for _ in range(args.repeat)]
+    memory = run("memory")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        counter_c = os.path.join(tmp_dir, "alloc_counter.c")
+        counter_so = os.path.join(tmp_dir, "alloc_counter.so")
+        with open(counter_c, "w") as f:
+            f.write(ALLOC_COUNTER_SOURCE)
+        subprocess.check_call(
+            ["cc", "-O2", "-shared", "-fPIC", "-o", counter_so, counter_c]
+        )
+        allocations = run(
+            "allocations",
+            dict(os.environ, LD_PRELOAD=counter_so, PYTHONMALLOC="malloc"),
+        )
+
+    for name in BENCHED_PASSES:
+        best_time = min(t[name] for t in times)
+        print(
+            f"{name}: {best_time:.3f}s,"
+            f" peak memory: {memory[name] / 1024:.0f}KiB,"
+            f" allocations: {allocations[name]}"
+        )
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,180 @@
+#! /usr/bin/env python
+
+"""
+Report how much memory analysis units take to store their source text.
+
+By default, this script does not measure anything: it models the size of the
+source buffer that a token data handler keeps for each source file in the
+given corpus:
+
+* With the 32-bit representation, which is used for sources that contain
+  characters whose code point does not fit in 8 bits. Decoding allocates one
+  code point (4 bytes) per input byte.
+
+* With the compact representation (see
+  ``Langkit_Support.Token_Data_Handlers.Compact``), which is used for all
+  other sources. It takes one byte per character.
+
+It then prints the modeled total and average size per unit before and after
+compaction. This ignores allocator overhead and all the other data that
+analysis units keep (tokens, trivia, trees, ...).
+
+With ``--measure=MODULE``, this script instead measures the increase of the
+resident set size of the process when it parses all source files, keeping
+their analysis units alive, with the Python bindings of a generated library
+(for instance ``--measure=libadalang``). This requires Linux (the resident set
+size is read from ``/proc/self/status``). Comparing the actual effect of
+compaction requires to run this mode once with a library built before
+compaction and once with a library built after it.
+"""
+
+import argparse
+import importlib
+import os
+import os.path
+import sys
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    "--charset", default="utf-8",
+    help="Charset to use to decode source files. Default: %(default)s."
+)
+parser.add_argument(
+    "--extension", "-e", action="append", default=[],
+    help="Only consider files that have this extension (for instance"
+         " '.adb'). Can be passed multiple times. By default, consider all"
+         " files."
+)
+parser.add_argument(
+    "--measure", metavar="MODULE",
+    help="Measure the resident set size increase when parsing the corpus with"
+         " the given Python bindings module instead of modeling source buffer"
+         " sizes."
+)
+parser.add_argument(
+    "corpus", nargs="+",
+    help="Source files, or directories to scan recursively for source files."
+)
+
+
+def source_files(args):
+    """
+    Yield the paths of all source files in the corpus.
+    """
+    def is_source(path):
+        return not args.extension or any(
+            path.endswith(ext) for ext in args.extension
+        )
+
+    for path in args.corpus:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for f in sorted(filenames):
+                    if is_source(f):
+                        yield os.path.join(dirpath, f)
+        else:
+            yield path
+
+
+def buffer_sizes(path, charset):
+    """
+    Return the size in bytes of the source buffer for the given file with the
+    32-bit representation and the size with the representation that
+    compaction selects.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    wide_size = 4 * len(data)
+
+    # Like the library, strip the byte order mark, if any
+    text = data.decode(charset, errors="replace")
+    if text.startswith("\ufeff"):
+        text = text[1:]
+
+    if all(ord(c) < 256 for c in text):
+        return wide_size, len(text)
+    else:
+        return wide_size, wide_size
+
+
+def resident_set_size():
+    """
+    Return the resident set size of this process, in bytes.
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                # The size is given in kiB
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("cannot read the resident set size")
+
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+def measure(args):
+    """
+    Parse all source files with the ``args.measure`` Python bindings, keeping
+    their analysis units alive, and print the resident set size increase.
+    """
+    lib = importlib.import_module(args.measure)
+    files = list(source_files(args))
+    if not files:
+        print("No source file found", file=sys.stderr)
+        sys.exit(1)
+
+    ctx = lib.AnalysisContext(charset=args.charset)
+    before = resident_set_size()
+    units = [ctx.get_from_file(f) for f in files]
+    after = resident_set_size()
+
+    print(f"Units: {len(units)}")
+    print(
+        f"Measured RSS increase: {format_size(after - before)} in total,"
+        f" {format_size((after - before) / len(units))} per unit"
+    )
+
+
+def main(args):
+    if args.measure:
+        measure(args)
+        return
+
+    count = 0
+    compact_count = 0
+    total_before = 0
+    total_after = 0
+
+    for path in source_files(args):
+        before, after = buffer_sizes(path, args.charset)
+        count += 1
+        if after < before:
+            compact_count += 1
+        total_before += before
+        total_after += after
+
+    if not count:
+        print("No source file found", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Units: {count} ({compact_count} compact)")
+    print("Modeled source buffer sizes (not measured):")
+    for label, total in [("Before", total_before), ("After", total_after)]:
+        print(
+            f"  {label}: {format_size(total)} in total,"
+            f" {format_size(total / count)} per unit"
+        )
+    if total_before:
+        print(f"  Reduction: {100 * (1 - total_after / total_before):.1f}%")
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())